@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the generator's event and service models.
+
+Synthesises a federated corpus of event and service markdown files (many
+domains, each with its own type prefix, owner and parent services), loads
+it with the generator and reports the memory retained per record, measured
+with tracemalloc.
+
+Two layouts are compared on the same corpus:
+
+- baseline: plain (non-slotted) dataclasses holding the strings exactly as
+            parsed and file_path as a Path, as the generator stored them before
+- compact:  the slotted Event and Service models with interned identifiers
+            and file_path as a string
+
+Usage:
+    python benchmark_models.py --domains 40 --services-per-domain 25
+    python benchmark_models.py --output benchmark-models.json
+"""
+import argparse
+import dataclasses
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import generate_asyncapi  # noqa: E402
+from generate_asyncapi import AsyncAPIGenerator  # noqa: E402
+
+SCHEMA_BASE_URL = 'https://notify.nhs.uk/cloudevents/schemas'
+LAYOUTS = ('baseline', 'compact')
+
+
+def build_corpus(root: Path, domains: int, services_per_domain: int, events_per_service: int) -> Dict[str, Path]:
+    """Write events and services for a corpus, returning the directories."""
+    events_dir = root / 'events'
+    services_dir = root / 'services'
+    events_dir.mkdir(parents=True)
+    services_dir.mkdir(parents=True)
+
+    for d in range(domains):
+        domain = f'domain{d:03d}'
+        domain_title = f'Domain {d:03d} Services'
+        owner = f'NHS Notify Domain {d:03d} Team'
+        type_prefix = f'uk.nhs.notify.{domain}'
+        domain_dir = services_dir / domain
+        domain_dir.mkdir()
+        (domain_dir / 'index.md').write_text(
+            f"---\ntitle: {domain_title}\nparent: NHS Notify\nc4type: container\nowner: {owner}\n---\n"
+        )
+
+        for s in range(services_per_domain):
+            service_title = f'{domain_title} Service {s:03d}'
+            raised = []
+            for e in range(events_per_service):
+                name = f'{domain}-service{s:03d}-event{e:02d}'
+                raised.append(name)
+                (events_dir / f'{name}.md').write_text(
+                    f"---\n"
+                    f"title: {name}\n"
+                    f"type: {type_prefix}.service{s:03d}.event{e:02d}.v1\n"
+                    f"nice_name: Service{s:03d}Event{e:02d}\n"
+                    f"service: {service_title}\n"
+                    f"schema_envelope: {SCHEMA_BASE_URL}/{domain}/2025-10-draft/events/"
+                    f"{type_prefix}.service{s:03d}.event{e:02d}.v1.schema.json\n"
+                    f"schema_data: {SCHEMA_BASE_URL}/{domain}/2025-10-draft/data/{domain}-base-data.schema.json\n"
+                    f"---\n\n"
+                    f"Raised by {service_title}.\n"
+                )
+            # Each service consumes the events of the previous service in its domain
+            consumed = [f'{domain}-service{(s - 1) % services_per_domain:03d}-event{e:02d}'
+                        for e in range(events_per_service)]
+            service_dir = domain_dir / f'service{s:03d}'
+            service_dir.mkdir()
+            (service_dir / 'index.md').write_text(
+                f"---\n"
+                f"title: {service_title}\n"
+                f"parent: {domain_title}\n"
+                f"c4type: component\n"
+                f"owner: {owner}\n"
+                f"author: {owner}\n"
+                f"events-raised: {' '.join(raised)}\n"
+                f"events-consumed: {' '.join(consumed)}\n"
+                f"---\n"
+            )
+
+    return {'events_dir': events_dir, 'services_dir': services_dir}
+
+
+def unslotted(cls):
+    """Return a plain dataclass with the same fields as a slotted model, holding file_path as a Path."""
+    def __post_init__(self):
+        if self.file_path is not None:
+            self.file_path = Path(self.file_path)
+
+    return dataclasses.make_dataclass(cls.__name__, [
+        (f.name, f.type, dataclasses.field(default=f.default, default_factory=f.default_factory))
+        for f in dataclasses.fields(cls)
+    ], namespace={'__post_init__': __post_init__})
+
+
+@contextmanager
+def layout(name: str):
+    """Load records with the given model layout within the block."""
+    if name == 'compact':
+        yield
+        return
+    with patch.object(generate_asyncapi, 'Event', unslotted(generate_asyncapi.Event)), \
+            patch.object(generate_asyncapi, 'Service', unslotted(generate_asyncapi.Service)), \
+            patch.object(generate_asyncapi, 'intern_str', lambda value: value):
+        yield
+
+
+def measure(paths: Dict[str, Path], output_dir: Path, name: str) -> Dict[str, Any]:
+    """Load the corpus with one layout and measure the memory it retains."""
+    config = {
+        'events_dir': str(paths['events_dir']),
+        'services_dir': str(paths['services_dir']),
+        'output_dir': str(output_dir),
+    }
+    with layout(name):
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        generator = AsyncAPIGenerator(config)
+        generator.load_events()
+        generator.load_services()
+        load_seconds = time.perf_counter() - start
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+    records = len(generator.events) + len(generator.services)
+    return {
+        'events': len(generator.events),
+        'services': len(generator.services),
+        'retained_bytes': retained,
+        'bytes_per_record': round(retained / records, 1) if records else 0,
+        'load_seconds': round(load_seconds, 4),
+    }
+
+
+def run_benchmark(domains: int, services_per_domain: int, events_per_service: int,
+                  work_dir: Path) -> Dict[str, Any]:
+    """Build the corpus under work_dir and measure both layouts."""
+    paths = build_corpus(work_dir / 'corpus', domains, services_per_domain, events_per_service)
+    results = {name: measure(paths, work_dir / 'output', name) for name in LAYOUTS}
+    baseline = results['baseline']['bytes_per_record']
+    compact = results['compact']['bytes_per_record']
+    return {
+        'corpus': {
+            'domains': domains,
+            'services_per_domain': services_per_domain,
+            'events_per_service': events_per_service,
+        },
+        'layouts': results,
+        'reduction_percent': round(100 * (baseline - compact) / baseline, 1) if baseline else 0,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print a summary table."""
+    print(f"{'layout':<10} {'events':>8} {'services':>9} {'bytes/record':>13} {'load s':>8}")
+    for name, result in report['layouts'].items():
+        print(f"{name:<10} {result['events']:>8} {result['services']:>9} "
+              f"{result['bytes_per_record']:>13} {result['load_seconds']:>8}")
+    print(f"Memory per record reduced by {report['reduction_percent']}%")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Benchmark memory per record of the generator models')
+    parser.add_argument('--domains', type=int, default=40, help='Number of domains (default: 40)')
+    parser.add_argument('--services-per-domain', type=int, default=25,
+                        help='Services in each domain (default: 25)')
+    parser.add_argument('--events-per-service', type=int, default=4,
+                        help='Events raised by each service (default: 4)')
+    parser.add_argument('--output', type=str, default=None, help='Write the report as JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run_benchmark(args.domains, args.services_per_domain, args.events_per_service, Path(tmp))
+
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()
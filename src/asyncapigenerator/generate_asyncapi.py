@@ -6,17 +6,133 @@ This script generates AsyncAPI 3.0 specifications from event definitions,
 service architecture, and JSON schemas.
 """
 import yaml
+import hashlib
 import json
 import os
+import re
 import sys
 import argparse
+import logging
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterable, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
+# Shared build tooling lives alongside this project in src/tooling
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'tooling'))
 
-@dataclass
+from build_logging import add_logging_arguments, configure_logging, get_logger  # noqa: E402
+from file_watcher import FileWatcher  # noqa: E402
+from instrumentation import Instrumentation  # noqa: E402
+from schema_resolver import SchemaResolver  # noqa: E402
+
+logger = get_logger('asyncapigenerator')
+
+OUTPUT_FORMATS = ['yaml', 'json', 'both']
+
+# Sharded combined output: one spec per parent under output_dir/shards,
+# with services that have no parent grouped under UNGROUPED_SHARD
+SHARDS_DIR = 'shards'
+SHARD_INDEX = 'index'
+UNGROUPED_SHARD = 'ungrouped'
+
+# Aggregated container specs, covering a service and all its descendants
+AGGREGATED_DIR = 'aggregated'
+
+# --check problem categories; errors fail the check, warnings only with --strict
+CHECK_ERRORS = ['missing_events', 'duplicate_event_titles', 'duplicate_service_titles', 'duplicate_event_types']
+CHECK_WARNINGS = ['orphaned_events', 'services_without_events']
+
+
+def render_spec(asyncapi_spec: Dict[str, Any], fmt: str) -> str:
+    """Serialise a spec as 'yaml' or 'json'; both hold the same document."""
+    if fmt == 'json':
+        return json.dumps(asyncapi_spec, indent=2, ensure_ascii=False) + '\n'
+    return yaml.dump(asyncapi_spec, default_flow_style=False, sort_keys=False)
+
+
+def service_metadata(service: 'Service') -> Dict[str, Optional[str]]:
+    """Return the x-service-metadata block describing a service."""
+    return {
+        'c4type': service.c4type,
+        'owner': service.owner,
+        'author': service.author,
+        'parent': service.parent
+    }
+
+
+def service_description(service: 'Service') -> str:
+    """Return the description a service's own spec is given."""
+    return service.description or f'AsyncAPI specification for {service.title}'
+
+
+def operation_slug(text: str) -> str:
+    """Return text as a lower-case identifier of letters, digits and underscores."""
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+def stable_operation_ids(operations: Iterable[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], str]:
+    """
+    Assign content-derived IDs to (action, channel_id, service title) operations.
+
+    IDs are '<action>_<channel_id>_by_<service slug>', so they do not depend
+    on the order of services or on which other services are present. When
+    distinct service titles share a slug, the title that sorts first keeps
+    the plain ID and the others get a suffix hashed from their title. Adding
+    a colliding service therefore renames only its own operations, unless
+    its title sorts before the one already present.
+    """
+    by_base: Dict[str, Set[Tuple[str, str, str]]] = {}
+    for action, channel_id, service in operations:
+        base = f'{action}_{channel_id}_by_{operation_slug(service)}'
+        by_base.setdefault(base, set()).add((action, channel_id, service))
+
+    ids = {}
+    for base, keys in by_base.items():
+        owner = min(service for _, _, service in keys)
+        for key in keys:
+            if key[2] == owner:
+                ids[key] = base
+            else:
+                ids[key] = f"{base}_{hashlib.sha1(key[2].encode('utf-8')).hexdigest()[:8]}"
+    return ids
+
+
+def diff_specs(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Structurally compare two specs.
+
+    Returns:
+        For channels and operations, a list of '+id', '-id' and '~id'
+        entries for ids added, removed or changed; other top-level sections
+        that differ are listed under 'sections'. Empty if the specs match.
+    """
+    changes: Dict[str, List[str]] = {}
+    for section in ('channels', 'operations'):
+        before = old.get(section) or {}
+        after = new.get(section) or {}
+        entries = [f'+{key}' for key in sorted(after.keys() - before.keys())]
+        entries += [f'-{key}' for key in sorted(before.keys() - after.keys())]
+        entries += [f'~{key}' for key in sorted(before.keys() & after.keys()) if before[key] != after[key]]
+        if entries:
+            changes[section] = entries
+
+    other = [key for key in sorted((old.keys() | new.keys()) - {'channels', 'operations'})
+             if old.get(key) != new.get(key)]
+    if other:
+        changes['sections'] = other
+    return changes
+
+
+def intern_str(value):
+    """Intern strings so repeated identifiers share one object; other values pass through."""
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True)
 class Event:
     """Represents an event definition from markdown frontmatter."""
     title: str
@@ -26,10 +142,11 @@ class Event:
     schema_envelope: str
     schema_data: str
     description: str = ""
-    file_path: Optional[Path] = None
+    # Kept as a string: a Path object costs several times the memory
+    file_path: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Service:
     """Represents a service/system from architecture definitions."""
     title: str
@@ -40,7 +157,96 @@ class Service:
     owner: Optional[str] = None
     author: Optional[str] = None
     description: str = ""
-    file_path: Optional[Path] = None
+    file_path: Optional[str] = None
+
+
+@dataclass
+class ServiceHierarchy:
+    """Ancestor and descendant index over services linked by parent."""
+    # Service title -> ancestor titles, nearest first
+    ancestors: Dict[str, Tuple[str, ...]]
+    # Service title -> titles of every service below it
+    descendants: Dict[str, Set[str]]
+
+    def containers(self) -> List[str]:
+        """Return the titles of services that have descendants, sorted."""
+        return sorted(title for title, below in self.descendants.items() if below)
+
+
+def build_hierarchy(services: Dict[str, Service]) -> ServiceHierarchy:
+    """
+    Compute the transitive closure of the service parent links.
+
+    Each service is visited once: ancestor chains are memoised, so a walk
+    stops at the first service whose chain is already known. Parents that
+    are not loaded services end the chain, and cycles are broken with a
+    warning.
+    """
+    ancestors: Dict[str, Tuple[str, ...]] = {}
+    for title in services:
+        path: List[str] = []
+        current: Optional[str] = title
+        while current is not None and current not in ancestors and current not in path:
+            path.append(current)
+            parent = services[current].parent
+            current = parent if parent in services else None
+
+        if current is None:
+            above: Tuple[str, ...] = ()
+        elif current in path:
+            logger.warning("Service parent cycle through '%s'", current)
+            above = ()
+        else:
+            above = (current,) + ancestors[current]
+
+        for node in reversed(path):
+            ancestors[node] = above
+            above = (node,) + above
+
+    descendants: Dict[str, Set[str]] = {title: set() for title in services}
+    for title, chain in ancestors.items():
+        for ancestor in chain:
+            descendants[ancestor].add(title)
+    return ServiceHierarchy(ancestors=ancestors, descendants=descendants)
+
+
+class EventTable:
+    """
+    Dense integer IDs for event titles, with each service's events as IDs.
+
+    Known events get IDs 0..len(events)-1 in load order; titles that
+    services reference but that are not loaded get the IDs after them, so
+    a missing reference is any ID >= known. users is the reverse index
+    from event ID to the titles of the services raising or consuming it.
+    """
+    __slots__ = ('ids', 'titles', 'events', 'known', 'raised', 'consumed', 'users')
+
+    def __init__(self, events: Dict[str, Event], services: Dict[str, Service]):
+        self.ids: Dict[str, int] = {}
+        self.titles: List[str] = []
+        self.events: List[Event] = list(events.values())
+        for event in self.events:
+            self._id(event.title)
+        self.known = len(self.events)
+
+        self.raised: Dict[str, Tuple[int, ...]] = {}
+        self.consumed: Dict[str, Tuple[int, ...]] = {}
+        for service in services.values():
+            self.raised[service.title] = tuple(self._id(title) for title in service.events_raised)
+            self.consumed[service.title] = tuple(self._id(title) for title in service.events_consumed)
+
+        self.users: List[Set[str]] = [set() for _ in self.ids]
+        for table in (self.raised, self.consumed):
+            for service_title, event_ids in table.items():
+                for event_id in event_ids:
+                    self.users[event_id].add(service_title)
+
+    def _id(self, title: str) -> int:
+        event_id = self.ids.get(title)
+        if event_id is None:
+            event_id = self.ids[title] = len(self.titles)
+            self.titles.append(title)
+        return event_id
 
 
 class AsyncAPIGenerator:
@@ -51,15 +257,34 @@ class AsyncAPIGenerator:
         self.config = config
         self.events_dir = Path(config.get('events_dir', '../../docs/collections/_events'))
         self.services_dir = Path(config.get('services_dir', '../../docs/architecture/c4/notifhir'))
-        self.schemas_dir = Path(config.get('schemas_dir', '../../schemas/digital-letters'))
+        self.schemas_dir = Path(config.get('schemas_dir', '../cloudevents/domains/digital-letters'))
         self.output_dir = Path(config.get('output_dir', './output'))
         self.schema_base_url = config.get('schema_base_url', 'https://notify.nhs.uk/cloudevents/schemas/digital-letters')
 
         self.events: Dict[str, Event] = {}
         self.services: Dict[str, Service] = {}
 
-        # Ensure output directory exists
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Built from the model on first use and dropped whenever it changes
+        self._hierarchy: Optional[ServiceHierarchy] = None
+        self._event_table: Optional[EventTable] = None
+
+        # Files sharing a title with an earlier file; only the last one loaded is kept
+        self.duplicate_events: Dict[str, List[Path]] = {}
+        self.duplicate_services: Dict[str, List[Path]] = {}
+
+        # Version being written when generating several versions in one run;
+        # None uses info.version and the schema URLs as written in the events
+        self.target_version: Optional[str] = None
+
+        # Span timings and file counters, written out by --profile
+        self.instrumentation = Instrumentation('asyncapigenerator')
+
+        # Bundle schemas from schemas_dir into components.schemas; the resolver
+        # caches each schema file so it is parsed once across all services
+        self.schema_resolver: Optional[SchemaResolver] = None
+        if config.get('resolve_schemas', False):
+            self.schema_resolver = SchemaResolver(self.schemas_dir, self.schema_base_url, self.instrumentation)
+        self._missing_schemas: Set[str] = set()
 
     def parse_frontmatter(self, content: str) -> Dict[str, Any]:
         """Extract YAML frontmatter from markdown content."""
@@ -75,105 +300,236 @@ class AsyncAPIGenerator:
             frontmatter = content[3:end_idx].strip()
             return yaml.safe_load(frontmatter) or {}
         except Exception as e:
-            print(f"Error parsing frontmatter: {e}")
+            logger.error(f"Error parsing frontmatter: {e}")
             return {}
 
+    def _read_source(self, path: Path) -> str:
+        """Read a markdown source file, recording the read."""
+        with self.instrumentation.span('load'):
+            with open(path, 'r') as f:
+                content = f.read()
+        self.instrumentation.record_read(len(content.encode('utf-8')))
+        return content
+
+    def _write_spec(self, asyncapi_spec: Dict[str, Any], output_base: Path,
+                    output_format: str = 'yaml') -> List[Path]:
+        """
+        Serialise a spec and write it, recording each write.
+
+        Writes <output_base>.yaml, <output_base>.json or both, depending on
+        output_format. Both files hold the same document.
+
+        Returns:
+            The files written
+        """
+        formats = ['yaml', 'json'] if output_format == 'both' else [output_format]
+        written = []
+        for fmt in formats:
+            with self.instrumentation.span('render'):
+                content = render_spec(asyncapi_spec, fmt)
+            output_file = output_base.with_name(f"{output_base.name}.{fmt}")
+            with self.instrumentation.span('write'):
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(output_file, 'w') as f:
+                    f.write(content)
+            self.instrumentation.record_write(len(content.encode('utf-8')))
+            written.append(output_file)
+        return written
+
+    def _load_event_file(self, event_file: Path) -> Optional[Event]:
+        """Parse an event markdown file, returning None if it has no frontmatter."""
+        content = self._read_source(event_file)
+
+        with self.instrumentation.span('parse'):
+            metadata = self.parse_frontmatter(content)
+        if not metadata:
+            self.instrumentation.record_skip()
+            return None
+
+        # Extract description from content after frontmatter
+        end_idx = content.find('---', 3)
+        description = content[end_idx + 3:].strip() if end_idx != -1 else ""
+
+        # Identifiers repeat across thousands of records in a large corpus, so
+        # they are interned; the event title is shared with service references
+        return Event(
+            title=intern_str(metadata.get('title', event_file.stem)),
+            type=intern_str(metadata.get('type', '')),
+            nice_name=intern_str(metadata.get('nice_name', '')),
+            service=intern_str(metadata.get('service', '')),
+            schema_envelope=intern_str(metadata.get('schema_envelope', '')),
+            schema_data=intern_str(metadata.get('schema_data', '')),
+            description=description,
+            file_path=str(event_file)
+        )
+
+    def _load_service_file(self, service_file: Path) -> Optional[Service]:
+        """Parse a service index.md file, returning None if it has no title."""
+        content = self._read_source(service_file)
+
+        with self.instrumentation.span('parse'):
+            metadata = self.parse_frontmatter(content)
+        if not metadata:
+            self.instrumentation.record_skip()
+            return None
+
+        title = metadata.get('title', '')
+        if not title:
+            self.instrumentation.record_skip()
+            return None
+
+        # Parse events-raised and events-consumed (can be comma or space separated)
+        events_raised = metadata.get('events-raised', [])
+        if isinstance(events_raised, str):
+            events_raised = [e.strip() for e in events_raised.replace(',', ' ').split() if e.strip()]
+
+        events_consumed = metadata.get('events-consumed', [])
+        if isinstance(events_consumed, str):
+            events_consumed = [e.strip() for e in events_consumed.replace(',', ' ').split() if e.strip()]
+
+        # Extract description from content
+        end_idx = content.find('---', 3)
+        description = content[end_idx + 3:].strip() if end_idx != -1 else ""
+
+        return Service(
+            title=intern_str(title),
+            parent=intern_str(metadata.get('parent')),
+            events_raised=[intern_str(e) for e in events_raised],
+            events_consumed=[intern_str(e) for e in events_consumed],
+            c4type=intern_str(metadata.get('c4type')),
+            owner=intern_str(metadata.get('owner')),
+            author=intern_str(metadata.get('author')),
+            description=description,
+            file_path=str(service_file)
+        )
+
     def load_events(self):
         """Load all event definitions from markdown files."""
-        print(f"Loading events from {self.events_dir}")
+        logger.debug("Loading events from %s", self.events_dir)
+        self._event_table = None
+        self.events = {}
+        self.duplicate_events = {}
 
         if not self.events_dir.exists():
-            print(f"Warning: Events directory not found: {self.events_dir}")
+            logger.warning("Events directory not found: %s", self.events_dir)
             return
 
         event_files = list(self.events_dir.glob("*.md"))
-        print(f"Found {len(event_files)} event file(s)")
+        logger.debug("Found %d event file(s)", len(event_files))
 
         for event_file in event_files:
             try:
-                with open(event_file, 'r') as f:
-                    content = f.read()
-
-                metadata = self.parse_frontmatter(content)
-                if not metadata:
+                event = self._load_event_file(event_file)
+                if event is None:
                     continue
 
-                # Extract description from content after frontmatter
-                end_idx = content.find('---', 3)
-                description = content[end_idx + 3:].strip() if end_idx != -1 else ""
-
-                event = Event(
-                    title=metadata.get('title', event_file.stem),
-                    type=metadata.get('type', ''),
-                    nice_name=metadata.get('nice_name', ''),
-                    service=metadata.get('service', ''),
-                    schema_envelope=metadata.get('schema_envelope', ''),
-                    schema_data=metadata.get('schema_data', ''),
-                    description=description,
-                    file_path=event_file
-                )
-
-                self.events[event.title] = event
-                print(f"  Loaded event: {event.title} ({event.type})")
+                self._add_definition(self.events, self.duplicate_events, event, event_file, 'Event')
+                logger.debug("  Loaded event: %s (%s)", event.title, event.type)
 
             except Exception as e:
-                print(f"Error loading event {event_file}: {e}")
+                logger.error(f"Error loading event {event_file}: {e}")
 
     def load_services(self):
         """Load all service definitions from architecture markdown files."""
-        print(f"\nLoading services from {self.services_dir}")
+        logger.debug("Loading services from %s", self.services_dir)
+        self._hierarchy = None
+        self._event_table = None
+        self.services = {}
+        self.duplicate_services = {}
 
         if not self.services_dir.exists():
-            print(f"Warning: Services directory not found: {self.services_dir}")
+            logger.warning("Services directory not found: %s", self.services_dir)
             return
 
         # Recursively find all index.md files (service definitions)
         service_files = list(self.services_dir.rglob("index.md"))
-        print(f"Found {len(service_files)} service file(s)")
+        logger.debug("Found %d service file(s)", len(service_files))
 
         for service_file in service_files:
             try:
-                with open(service_file, 'r') as f:
-                    content = f.read()
-
-                metadata = self.parse_frontmatter(content)
-                if not metadata:
-                    continue
-
-                title = metadata.get('title', '')
-                if not title:
+                service = self._load_service_file(service_file)
+                if service is None:
                     continue
 
-                # Parse events-raised and events-consumed (can be comma or space separated)
-                events_raised = metadata.get('events-raised', [])
-                if isinstance(events_raised, str):
-                    events_raised = [e.strip() for e in events_raised.replace(',', ' ').split() if e.strip()]
-
-                events_consumed = metadata.get('events-consumed', [])
-                if isinstance(events_consumed, str):
-                    events_consumed = [e.strip() for e in events_consumed.replace(',', ' ').split() if e.strip()]
-
-                # Extract description from content
-                end_idx = content.find('---', 3)
-                description = content[end_idx + 3:].strip() if end_idx != -1 else ""
-
-                service = Service(
-                    title=title,
-                    parent=metadata.get('parent'),
-                    events_raised=events_raised,
-                    events_consumed=events_consumed,
-                    c4type=metadata.get('c4type'),
-                    owner=metadata.get('owner'),
-                    author=metadata.get('author'),
-                    description=description,
-                    file_path=service_file
-                )
-
-                self.services[title] = service
-                print(f"  Loaded service: {title} (raises: {len(events_raised)}, consumes: {len(events_consumed)})")
+                self._add_definition(self.services, self.duplicate_services, service, service_file, 'Service')
+                logger.debug("  Loaded service: %s (raises: %d, consumes: %d)",
+                             service.title, len(service.events_raised), len(service.events_consumed))
 
             except Exception as e:
-                print(f"Error loading service {service_file}: {e}")
+                logger.error(f"Error loading service {service_file}: {e}")
+
+    def check_references(self) -> Dict[str, List[str]]:
+        """
+        Cross-check the loaded events and services.
+
+        Returns:
+            Problems by category (see CHECK_ERRORS and CHECK_WARNINGS), each
+            a sorted list of messages; empty lists mean no problems
+        """
+        table = self.event_table()
+        problems: Dict[str, List[str]] = {category: [] for category in CHECK_ERRORS + CHECK_WARNINGS}
+
+        for service in self.services.values():
+            service_refs = set(table.raised[service.title] + table.consumed[service.title])
+            for event_id in service_refs:
+                if event_id >= table.known:
+                    problems['missing_events'].append(f"{service.title}: unknown event '{table.titles[event_id]}'")
+
+        for title, paths in self.duplicate_events.items():
+            problems['duplicate_event_titles'].append(f"{title}: {', '.join(str(p) for p in paths)}")
+        for title, paths in self.duplicate_services.items():
+            problems['duplicate_service_titles'].append(f"{title}: {', '.join(str(p) for p in paths)}")
+
+        titles_by_type: Dict[str, Set[str]] = {}
+        for event in self.events.values():
+            titles_by_type.setdefault(event.type, set()).add(event.title)
+        for event_type, titles in titles_by_type.items():
+            if len(titles) > 1:
+                problems['duplicate_event_types'].append(f"{event_type}: {', '.join(sorted(titles))}")
+
+        for event_id in range(table.known):
+            if not table.users[event_id]:
+                problems['orphaned_events'].append(f"{table.titles[event_id]}: not raised or consumed by any service")
+
+        # Services that are another service's parent group others and need no events
+        parents = {service.parent for service in self.services.values() if service.parent}
+        for service in self.services.values():
+            if not service.events_raised and not service.events_consumed and service.title not in parents:
+                problems['services_without_events'].append(f"{service.title}: raises and consumes no events")
+
+        return {category: sorted(messages) for category, messages in problems.items()}
+
+    def check(self, strict: bool = False) -> int:
+        """
+        Load the model and report reference problems without writing specs.
+
+        Args:
+            strict: Treat warnings (orphaned events, services without
+                events) as failures
+
+        Returns:
+            Exit status: 1 if the check failed, 0 otherwise
+        """
+        with self.instrumentation.span('load_events'):
+            self.load_events()
+        with self.instrumentation.span('load_services'):
+            self.load_services()
+        with self.instrumentation.span('check'):
+            problems = self.check_references()
+
+        failing = CHECK_ERRORS + (CHECK_WARNINGS if strict else [])
+        for category in CHECK_ERRORS + CHECK_WARNINGS:
+            for message in problems[category]:
+                level = 'ERROR' if category in failing else 'WARNING'
+                logger.log(getattr(logging, level), "%s: %s", category, message)
+
+        failures = sum(len(problems[category]) for category in failing)
+        warnings = sum(len(problems[category]) for category in CHECK_WARNINGS if category not in failing)
+        logger.info(
+            f"Checked {len(self.events)} events and {len(self.services)} services: "
+            f"{failures} problem(s), {warnings} warning(s)"
+        )
+        return 1 if failures else 0
 
     def generate_channel_for_event(self, event: Event) -> Dict[str, Any]:
         """Generate an AsyncAPI channel definition for an event."""
@@ -187,16 +543,23 @@ class AsyncAPIGenerator:
             'description': event.description or f'Event of type {event.type}',
             'contentType': 'application/cloudevents+json',
             'payload': {
-                '$ref': event.schema_envelope
+                '$ref': self._versioned_url(event.schema_envelope)
             }
         }
 
         # Add data schema reference as trait
         if event.schema_data:
             message['traits'] = [{
-                'description': f'Data schema: {event.schema_data}'
+                'description': f'Data schema: {self._versioned_url(event.schema_data)}'
             }]
 
+        # Point at the bundled envelope, keeping the published URL for consumers
+        # such as the EventCatalog importer that copy the schema files
+        envelope = self._resolve_schema(event.schema_envelope)
+        if envelope:
+            message['payload'] = {'$ref': f'#/components/schemas/{envelope[0]}'}
+            message['x-schema-url'] = self._versioned_url(event.schema_envelope)
+
         channel = {
             'address': channel_name,
             'messages': {
@@ -207,6 +570,42 @@ class AsyncAPIGenerator:
 
         return channel
 
+    def _versioned_url(self, url: str) -> str:
+        """
+        Return a schema URL pointing at the target version.
+
+        Schema URLs are <schema_base_url>/<version>/..., so the first path
+        segment after the base URL is swapped for target_version.
+        """
+        prefix = self.schema_base_url.rstrip('/') + '/'
+        if self.target_version is None or not url.startswith(prefix):
+            return url
+        _, sep, rest = url[len(prefix):].partition('/')
+        return f"{prefix}{self.target_version}{sep}{rest}" if sep else url
+
+    def _resolve_schema(self, url: str) -> Optional[Tuple[str, Dict[str, Dict[str, Any]]]]:
+        """Resolve a schema URL when schema resolution is enabled."""
+        if self.schema_resolver is None or not url:
+            return None
+        url = self._versioned_url(url)
+        resolved = self.schema_resolver.resolve(url)
+        if resolved is None and url not in self._missing_schemas:
+            self._missing_schemas.add(url)
+            logger.warning("  Schema '%s' not found under %s", url, self.schemas_dir)
+        return resolved
+
+    def _add_component_schemas(self, asyncapi_spec: Dict[str, Any], events: Iterable[Event]) -> None:
+        """Add the envelope and data schemas of events to components.schemas."""
+        if self.schema_resolver is None:
+            return
+        schemas = asyncapi_spec['components'].setdefault('schemas', {})
+        for event in events:
+            for url in (event.schema_envelope, event.schema_data):
+                resolved = self._resolve_schema(url)
+                if resolved:
+                    schemas.update(resolved[1])
+        asyncapi_spec['components']['schemas'] = dict(sorted(schemas.items()))
+
     def generate_asyncapi_for_service(self, service: Service) -> Dict[str, Any]:
         """Generate AsyncAPI specification for a single service."""
         info = self.config.get('info', {})
@@ -215,8 +614,8 @@ class AsyncAPIGenerator:
             'asyncapi': self.config.get('asyncapi', {}).get('version', '3.0.0'),
             'info': {
                 'title': f"{info.get('title', 'NHS Notify')} - {service.title}",
-                'version': info.get('version', '1.0.0'),
-                'description': service.description or f'AsyncAPI specification for {service.title}',
+                'version': self.target_version or info.get('version', '1.0.0'),
+                'description': service_description(service),
             },
             'channels': {},
             'operations': {},
@@ -232,22 +631,20 @@ class AsyncAPIGenerator:
             asyncapi_spec['info']['license'] = info['license']
 
         # Add metadata about the service
-        asyncapi_spec['info']['x-service-metadata'] = {
-            'c4type': service.c4type,
-            'owner': service.owner,
-            'author': service.author,
-            'parent': service.parent
-        }
+        asyncapi_spec['info']['x-service-metadata'] = service_metadata(service)
+
+        used_events: Dict[str, Event] = {}
 
         # Process events raised (send operations)
         for event_title in service.events_raised:
             event = self.events.get(event_title)
             if not event:
-                print(f"  Warning: Event '{event_title}' not found for service '{service.title}'")
+                logger.warning("  Event '%s' not found for service '%s'", event_title, service.title)
                 continue
 
             channel = self.generate_channel_for_event(event)
             channel_id = event.type.replace('.', '_')
+            used_events[event.type] = event
 
             asyncapi_spec['channels'][channel_id] = channel
 
@@ -267,12 +664,14 @@ class AsyncAPIGenerator:
         for event_title in service.events_consumed:
             event = self.events.get(event_title)
             if not event:
-                print(f"  Warning: Event '{event_title}' not found for service '{service.title}'")
+                logger.warning("  Event '%s' not found for service '%s'", event_title, service.title)
                 continue
 
             channel = self.generate_channel_for_event(event)
             channel_id = event.type.replace('.', '_')
 
+            used_events[event.type] = event
+
             # Add channel if not already present (might be raised and consumed by same service)
             if channel_id not in asyncapi_spec['channels']:
                 asyncapi_spec['channels'][channel_id] = channel
@@ -289,18 +688,32 @@ class AsyncAPIGenerator:
                 ]
             }
 
+        self._add_component_schemas(asyncapi_spec, used_events.values())
         return asyncapi_spec
 
-    def generate_combined_asyncapi(self) -> Dict[str, Any]:
-        """Generate a combined AsyncAPI specification for all services."""
+    def generate_combined_asyncapi(self, services: Optional[Iterable[Service]] = None,
+                                   scope: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Generate a combined AsyncAPI specification.
+
+        Args:
+            services: Services to include (default: all services)
+            scope: Name of the group the services belong to, such as the
+                parent of a shard or an aggregated container
+        """
         info = self.config.get('info', {})
+        title = info.get('title', 'NHS Notify Digital Letters')
+        description = info.get('description', 'Complete event-driven architecture')
+        if scope is not None:
+            title = f"{title} - {scope}"
+            description = f'Combined AsyncAPI specification for {scope}'
 
         asyncapi_spec = {
             'asyncapi': self.config.get('asyncapi', {}).get('version', '3.0.0'),
             'info': {
-                'title': info.get('title', 'NHS Notify Digital Letters'),
-                'version': info.get('version', '1.0.0'),
-                'description': info.get('description', 'Complete event-driven architecture'),
+                'title': title,
+                'version': self.target_version or info.get('version', '1.0.0'),
+                'description': description,
             },
             'channels': {},
             'operations': {},
@@ -316,114 +729,670 @@ class AsyncAPIGenerator:
         if 'license' in info:
             asyncapi_spec['info']['license'] = info['license']
 
-        # Collect all unique events
+        # Collect the events of each (action, channel, service) operation,
+        # and each service's operations in the order its own spec lists them
         all_event_types = set()
-        service_operations = []
-
-        for service in self.services.values():
-            for event_title in service.events_raised + service.events_consumed:
-                event = self.events.get(event_title)
-                if event:
+        service_operations: Dict[Tuple[str, str, str], List[Event]] = {}
+        owned: Dict[str, Dict[Tuple[str, str, str], None]] = {}
+
+        table = self.event_table()
+        services = list(self.services.values() if services is None else services)
+        for service in services:
+            keys = owned.setdefault(service.title, {})
+            operations = [('send', event_id) for event_id in table.raised[service.title]]
+            operations += [('receive', event_id) for event_id in table.consumed[service.title]]
+            for action, event_id in operations:
+                if event_id < table.known:
+                    event = table.events[event_id]
                     all_event_types.add(event.type)
-                    service_operations.append({
-                        'service': service.title,
-                        'event': event,
-                        'action': 'send' if event_title in service.events_raised else 'receive'
-                    })
-
-        # Generate channels for all unique events
-        processed_events = set()
+                    key = (action, event.type.replace('.', '_'), service.title)
+                    events = service_operations.setdefault(key, [])
+                    if event not in events:
+                        events.append(event)
+                    keys.setdefault(key)
+
+        # Generate channels for all unique events, ordered by channel ID
+        processed_events: Dict[str, Event] = {}
         for event in self.events.values():
             if event.type in all_event_types and event.type not in processed_events:
-                channel = self.generate_channel_for_event(event)
-                channel_id = event.type.replace('.', '_')
-                asyncapi_spec['channels'][channel_id] = channel
-                processed_events.add(event.type)
-
-        # Generate operations for each service
-        for idx, op in enumerate(service_operations):
-            service = op['service']
-            event = op['event']
-            action = op['action']
-            channel_id = event.type.replace('.', '_')
-
-            operation_id = f"{action}_{channel_id}_by_{service.replace(' ', '_').lower()}_{idx}"
-            asyncapi_spec['operations'][operation_id] = {
+                processed_events[event.type] = event
+        for event_type in sorted(processed_events):
+            event = processed_events[event_type]
+            asyncapi_spec['channels'][event_type.replace('.', '_')] = self.generate_channel_for_event(event)
+
+        self._add_component_schemas(asyncapi_spec, processed_events.values())
+
+        # Generate operations, keyed and ordered by stable IDs
+        operation_ids = stable_operation_ids(service_operations)
+        for key in sorted(service_operations, key=operation_ids.get):
+            action, channel_id, service = key
+            events = service_operations[key]
+            event = events[0]
+            asyncapi_spec['operations'][operation_ids[key]] = {
                 'action': action,
                 'channel': {'$ref': f'#/channels/{channel_id}'},
                 'summary': f'{service} {action}s {event.nice_name or event.title}',
                 'description': f'{service} {"raises" if action == "send" else "consumes"} this event',
                 'messages': [
-                    {'$ref': f'#/channels/{channel_id}/messages/{event.nice_name or event.title}'}
+                    {'$ref': f'#/channels/{channel_id}/messages/{e.nice_name or e.title}'} for e in events
                 ]
             }
 
+        # Describe each service that gets its own spec, so consumers can
+        # rebuild the per-service views from this document alone
+        asyncapi_spec['x-services'] = {
+            service.title: {
+                'description': service_description(service),
+                'x-service-metadata': service_metadata(service),
+                'operations': [operation_ids[key] for key in owned[service.title]],
+            }
+            for service in sorted(services, key=lambda service: service.title)
+            if service.events_raised or service.events_consumed
+        }
+
         return asyncapi_spec
 
-    def generate(self, service_filter: Optional[str] = None):
-        """Generate AsyncAPI specifications."""
-        print("=" * 80)
-        print("NHS Notify Digital Letters - AsyncAPI Generator")
-        print("=" * 80)
+    def _resolve_format(self, output_format: Optional[str]) -> str:
+        """Return output_format, or the configured default, checking it is known."""
+        output_format = output_format or self.config.get('output_format', 'yaml')
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown output format '{output_format}' (expected one of: {', '.join(OUTPUT_FORMATS)})"
+            )
+        return output_format
+
+    def _service_spec_base(self, service_title: str) -> Path:
+        """Return the output path, without extension, for a service's spec."""
+        return self.output_dir / f"asyncapi-{service_title.lower().replace(' ', '-')}"
+
+    def _write_service_spec(self, service: Service, output_format: str) -> List[Path]:
+        """Generate and write the spec for one service."""
+        logger.debug("\nGenerating AsyncAPI for: %s", service.title)
+        with self.instrumentation.span('render'):
+            asyncapi_spec = self.generate_asyncapi_for_service(service)
+
+        output_files = self._write_spec(asyncapi_spec, self._service_spec_base(service.title), output_format)
+
+        for output_file in output_files:
+            logger.debug("  ✓ Generated: %s", output_file)
+        logger.debug("    - Channels: %d", len(asyncapi_spec['channels']))
+        logger.debug("    - Operations: %d", len(asyncapi_spec['operations']))
+        return output_files
+
+    def _write_combined_spec(self, output_format: str) -> Tuple[Dict[str, Any], List[Path]]:
+        """Generate and write the combined spec, returning it and the files written."""
+        with self.instrumentation.span('render'):
+            asyncapi_spec = self.generate_combined_asyncapi()
+        output_files = self._write_spec(asyncapi_spec, self.output_dir / "asyncapi-all", output_format)
+        return asyncapi_spec, output_files
+
+    def event_table(self) -> EventTable:
+        """Return the event ID table, building it if events or services changed."""
+        if self._event_table is None:
+            with self.instrumentation.span('event_table'):
+                self._event_table = EventTable(self.events, self.services)
+        return self._event_table
+
+    def hierarchy(self) -> ServiceHierarchy:
+        """Return the service hierarchy index, building it if services changed."""
+        if self._hierarchy is None:
+            with self.instrumentation.span('hierarchy'):
+                self._hierarchy = build_hierarchy(self.services)
+        return self._hierarchy
+
+    def aggregated_containers(self) -> List[str]:
+        """Return the containers whose subtree raises or consumes any event."""
+        hierarchy = self.hierarchy()
+        return [
+            title for title in hierarchy.containers()
+            if any(self.services[member].events_raised or self.services[member].events_consumed
+                   for member in hierarchy.descendants[title] | {title})
+        ]
+
+    def generate_aggregated_asyncapi(self, container: str) -> Dict[str, Any]:
+        """Generate a spec covering a container service and all its descendants."""
+        service = self.services[container]
+        members = sorted(self.hierarchy().descendants[container] | {container})
+        asyncapi_spec = self.generate_combined_asyncapi([self.services[title] for title in members], scope=container)
+        asyncapi_spec['info']['x-service-metadata'] = service_metadata(service)
+        asyncapi_spec['info']['x-aggregated-services'] = members
+        return asyncapi_spec
+
+    def _aggregated_spec_base(self, container: str) -> Path:
+        """Return the output path, without extension, for a container's aggregated spec."""
+        return self.output_dir / AGGREGATED_DIR / f"asyncapi-{container.lower().replace(' ', '-')}"
+
+    def _write_aggregated_specs(self, containers: Iterable[str], output_format: str) -> List[Path]:
+        """Write aggregated specs for the given containers, removing those that no longer apply."""
+        current = set(self.aggregated_containers())
+        output_files: List[Path] = []
+        for container in sorted(containers):
+            base = self._aggregated_spec_base(container)
+            if container not in current:
+                for fmt in ('yaml', 'json'):
+                    base.with_name(f"{base.name}.{fmt}").unlink(missing_ok=True)
+                continue
+            with self.instrumentation.span('render'):
+                asyncapi_spec = self.generate_aggregated_asyncapi(container)
+            output_files.extend(self._write_spec(asyncapi_spec, base, output_format))
+        return output_files
+
+    def shard_groups(self) -> Dict[str, List[Service]]:
+        """Return the services with events grouped by parent, sorted by parent."""
+        groups: Dict[str, List[Service]] = {}
+        for service in self.services.values():
+            if service.events_raised or service.events_consumed:
+                groups.setdefault(service.parent or UNGROUPED_SHARD, []).append(service)
+        return dict(sorted(groups.items()))
+
+    def _write_sharded_specs(self, output_format: str) -> Tuple[Dict[str, Any], List[Path]]:
+        """
+        Write one combined spec per parent and an index of the shards.
+
+        Shard files left over from parents that no longer have services
+        are removed. Returns the index and the shard files written.
+        """
+        shards_dir = self.output_dir / SHARDS_DIR
+        shards_dir.mkdir(parents=True, exist_ok=True)
+        info = self.config.get('info', {})
+
+        index: Dict[str, Any] = {
+            'title': info.get('title', 'NHS Notify Digital Letters'),
+            'version': self.target_version or info.get('version', '1.0.0'),
+            'shards': [],
+        }
+        output_files: List[Path] = []
+        for parent, services in self.shard_groups().items():
+            with self.instrumentation.span('render'):
+                asyncapi_spec = self.generate_combined_asyncapi(services, scope=parent)
+            files = self._write_spec(
+                asyncapi_spec, shards_dir / f"asyncapi-{parent.lower().replace(' ', '-')}", output_format
+            )
+            output_files.extend(files)
+            index['shards'].append({
+                'parent': parent,
+                'files': [f.name for f in files],
+                'services': sorted(service.title for service in services),
+                'channels': sorted(asyncapi_spec['channels']),
+            })
+
+        for stale in set(shards_dir.glob('asyncapi-*')) - set(output_files):
+            stale.unlink()
+            logger.debug("  ✓ Removed stale shard: %s", stale)
+
+        self._write_spec(index, shards_dir / SHARD_INDEX, output_format)
+        return index, output_files
+
+    def planned_specs(self, service_filter: Optional[str] = None) -> Dict[Path, Dict[str, Any]]:
+        """
+        Render every spec generate() would write, without writing it.
+
+        Returns:
+            Output path without extension -> spec, for the current version
+        """
+        planned: Dict[Path, Dict[str, Any]] = {}
+        if self.config.get('generate_per_service', True):
+            for service in self.services.values():
+                if service_filter and service.title != service_filter:
+                    continue
+                if service.events_raised or service.events_consumed:
+                    planned[self._service_spec_base(service.title)] = self.generate_asyncapi_for_service(service)
+
+        if self.config.get('generate_combined', True) and not service_filter:
+            planned[self.output_dir / 'asyncapi-all'] = self.generate_combined_asyncapi()
+            if self.config.get('shard_combined', False):
+                for parent, services in self.shard_groups().items():
+                    base = self.output_dir / SHARDS_DIR / f"asyncapi-{parent.lower().replace(' ', '-')}"
+                    planned[base] = self.generate_combined_asyncapi(services, scope=parent)
+
+        if self.config.get('aggregate_containers', False) and not service_filter:
+            for container in self.aggregated_containers():
+                planned[self._aggregated_spec_base(container)] = self.generate_aggregated_asyncapi(container)
+        return planned
+
+    def _load_existing_spec(self, output_base: Path) -> Optional[Tuple[Path, Dict[str, Any]]]:
+        """Load a previously written spec, preferring the faster .json sibling."""
+        for fmt in ('json', 'yaml'):
+            spec_file = output_base.with_name(f"{output_base.name}.{fmt}")
+            if spec_file.exists():
+                content = self._read_source(spec_file)
+                with self.instrumentation.span('parse'):
+                    spec = json.loads(content) if fmt == 'json' else yaml.safe_load(content)
+                return spec_file, spec or {}
+        return None
+
+    def diff(self, service_filter: Optional[str] = None) -> int:
+        """
+        Compare the specs that would be generated with those in output_dir.
+
+        Specs are compared as parsed documents rather than text: channels and
+        operations are reported as added (+), removed (-) or changed (~),
+        along with any other top-level sections that differ. Nothing is
+        written.
+
+        Returns:
+            Exit status: 1 if any spec would change, 0 otherwise
+        """
+        with self.instrumentation.span('load_events'):
+            self.load_events()
+        with self.instrumentation.span('load_services'):
+            self.load_services()
+
+        counts = {'changed': 0, 'new': 0, 'removed': 0, 'unchanged': 0}
+        for version, output_dir in self.version_targets():
+            with self.version_target(version, output_dir):
+                with self.instrumentation.span('render'):
+                    planned = self.planned_specs(service_filter)
+                # Names are shown relative to output_dir, including the version if any
+                root = self.output_dir.parent if version else self.output_dir
+
+                for output_base, new_spec in sorted(planned.items()):
+                    name = output_base.relative_to(root)
+                    existing = self._load_existing_spec(output_base)
+                    if existing is None:
+                        counts['new'] += 1
+                        logger.info(f"new: {name} ({len(new_spec['channels'])} channels, "
+                                    f"{len(new_spec['operations'])} operations)")
+                        continue
+
+                    with self.instrumentation.span('diff'):
+                        changes = diff_specs(existing[1], new_spec)
+                    if not changes:
+                        counts['unchanged'] += 1
+                        continue
+                    counts['changed'] += 1
+                    logger.info(f"changed: {name}")
+                    for section, entries in changes.items():
+                        logger.info(f"  {section}: {', '.join(entries)}")
+
+                if service_filter:
+                    continue
+                planned_names = {base.name for base in planned}
+                spec_dirs = {base.parent for base in planned} | {self.output_dir}
+                for spec_dir in sorted(spec_dirs):
+                    stale = {f.with_suffix('') for f in spec_dir.glob('asyncapi-*.*') if f.suffix in ('.yaml', '.json')}
+                    for output_base in sorted(stale):
+                        if output_base.name not in planned_names:
+                            counts['removed'] += 1
+                            logger.info(f"removed: {output_base.relative_to(root)}")
+
+        logger.info(
+            f"{counts['changed']} spec(s) changed, {counts['new']} new, {counts['removed']} removed, "
+            f"{counts['unchanged']} unchanged"
+        )
+        return 1 if counts['changed'] or counts['new'] or counts['removed'] else 0
+
+    def _remove_spec_files(self, service_title: str) -> List[Path]:
+        """Delete any spec files written for a service."""
+        base = self._service_spec_base(service_title)
+        removed = []
+        for fmt in ('yaml', 'json'):
+            spec_file = base.with_name(f"{base.name}.{fmt}")
+            if spec_file.exists():
+                spec_file.unlink()
+                removed.append(spec_file)
+        return removed
+
+    def generate(self, service_filter: Optional[str] = None, output_format: Optional[str] = None):
+        """
+        Generate AsyncAPI specifications.
+
+        Args:
+            service_filter: Only generate the spec for this service title
+            output_format: 'yaml', 'json' or 'both' (default: the
+                output_format config key, or 'yaml')
+        """
+        output_format = self._resolve_format(output_format)
+
+        logger.info("=" * 80)
+        logger.info("NHS Notify Digital Letters - AsyncAPI Generator")
+        logger.info("=" * 80)
 
         # Load data
-        self.load_events()
-        self.load_services()
+        with self.instrumentation.span('load_events'):
+            self.load_events()
+        with self.instrumentation.span('load_services'):
+            self.load_services()
+
+        logger.info(f"\nLoaded {len(self.events)} events and {len(self.services)} services")
+
+        # Sources are parsed once above and shared by every version written
+        for version, output_dir in self.version_targets():
+            with self.version_target(version, output_dir):
+                if version is not None:
+                    logger.info("\n" + "=" * 80)
+                    logger.info(f"Version {version} -> {output_dir}")
+                    logger.info("=" * 80)
+                if not self._generate_specs(service_filter, output_format):
+                    return
 
-        print(f"\nLoaded {len(self.events)} events and {len(self.services)} services")
+        logger.info("\n" + "=" * 80)
+        logger.info("Generation complete!")
+        logger.info("=" * 80)
+
+    def version_targets(self) -> List[Tuple[Optional[str], Path]]:
+        """
+        Return (version, output_dir) for each version to generate.
+
+        The versions config key lists version names, or mappings with a
+        version and an optional output_dir; each version is written to
+        output_dir/<version> unless given its own output_dir. Without it a
+        single (None, output_dir) target is returned.
+        """
+        versions = self.config.get('versions') or []
+        if not versions:
+            return [(None, self.output_dir)]
+
+        targets = []
+        for target in versions:
+            if isinstance(target, dict):
+                version = target.get('version')
+                if not version:
+                    raise ValueError(f"Version target is missing 'version': {target}")
+                output_dir = Path(target['output_dir']) if target.get('output_dir') else self.output_dir / version
+            else:
+                version = str(target)
+                output_dir = self.output_dir / version
+            targets.append((version, output_dir))
+        return targets
+
+    @contextmanager
+    def version_target(self, version: Optional[str], output_dir: Optional[Path] = None):
+        """
+        Render and write specs for a version within the block.
+
+        Args:
+            version: Version to render, or None for info.version and the
+                schema URLs as written in the events
+            output_dir: Directory to write to; defaults to the current one
+        """
+        previous = (self.target_version, self.output_dir)
+        self.target_version, self.output_dir = version, output_dir or self.output_dir
+        try:
+            yield
+        finally:
+            self.target_version, self.output_dir = previous
 
+    def _generate_specs(self, service_filter: Optional[str], output_format: str) -> bool:
+        """Write the per-service and combined specs, returning False if service_filter is unknown."""
         # Generate per-service specs
         if self.config.get('generate_per_service', True):
-            print("\n" + "=" * 80)
-            print("Generating AsyncAPI specifications per service")
-            print("=" * 80)
+            logger.info("\n" + "=" * 80)
+            logger.info("Generating AsyncAPI specifications per service")
+            logger.info("=" * 80)
 
             services_to_generate = self.services.values()
             if service_filter:
                 services_to_generate = [s for s in services_to_generate if s.title == service_filter]
                 if not services_to_generate:
-                    print(f"Error: Service '{service_filter}' not found")
-                    return
+                    logger.error(f"Error: Service '{service_filter}' not found")
+                    return False
 
+            generated = 0
             for service in services_to_generate:
                 # Only generate for services that have events
                 if not service.events_raised and not service.events_consumed:
-                    print(f"Skipping {service.title} (no events)")
+                    logger.debug("Skipping %s (no events)", service.title)
+                    self.instrumentation.record_skip()
                     continue
 
-                print(f"\nGenerating AsyncAPI for: {service.title}")
-                asyncapi_spec = self.generate_asyncapi_for_service(service)
-
-                # Write to file
-                filename = f"asyncapi-{service.title.lower().replace(' ', '-')}.yaml"
-                output_file = self.output_dir / filename
-
-                with open(output_file, 'w') as f:
-                    yaml.dump(asyncapi_spec, f, default_flow_style=False, sort_keys=False)
+                self._write_service_spec(service, output_format)
+                generated += 1
 
-                print(f"  ✓ Generated: {output_file}")
-                print(f"    - Channels: {len(asyncapi_spec['channels'])}")
-                print(f"    - Operations: {len(asyncapi_spec['operations'])}")
+            logger.info(f"  ✓ Generated {generated} service specification(s) in {self.output_dir}")
 
         # Generate combined spec
         if self.config.get('generate_combined', True) and not service_filter:
-            print("\n" + "=" * 80)
-            print("Generating combined AsyncAPI specification")
-            print("=" * 80)
+            logger.info("\n" + "=" * 80)
+            logger.info("Generating combined AsyncAPI specification")
+            logger.info("=" * 80)
+
+            asyncapi_spec, output_files = self._write_combined_spec(output_format)
+
+            for output_file in output_files:
+                logger.info(f"  ✓ Generated: {output_file}")
+            logger.info(f"    - Channels: {len(asyncapi_spec['channels'])}")
+            logger.info(f"    - Operations: {len(asyncapi_spec['operations'])}")
+
+            if self.config.get('shard_combined', False):
+                index, _ = self._write_sharded_specs(output_format)
+                logger.info(f"  ✓ Generated {len(index['shards'])} shard(s) in {self.output_dir / SHARDS_DIR}")
+
+        if self.config.get('aggregate_containers', False) and not service_filter:
+            containers = self.aggregated_containers()
+            self._write_aggregated_specs(containers, output_format)
+            logger.info(f"  ✓ Generated {len(containers)} aggregated container spec(s) in "
+                        f"{self.output_dir / AGGREGATED_DIR}")
+
+        return True
+
+    @staticmethod
+    def _add_definition(models: Dict, duplicates: Dict[str, List[Path]], item, path: Path, kind: str) -> None:
+        """Add an event or service, recording the clash if an earlier file already uses its title."""
+        existing = models.get(item.title)
+        if existing is not None:
+            duplicates.setdefault(item.title, [Path(existing.file_path)]).append(path)
+            logger.warning("%s title '%s' in %s is already used by %s", kind, item.title, path, existing.file_path)
+        models[item.title] = item
+
+    @staticmethod
+    def _forget_duplicate(models: Dict, duplicates: Dict[str, List[Path]], resolved: Path,
+                          load_file: Callable[[Path], Optional[Any]]) -> None:
+        """
+        Drop a reloaded file from the duplicate titles it was listed under.
+
+        A title whose kept definition came from that file falls back to the
+        last file still using it, so the model matches a fresh load.
+        """
+        for title, paths in list(duplicates.items()):
+            remaining = [path for path in paths if path.resolve() != resolved]
+            if len(remaining) == len(paths):
+                continue
+            if len(remaining) > 1:
+                duplicates[title] = remaining
+            else:
+                del duplicates[title]
+            if title in models or not remaining:
+                continue
+            try:
+                item = load_file(remaining[-1])
+            except Exception as e:
+                logger.error(f"Error loading {remaining[-1]}: {e}")
+                continue
+            if item is not None and item.title == title:
+                models[title] = item
+
+    def _reload_event(self, event_file: Path) -> Set[str]:
+        """Re-read one event file into the model, returning the titles it affects."""
+        resolved = event_file.resolve()
+        old_titles = {
+            title for title, event in self.events.items()
+            if event.file_path and Path(event.file_path).resolve() == resolved
+        }
 
-            asyncapi_spec = self.generate_combined_asyncapi()
-            output_file = self.output_dir / "asyncapi-all.yaml"
+        event = None
+        if event_file.exists():
+            try:
+                event = self._load_event_file(event_file)
+            except Exception as e:
+                # Keep the last good definition until the file parses again
+                logger.error(f"Error loading event {event_file}: {e}")
+                return set()
+
+        self._event_table = None
+        for title in old_titles:
+            del self.events[title]
+        self._forget_duplicate(self.events, self.duplicate_events, resolved, self._load_event_file)
+        if event is None:
+            return old_titles
+
+        self._add_definition(self.events, self.duplicate_events, event, event_file, 'Event')
+        logger.debug("  Reloaded event: %s (%s)", event.title, event.type)
+        return old_titles | {event.title}
+
+    def _reload_service(self, service_file: Path) -> Set[str]:
+        """Re-read one service file into the model, returning the titles it affects."""
+        resolved = service_file.resolve()
+        old_titles = {
+            title for title, service in self.services.items()
+            if service.file_path and Path(service.file_path).resolve() == resolved
+        }
 
-            with open(output_file, 'w') as f:
-                yaml.dump(asyncapi_spec, f, default_flow_style=False, sort_keys=False)
+        service = None
+        if service_file.exists():
+            try:
+                service = self._load_service_file(service_file)
+            except Exception as e:
+                logger.error(f"Error loading service {service_file}: {e}")
+                return set()
+
+        self._hierarchy = None
+        self._event_table = None
+        for title in old_titles:
+            del self.services[title]
+        self._forget_duplicate(self.services, self.duplicate_services, resolved, self._load_service_file)
+        if service is None:
+            return old_titles
+
+        self._add_definition(self.services, self.duplicate_services, service, service_file, 'Service')
+        logger.debug("  Reloaded service: %s", service.title)
+        return old_titles | {service.title}
+
+    def reload_changed(self, changed_paths: Iterable[Path]) -> Tuple[Set[str], Set[str]]:
+        """
+        Re-read changed event and service files into the in-memory model.
+
+        Paths outside events_dir and services_dir, and files that are not
+        event or service definitions, are ignored.
+
+        Returns:
+            The event titles and service titles that were added, changed
+            or removed
+        """
+        events_dir = self.events_dir.resolve()
+        services_dir = self.services_dir.resolve()
+
+        changed_events: Set[str] = set()
+        changed_services: Set[str] = set()
+        for path in map(Path, changed_paths):
+            resolved = path.resolve()
+            if path.suffix == '.md' and resolved.parent == events_dir:
+                changed_events |= self._reload_event(path)
+            elif path.name == 'index.md' and services_dir in resolved.parents:
+                changed_services |= self._reload_service(path)
+        return changed_events, changed_services
+
+    def affected_services(self, changed_events: Set[str], changed_services: Set[str]) -> Set[str]:
+        """Return the changed services plus every service using a changed event."""
+        affected = set(changed_services)
+        table = self.event_table()
+        for title in changed_events:
+            event_id = table.ids.get(title)
+            if event_id is not None:
+                affected |= table.users[event_id]
+        return affected
+
+    def apply_changes(self, changed_paths: Iterable[Path],
+                      output_format: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Reload changed source files and regenerate only the specs they affect.
+
+        Changed event files regenerate every service that raises or consumes
+        the event; changed service files regenerate that service. Specs of
+        services that were deleted, renamed or no longer have events are
+        removed. The combined spec is rebuilt from the in-memory model, so
+        no other source files are read.
+
+        Args:
+            changed_paths: Paths of added, modified or deleted markdown files
+            output_format: 'yaml', 'json' or 'both' (default: the
+                output_format config key, or 'yaml')
+
+        Returns:
+            Dict with the changed 'events' and the 'regenerated' and
+            'removed' service titles
+        """
+        output_format = self._resolve_format(output_format)
+        start = time.perf_counter()
+
+        ancestors_before = self.hierarchy().ancestors
+        changed_events, changed_services = self.reload_changed(changed_paths)
+        affected = self.affected_services(changed_events, changed_services)
+
+        # Containers above an affected service, before or after the change
+        ancestors_after = self.hierarchy().ancestors
+        affected_containers: Set[str] = set()
+        for title in affected:
+            affected_containers.update(ancestors_before.get(title, ()))
+            affected_containers.update(ancestors_after.get(title, ()))
+            if self.hierarchy().descendants.get(title):
+                affected_containers.add(title)
+
+        regenerated: Set[str] = set()
+        removed: Set[str] = set()
+        for version, output_dir in self.version_targets():
+            with self.version_target(version, output_dir):
+                if self.config.get('generate_per_service', True):
+                    for title in sorted(affected):
+                        service = self.services.get(title)
+                        if service is None or not (service.events_raised or service.events_consumed):
+                            if self._remove_spec_files(title):
+                                removed.add(title)
+                            continue
+                        self._write_service_spec(service, output_format)
+                        regenerated.add(title)
+
+                if (changed_events or changed_services) and self.config.get('generate_combined', True):
+                    self._write_combined_spec(output_format)
+                    if self.config.get('shard_combined', False):
+                        self._write_sharded_specs(output_format)
+
+                if self.config.get('aggregate_containers', False):
+                    self._write_aggregated_specs(affected_containers, output_format)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"Regenerated {len(regenerated)} service spec(s), removed {len(removed)} "
+            f"for {len(changed_events)} event and {len(changed_services)} service change(s) "
+            f"in {elapsed_ms:.1f} ms"
+        )
+        return {
+            'events': sorted(changed_events),
+            'regenerated': sorted(regenerated),
+            'removed': sorted(removed),
+        }
 
-            print(f"  ✓ Generated: {output_file}")
-            print(f"    - Channels: {len(asyncapi_spec['channels'])}")
-            print(f"    - Operations: {len(asyncapi_spec['operations'])}")
+    def watch(self, interval: float = 0.5, output_format: Optional[str] = None,
+              stop_event: Optional[threading.Event] = None,
+              use_native: Optional[bool] = None) -> None:
+        """
+        Generate everything once, then regenerate affected specs on change.
+
+        Watches events_dir and services_dir with watchdog (inotify) when it
+        is installed, or by polling otherwise. Runs until stop_event is set
+        or the process is interrupted.
+        """
+        output_format = self._resolve_format(output_format)
+        self.generate(output_format=output_format)
+
+        watcher = FileWatcher(
+            [self.events_dir, self.services_dir],
+            pattern='*.md',
+            interval=interval,
+            use_native=use_native,
+        )
+
+        def on_change(changed: Set[Path]) -> None:
+            try:
+                self.apply_changes(changed, output_format)
+            except Exception as e:
+                logger.error(f"Error regenerating specs: {e}")
 
-        print("\n" + "=" * 80)
-        print("Generation complete!")
-        print("=" * 80)
+        logger.info(
+            f"\nWatching {self.events_dir} and {self.services_dir} "
+            f"({watcher.mode}); press Ctrl+C to stop"
+        )
+        watcher.run(on_change, stop_event)
 
 
 def load_config(config_file: Optional[str] = None) -> Dict[str, Any]:
@@ -431,11 +1400,16 @@ def load_config(config_file: Optional[str] = None) -> Dict[str, Any]:
     default_config = {
         'events_dir': '../../docs/collections/_events',
         'services_dir': '../../docs/architecture/c4/notifhir',
-        'schemas_dir': '../../schemas/digital-letters',
+        'schemas_dir': '../cloudevents/domains/digital-letters',
         'output_dir': './output',
         'schema_base_url': 'https://notify.nhs.uk/cloudevents/schemas/digital-letters',
         'generate_per_service': True,
         'generate_combined': True,
+        'output_format': 'yaml',
+        'resolve_schemas': False,
+        'versions': [],
+        'shard_combined': False,
+        'aggregate_containers': False,
         'asyncapi': {
             'version': '3.0.0'
         },
@@ -492,8 +1466,76 @@ def main():
         type=str,
         help='Generate AsyncAPI for a specific service only'
     )
+    parser.add_argument(
+        '--format',
+        dest='output_format',
+        choices=OUTPUT_FORMATS,
+        help='Output format for specs: yaml, json or both (default: yaml)'
+    )
+    parser.add_argument(
+        '--versions',
+        nargs='+',
+        metavar='VERSION',
+        help='Generate each version into OUTPUT_DIR/VERSION in one run (default: info.version only)'
+    )
+    parser.add_argument(
+        '--shard-combined',
+        action='store_true',
+        help='Also write the combined spec as one shard per parent with an index, under OUTPUT_DIR/shards'
+    )
+    parser.add_argument(
+        '--aggregate-containers',
+        action='store_true',
+        help='Also write a spec per container service covering all its descendants, under OUTPUT_DIR/aggregated'
+    )
+    parser.add_argument(
+        '--resolve-schemas',
+        action='store_true',
+        help='Bundle envelope and data schemas from --schemas-dir into components.schemas'
+    )
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Check event and service references without writing specs; exits 1 on problems'
+    )
+    parser.add_argument(
+        '--strict',
+        action='store_true',
+        help='With --check, also fail on orphaned events and services without events'
+    )
+    parser.add_argument(
+        '--diff',
+        action='store_true',
+        help='Show how the specs in the output directory would change, without writing; exits 1 on changes'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and regenerate the specs affected by each change to events or services'
+    )
+    parser.add_argument(
+        '--watch-interval',
+        type=float,
+        default=0.5,
+        metavar='SECONDS',
+        help='Seconds between change checks in --watch mode (default: 0.5)'
+    )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        metavar='DIR',
+        help='Profile the run, writing a cProfile dump and JSON timing summary to DIR'
+    )
+    add_logging_arguments(parser)
 
     args = parser.parse_args()
+    if args.watch and args.service:
+        parser.error('--watch cannot be combined with --service')
+    if sum([args.check, args.diff, args.watch]) > 1:
+        parser.error('--check, --diff and --watch cannot be combined')
+    if args.strict and not args.check:
+        parser.error('--strict requires --check')
+    configure_logging('asyncapigenerator', level=args.log_level, log_file=args.log_file)
 
     # Load configuration
     config = load_config(args.config)
@@ -507,10 +1549,31 @@ def main():
         config['schemas_dir'] = args.schemas_dir
     if args.output_dir:
         config['output_dir'] = args.output_dir
+    if args.output_format:
+        config['output_format'] = args.output_format
+    if args.resolve_schemas:
+        config['resolve_schemas'] = True
+    if args.versions:
+        config['versions'] = args.versions
+    if args.shard_combined:
+        config['shard_combined'] = True
+    if args.aggregate_containers:
+        config['aggregate_containers'] = True
 
     # Generate AsyncAPI
     generator = AsyncAPIGenerator(config)
-    generator.generate(service_filter=args.service)
+    with generator.instrumentation.profile(args.profile):
+        if args.check:
+            status = generator.check(strict=args.strict)
+        elif args.diff:
+            status = generator.diff(service_filter=args.service)
+        elif args.watch:
+            generator.watch(interval=args.watch_interval)
+        else:
+            generator.generate(service_filter=args.service)
+
+    if args.check or args.diff:
+        sys.exit(status)
 
 
 if __name__ == '__main__':
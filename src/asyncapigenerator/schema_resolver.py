@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Local schema resolution for the AsyncAPI generator.
+
+Maps published schema URLs (under schema_base_url) onto the local schema
+tree (schemas_dir), loads each schema file once, and rewrites its local
+$refs to point at #/components/schemas so specs can carry every schema
+they use without network fetches.
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+
+import yaml
+
+SCHEMA_SUFFIXES = ('.schema.json', '.schema.yaml', '.schema.yml')
+COMPONENT_PREFIX = '#/components/schemas/'
+
+
+class SchemaResolver:
+    """Resolves schema URLs to bundled component schemas, caching every file."""
+
+    def __init__(self, schemas_dir: Path, schema_base_url: str, instrumentation=None):
+        """
+        Initialize the resolver.
+
+        Args:
+            schemas_dir: Local directory that schema_base_url is published from
+            schema_base_url: URL prefix of the published schemas
+            instrumentation: Optional Instrumentation recording reads and parses
+        """
+        self.schemas_dir = Path(schemas_dir).resolve()
+        self.schema_base_url = schema_base_url.rstrip('/')
+        self.instrumentation = instrumentation
+        # path -> (component name, rewritten schema, local dependencies)
+        self._bundled: Dict[Path, Tuple[str, Dict[str, Any], Set[Path]]] = {}
+        # path -> full closure of component name -> schema
+        self._closures: Dict[Path, Dict[str, Dict[str, Any]]] = {}
+        self.files_loaded = 0
+
+    def local_path(self, url: str, relative_to: Optional[Path] = None) -> Optional[Path]:
+        """
+        Return the local schema file for a URL or relative reference.
+
+        .schema.json and .schema.yaml are interchangeable, since the source
+        tree holds YAML while the published URLs end in .json.
+        """
+        if url.startswith(self.schema_base_url + '/'):
+            candidate = self.schemas_dir / url[len(self.schema_base_url) + 1:]
+        elif '://' in url or relative_to is None:
+            return None
+        else:
+            candidate = relative_to / url
+
+        candidate = Path(candidate).resolve()
+        name = candidate.name
+        for suffix in SCHEMA_SUFFIXES:
+            if name.endswith(suffix):
+                stem = name[:-len(suffix)]
+                for alternative in SCHEMA_SUFFIXES:
+                    path = candidate.with_name(stem + alternative)
+                    if path.exists():
+                        return path
+                return None
+        return candidate if candidate.exists() else None
+
+    def component_name(self, path: Path) -> str:
+        """Return the components.schemas key for a schema file."""
+        try:
+            relative = path.relative_to(self.schemas_dir).as_posix()
+        except ValueError:
+            # Outside schemas_dir, a hash of the directory keeps files with
+            # the same name from sharing one component
+            digest = hashlib.sha256(path.parent.as_posix().encode('utf-8')).hexdigest()[:8]
+            relative = f"external-{digest}/{path.name}"
+        for suffix in SCHEMA_SUFFIXES:
+            if relative.endswith(suffix):
+                relative = relative[:-len(suffix)]
+                break
+        return re.sub(r'[^A-Za-z0-9._-]', '_', relative.replace('/', '.'))
+
+    def clear(self) -> None:
+        """Forget every loaded schema, so edited files are read again."""
+        self._bundled.clear()
+        self._closures.clear()
+
+    def _load(self, path: Path) -> Dict[str, Any]:
+        """Read and parse a schema file."""
+        if self.instrumentation is not None:
+            with self.instrumentation.span('load'):
+                content = path.read_text()
+            self.instrumentation.record_read(len(content.encode('utf-8')))
+            with self.instrumentation.span('parse'):
+                return self._parse(path, content)
+        return self._parse(path, path.read_text())
+
+    @staticmethod
+    def _parse(path: Path, content: str) -> Dict[str, Any]:
+        if path.suffix == '.json':
+            return json.loads(content)
+        return yaml.safe_load(content) or {}
+
+    def _bundle(self, path: Path) -> Tuple[str, Dict[str, Any], Set[Path]]:
+        """Load one schema file and rewrite its local $refs, once per file."""
+        if path in self._bundled:
+            return self._bundled[path]
+
+        name = self.component_name(path)
+        schema = self._load(path)
+        self.files_loaded += 1
+        dependencies: Set[Path] = set()
+
+        def rewrite(node):
+            if isinstance(node, dict):
+                rewritten = {}
+                for key, value in node.items():
+                    if key == '$ref' and isinstance(value, str):
+                        rewritten[key] = self._rewrite_ref(value, path, name, dependencies)
+                    else:
+                        rewritten[key] = rewrite(value)
+                return rewritten
+            if isinstance(node, list):
+                return [rewrite(item) for item in node]
+            return node
+
+        bundled = rewrite(schema)
+        # A bundled schema is addressed through components, not its published $id
+        bundled.pop('$id', None)
+        self._bundled[path] = (name, bundled, dependencies)
+        return self._bundled[path]
+
+    def _rewrite_ref(self, ref: str, path: Path, name: str, dependencies: Set[Path]) -> str:
+        """Point a $ref at components.schemas when it targets a local file."""
+        target, _, fragment = ref.partition('#')
+        if not target:
+            return f"{COMPONENT_PREFIX}{name}{fragment}"
+
+        local = self.local_path(target, relative_to=path.parent)
+        if local is None:
+            # Left as is, e.g. schemas published from another domain
+            return ref
+        dependencies.add(local)
+        return f"{COMPONENT_PREFIX}{self.component_name(local)}{fragment}"
+
+    def resolve(self, url: str) -> Optional[Tuple[str, Dict[str, Dict[str, Any]]]]:
+        """
+        Resolve a schema URL to its component name and bundled schemas.
+
+        Returns:
+            (component name, {component name: schema} for the schema and
+            every local schema it references), or None when the URL does
+            not map to a local file
+        """
+        path = self.local_path(url)
+        if path is None:
+            return None
+
+        if path not in self._closures:
+            closure: Dict[str, Dict[str, Any]] = {}
+            pending = [path]
+            seen: Set[Path] = set()
+            while pending:
+                current = pending.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                name, schema, dependencies = self._bundle(current)
+                closure[name] = schema
+                pending.extend(dependencies - seen)
+            self._closures[path] = dict(sorted(closure.items()))
+
+        return self.component_name(path), self._closures[path]
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Local AsyncAPI spec server for NHS Notify Digital Letters
+
+Loads events and services once, then serves the specs generate() would
+write over HTTP in YAML or JSON without writing to disk. Rendered documents
+are cached with an ETag and invalidated when the source markdown or, with
+resolve_schemas, the local schemas change, so repeat requests are answered
+from memory.
+
+Routes:
+    GET /                                 Index of available specs (JSON)
+    GET /specs/all.yaml                   Combined spec
+    GET /specs/<service>.json             Spec for one service, e.g. /specs/mesh-poller.yaml
+    GET /specs/shards/<parent>.yaml       Combined spec shard, with shard_combined
+    GET /specs/aggregated/<service>.yaml  Aggregated container spec, with aggregate_containers
+
+With versions configured, each route is prefixed by the version, e.g.
+/specs/2025-10-draft/all.yaml.
+"""
+import argparse
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+# generate_asyncapi puts src/tooling on sys.path for the shared modules below
+from generate_asyncapi import AGGREGATED_DIR, SHARDS_DIR, AsyncAPIGenerator, load_config, render_spec
+from build_logging import add_logging_arguments, configure_logging, get_logger  # noqa: E402
+from file_watcher import FileWatcher  # noqa: E402
+
+logger = get_logger('asyncapigenerator')
+
+CONTENT_TYPES = {
+    'yaml': 'application/yaml',
+    'json': 'application/json',
+}
+COMBINED = 'all'
+
+# Kinds of spec served, and the index key each is listed under
+SERVICE = 'service'
+SHARD = 'shard'
+AGGREGATED = 'aggregated'
+INDEX_KEYS = {SERVICE: 'services', SHARD: 'shards', AGGREGATED: 'aggregated'}
+
+# name -> (version, kind, service or parent title)
+SpecNames = Dict[str, Tuple[Optional[str], str, str]]
+
+
+def service_slug(title: str) -> str:
+    """Return the URL and file name slug for a service title."""
+    return title.lower().replace(' ', '-')
+
+
+class SpecCache:
+    """Rendered specs keyed by (name, format), backed by an in-memory model."""
+
+    def __init__(self, generator: AsyncAPIGenerator):
+        """
+        Load the model and prepare an empty cache.
+
+        Args:
+            generator: Generator whose events and services are served
+        """
+        self.generator = generator
+        self.entries: Dict[Tuple[str, str], Tuple[bytes, str]] = {}
+        self.lock = threading.RLock()
+        self._names: Optional[SpecNames] = None
+        with generator.instrumentation.span('load_events'):
+            generator.load_events()
+        with generator.instrumentation.span('load_services'):
+            generator.load_services()
+        logger.info(
+            f"Loaded {len(generator.events)} events and {len(generator.services)} services"
+        )
+
+    def services(self) -> Dict[str, str]:
+        """Return slug -> title for every service that has events."""
+        with self.lock:
+            return {
+                service_slug(service.title): service.title
+                for service in self.generator.services.values()
+                if service.events_raised or service.events_consumed
+            }
+
+    def names(self) -> SpecNames:
+        """
+        Return every spec served, by the name in its URL.
+
+        Names mirror the output tree: <service>, all, shards/<parent> and
+        aggregated/<container>, under <version>/ when versions are configured.
+        """
+        with self.lock:
+            if self._names is not None:
+                return self._names
+            config = self.generator.config
+            services = self.services().values()
+            shards = list(self.generator.shard_groups()) if config.get('shard_combined', False) else []
+            containers = self.generator.aggregated_containers() if config.get('aggregate_containers', False) else []
+
+            names: SpecNames = {}
+            for version, _ in self.generator.version_targets():
+                prefix = f'{version}/' if version else ''
+                for title in services:
+                    names[prefix + service_slug(title)] = (version, SERVICE, title)
+                names[prefix + COMBINED] = (version, COMBINED, COMBINED)
+                for parent in shards:
+                    names[f'{prefix}{SHARDS_DIR}/{service_slug(parent)}'] = (version, SHARD, parent)
+                for container in containers:
+                    names[f'{prefix}{AGGREGATED_DIR}/{service_slug(container)}'] = (version, AGGREGATED, container)
+            self._names = names
+            return names
+
+    def index(self) -> Dict[str, Any]:
+        """Return the URLs of every spec, grouped by kind and, with versions, by version."""
+        groups: Dict[Optional[str], Dict[str, Any]] = {}
+        for name, (version, kind, title) in sorted(self.names().items()):
+            urls = {fmt: f'/specs/{name}.{fmt}' for fmt in CONTENT_TYPES}
+            group = groups.setdefault(version, {})
+            if kind == COMBINED:
+                group['combined'] = urls
+            else:
+                group.setdefault(INDEX_KEYS[kind], {})[title] = urls
+        if list(groups) == [None]:
+            return groups[None]
+        return {'versions': groups}
+
+    def _render(self, kind: str, title: str) -> Dict[str, Any]:
+        if kind == COMBINED:
+            return self.generator.generate_combined_asyncapi()
+        if kind == SHARD:
+            return self.generator.generate_combined_asyncapi(self.generator.shard_groups()[title], scope=title)
+        if kind == AGGREGATED:
+            return self.generator.generate_aggregated_asyncapi(title)
+        return self.generator.generate_asyncapi_for_service(self.generator.services[title])
+
+    def get(self, name: str, fmt: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Return (body, etag) for a spec, rendering it on a cache miss.
+
+        Returns None if there is no such spec.
+        """
+        key = (name, fmt)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                return entry
+
+            spec_name = self.names().get(name)
+            if spec_name is None:
+                return None
+            version, kind, title = spec_name
+            with self.generator.version_target(version):
+                spec = self._render(kind, title)
+
+            body = render_spec(spec, fmt).encode('utf-8')
+            etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            self.entries[key] = (body, etag)
+            return self.entries[key]
+
+    def invalidate(self, names: Set[str]) -> None:
+        """Drop cached entries for the given names in every format."""
+        with self.lock:
+            for key in [k for k in self.entries if k[0] in names]:
+                del self.entries[key]
+
+    def _is_schema(self, path: Path) -> bool:
+        if self.generator.schema_resolver is None:
+            return False
+        return self.generator.schema_resolver.schemas_dir in Path(path).resolve().parents
+
+    def apply_changes(self, changed_paths: Iterable[Path]) -> Set[str]:
+        """
+        Reload changed source files and invalidate the specs they affect.
+
+        An edited event or service drops the specs of the services it
+        affects, and every combined, shard and aggregated spec. An edited
+        schema, when schemas are resolved, clears the resolver and every
+        cached spec, since any of them may bundle it.
+
+        Returns:
+            The names that were invalidated
+        """
+        changed_paths = list(changed_paths)
+        with self.lock:
+            names_before = self.names()
+            schemas_changed = any(self._is_schema(path) for path in changed_paths)
+            changed_events, changed_services = self.generator.reload_changed(
+                path for path in changed_paths if not self._is_schema(path)
+            )
+            if not changed_events and not changed_services and not schemas_changed:
+                return set()
+
+            self._names = None
+            names = {**names_before, **self.names()}
+            if schemas_changed:
+                self.generator.schema_resolver.clear()
+                invalidated = set(names)
+            else:
+                affected = self.generator.affected_services(changed_events, changed_services)
+                invalidated = {name for name, (_, kind, title) in names.items() if kind != SERVICE or title in affected}
+            self.invalidate(invalidated)
+        logger.info(f"Invalidated {len(invalidated)} spec(s): {', '.join(sorted(invalidated))}")
+        return invalidated
+
+
+def make_handler(cache: SpecCache):
+    """Build a request handler class bound to a cache."""
+
+    class SpecRequestHandler(BaseHTTPRequestHandler):
+        """Serves specs from the cache."""
+
+        def log_message(self, format, *args):
+            logger.debug("%s - " + format, self.address_string(), *args)
+
+        def _send(self, status: int, body: bytes, content_type: str, etag: Optional[str] = None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            # Clients may cache but must revalidate, so edits show up straight away
+            self.send_header('Cache-Control', 'no-cache')
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def _send_json(self, status: int, data) -> None:
+            self._send(status, (json.dumps(data, indent=2) + '\n').encode('utf-8'), CONTENT_TYPES['json'])
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            path = urlparse(self.path).path.rstrip('/')
+
+            if path == '':
+                self._send_json(200, cache.index())
+                return
+
+            prefix, _, spec_path = path.partition('/specs/')
+            name, _, fmt = spec_path.rpartition('.')
+            if prefix or fmt not in CONTENT_TYPES or not name:
+                self._send_json(404, {'error': f'Not found: {path}'})
+                return
+
+            entry = cache.get(name, fmt)
+            if entry is None:
+                self._send_json(404, {'error': f"Spec '{name}' not found"})
+                return
+
+            body, etag = entry
+            if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+                self._send(304, b'', CONTENT_TYPES[fmt], etag)
+                return
+            self._send(200, body, CONTENT_TYPES[fmt], etag)
+
+    return SpecRequestHandler
+
+
+def create_server(config, host: str = '127.0.0.1', port: int = 8080) -> ThreadingHTTPServer:
+    """
+    Load the model and create a server for it without starting it.
+
+    The spec cache is available as server.cache. Pass port 0 to bind a
+    free port.
+    """
+    cache = SpecCache(AsyncAPIGenerator(config))
+    server = ThreadingHTTPServer((host, port), make_handler(cache))
+    server.cache = cache
+    return server
+
+
+def serve(config, host: str = '127.0.0.1', port: int = 8080, watch: bool = True,
+          interval: float = 0.5) -> None:
+    """
+    Serve specs until interrupted.
+
+    Args:
+        config: Generator configuration
+        host: Interface to bind
+        port: Port to bind
+        watch: Invalidate cached specs when source or schema files change
+        interval: Seconds between change checks
+    """
+    server = create_server(config, host, port)
+    generator = server.cache.generator
+    stop_event = threading.Event()
+
+    if watch:
+        watcher = FileWatcher(
+            [generator.events_dir, generator.services_dir],
+            pattern='*.md',
+            interval=interval,
+        )
+        threading.Thread(
+            target=watcher.run, args=(server.cache.apply_changes, stop_event), daemon=True
+        ).start()
+        if generator.schema_resolver is not None:
+            # Schemas are YAML or JSON, so every file under schemas_dir is watched
+            schema_watcher = FileWatcher([generator.schemas_dir], pattern='*', interval=interval)
+            threading.Thread(
+                target=schema_watcher.run, args=(server.cache.apply_changes, stop_event), daemon=True
+            ).start()
+
+    bound_host, bound_port = server.server_address[:2]
+    logger.info(f"Serving AsyncAPI specs on http://{bound_host}:{bound_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+        server.server_close()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Serve AsyncAPI specifications from NHS Notify event definitions'
+    )
+    parser.add_argument('--config', type=str, help='Path to configuration YAML file')
+    parser.add_argument('--events-dir', type=str, help='Path to events directory')
+    parser.add_argument('--services-dir', type=str, help='Path to services directory')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--no-watch', action='store_true', help='Do not invalidate specs when source files change')
+    parser.add_argument(
+        '--watch-interval',
+        type=float,
+        default=0.5,
+        metavar='SECONDS',
+        help='Seconds between change checks (default: 0.5)'
+    )
+    add_logging_arguments(parser)
+
+    args = parser.parse_args()
+    configure_logging('asyncapigenerator', level=args.log_level, log_file=args.log_file)
+
+    config = load_config(args.config)
+    if args.events_dir:
+        config['events_dir'] = args.events_dir
+    if args.services_dir:
+        config['services_dir'] = args.services_dir
+
+    serve(config, host=args.host, port=args.port, watch=not args.no_watch, interval=args.watch_interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -97,3 +97,44 @@ def sample_service_data() -> Dict[str, Any]:
         'owner': 'Test Team',
         'description': 'Test service description'
     }
+
+
+@pytest.fixture
+def write_event():
+    """Provide a function that writes an event markdown file and returns its path."""
+    def write(events_dir: Path, name: str, event_type: str, description: str = "Event description.",
+              title: str = None, envelope: str = 'https://example.com/envelope.json',
+              data: str = 'https://example.com/data.json') -> Path:
+        event_file = events_dir / f"{name}.md"
+        event_file.write_text(f"""---
+title: {title or name}
+type: {event_type}
+nice_name: {name}
+service: Test Service
+schema_envelope: {envelope}
+schema_data: {data}
+---
+
+{description}
+""")
+        return event_file
+    return write
+
+
+@pytest.fixture
+def write_service():
+    """Provide a function that writes a service index.md file and returns its path."""
+    def write(services_dir: Path, slug: str, title: str, raises=(), consumes=(), parent: str = None) -> Path:
+        service_dir = services_dir / slug
+        service_dir.mkdir(parents=True, exist_ok=True)
+        lines = [f"title: {title}"]
+        if parent:
+            lines.append(f"parent: {parent}")
+        if raises:
+            lines.append("events-raised:" + "".join(f"\n    - {e}" for e in raises))
+        if consumes:
+            lines.append("events-consumed:" + "".join(f"\n    - {e}" for e in consumes))
+        service_file = service_dir / "index.md"
+        service_file.write_text("---\n" + "\n".join(lines) + "\n---\n")
+        return service_file
+    return write
@@ -0,0 +1,42 @@
+"""Tests for the model memory benchmark."""
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmark_models import LAYOUTS, build_corpus, main, run_benchmark
+
+
+class TestBenchmarkModels:
+    """Tests for the benchmark harness on a tiny corpus."""
+
+    def test_build_corpus(self, temp_dir):
+        """Test the corpus has the requested shape."""
+        paths = build_corpus(temp_dir, domains=2, services_per_domain=3, events_per_service=2)
+
+        assert len(list(paths['events_dir'].glob('*.md'))) == 12
+        assert len(list(paths['services_dir'].rglob('index.md'))) == 8
+
+    def test_compact_layout_uses_less_memory(self, temp_dir):
+        """Test both layouts load the same records and compact retains less."""
+        report = run_benchmark(domains=2, services_per_domain=3, events_per_service=2, work_dir=temp_dir)
+
+        assert set(report['layouts']) == set(LAYOUTS)
+        baseline, compact = report['layouts']['baseline'], report['layouts']['compact']
+        assert baseline['events'] == compact['events'] == 12
+        assert compact['bytes_per_record'] < baseline['bytes_per_record']
+        assert report['reduction_percent'] > 0
+
+    def test_main_writes_report(self, temp_dir, capsys):
+        """Test the CLI prints a table and writes JSON."""
+        output = temp_dir / 'report.json'
+        argv = ['benchmark_models.py', '--domains', '1', '--services-per-domain', '2',
+                '--events-per-service', '1', '--output', str(output)]
+
+        with patch('sys.argv', argv):
+            main()
+
+        assert 'Memory per record reduced by' in capsys.readouterr().out
+        assert json.loads(output.read_text())['corpus']['domains'] == 1
@@ -0,0 +1,162 @@
+"""Tests for the validation-only --check mode."""
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from generate_asyncapi import AsyncAPIGenerator, main
+
+
+@pytest.fixture
+def valid_config(sample_config, write_event, write_service):
+    """A model without problems."""
+    events_dir = Path(sample_config['events_dir'])
+    services_dir = Path(sample_config['services_dir'])
+    write_event(events_dir, 'event-a', 'uk.nhs.notify.a.v1')
+    write_event(events_dir, 'event-b', 'uk.nhs.notify.b.v1')
+    write_service(services_dir, 'group', 'Group')
+    write_service(services_dir, 'group/producer', 'Producer', parent='Group', raises=['event-a'])
+    write_service(services_dir, 'group/consumer', 'Consumer', parent='Group', consumes=['event-a', 'event-b'])
+    return sample_config
+
+
+def load(config) -> AsyncAPIGenerator:
+    generator = AsyncAPIGenerator(config)
+    generator.load_events()
+    generator.load_services()
+    return generator
+
+
+class TestCheckReferences:
+    """Tests for the cross-reference checks."""
+
+    def test_valid_model_has_no_problems(self, valid_config):
+        """Test that parents without events are not reported."""
+        problems = load(valid_config).check_references()
+
+        assert all(messages == [] for messages in problems.values())
+
+    def test_missing_events(self, valid_config, write_service):
+        """Test that unknown event titles are reported per service."""
+        write_service(Path(valid_config['services_dir']), 'group/producer', 'Producer',
+                      parent='Group', raises=['event-a', 'event-z'])
+
+        problems = load(valid_config).check_references()
+
+        assert problems['missing_events'] == ["Producer: unknown event 'event-z'"]
+
+    def test_duplicate_titles(self, valid_config, write_event, write_service):
+        """Test that events and services sharing a title are reported."""
+        write_event(Path(valid_config['events_dir']), 'event-a-copy', 'uk.nhs.notify.c.v1', title='event-a')
+        write_service(Path(valid_config['services_dir']), 'other/producer', 'Producer', raises=['event-a'])
+
+        problems = load(valid_config).check_references()
+
+        assert len(problems['duplicate_event_titles']) == 1
+        assert problems['duplicate_event_titles'][0].startswith('event-a: ')
+        assert len(problems['duplicate_service_titles']) == 1
+
+    def test_loading_again_reports_nothing_new(self, valid_config):
+        """Test that reloading the same files does not report them as duplicates of themselves."""
+        generator = load(valid_config)
+        generator.load_events()
+        generator.load_services()
+
+        problems = generator.check_references()
+
+        assert problems['duplicate_event_titles'] == []
+        assert problems['duplicate_service_titles'] == []
+
+    def test_reloaded_files_update_duplicates(self, valid_config, write_event):
+        """Test that watch reloads add and clear duplicates, keeping the other definition."""
+        events_dir = Path(valid_config['events_dir'])
+        generator = load(valid_config)
+        copy = write_event(events_dir, 'event-a-copy', 'uk.nhs.notify.c.v1', title='event-a')
+
+        generator.reload_changed([copy])
+
+        assert generator.check_references()['duplicate_event_titles'] == [
+            f"event-a: {events_dir / 'event-a.md'}, {copy}"]
+        assert generator.events['event-a'].type == 'uk.nhs.notify.c.v1'
+
+        copy.unlink()
+        generator.reload_changed([copy])
+
+        assert generator.check_references()['duplicate_event_titles'] == []
+        assert generator.events['event-a'].type == 'uk.nhs.notify.a.v1'
+
+    def test_duplicate_types(self, valid_config, write_event):
+        """Test that two events with the same type are reported."""
+        write_event(Path(valid_config['events_dir']), 'event-c', 'uk.nhs.notify.a.v1')
+
+        problems = load(valid_config).check_references()
+
+        assert problems['duplicate_event_types'] == ['uk.nhs.notify.a.v1: event-a, event-c']
+
+    def test_orphans_and_services_without_events(self, valid_config, write_event, write_service):
+        """Test the warning categories."""
+        write_event(Path(valid_config['events_dir']), 'event-c', 'uk.nhs.notify.c.v1')
+        write_service(Path(valid_config['services_dir']), 'group/idle', 'Idle', parent='Group')
+
+        problems = load(valid_config).check_references()
+
+        assert problems['orphaned_events'] == ['event-c: not raised or consumed by any service']
+        assert problems['services_without_events'] == ['Idle: raises and consumes no events']
+
+
+class TestCheck:
+    """Tests for the check run and its exit status."""
+
+    def test_passes_and_writes_nothing(self, valid_config):
+        """Test that a clean model returns 0 and writes no specs."""
+        assert AsyncAPIGenerator(valid_config).check() == 0
+        assert list(Path(valid_config['output_dir']).iterdir()) == []
+
+    def test_missing_output_dir_not_created(self, valid_config, temp_dir):
+        """Test that checking leaves a missing output directory missing."""
+        valid_config['output_dir'] = str(temp_dir / 'new-output')
+
+        AsyncAPIGenerator(valid_config).check()
+
+        assert not (temp_dir / 'new-output').exists()
+
+    def test_errors_fail(self, valid_config, capsys, write_event):
+        """Test that errors return 1 and are logged."""
+        write_event(Path(valid_config['events_dir']), 'event-c', 'uk.nhs.notify.a.v1')
+
+        assert AsyncAPIGenerator(valid_config).check() == 1
+        out = capsys.readouterr().out
+        assert out.startswith('duplicate_event_types: uk.nhs.notify.a.v1: event-a, event-c\n')
+        assert 'ERROR' not in out
+
+    def test_warnings_fail_only_when_strict(self, valid_config, write_event):
+        """Test that warnings fail with strict only."""
+        write_event(Path(valid_config['events_dir']), 'event-c', 'uk.nhs.notify.c.v1')
+
+        assert AsyncAPIGenerator(valid_config).check() == 0
+        assert AsyncAPIGenerator(valid_config).check(strict=True) == 1
+
+    def test_cli_exit_status(self, valid_config, write_event):
+        """Test that --check exits with the check status without generating."""
+        write_event(Path(valid_config['events_dir']), 'event-c', 'uk.nhs.notify.a.v1')
+        argv = ['generate_asyncapi.py', '--check',
+                '--events-dir', valid_config['events_dir'],
+                '--services-dir', valid_config['services_dir'],
+                '--output-dir', valid_config['output_dir']]
+
+        with patch('sys.argv', argv):
+            with patch.object(AsyncAPIGenerator, 'generate') as generate:
+                with pytest.raises(SystemExit) as exc_info:
+                    main()
+
+        assert exc_info.value.code == 1
+        generate.assert_not_called()
+
+    def test_strict_requires_check(self):
+        """Test that --strict is rejected without --check."""
+        with patch('sys.argv', ['generate_asyncapi.py', '--strict']):
+            with pytest.raises(SystemExit):
+                main()
@@ -88,6 +88,18 @@ class TestMainCLI:
         config = call_args[0][0]
         assert config['output_dir'] == '/custom/output'
 
+    @patch('sys.argv', ['generate_asyncapi.py', '--format', 'both'])
+    @patch('generate_asyncapi.AsyncAPIGenerator')
+    def test_main_with_format(self, mock_generator_class):
+        """Test main function passes --format through the config."""
+        mock_generator = MagicMock()
+        mock_generator_class.return_value = mock_generator
+
+        main()
+
+        config = mock_generator_class.call_args[0][0]
+        assert config['output_format'] == 'both'
+
     @patch('sys.argv', ['generate_asyncapi.py', '--service', 'Test Service'])
     @patch('generate_asyncapi.AsyncAPIGenerator')
     def test_main_with_service_filter(self, mock_generator_class):
@@ -143,12 +155,193 @@ class TestMainCLI:
         # Should load config from file
         mock_load_config.assert_called_once_with('/path/to/config.yaml')
 
+    @patch('sys.argv', ['generate_asyncapi.py', '--profile', '/custom/profile'])
+    @patch('generate_asyncapi.AsyncAPIGenerator')
+    def test_main_with_profile(self, mock_generator_class):
+        """Test main function wraps generation in the profiler."""
+        mock_generator = MagicMock()
+        mock_generator_class.return_value = mock_generator
+
+        main()
+
+        mock_generator.instrumentation.profile.assert_called_once_with('/custom/profile')
+        mock_generator.generate.assert_called_once_with(service_filter=None)
+
+
+class TestProfiling:
+    """Tests for span and counter instrumentation during generation."""
+
+    def test_generate_records_spans_and_counters(self, sample_config, sample_event_markdown):
+        """Test that generation records load/parse/render/write spans and file counters."""
+        from generate_asyncapi import AsyncAPIGenerator
+
+        (Path(sample_config['events_dir']) / "test-event.md").write_text(sample_event_markdown)
+        service_dir = Path(sample_config['services_dir']) / "test-service"
+        service_dir.mkdir()
+        (service_dir / "index.md").write_text("""---
+title: Test Service
+events-raised:
+    - test-event
+---
+""")
+        (Path(sample_config['events_dir']) / "no-frontmatter.md").write_text("No frontmatter")
+
+        generator = AsyncAPIGenerator(sample_config)
+        generator.generate()
+
+        summary = generator.instrumentation.summary()
+        for span in ('load', 'parse', 'render', 'write'):
+            assert summary['spans'][span]['count'] > 0
+        assert summary['counters']['files_read'] == 3
+        assert summary['counters']['files_written'] == 2
+        assert summary['counters']['files_skipped'] == 1
+        assert summary['counters']['bytes_written'] > 0
+
+    def test_main_profile_writes_dump_and_timings(self, sample_config, temp_dir):
+        """Test that --profile writes a cProfile dump and a JSON timing summary."""
+        profile_dir = temp_dir / "profile"
+        argv = [
+            'generate_asyncapi.py',
+            '--events-dir', sample_config['events_dir'],
+            '--services-dir', sample_config['services_dir'],
+            '--output-dir', sample_config['output_dir'],
+            '--profile', str(profile_dir),
+        ]
+
+        with patch('sys.argv', argv):
+            main()
+
+        timings = json.loads((profile_dir / 'asyncapigenerator-timings.json').read_text())
+        assert timings['tool'] == 'asyncapigenerator'
+        assert (profile_dir / 'asyncapigenerator.prof').exists()
+
+
+class TestLogging:
+    """Tests for log levels and the JSON log file."""
+
+    @pytest.fixture(autouse=True)
+    def reset_logging(self):
+        """Restore the default console level after each test."""
+        from build_logging import configure_logging
+        yield
+        configure_logging('asyncapigenerator', level='INFO')
+
+    @pytest.fixture
+    def populated_config(self, sample_config, sample_event_markdown):
+        """Config with one event file."""
+        (Path(sample_config['events_dir']) / "test-event.md").write_text(sample_event_markdown)
+        return sample_config
+
+    def _argv(self, config, *extra):
+        return [
+            'generate_asyncapi.py',
+            '--events-dir', config['events_dir'],
+            '--services-dir', config['services_dir'],
+            '--output-dir', config['output_dir'],
+            *extra,
+        ]
+
+    def test_debug_level_shows_per_item_detail(self, populated_config, capsys):
+        """Test --log-level DEBUG prints each loaded event."""
+        with patch('sys.argv', self._argv(populated_config, '--log-level', 'debug')):
+            main()
+
+        assert 'Loaded event: test-event' in capsys.readouterr().out
+
+    def test_log_file_records_debug_as_json(self, populated_config, temp_dir, capsys):
+        """Test --log-file captures per-item detail as JSON lines at the default level."""
+        log_file = temp_dir / 'logs' / 'generator.jsonl'
+
+        with patch('sys.argv', self._argv(populated_config, '--log-file', str(log_file))):
+            main()
+
+        assert 'Loaded event: test-event' not in capsys.readouterr().out
+        records = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert all(record['logger'] == 'asyncapigenerator' for record in records)
+        assert any(
+            record['level'] == 'DEBUG' and 'Loaded event: test-event' in record['message']
+            for record in records
+        )
+
+    def test_warnings_name_their_level_once(self, sample_config, temp_dir, capsys):
+        """Test that warning messages leave the level to the log format."""
+        log_file = temp_dir / 'generator.jsonl'
+        sample_config['events_dir'] = str(temp_dir / 'missing-events')
+
+        with patch('sys.argv', self._argv(sample_config, '--log-file', str(log_file))):
+            main()
+
+        records = [json.loads(line) for line in log_file.read_text().splitlines()]
+        warning = next(record for record in records if record['level'] == 'WARNING')
+        assert warning['message'].startswith('Events directory not found')
+
+
+class TestOutputFormat:
+    """Tests for YAML and JSON spec output."""
+
+    @pytest.fixture
+    def generator(self, sample_config, sample_event_markdown):
+        """Generator with one event and one service raising it."""
+        from generate_asyncapi import AsyncAPIGenerator
+
+        (Path(sample_config['events_dir']) / "test-event.md").write_text(sample_event_markdown)
+        service_dir = Path(sample_config['services_dir']) / "test-service"
+        service_dir.mkdir()
+        (service_dir / "index.md").write_text("""---
+title: Test Service
+events-raised:
+    - test-event
+---
+""")
+        return AsyncAPIGenerator(sample_config)
+
+    def test_default_format_is_yaml(self, generator):
+        """Test that only YAML is written by default."""
+        generator.generate()
+
+        names = sorted(p.name for p in generator.output_dir.iterdir())
+        assert names == ['asyncapi-all.yaml', 'asyncapi-test-service.yaml']
+
+    def test_json_format(self, generator):
+        """Test that only JSON is written with output_format='json'."""
+        generator.generate(output_format='json')
+
+        names = sorted(p.name for p in generator.output_dir.iterdir())
+        assert names == ['asyncapi-all.json', 'asyncapi-test-service.json']
+
+    def test_both_formats_hold_identical_documents(self, generator):
+        """Test that the YAML and JSON outputs are the same document."""
+        import yaml
+
+        generator.generate(output_format='both')
+
+        for stem in ('asyncapi-all', 'asyncapi-test-service'):
+            yaml_doc = yaml.safe_load((generator.output_dir / f"{stem}.yaml").read_text())
+            json_doc = json.loads((generator.output_dir / f"{stem}.json").read_text())
+            assert json_doc == yaml_doc
+            assert list(json_doc) == list(yaml_doc)
+
+    def test_format_from_config(self, generator):
+        """Test that the output_format config key is used when no format is passed."""
+        generator.config['output_format'] = 'json'
+
+        generator.generate()
+
+        assert (generator.output_dir / 'asyncapi-all.json').exists()
+        assert not (generator.output_dir / 'asyncapi-all.yaml').exists()
+
+    def test_unknown_format_raises(self, generator):
+        """Test that an unknown format is rejected before anything is written."""
+        with pytest.raises(ValueError, match="Unknown output format 'xml'"):
+            generator.generate(output_format='xml')
+
+        assert list(generator.output_dir.iterdir()) == []
+
 
 class TestGenerateMethod:
     """Tests for the generate method that weren't covered elsewhere."""
 
-    @patch('builtins.print')
-    def test_generate_prints_summary(self, mock_print, sample_config, temp_dir):
+    def test_generate_prints_summary(self, sample_config, temp_dir, capsys):
         """Test that generate method prints summary information."""
         from generate_asyncapi import AsyncAPIGenerator, Event, Service
 
@@ -203,10 +396,11 @@ Test service description.
         # Run generate
         generator.generate()
 
-        # Check that print was called with summary info
-        print_calls = [str(call) for call in mock_print.call_args_list]
-        assert any('NHS Notify' in str(call) for call in print_calls)
-        assert any('Loaded' in str(call) for call in print_calls)
+        # Summary is logged at the default level, per-item detail is not
+        output = capsys.readouterr().out
+        assert 'NHS Notify' in output
+        assert 'Loaded 1 events and 1 services' in output
+        assert 'Loaded event: test-event' not in output
 
     def test_generate_skips_services_without_events(self, sample_config, temp_dir):
         """Test that generate skips services that don't have any events."""
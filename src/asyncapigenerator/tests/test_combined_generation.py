@@ -7,7 +7,7 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from generate_asyncapi import AsyncAPIGenerator, Event, Service
+from generate_asyncapi import AsyncAPIGenerator, Event, Service, stable_operation_ids
 
 
 class TestCombinedAsyncAPIGeneration:
@@ -125,6 +125,123 @@ class TestCombinedAsyncAPIGeneration:
         assert len(spec['operations']) == 2
 
 
+def make_event(index: int) -> Event:
+    return Event(
+        title=f'event-{index}',
+        type=f'uk.nhs.notify.event{index}.v1',
+        nice_name=f'Event{index}',
+        service='Test Service',
+        schema_envelope='https://example.com/envelope.json',
+        schema_data='https://example.com/data.json'
+    )
+
+
+def combined_spec(config, events, services) -> dict:
+    generator = AsyncAPIGenerator(config)
+    generator.events = {event.title: event for event in events}
+    generator.services = {service.title: service for service in services}
+    return generator.generate_combined_asyncapi()
+
+
+class TestStableOperationIds:
+    """Tests for content-derived operation IDs in the combined spec."""
+
+    def test_ids_derived_from_content(self, sample_config):
+        """Test that IDs name the action, channel and service."""
+        spec = combined_spec(sample_config, [make_event(1)],
+                             [Service(title='MESH Poller', events_raised=['event-1'])])
+
+        assert list(spec['operations']) == ['send_uk_nhs_notify_event1_v1_by_mesh_poller']
+
+    def test_adding_service_keeps_existing_ids(self, sample_config):
+        """Test that a new service does not renumber or reorder other operations."""
+        events = [make_event(i) for i in range(3)]
+        services = [
+            Service(title='Service B', events_raised=['event-1', 'event-2']),
+            Service(title='Service C', events_consumed=['event-1']),
+        ]
+        before = combined_spec(sample_config, events, services)
+
+        after = combined_spec(sample_config, events,
+                              [Service(title='Service A', events_raised=['event-0'])] + services)
+
+        assert set(after['operations']) - set(before['operations']) == {
+            'send_uk_nhs_notify_event0_v1_by_service_a'
+        }
+        assert all(after['operations'][key] == value for key, value in before['operations'].items())
+        assert list(after['operations']) == sorted(after['operations'])
+        assert list(after['channels']) == sorted(after['channels'])
+
+    def test_service_order_does_not_matter(self, sample_config):
+        """Test that the spec is identical whatever order services are loaded in."""
+        events = [make_event(i) for i in range(2)]
+        services = [
+            Service(title='Service A', events_raised=['event-0'], events_consumed=['event-1']),
+            Service(title='Service B', events_raised=['event-1'], events_consumed=['event-0']),
+        ]
+
+        forwards = combined_spec(sample_config, events, services)
+        backwards = combined_spec(sample_config, list(reversed(events)), list(reversed(services)))
+
+        assert list(forwards['operations']) == list(backwards['operations'])
+        assert list(forwards['channels']) == list(backwards['channels'])
+        assert forwards == backwards
+
+    def test_repeated_reference_is_one_operation(self, sample_config):
+        """Test that listing an event twice does not add a second operation."""
+        spec = combined_spec(sample_config, [make_event(1)],
+                             [Service(title='Service A', events_raised=['event-1', 'event-1'])])
+
+        assert len(spec['operations']) == 1
+
+    def test_raised_and_consumed_event(self, sample_config):
+        """Test that a service raising and consuming one event gets both operations."""
+        spec = combined_spec(sample_config, [make_event(1)],
+                             [Service(title='Loop', events_raised=['event-1'], events_consumed=['event-1'])])
+
+        assert sorted(op['action'] for op in spec['operations'].values()) == ['receive', 'send']
+
+    def test_x_services(self, sample_config):
+        """Test that each service with events lists its metadata and operations in its own order."""
+        spec = combined_spec(sample_config, [make_event(i) for i in range(3)], [
+            Service(title='Poller', parent='Group', owner='Team', events_raised=['event-2', 'event-0'],
+                    events_consumed=['event-1']),
+            Service(title='Group'),
+        ])
+
+        assert list(spec['x-services']) == ['Poller']
+        poller = spec['x-services']['Poller']
+        assert poller['description'] == 'AsyncAPI specification for Poller'
+        assert poller['x-service-metadata']['parent'] == 'Group'
+        assert poller['operations'] == [
+            'send_uk_nhs_notify_event2_v1_by_poller',
+            'send_uk_nhs_notify_event0_v1_by_poller',
+            'receive_uk_nhs_notify_event1_v1_by_poller',
+        ]
+
+    def test_slug_collision(self):
+        """Test that services sharing a slug get distinct, order-independent IDs."""
+        keys = [('send', 'ch', 'Mesh Poller'), ('send', 'ch', 'mesh-poller'), ('send', 'ch', 'Other')]
+
+        ids = stable_operation_ids(keys)
+
+        assert ids == stable_operation_ids(reversed(keys))
+        assert len(set(ids.values())) == 3
+        assert ids[('send', 'ch', 'Other')] == 'send_ch_by_other'
+        assert ids[('send', 'ch', 'Mesh Poller')] == 'send_ch_by_mesh_poller'
+        assert ids[('send', 'ch', 'mesh-poller')].startswith('send_ch_by_mesh_poller_')
+
+    def test_slug_collision_keeps_existing_ids(self):
+        """Test that adding a service whose title sorts later leaves existing IDs unchanged."""
+        existing = [('send', 'ch', 'Mesh Poller'), ('receive', 'other', 'Mesh Poller')]
+        before = stable_operation_ids(existing)
+
+        after = stable_operation_ids(existing + [('send', 'ch', 'mesh-poller')])
+
+        assert all(after[key] == before[key] for key in existing)
+        assert after[('send', 'ch', 'mesh-poller')] != before[('send', 'ch', 'Mesh Poller')]
+
+
 class TestFileWriting:
     """Tests for file writing operations."""
 
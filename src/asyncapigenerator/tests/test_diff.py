@@ -0,0 +1,135 @@
+"""Tests for the dry-run --diff mode."""
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from generate_asyncapi import AsyncAPIGenerator, diff_specs, load_config, main
+
+
+@pytest.fixture
+def config(sample_config, write_event, write_service):
+    """Config whose specs have already been generated."""
+    events_dir = Path(sample_config['events_dir'])
+    services_dir = Path(sample_config['services_dir'])
+    write_event(events_dir, 'event-a', 'uk.nhs.notify.a.v1')
+    write_event(events_dir, 'event-b', 'uk.nhs.notify.b.v1')
+    write_service(services_dir, 'producer', 'Producer', ['event-a'])
+    write_service(services_dir, 'other', 'Other', ['event-b'])
+    AsyncAPIGenerator(sample_config).generate()
+    return sample_config
+
+
+def output_snapshot(output_dir: Path) -> dict:
+    return {path: path.stat().st_mtime_ns for path in output_dir.rglob('*')}
+
+
+class TestDiffSpecs:
+    """Tests for the structural comparison."""
+
+    def test_identical_specs(self):
+        """Test that equal specs have no changes."""
+        spec = {'info': {'title': 'x'}, 'channels': {'a': {}}, 'operations': {}}
+
+        assert diff_specs(spec, json.loads(json.dumps(spec))) == {}
+
+    def test_added_removed_changed(self):
+        """Test channel and operation entries and other sections."""
+        old = {
+            'info': {'title': 'old'},
+            'channels': {'a': {'address': 'a'}, 'b': {'address': 'b'}},
+            'operations': {'send_a': {'action': 'send'}},
+        }
+        new = {
+            'info': {'title': 'new'},
+            'channels': {'a': {'address': 'a2'}, 'c': {'address': 'c'}},
+            'operations': {'send_a': {'action': 'send'}},
+        }
+
+        assert diff_specs(old, new) == {
+            'channels': ['+c', '-b', '~a'],
+            'sections': ['info'],
+        }
+
+
+class TestDiff:
+    """Tests for diffing against the output directory."""
+
+    def test_no_changes(self, config, capsys):
+        """Test that an up-to-date output directory returns 0."""
+        generator = AsyncAPIGenerator(config)
+
+        assert generator.diff() == 0
+        assert '0 spec(s) changed, 0 new, 0 removed, 3 unchanged' in capsys.readouterr().out
+
+    def test_reports_changes_without_writing(self, config, capsys, write_event):
+        """Test that edits are reported per spec and nothing is written."""
+        output_dir = Path(config['output_dir'])
+        before = output_snapshot(output_dir)
+        write_event(Path(config['events_dir']), 'event-a', 'uk.nhs.notify.a.v1', 'Changed.')
+        write_event(Path(config['events_dir']), 'event-b', 'uk.nhs.notify.b.v2')
+
+        status = AsyncAPIGenerator(config).diff()
+
+        out = capsys.readouterr().out
+        assert status == 1
+        assert 'changed: asyncapi-producer\n  channels: ~uk_nhs_notify_a_v1' in out
+        assert 'channels: +uk_nhs_notify_b_v2, -uk_nhs_notify_b_v1' in out
+        assert output_snapshot(output_dir) == before
+
+    def test_missing_output_dir_not_created(self, config, temp_dir, capsys):
+        """Test that diffing against a missing output directory reports every spec as new."""
+        config['output_dir'] = str(temp_dir / 'new-output')
+
+        assert AsyncAPIGenerator(config).diff() == 1
+
+        assert '0 spec(s) changed, 3 new, 0 removed' in capsys.readouterr().out
+        assert not (temp_dir / 'new-output').exists()
+
+    def test_new_and_removed_specs(self, config, capsys, write_service):
+        """Test specs that would be created or deleted."""
+        services_dir = Path(config['services_dir'])
+        (services_dir / 'other' / 'index.md').unlink()
+        write_service(services_dir, 'consumer', 'Consumer', ['event-b'])
+
+        AsyncAPIGenerator(config).diff()
+
+        out = capsys.readouterr().out
+        assert 'new: asyncapi-consumer (1 channels, 1 operations)' in out
+        assert 'removed: asyncapi-other' in out
+
+    def test_compares_yaml_when_no_json(self, config):
+        """Test that YAML output is parsed when there is no JSON sibling."""
+        output_dir = Path(config['output_dir'])
+        spec_file = output_dir / 'asyncapi-producer.yaml'
+        spec = yaml.safe_load(spec_file.read_text())
+        spec['operations'] = {}
+        spec_file.write_text(yaml.dump(spec))
+
+        assert AsyncAPIGenerator(config).diff(service_filter='Producer') == 1
+
+    def test_cli_diff(self, config, temp_dir):
+        """Test that --diff exits with the diff status without generating."""
+        config_file = temp_dir / 'config.yaml'
+        config_file.write_text(yaml.dump(config))
+        AsyncAPIGenerator(load_config(str(config_file))).generate()
+        argv = ['generate_asyncapi.py', '--diff', '--config', str(config_file)]
+
+        with patch('sys.argv', argv):
+            with patch.object(AsyncAPIGenerator, 'generate') as generate:
+                with pytest.raises(SystemExit) as exc_info:
+                    main()
+
+        assert exc_info.value.code == 0
+        generate.assert_not_called()
+
+    def test_diff_and_watch_rejected(self):
+        """Test that --diff cannot be combined with --watch."""
+        with patch('sys.argv', ['generate_asyncapi.py', '--diff', '--watch']):
+            with pytest.raises(SystemExit):
+                main()
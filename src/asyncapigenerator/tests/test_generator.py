@@ -148,7 +148,7 @@ class TestAsyncAPIGenerator:
         assert generator.services == {}
 
     def test_output_directory_creation(self, temp_dir):
-        """Test that output directory is created if it doesn't exist."""
+        """Test that output directory is created on generation if it doesn't exist."""
         config = {
             'events_dir': str(temp_dir / 'events'),
             'services_dir': str(temp_dir / 'services'),
@@ -157,5 +157,8 @@ class TestAsyncAPIGenerator:
         }
 
         generator = AsyncAPIGenerator(config)
+        assert not generator.output_dir.exists()
+
+        generator.generate()
         assert generator.output_dir.exists()
         assert generator.output_dir.is_dir()
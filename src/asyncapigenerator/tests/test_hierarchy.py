@@ -0,0 +1,134 @@
+"""Tests for the service hierarchy index and aggregated container specs."""
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from generate_asyncapi import AsyncAPIGenerator, Service, build_hierarchy, main
+
+
+@pytest.fixture
+def config(sample_config, write_event, write_service):
+    """NotiFHIR -> MESH Services -> MESH Poller / MESH Timer, NotiFHIR -> PDM Services -> PDM Poller."""
+    events_dir = Path(sample_config['events_dir'])
+    services_dir = Path(sample_config['services_dir'])
+    write_event(events_dir, 'event-a', 'uk.nhs.notify.a.v1')
+    write_event(events_dir, 'event-b', 'uk.nhs.notify.b.v1')
+    write_event(events_dir, 'event-c', 'uk.nhs.notify.c.v1')
+    write_service(services_dir, 'notifhir', 'NotiFHIR', parent='System Context')
+    write_service(services_dir, 'notifhir/mesh', 'MESH Services', parent='NotiFHIR')
+    write_service(services_dir, 'notifhir/mesh/poller', 'MESH Poller', parent='MESH Services', raises=['event-a'])
+    write_service(services_dir, 'notifhir/mesh/timer', 'MESH Timer', parent='MESH Services', raises=['event-b'])
+    write_service(services_dir, 'notifhir/pdm', 'PDM Services', parent='NotiFHIR')
+    write_service(services_dir, 'notifhir/pdm/poller', 'PDM Poller', parent='PDM Services', raises=['event-c'])
+    sample_config['aggregate_containers'] = True
+    return sample_config
+
+
+class TestBuildHierarchy:
+    """Tests for the ancestor and descendant closure."""
+
+    def test_closure(self):
+        """Test ancestors nearest first and transitive descendants."""
+        services = {
+            'Root': Service(title='Root', parent='Outside'),
+            'Mid': Service(title='Mid', parent='Root'),
+            'Leaf': Service(title='Leaf', parent='Mid'),
+            'Other': Service(title='Other', parent='Root'),
+        }
+
+        hierarchy = build_hierarchy(services)
+
+        assert hierarchy.ancestors['Leaf'] == ('Mid', 'Root')
+        assert hierarchy.ancestors['Root'] == ()
+        assert hierarchy.descendants['Root'] == {'Mid', 'Leaf', 'Other'}
+        assert hierarchy.descendants['Leaf'] == set()
+        assert hierarchy.containers() == ['Mid', 'Root']
+
+    def test_cycle_terminates(self):
+        """Test that a parent cycle is broken rather than looping."""
+        services = {
+            'A': Service(title='A', parent='B'),
+            'B': Service(title='B', parent='A'),
+        }
+
+        hierarchy = build_hierarchy(services)
+
+        assert set(hierarchy.ancestors) == {'A', 'B'}
+
+    def test_cached_until_services_change(self, config, write_service):
+        """Test that the index is built once and rebuilt after a service reload."""
+        generator = AsyncAPIGenerator(config)
+        generator.load_events()
+        generator.load_services()
+
+        first = generator.hierarchy()
+        assert generator.hierarchy() is first
+
+        service_file = write_service(Path(config['services_dir']), 'notifhir/pdm/poller', 'PDM Poller',
+                                     parent='MESH Services', raises=['event-c'])
+        generator.reload_changed([service_file])
+
+        assert generator.hierarchy() is not first
+        assert 'PDM Poller' in generator.hierarchy().descendants['MESH Services']
+
+
+class TestAggregatedSpecs:
+    """Tests for aggregated container specs."""
+
+    def read(self, config, name):
+        return yaml.safe_load((Path(config['output_dir']) / 'aggregated' / f'asyncapi-{name}.yaml').read_text())
+
+    def test_container_includes_descendant_events(self, config):
+        """Test that each container spec covers its whole subtree."""
+        AsyncAPIGenerator(config).generate()
+
+        root = self.read(config, 'notifhir')
+        assert set(root['channels']) == {'uk_nhs_notify_a_v1', 'uk_nhs_notify_b_v1', 'uk_nhs_notify_c_v1'}
+        assert len(root['operations']) == 3
+        assert root['info']['x-aggregated-services'] == [
+            'MESH Poller', 'MESH Services', 'MESH Timer', 'NotiFHIR', 'PDM Poller', 'PDM Services'
+        ]
+        mesh = self.read(config, 'mesh-services')
+        assert set(mesh['channels']) == {'uk_nhs_notify_a_v1', 'uk_nhs_notify_b_v1'}
+        assert mesh['info']['x-service-metadata']['parent'] == 'NotiFHIR'
+
+    def test_leaf_services_not_aggregated(self, config):
+        """Test that only containers get aggregated specs."""
+        AsyncAPIGenerator(config).generate()
+
+        names = sorted(p.name for p in (Path(config['output_dir']) / 'aggregated').glob('*.yaml'))
+        assert names == ['asyncapi-mesh-services.yaml', 'asyncapi-notifhir.yaml', 'asyncapi-pdm-services.yaml']
+
+    def test_disabled_by_default(self, config):
+        """Test that nothing is aggregated unless enabled."""
+        config['aggregate_containers'] = False
+
+        AsyncAPIGenerator(config).generate()
+
+        assert not (Path(config['output_dir']) / 'aggregated').exists()
+
+    def test_apply_changes_moves_service_between_containers(self, config, write_service):
+        """Test that old and new ancestors are rewritten and empty containers removed."""
+        generator = AsyncAPIGenerator(config)
+        generator.generate()
+        service_file = write_service(Path(config['services_dir']), 'notifhir/pdm/poller', 'PDM Poller',
+                                     parent='MESH Services', raises=['event-c'])
+
+        generator.apply_changes([service_file])
+
+        mesh = self.read(config, 'mesh-services')
+        assert 'uk_nhs_notify_c_v1' in mesh['channels']
+        assert not (Path(config['output_dir']) / 'aggregated' / 'asyncapi-pdm-services.yaml').exists()
+
+    def test_cli_flag(self, config):
+        """Test that --aggregate-containers sets the config key."""
+        with patch('sys.argv', ['generate_asyncapi.py', '--aggregate-containers']):
+            with patch('generate_asyncapi.AsyncAPIGenerator') as mock_generator:
+                main()
+
+        assert mock_generator.call_args[0][0]['aggregate_containers'] is True
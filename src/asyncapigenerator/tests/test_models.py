@@ -0,0 +1,88 @@
+"""Tests for the compact models, interning and the event ID table."""
+from pathlib import Path
+
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from generate_asyncapi import AsyncAPIGenerator, Event, EventTable, Service, intern_str
+
+
+def make_event(title: str) -> Event:
+    return Event(title=title, type=f'uk.nhs.notify.{title}.v1', nice_name=title, service='Svc',
+                 schema_envelope='', schema_data='')
+
+
+class TestCompactModels:
+    """Tests for slotted models and interned identifiers."""
+
+    def test_models_are_slotted(self):
+        """Test that records carry no per-instance __dict__."""
+        assert not hasattr(make_event('a'), '__dict__')
+        assert not hasattr(Service(title='s'), '__dict__')
+
+    def test_intern_str(self):
+        """Test that equal strings become one object and other values pass through."""
+        first = intern_str(''.join(['uk.nhs.', 'notify']))
+        second = intern_str(''.join(['uk.nhs', '.notify']))
+
+        assert first is second
+        assert intern_str(None) is None
+        assert intern_str(3) == 3
+
+    def test_loaded_identifiers_are_shared(self, sample_config):
+        """Test that service references and event titles are the same objects."""
+        events_dir = Path(sample_config['events_dir'])
+        services_dir = Path(sample_config['services_dir'])
+        (events_dir / 'event-a.md').write_text("---\ntitle: event-a\ntype: a.v1\nservice: Team\n---\n")
+        for name in ('one', 'two'):
+            (services_dir / name).mkdir()
+            (services_dir / name / 'index.md').write_text(
+                f"---\ntitle: {name}\nowner: Team\nevents-raised: event-a\n---\n"
+            )
+        generator = AsyncAPIGenerator(sample_config)
+        generator.load_events()
+        generator.load_services()
+
+        event = generator.events['event-a']
+        one, two = generator.services['one'], generator.services['two']
+        assert one.events_raised[0] is event.title
+        assert one.owner is two.owner is event.service
+        assert isinstance(event.file_path, str)
+
+
+class TestEventTable:
+    """Tests for integer event IDs."""
+
+    def test_ids_and_reverse_index(self):
+        """Test known and missing IDs and the services using each event."""
+        events = {title: make_event(title) for title in ('a', 'b', 'c')}
+        services = {
+            'P': Service(title='P', events_raised=['a', 'x']),
+            'C': Service(title='C', events_consumed=['a', 'b']),
+        }
+
+        table = EventTable(events, services)
+
+        assert table.known == 3
+        assert [table.titles[i] for i in table.raised['P']] == ['a', 'x']
+        assert table.ids['x'] >= table.known
+        assert table.users[table.ids['a']] == {'P', 'C'}
+        assert table.users[table.ids['c']] == set()
+
+    def test_rebuilt_when_model_changes(self, sample_config):
+        """Test that reloading a file drops the cached table."""
+        events_dir = Path(sample_config['events_dir'])
+        event_file = events_dir / 'event-a.md'
+        event_file.write_text("---\ntitle: event-a\ntype: a.v1\n---\n")
+        generator = AsyncAPIGenerator(sample_config)
+        generator.load_events()
+        generator.load_services()
+        first = generator.event_table()
+
+        event_file.write_text("---\ntitle: event-b\ntype: b.v1\n---\n")
+        generator.reload_changed([event_file])
+
+        assert generator.event_table() is not first
+        assert 'event-b' in generator.event_table().ids
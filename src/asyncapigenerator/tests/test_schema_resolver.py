@@ -0,0 +1,226 @@
+"""Tests for local schema resolution and bundled component schemas."""
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from generate_asyncapi import AsyncAPIGenerator, main
+from schema_resolver import SchemaResolver
+
+BASE_URL = 'https://notify.nhs.uk/cloudevents/schemas/digital-letters'
+ENVELOPE_URL = f'{BASE_URL}/2025-10-draft/events/uk.nhs.notify.test.v1.schema.json'
+DATA_URL = f'{BASE_URL}/2025-10-draft/data/test-data.schema.json'
+REMOTE_URL = 'https://notify.nhs.uk/cloudevents/schemas/common/2025-11-draft/nhs-notify-profile.schema.json'
+
+
+@pytest.fixture
+def schemas_dir(temp_dir: Path) -> Path:
+    """Write a small schema tree mirroring src/cloudevents/domains/digital-letters."""
+    root = temp_dir / 'schemas'
+    version = root / '2025-10-draft'
+    (version / 'events').mkdir(parents=True)
+    (version / 'data').mkdir()
+    (version / 'defs').mkdir()
+
+    (version / 'profile.schema.yaml').write_text(yaml.dump({
+        '$id': f'{BASE_URL}/2025-10-draft/profile.schema.json',
+        'allOf': [{'$ref': REMOTE_URL}],
+        'properties': {'subject': {'type': 'string'}},
+    }))
+    (version / 'defs' / 'ids.schema.yaml').write_text(yaml.dump({
+        'properties': {'senderId': {'type': 'string'}},
+    }))
+    (version / 'data' / 'test-data.schema.yaml').write_text(yaml.dump({
+        'type': 'object',
+        'properties': {
+            'senderId': {'$ref': '../defs/ids.schema.yaml#/properties/senderId'},
+            'copy': {'$ref': '#/properties/senderId'},
+        },
+    }))
+    (version / 'events' / 'uk.nhs.notify.test.v1.schema.yaml').write_text(yaml.dump({
+        'title': 'Test',
+        'allOf': [{'$ref': '../profile.schema.json'}],
+        'properties': {'data': {'$ref': '../data/test-data.schema.yaml'}},
+    }))
+    return root
+
+
+class TestSchemaResolver:
+    """Tests for SchemaResolver."""
+
+    def test_resolves_closure_of_local_refs(self, schemas_dir):
+        """Test that a schema and everything it references locally is bundled."""
+        resolver = SchemaResolver(schemas_dir, BASE_URL)
+
+        name, schemas = resolver.resolve(ENVELOPE_URL)
+
+        assert name == '2025-10-draft.events.uk.nhs.notify.test.v1'
+        assert set(schemas) == {
+            '2025-10-draft.events.uk.nhs.notify.test.v1',
+            '2025-10-draft.profile',
+            '2025-10-draft.data.test-data',
+            '2025-10-draft.defs.ids',
+        }
+
+    def test_rewrites_refs_to_components(self, schemas_dir):
+        """Test that local, fragment and json-for-yaml refs point at components."""
+        resolver = SchemaResolver(schemas_dir, BASE_URL)
+
+        _, schemas = resolver.resolve(ENVELOPE_URL)
+
+        envelope = schemas['2025-10-draft.events.uk.nhs.notify.test.v1']
+        assert envelope['allOf'][0]['$ref'] == '#/components/schemas/2025-10-draft.profile'
+        data = schemas['2025-10-draft.data.test-data']
+        assert data['properties']['senderId']['$ref'] == (
+            '#/components/schemas/2025-10-draft.defs.ids/properties/senderId'
+        )
+        assert data['properties']['copy']['$ref'] == (
+            '#/components/schemas/2025-10-draft.data.test-data/properties/senderId'
+        )
+
+    def test_remote_refs_and_ids(self, schemas_dir):
+        """Test that refs outside schema_base_url stay remote and $id is dropped."""
+        resolver = SchemaResolver(schemas_dir, BASE_URL)
+
+        _, schemas = resolver.resolve(ENVELOPE_URL)
+
+        profile = schemas['2025-10-draft.profile']
+        assert profile['allOf'][0]['$ref'] == REMOTE_URL
+        assert '$id' not in profile
+
+    def test_unknown_url_returns_none(self, schemas_dir):
+        """Test URLs without a local file."""
+        resolver = SchemaResolver(schemas_dir, BASE_URL)
+
+        assert resolver.resolve(f'{BASE_URL}/2025-10-draft/events/missing.schema.json') is None
+        assert resolver.resolve('https://example.com/envelope.json') is None
+
+    def test_each_file_parsed_once(self, schemas_dir):
+        """Test that shared schemas are loaded once across resolutions."""
+        resolver = SchemaResolver(schemas_dir, BASE_URL)
+
+        resolver.resolve(ENVELOPE_URL)
+        resolver.resolve(DATA_URL)
+        resolver.resolve(ENVELOPE_URL)
+
+        assert resolver.files_loaded == 4
+
+    def test_prefers_json_file(self, schemas_dir):
+        """Test that a .schema.json file is used when present."""
+        json_file = schemas_dir / '2025-10-draft' / 'defs' / 'ids.schema.json'
+        json_file.write_text(json.dumps({'title': 'from json'}))
+        resolver = SchemaResolver(schemas_dir, BASE_URL)
+
+        _, schemas = resolver.resolve(DATA_URL)
+
+        assert schemas['2025-10-draft.defs.ids'] == {'title': 'from json'}
+
+    def test_same_named_files_outside_schemas_dir(self, schemas_dir, temp_dir):
+        """Test that files outside schemas_dir with the same name get separate components."""
+        for domain in ('a', 'b'):
+            (temp_dir / domain).mkdir()
+            (temp_dir / domain / 'common.schema.yaml').write_text(yaml.dump({'title': domain}))
+        data_file = schemas_dir / '2025-10-draft' / 'data' / 'test-data.schema.yaml'
+        data_file.write_text(yaml.dump({'properties': {
+            'a': {'$ref': '../../../a/common.schema.yaml'},
+            'b': {'$ref': '../../../b/common.schema.yaml'},
+        }}))
+        resolver = SchemaResolver(schemas_dir, BASE_URL)
+
+        _, schemas = resolver.resolve(DATA_URL)
+
+        data = schemas.pop('2025-10-draft.data.test-data')
+        assert len(schemas) == 2
+        assert {schema['title'] for schema in schemas.values()} == {'a', 'b'}
+        assert {ref['$ref'][len('#/components/schemas/'):] for ref in data['properties'].values()} == set(schemas)
+        assert all(name.startswith('external-') and name.endswith('.common') for name in schemas)
+
+
+class TestBundledSpecs:
+    """Tests for generation with resolve_schemas enabled."""
+
+    @pytest.fixture
+    def config(self, sample_config, schemas_dir, write_event, write_service):
+        sample_config['schemas_dir'] = str(schemas_dir)
+        sample_config['resolve_schemas'] = True
+        events_dir = Path(sample_config['events_dir'])
+        services_dir = Path(sample_config['services_dir'])
+        write_event(events_dir, 'first', 'uk.nhs.notify.first.v1', envelope=ENVELOPE_URL, data=DATA_URL)
+        write_event(events_dir, 'second', 'uk.nhs.notify.second.v1', envelope=ENVELOPE_URL, data=DATA_URL)
+        write_service(services_dir, 'one', 'Service One', ['first'])
+        write_service(services_dir, 'two', 'Service Two', ['first', 'second'])
+        return sample_config
+
+    def test_service_spec_has_component_schemas(self, config):
+        """Test that payloads reference components and keep the published URL."""
+        generator = AsyncAPIGenerator(config)
+        generator.load_events()
+        generator.load_services()
+
+        spec = generator.generate_asyncapi_for_service(generator.services['Service One'])
+
+        message = spec['channels']['uk_nhs_notify_first_v1']['messages']['first']
+        assert message['payload'] == {'$ref': '#/components/schemas/2025-10-draft.events.uk.nhs.notify.test.v1'}
+        assert message['x-schema-url'] == ENVELOPE_URL
+        assert len(spec['components']['schemas']) == 4
+
+    def test_combined_spec_dedupes_schemas(self, config):
+        """Test that schemas shared by several events appear once."""
+        generator = AsyncAPIGenerator(config)
+        generator.load_events()
+        generator.load_services()
+
+        spec = generator.generate_combined_asyncapi()
+
+        assert list(spec['components']['schemas']) == sorted(spec['components']['schemas'])
+        assert len(spec['components']['schemas']) == 4
+
+    def test_schemas_resolved_once_across_services(self, config):
+        """Test that the resolver cache is shared by every spec in a run."""
+        generator = AsyncAPIGenerator(config)
+
+        generator.generate()
+
+        assert generator.schema_resolver.files_loaded == 4
+
+    def test_missing_schema_keeps_remote_ref(self, config, capsys, write_event):
+        """Test that events whose schema is not local keep the URL and warn once."""
+        events_dir = Path(config['events_dir'])
+        write_event(events_dir, 'first', 'uk.nhs.notify.first.v1',
+                    envelope='https://example.com/envelope.json', data=DATA_URL)
+        generator = AsyncAPIGenerator(config)
+        generator.load_events()
+        generator.load_services()
+
+        spec = generator.generate_combined_asyncapi()
+        generator.generate_combined_asyncapi()
+
+        message = spec['channels']['uk_nhs_notify_first_v1']['messages']['first']
+        assert message['payload'] == {'$ref': 'https://example.com/envelope.json'}
+        assert 'x-schema-url' not in message
+        assert capsys.readouterr().out.count("Schema 'https://example.com/envelope.json' not found") == 1
+
+    def test_disabled_by_default(self, config):
+        """Test that specs reference remote schemas unless enabled."""
+        config['resolve_schemas'] = False
+        generator = AsyncAPIGenerator(config)
+        generator.load_events()
+        generator.load_services()
+
+        spec = generator.generate_asyncapi_for_service(generator.services['Service One'])
+
+        assert generator.schema_resolver is None
+        assert 'schemas' not in spec['components']
+
+    def test_cli_flag_sets_config(self, config):
+        """Test that --resolve-schemas enables resolution."""
+        with patch('sys.argv', ['generate_asyncapi.py', '--resolve-schemas']):
+            with patch('generate_asyncapi.AsyncAPIGenerator') as mock_generator:
+                main()
+
+        assert mock_generator.call_args[0][0]['resolve_schemas'] is True
@@ -0,0 +1,116 @@
+"""Tests for sharded combined output."""
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from generate_asyncapi import AsyncAPIGenerator, main
+
+
+@pytest.fixture
+def config(sample_config, write_event, write_service):
+    """Two parents and one service without a parent."""
+    events_dir = Path(sample_config['events_dir'])
+    services_dir = Path(sample_config['services_dir'])
+    write_event(events_dir, 'event-a', 'uk.nhs.notify.a.v1')
+    write_event(events_dir, 'event-b', 'uk.nhs.notify.b.v1')
+    write_service(services_dir, 'mesh-poller', 'MESH Poller', parent='MESH Services', raises=['event-a'])
+    write_service(services_dir, 'mesh-timer', 'MESH Timer', parent='MESH Services', raises=['event-b'])
+    write_service(services_dir, 'pdm-poller', 'PDM Poller', parent='PDM Services', raises=['event-b'])
+    write_service(services_dir, 'loner', 'Loner', raises=['event-a'])
+    sample_config['shard_combined'] = True
+    return sample_config
+
+
+def read_yaml(path: Path) -> dict:
+    return yaml.safe_load(path.read_text())
+
+
+class TestShardedCombined:
+    """Tests for one combined spec per parent plus an index."""
+
+    def test_writes_shard_per_parent(self, config):
+        """Test that each parent gets a spec with only its services' channels."""
+        generator = AsyncAPIGenerator(config)
+
+        generator.generate()
+
+        shards_dir = Path(config['output_dir']) / 'shards'
+        mesh = read_yaml(shards_dir / 'asyncapi-mesh-services.yaml')
+        assert mesh['info']['title'].endswith('- MESH Services')
+        assert set(mesh['channels']) == {'uk_nhs_notify_a_v1', 'uk_nhs_notify_b_v1'}
+        pdm = read_yaml(shards_dir / 'asyncapi-pdm-services.yaml')
+        assert set(pdm['channels']) == {'uk_nhs_notify_b_v1'}
+        assert len(pdm['operations']) == 1
+        assert (shards_dir / 'asyncapi-ungrouped.yaml').exists()
+
+    def test_index_lists_shards(self, config):
+        """Test the index lists each shard's files, services and channels."""
+        generator = AsyncAPIGenerator(config)
+
+        generator.generate()
+
+        index = read_yaml(Path(config['output_dir']) / 'shards' / 'index.yaml')
+        assert [shard['parent'] for shard in index['shards']] == ['MESH Services', 'PDM Services', 'ungrouped']
+        assert index['shards'][0] == {
+            'parent': 'MESH Services',
+            'files': ['asyncapi-mesh-services.yaml'],
+            'services': ['MESH Poller', 'MESH Timer'],
+            'channels': ['uk_nhs_notify_a_v1', 'uk_nhs_notify_b_v1'],
+        }
+
+    def test_monolithic_spec_still_written(self, config):
+        """Test that asyncapi-all is written alongside the shards."""
+        generator = AsyncAPIGenerator(config)
+
+        generator.generate()
+
+        combined = read_yaml(Path(config['output_dir']) / 'asyncapi-all.yaml')
+        assert len(combined['operations']) == 4
+
+    def test_disabled_by_default(self, config):
+        """Test that no shards are written unless enabled."""
+        config['shard_combined'] = False
+        generator = AsyncAPIGenerator(config)
+
+        generator.generate()
+
+        assert not (Path(config['output_dir']) / 'shards').exists()
+
+    def test_both_formats(self, config):
+        """Test that shards and index follow the output format."""
+        generator = AsyncAPIGenerator(config)
+
+        generator.generate(output_format='both')
+
+        shards_dir = Path(config['output_dir']) / 'shards'
+        assert (shards_dir / 'asyncapi-mesh-services.json').exists()
+        assert (shards_dir / 'index.json').exists()
+
+    def test_apply_changes_rewrites_shards_and_removes_stale(self, config, write_service):
+        """Test that moving a service to a new parent updates the shards."""
+        generator = AsyncAPIGenerator(config)
+        generator.generate()
+        services_dir = Path(config['services_dir'])
+        service_file = write_service(services_dir, 'pdm-poller', 'PDM Poller', parent='PDM Core', raises=['event-b'])
+
+        generator.apply_changes([service_file])
+
+        shards_dir = Path(config['output_dir']) / 'shards'
+        assert (shards_dir / 'asyncapi-pdm-core.yaml').exists()
+        assert not (shards_dir / 'asyncapi-pdm-services.yaml').exists()
+        index = read_yaml(shards_dir / 'index.yaml')
+        assert 'PDM Core' in [shard['parent'] for shard in index['shards']]
+
+    def test_cli_flag(self, config):
+        """Test that --shard-combined sets the config key."""
+        config['shard_combined'] = False
+        with patch('sys.argv', ['generate_asyncapi.py', '--shard-combined']):
+            with patch('generate_asyncapi.AsyncAPIGenerator') as mock_generator:
+                main()
+
+        assert mock_generator.call_args[0][0]['shard_combined'] is True
@@ -0,0 +1,253 @@
+"""Tests for the local AsyncAPI spec server."""
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from spec_server import COMBINED, create_server, main, service_slug
+
+BASE_URL = 'https://notify.nhs.uk/cloudevents/schemas/digital-letters'
+
+
+@pytest.fixture
+def source_config(sample_config, sample_event_markdown):
+    """Config with one event and one service raising it."""
+    (Path(sample_config['events_dir']) / "test-event.md").write_text(sample_event_markdown)
+    service_dir = Path(sample_config['services_dir']) / "test-service"
+    service_dir.mkdir()
+    (service_dir / "index.md").write_text("""---
+title: Test Service
+events-raised:
+    - test-event
+---
+""")
+    return sample_config
+
+
+@pytest.fixture
+def server(source_config):
+    """A running server on a free port."""
+    server = create_server(source_config, port=0)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+def request(server, path, headers=None):
+    """Make a GET request, returning (status, headers, body) for any status."""
+    host, port = server.server_address[:2]
+    req = urllib.request.Request(f"http://{host}:{port}{path}", headers=headers or {})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+class TestRoutes:
+    """Tests for the HTTP routes."""
+
+    def test_index_lists_services(self, server):
+        """Test the index lists the combined spec and each service."""
+        status, headers, body = request(server, '/')
+
+        assert status == 200
+        index = json.loads(body)
+        assert index['combined']['yaml'] == '/specs/all.yaml'
+        assert index['services']['Test Service']['json'] == '/specs/test-service.json'
+
+    def test_service_spec_in_yaml_and_json(self, server):
+        """Test the same document is served in both formats."""
+        yaml_status, yaml_headers, yaml_body = request(server, '/specs/test-service.yaml')
+        json_status, json_headers, json_body = request(server, '/specs/test-service.json')
+
+        assert yaml_status == json_status == 200
+        assert yaml_headers['Content-Type'] == 'application/yaml'
+        assert json_headers['Content-Type'] == 'application/json'
+        assert yaml.safe_load(yaml_body) == json.loads(json_body)
+        assert 'send_uk_nhs_notify_test_v1' in json.loads(json_body)['operations']
+
+    def test_combined_spec(self, server):
+        """Test the combined spec is served."""
+        status, _, body = request(server, '/specs/all.json')
+
+        assert status == 200
+        assert 'uk_nhs_notify_test_v1' in json.loads(body)['channels']
+
+    @pytest.mark.parametrize('path', ['/specs/unknown.yaml', '/specs/test-service.xml', '/other/test-service.yaml'])
+    def test_not_found(self, server, path):
+        """Test unknown services, formats and routes return 404."""
+        status, headers, body = request(server, path)
+
+        assert status == 404
+        assert 'error' in json.loads(body)
+
+
+class TestCaching:
+    """Tests for ETags and the in-memory cache."""
+
+    def test_etag_revalidation(self, server):
+        """Test a matching If-None-Match returns 304 with no body."""
+        _, headers, _ = request(server, '/specs/test-service.yaml')
+        etag = headers['ETag']
+
+        status, revalidated, body = request(server, '/specs/test-service.yaml', {'If-None-Match': etag})
+
+        assert status == 304
+        assert body == b''
+        assert revalidated['ETag'] == etag
+
+    def test_warm_requests_do_not_rerender(self, server):
+        """Test a cached spec is not regenerated."""
+        request(server, '/specs/test-service.json')
+
+        with patch.object(server.cache.generator, 'generate_asyncapi_for_service') as generate:
+            status, _, _ = request(server, '/specs/test-service.json')
+
+        assert status == 200
+        generate.assert_not_called()
+
+    def test_source_change_invalidates_affected_specs(self, server, source_config, sample_event_markdown):
+        """Test that editing an event invalidates its services and the combined spec."""
+        _, before, _ = request(server, '/specs/test-service.yaml')
+        event_file = Path(source_config['events_dir']) / "test-event.md"
+        event_file.write_text(sample_event_markdown.replace('This is a test event description.', 'Edited.'))
+
+        slugs = server.cache.apply_changes([event_file])
+
+        assert slugs == {service_slug('Test Service'), COMBINED}
+        status, after, body = request(server, '/specs/test-service.yaml', {'If-None-Match': before['ETag']})
+        assert status == 200
+        assert after['ETag'] != before['ETag']
+        assert b'Edited.' in body
+
+    def test_unrelated_change_keeps_cache(self, server, temp_dir):
+        """Test that a change outside the sources invalidates nothing."""
+        request(server, '/specs/test-service.yaml')
+
+        assert server.cache.apply_changes([temp_dir / 'notes.md']) == set()
+        assert len(server.cache.entries) == 1
+
+
+@pytest.fixture
+def hierarchy_config(sample_config, write_event, write_service):
+    """A parent with two children, generated for two versions with shards and aggregated specs."""
+    events_dir = Path(sample_config['events_dir'])
+    services_dir = Path(sample_config['services_dir'])
+    write_event(events_dir, 'event-a', 'uk.nhs.notify.a.v1')
+    write_event(events_dir, 'event-b', 'uk.nhs.notify.b.v1')
+    write_service(services_dir, 'group', 'Group')
+    write_service(services_dir, 'group/poller', 'Poller', raises=['event-a'], parent='Group')
+    write_service(services_dir, 'group/timer', 'Timer', raises=['event-b'], parent='Group')
+    sample_config.update(shard_combined=True, aggregate_containers=True, versions=['2025-10', '2026-01'])
+    return sample_config
+
+
+class TestVersionsAndGroups:
+    """Tests for versioned, shard and aggregated routes."""
+
+    @pytest.fixture
+    def server(self, hierarchy_config):
+        server = create_server(hierarchy_config, port=0)
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+    def test_index_lists_every_version(self, server):
+        """Test the index groups each kind of spec by version."""
+        _, _, body = request(server, '/')
+
+        index = json.loads(body)['versions']
+        assert sorted(index) == ['2025-10', '2026-01']
+        assert index['2026-01']['combined']['json'] == '/specs/2026-01/all.json'
+        assert index['2026-01']['services']['Poller']['yaml'] == '/specs/2026-01/poller.yaml'
+        assert index['2026-01']['shards']['Group']['yaml'] == '/specs/2026-01/shards/group.yaml'
+        assert index['2026-01']['aggregated']['Group']['yaml'] == '/specs/2026-01/aggregated/group.yaml'
+
+    def test_versioned_specs(self, server):
+        """Test each version is rendered with its own version."""
+        _, _, old = request(server, '/specs/2025-10/poller.json')
+        _, _, new = request(server, '/specs/2026-01/poller.json')
+
+        assert json.loads(old)['info']['version'] == '2025-10'
+        assert json.loads(new)['info']['version'] == '2026-01'
+        assert request(server, '/specs/poller.json')[0] == 404
+
+    def test_shard_and_aggregated_specs(self, server):
+        """Test shards and aggregated container specs are served."""
+        _, _, shard = request(server, '/specs/2026-01/shards/group.json')
+        _, _, aggregated = request(server, '/specs/2026-01/aggregated/group.json')
+
+        assert set(json.loads(shard)['channels']) == {'uk_nhs_notify_a_v1', 'uk_nhs_notify_b_v1'}
+        assert json.loads(aggregated)['info']['x-aggregated-services'] == ['Group', 'Poller', 'Timer']
+
+    def test_service_change_invalidates_groups(self, server, hierarchy_config, write_service):
+        """Test that a service edit drops its specs and every combined, shard and aggregated spec."""
+        service_file = write_service(Path(hierarchy_config['services_dir']), 'group/timer', 'Timer',
+                                     raises=['event-a'], parent='Group')
+
+        names = server.cache.apply_changes([service_file])
+
+        assert '2025-10/poller' not in names
+        assert {'2025-10/timer', '2026-01/all', '2026-01/shards/group', '2026-01/aggregated/group'} <= names
+
+
+class TestSchemaChanges:
+    """Tests for invalidation when resolved schemas change."""
+
+    @pytest.fixture
+    def schema_config(self, source_config, temp_dir, write_event):
+        """Resolve the test event's envelope from a local schema file."""
+        schema_file = temp_dir / 'schemas' / '2025-10-draft' / 'events' / 'test.schema.yaml'
+        schema_file.parent.mkdir(parents=True)
+        schema_file.write_text(yaml.dump({'type': 'object', 'title': 'Before'}))
+        write_event(Path(source_config['events_dir']), 'test-event', 'uk.nhs.notify.test.v1',
+                    envelope=f'{BASE_URL}/2025-10-draft/events/test.schema.json')
+        source_config['resolve_schemas'] = True
+        return source_config
+
+    def test_schema_change_invalidates_everything(self, schema_config, temp_dir):
+        """Test that editing a schema clears the resolver and every cached spec."""
+        server = create_server(schema_config, port=0)
+        server.server_close()
+        cache = server.cache
+        before = cache.get('test-service', 'json')
+        cache.get(COMBINED, 'json')
+        schema_file = temp_dir / 'schemas' / '2025-10-draft' / 'events' / 'test.schema.yaml'
+        schema_file.write_text(yaml.dump({'type': 'object', 'title': 'After'}))
+
+        names = cache.apply_changes([schema_file])
+
+        assert names == {service_slug('Test Service'), COMBINED}
+        assert cache.entries == {}
+        body, etag = cache.get('test-service', 'json')
+        assert etag != before[1]
+        assert b'After' in body
+
+
+class TestMain:
+    """Tests for the command line entry point."""
+
+    @patch('sys.argv', ['spec_server.py', '--events-dir', '/custom/events', '--port', '9000', '--no-watch'])
+    @patch('spec_server.serve')
+    def test_main_passes_options(self, mock_serve):
+        """Test main builds the config and serves with the given options."""
+        main()
+
+        config = mock_serve.call_args[0][0]
+        assert config['events_dir'] == '/custom/events'
+        assert mock_serve.call_args[1] == {'host': '127.0.0.1', 'port': 9000, 'watch': False, 'interval': 0.5}
@@ -0,0 +1,136 @@
+"""Tests for generating several versions in one run."""
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from generate_asyncapi import AsyncAPIGenerator, main
+
+BASE_URL = 'https://notify.nhs.uk/cloudevents/schemas/digital-letters'
+
+
+@pytest.fixture
+def config(sample_config):
+    """Config with one event raised by one service."""
+    events_dir = Path(sample_config['events_dir'])
+    services_dir = Path(sample_config['services_dir'])
+    (events_dir / 'test-event.md').write_text(f"""---
+title: test-event
+type: uk.nhs.notify.test.v1
+nice_name: TestEvent
+service: Test Service
+schema_envelope: {BASE_URL}/2025-10-draft/events/test.schema.json
+schema_data: {BASE_URL}/2025-10-draft/data/test-data.schema.json
+---
+""")
+    (services_dir / 'test').mkdir()
+    (services_dir / 'test' / 'index.md').write_text("""---
+title: Test Service
+events-raised:
+    - test-event
+---
+""")
+    sample_config['versions'] = ['2025-10-draft', '2026-01-draft']
+    return sample_config
+
+
+def read_spec(path: Path) -> dict:
+    return yaml.safe_load(path.read_text())
+
+
+class TestVersionTargets:
+    """Tests for version target configuration."""
+
+    def test_default_single_target(self, sample_config):
+        """Test that no versions writes to output_dir as before."""
+        generator = AsyncAPIGenerator(sample_config)
+
+        assert generator.version_targets() == [(None, generator.output_dir)]
+
+    def test_names_and_mappings(self, sample_config, temp_dir):
+        """Test version names and mappings with their own output_dir."""
+        sample_config['versions'] = ['v1', {'version': 'v2', 'output_dir': str(temp_dir / 'elsewhere')}]
+        generator = AsyncAPIGenerator(sample_config)
+
+        assert generator.version_targets() == [
+            ('v1', generator.output_dir / 'v1'),
+            ('v2', temp_dir / 'elsewhere'),
+        ]
+
+    def test_mapping_without_version_raises(self, sample_config):
+        """Test that a mapping must name its version."""
+        sample_config['versions'] = [{'output_dir': 'out'}]
+        generator = AsyncAPIGenerator(sample_config)
+
+        with pytest.raises(ValueError, match="missing 'version'"):
+            generator.version_targets()
+
+    def test_version_target_renders_version(self, config):
+        """Test that specs rendered within version_target use its version, restored afterwards."""
+        generator = AsyncAPIGenerator(config)
+        generator.load_events()
+        generator.load_services()
+        service = generator.services['Test Service']
+
+        with generator.version_target('2026-01-draft'):
+            spec = generator.generate_asyncapi_for_service(service)
+            assert generator.output_dir == Path(config['output_dir'])
+
+        assert spec['info']['version'] == '2026-01-draft'
+        assert generator.target_version is None
+
+
+class TestMultiVersionGeneration:
+    """Tests for writing each version from one parse."""
+
+    def test_writes_tree_per_version(self, config):
+        """Test that each version gets its own specs, version and schema URLs."""
+        generator = AsyncAPIGenerator(config)
+
+        generator.generate()
+
+        output_dir = Path(config['output_dir'])
+        for version in ('2025-10-draft', '2026-01-draft'):
+            spec = read_spec(output_dir / version / 'asyncapi-test-service.yaml')
+            assert spec['info']['version'] == version
+            message = spec['channels']['uk_nhs_notify_test_v1']['messages']['TestEvent']
+            assert message['payload']['$ref'] == f'{BASE_URL}/{version}/events/test.schema.json'
+            assert message['traits'][0]['description'] == f'Data schema: {BASE_URL}/{version}/data/test-data.schema.json'
+            assert (output_dir / version / 'asyncapi-all.yaml').exists()
+        assert generator.output_dir == output_dir
+        assert generator.target_version is None
+
+    def test_sources_parsed_once(self, config):
+        """Test that events and services are read once for all versions."""
+        generator = AsyncAPIGenerator(config)
+
+        generator.generate()
+
+        assert generator.instrumentation.counters['files_read'] == 2
+
+    def test_apply_changes_updates_every_version(self, config):
+        """Test that a change regenerates the affected specs in each version."""
+        generator = AsyncAPIGenerator(config)
+        generator.generate()
+        event_file = Path(config['events_dir']) / 'test-event.md'
+        event_file.write_text(event_file.read_text() + '\nUpdated.\n')
+
+        result = generator.apply_changes([event_file])
+
+        assert result['regenerated'] == ['Test Service']
+        for version in ('2025-10-draft', '2026-01-draft'):
+            spec = read_spec(Path(config['output_dir']) / version / 'asyncapi-test-service.yaml')
+            message = spec['channels']['uk_nhs_notify_test_v1']['messages']['TestEvent']
+            assert message['description'] == 'Updated.'
+
+    def test_cli_versions(self, config):
+        """Test that --versions sets the versions config key."""
+        with patch('sys.argv', ['generate_asyncapi.py', '--versions', 'a', 'b']):
+            with patch('generate_asyncapi.AsyncAPIGenerator') as mock_generator:
+                main()
+
+        assert mock_generator.call_args[0][0]['versions'] == ['a', 'b']
@@ -0,0 +1,185 @@
+"""Tests for targeted regeneration and watch mode."""
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import pytest
+import yaml
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from generate_asyncapi import AsyncAPIGenerator, main
+
+
+@pytest.fixture
+def generator(sample_config, write_event, write_service):
+    """Generator over two events and three services, already generated once."""
+    events_dir = Path(sample_config['events_dir'])
+    services_dir = Path(sample_config['services_dir'])
+    write_event(events_dir, 'event-a', 'uk.nhs.notify.a.v1')
+    write_event(events_dir, 'event-b', 'uk.nhs.notify.b.v1')
+    write_service(services_dir, 'producer', 'Producer', raises=['event-a'])
+    write_service(services_dir, 'consumer', 'Consumer', consumes=['event-a'])
+    write_service(services_dir, 'other', 'Other', raises=['event-b'])
+
+    generator = AsyncAPIGenerator(sample_config)
+    generator.generate()
+    return generator
+
+
+def read_spec(generator: AsyncAPIGenerator, name: str) -> dict:
+    return yaml.safe_load((generator.output_dir / f"asyncapi-{name}.yaml").read_text())
+
+
+class TestApplyChanges:
+    """Tests for regenerating only the specs affected by a change."""
+
+    def test_event_change_regenerates_referencing_services(self, generator, write_event):
+        """Test that editing an event rewrites only the services that use it."""
+        other_mtime = (generator.output_dir / "asyncapi-other.yaml").stat().st_mtime_ns
+        event_file = write_event(generator.events_dir, 'event-a', 'uk.nhs.notify.a.v1', 'Updated text.')
+
+        result = generator.apply_changes([event_file])
+
+        assert result['events'] == ['event-a']
+        assert result['regenerated'] == ['Consumer', 'Producer']
+        assert (generator.output_dir / "asyncapi-other.yaml").stat().st_mtime_ns == other_mtime
+        channel = read_spec(generator, 'producer')['channels']['uk_nhs_notify_a_v1']
+        assert channel['messages']['event-a']['description'] == 'Updated text.'
+
+    def test_event_change_patches_combined_spec(self, generator, write_event):
+        """Test that the combined spec reflects the changed event."""
+        event_file = write_event(generator.events_dir, 'event-b', 'uk.nhs.notify.b.v2')
+
+        generator.apply_changes([event_file])
+
+        combined = read_spec(generator, 'all')
+        assert 'uk_nhs_notify_b_v2' in combined['channels']
+        assert 'uk_nhs_notify_b_v1' not in combined['channels']
+
+    def test_service_change_regenerates_only_that_service(self, generator, write_service):
+        """Test that editing a service rewrites its spec alone."""
+        service_file = write_service(generator.services_dir, 'other', 'Other', raises=['event-b'], consumes=['event-a'])
+
+        result = generator.apply_changes([service_file])
+
+        assert result['events'] == []
+        assert result['regenerated'] == ['Other']
+        assert 'receive_uk_nhs_notify_a_v1' in read_spec(generator, 'other')['operations']
+
+    def test_deleted_service_removes_its_spec(self, generator):
+        """Test that deleting a service removes its spec and drops it from the combined spec."""
+        service_file = generator.services_dir / 'consumer' / 'index.md'
+        service_file.unlink()
+
+        result = generator.apply_changes([service_file])
+
+        assert result['removed'] == ['Consumer']
+        assert 'Consumer' not in generator.services
+        assert not (generator.output_dir / "asyncapi-consumer.yaml").exists()
+        operations = read_spec(generator, 'all')['operations']
+        assert not any('consumer' in operation_id for operation_id in operations)
+
+    def test_renamed_service_replaces_old_spec(self, generator, write_service):
+        """Test that retitling a service writes the new spec and removes the old one."""
+        service_file = write_service(generator.services_dir, 'other', 'Renamed', raises=['event-b'])
+
+        result = generator.apply_changes([service_file])
+
+        assert result['regenerated'] == ['Renamed']
+        assert result['removed'] == ['Other']
+        assert (generator.output_dir / "asyncapi-renamed.yaml").exists()
+        assert not (generator.output_dir / "asyncapi-other.yaml").exists()
+
+    def test_new_event_file_is_added(self, generator, write_event):
+        """Test that a new event file is loaded into the model."""
+        event_file = write_event(generator.events_dir, 'event-c', 'uk.nhs.notify.c.v1')
+
+        result = generator.apply_changes([event_file])
+
+        assert 'event-c' in generator.events
+        assert result['events'] == ['event-c']
+        assert result['regenerated'] == []
+
+    def test_unparseable_event_keeps_last_good_definition(self, generator):
+        """Test that a read error leaves the model unchanged."""
+        event_file = generator.events_dir / 'event-a.md'
+
+        with patch.object(generator, '_read_source', side_effect=OSError('locked')):
+            result = generator.apply_changes([event_file])
+
+        assert 'event-a' in generator.events
+        assert result['regenerated'] == []
+
+    def test_unrelated_files_are_ignored(self, generator, temp_dir):
+        """Test that files outside the watched directories change nothing."""
+        stray = temp_dir / 'notes.md'
+        stray.write_text('# Notes')
+
+        result = generator.apply_changes([stray, generator.services_dir / 'producer' / 'README.md'])
+
+        assert result == {'events': [], 'regenerated': [], 'removed': []}
+
+    def test_other_sources_are_not_reread(self, generator, write_event):
+        """Test that only the changed file is read."""
+        event_file = write_event(generator.events_dir, 'event-a', 'uk.nhs.notify.a.v1', 'Again.')
+        reads_before = generator.instrumentation.counters['files_read']
+
+        generator.apply_changes([event_file])
+
+        assert generator.instrumentation.counters['files_read'] == reads_before + 1
+
+
+class TestWatch:
+    """Tests for the watch loop."""
+
+    def test_watch_regenerates_on_change(self, sample_config, write_event, write_service):
+        """Test that watch picks up an edit and rewrites the affected spec."""
+        events_dir = Path(sample_config['events_dir'])
+        services_dir = Path(sample_config['services_dir'])
+        write_event(events_dir, 'event-a', 'uk.nhs.notify.a.v1')
+        write_service(services_dir, 'producer', 'Producer', raises=['event-a'])
+        generator = AsyncAPIGenerator(sample_config)
+        output_file = generator.output_dir / "asyncapi-producer.yaml"
+
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=generator.watch,
+            kwargs={'interval': 0.02, 'stop_event': stop_event, 'use_native': False},
+        )
+        thread.start()
+        try:
+            deadline = time.monotonic() + 5
+            while not output_file.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.05)
+
+            write_event(events_dir, 'event-a', 'uk.nhs.notify.a.v1', 'Edited while watching.')
+
+            while 'Edited while watching.' not in output_file.read_text() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            stop_event.set()
+            thread.join(timeout=5)
+
+        assert 'Edited while watching.' in output_file.read_text()
+
+    @patch('sys.argv', ['generate_asyncapi.py', '--watch', '--watch-interval', '0.2'])
+    @patch('generate_asyncapi.AsyncAPIGenerator')
+    def test_main_with_watch(self, mock_generator_class):
+        """Test main function starts watch mode instead of a single generate."""
+        mock_generator = MagicMock()
+        mock_generator_class.return_value = mock_generator
+
+        main()
+
+        mock_generator.watch.assert_called_once_with(interval=0.2)
+        mock_generator.generate.assert_not_called()
+
+    @patch('sys.argv', ['generate_asyncapi.py', '--watch', '--service', 'Test Service'])
+    def test_main_rejects_watch_with_service(self):
+        """Test that --watch and --service cannot be combined."""
+        with pytest.raises(SystemExit):
+            main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the CloudEvents Jekyll documentation pipeline.
+
+Generates a synthetic schema tree (deep directory nesting, large property
+sets, allOf chains and many examples) and times each stage of the pipeline
+in-process:
+
+- json_conversion:  yaml_to_json for every schema
+- yaml_docs:        generate_single_doc_yaml for every schema
+- markdown_docs:    generate_single_markdown_doc for every doc YAML file
+- index_generation: hierarchical YAML and Markdown index generation
+
+The process's peak RSS is recorded after every stage. ru_maxrss is a
+high-water mark for the whole process, so each stage's value is the peak so
+far, not the stage's own. Optionally the real subprocess-based
+generate_docs_all pipeline is also timed end to end.
+
+The report is written as JSON so results can be tracked over time.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from yaml_to_json import yaml_to_json
+from generate_docs_yaml import generate_single_doc_yaml, generate_hierarchical_indices_yaml
+from generate_docs_markdown import generate_single_markdown_doc, generate_hierarchical_markdown_indices
+from generate_docs_all import run_documentation_generation
+
+
+STAGES = ['json_conversion', 'yaml_docs', 'markdown_docs', 'index_generation']
+
+
+def peak_rss_kb(who=resource.RUSAGE_SELF):
+    """Return the peak resident set size in KiB for this process or its children."""
+    peak = resource.getrusage(who).ru_maxrss
+    # macOS reports bytes, Linux reports KiB
+    if sys.platform == 'darwin':
+        peak //= 1024
+    return peak
+
+
+def build_property(index, depth, width):
+    """Build a property definition, nesting objects down to the given depth."""
+    prop = {
+        'type': 'string',
+        'description': f'Synthetic property {index} used to exercise documentation generation.',
+        'pattern': '^[A-Za-z0-9-]{1,64}$',
+        'minLength': 1,
+        'maxLength': 64,
+        'examples': [f'value-{index}-{n}' for n in range(3)],
+    }
+    if depth > 0:
+        prop = {
+            'type': 'object',
+            'description': f'Nested object {index} at depth {depth}.',
+            'properties': {
+                f'child{n}': build_property(n, depth - 1, width)
+                for n in range(width)
+            },
+            'required': [f'child{n}' for n in range(min(2, width))],
+        }
+    return prop
+
+
+def build_schema(index, properties, nesting, examples, parent_ref):
+    """Build a synthetic JSON Schema document."""
+    schema = {
+        '$schema': 'https://json-schema.org/draft/2020-12/schema',
+        '$id': f'https://notify.nhs.uk/cloudevents/schemas/bench/schema{index}.schema.json',
+        'title': f'BenchSchema{index}',
+        'description': f'Synthetic schema {index} for documentation benchmarks.',
+        'type': 'object',
+        'properties': {
+            f'prop{n}': build_property(n, nesting if n % 5 == 0 else 0, 3)
+            for n in range(properties)
+        },
+        'required': [f'prop{n}' for n in range(0, properties, 4)],
+        'additionalProperties': False,
+        'examples': [
+            {f'prop{n}': f'example-{e}-{n}' for n in range(min(properties, 5))}
+            for e in range(examples)
+        ],
+    }
+    if parent_ref:
+        schema['allOf'] = [{'$ref': parent_ref}]
+    return schema
+
+
+def build_schema_tree(src_dir, schemas, depth, properties, nesting, examples, chain):
+    """
+    Write a synthetic schema tree under src_dir.
+
+    Schemas are spread across directories nested depth levels deep, and
+    consecutive schemas form allOf inheritance chains of the given length.
+    """
+    src_path = Path(src_dir)
+    written = []
+    for index in range(schemas):
+        branch = [f'level{level}-{(index >> level) % 3}' for level in range(depth)]
+        schema_dir = src_path.joinpath(*branch) if branch else src_path
+        schema_dir.mkdir(parents=True, exist_ok=True)
+
+        parent_ref = None
+        if chain and index % chain:
+            parent = written[index - 1]
+            parent_ref = os.path.relpath(parent, schema_dir)
+
+        schema_file = schema_dir / f'bench-schema-{index}.schema.yaml'
+        with open(schema_file, 'w') as f:
+            yaml.dump(build_schema(index, properties, nesting, examples, parent_ref), f,
+                      default_flow_style=False, sort_keys=False)
+        written.append(schema_file)
+    return written
+
+
+@contextlib.contextmanager
+def timed_stage(results, stage, quiet=True):
+    """Time a stage, record the cumulative peak RSS after it, and optionally silence stdout."""
+    sink = io.StringIO() if quiet else sys.stdout
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink):
+        yield
+    results[stage] = {
+        'seconds': round(time.perf_counter() - start, 6),
+        'cumulative_peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def run_stages(src_dir, output_dir, quiet=True):
+    """Run each documentation stage in-process and time it."""
+    src_path = Path(src_dir)
+    output_path = Path(output_dir)
+    schemas_dir = output_path / 'schemas'
+    yaml_docs_dir = output_path / 'docs' / 'yaml'
+    md_docs_dir = output_path / 'docs' / 'md'
+    for directory in (schemas_dir, yaml_docs_dir, md_docs_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    yaml_files = list(src_path.rglob('*.schema.yaml'))
+    results = {}
+
+    with timed_stage(results, 'json_conversion', quiet):
+        for yaml_file in yaml_files:
+            json_file = schemas_dir / str(yaml_file.relative_to(src_path)).replace('.schema.yaml', '.schema.json')
+            json_file.parent.mkdir(parents=True, exist_ok=True)
+            yaml_to_json(yaml_file, json_file)
+
+    with timed_stage(results, 'yaml_docs', quiet):
+        doc_yaml_files = [generate_single_doc_yaml(f, src_path, yaml_docs_dir) for f in yaml_files]
+
+    with timed_stage(results, 'markdown_docs', quiet):
+        for doc_file in yaml_docs_dir.rglob('*.doc.yaml'):
+            generate_single_markdown_doc(doc_file, yaml_docs_dir, md_docs_dir)
+
+    with timed_stage(results, 'index_generation', quiet):
+        generate_hierarchical_indices_yaml(doc_yaml_files, yaml_files, src_path, yaml_docs_dir)
+        generate_hierarchical_markdown_indices(yaml_docs_dir, md_docs_dir)
+
+    return results
+
+
+def run_pipeline(src_dir, output_dir, quiet=True):
+    """Time the real subprocess-based generate_docs_all pipeline end to end."""
+    sink = io.StringIO() if quiet else sys.stdout
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink):
+        success = run_documentation_generation(str(src_dir), str(output_dir))
+    return {
+        'seconds': round(time.perf_counter() - start, 6),
+        'success': success,
+        'children_peak_rss_kb': peak_rss_kb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def count_outputs(output_dir):
+    """Count the files produced by each stage."""
+    output_path = Path(output_dir)
+    return {
+        'json_schemas': len(list((output_path / 'schemas').rglob('*.schema.json'))),
+        'yaml_docs': len(list((output_path / 'docs' / 'yaml').rglob('*.doc.yaml'))),
+        'markdown_docs': len([p for p in (output_path / 'docs' / 'md').rglob('*.md') if p.name != 'index.md']),
+        'indices': len(list((output_path / 'docs' / 'md').rglob('index.md'))),
+    }
+
+
+def run_benchmark(schemas=100, depth=5, properties=30, nesting=2, examples=10, chain=4,
+                  include_pipeline=False, quiet=True, work_dir=None):
+    """Build a synthetic schema tree and return a benchmark report dict."""
+    config = {
+        'schemas': schemas,
+        'depth': depth,
+        'properties': properties,
+        'nesting': nesting,
+        'examples': examples,
+        'chain': chain,
+        'include_pipeline': include_pipeline,
+    }
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as temp_dir:
+        src_dir = Path(temp_dir) / 'src'
+        build_start = time.perf_counter()
+        build_schema_tree(src_dir, schemas, depth, properties, nesting, examples, chain)
+        build_seconds = time.perf_counter() - build_start
+        source_bytes = sum(p.stat().st_size for p in src_dir.rglob('*.schema.yaml'))
+
+        stages_output = Path(temp_dir) / 'stages-output'
+        stages = run_stages(src_dir, stages_output, quiet)
+
+        report = {
+            'benchmark': 'cloudevent-jekyll-docs',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version.split()[0],
+            'config': config,
+            'corpus': {
+                'build_seconds': round(build_seconds, 6),
+                'source_bytes': source_bytes,
+            },
+            'stages': stages,
+            'total_seconds': round(sum(stage['seconds'] for stage in stages.values()), 6),
+            'peak_rss_kb': peak_rss_kb(),
+            'outputs': count_outputs(stages_output),
+        }
+
+        if include_pipeline:
+            report['pipeline'] = run_pipeline(src_dir, Path(temp_dir) / 'pipeline-output', quiet)
+
+    return report
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Benchmark the CloudEvents Jekyll docs pipeline')
+    parser.add_argument('--schemas', type=int, default=100, help='Number of schema files (default: 100)')
+    parser.add_argument('--depth', type=int, default=5, help='Directory nesting depth (default: 5)')
+    parser.add_argument('--properties', type=int, default=30, help='Top-level properties per schema (default: 30)')
+    parser.add_argument('--nesting', type=int, default=2, help='Nested object depth for every fifth property (default: 2)')
+    parser.add_argument('--examples', type=int, default=10, help='Examples per schema (default: 10)')
+    parser.add_argument('--chain', type=int, default=4, help='Length of allOf inheritance chains (default: 4, 0 disables)')
+    parser.add_argument('--pipeline', action='store_true', help='Also time the subprocess-based generate_docs_all pipeline')
+    parser.add_argument('--verbose', action='store_true', help='Show the per-file output of each stage')
+    parser.add_argument('--work-dir', default=None, help='Directory for the temporary schema tree')
+    parser.add_argument('--output', default=None, help='Write the JSON report to this path (default: stdout)')
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        schemas=args.schemas,
+        depth=args.depth,
+        properties=args.properties,
+        nesting=args.nesting,
+        examples=args.examples,
+        chain=args.chain,
+        include_pipeline=args.pipeline,
+        quiet=not args.verbose,
+        work_dir=args.work_dir,
+    )
+
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report_json + '\n')
+        print(f'Benchmark report written to {args.output}')
+    else:
+        print(report_json)
+
+
+if __name__ == '__main__':
+    main()
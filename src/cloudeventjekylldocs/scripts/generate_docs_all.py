@@ -9,11 +9,21 @@ import subprocess
 import shutil
 from pathlib import Path
 
+# Shared build tooling lives alongside this project in src/tooling
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tooling'))
 
-def run_documentation_generation(src_dir, output_dir):
+from build_logging import configure_logging, export_logging_env, get_logger, relay_env, relay_output  # noqa: E402
+from instrumentation import Instrumentation  # noqa: E402
+
+logger = get_logger('cloudeventjekylldocs')
+
+
+def run_documentation_generation(src_dir, output_dir, instrumentation=None):
     """Run both YAML and Markdown documentation generation."""
     script_dir = Path(__file__).parent
     output_path = Path(output_dir)
+    if instrumentation is None:
+        instrumentation = Instrumentation('cloudeventjekylldocs')
 
     # Create the nested directory structure
     docs_yaml_dir = output_path / "docs" / "yaml"
@@ -23,16 +33,16 @@ def run_documentation_generation(src_dir, output_dir):
     # Get the Python executable path for this environment
     python_executable = sys.executable
 
-    print("=== Schema Documentation Generation ===")
-    print(f"Source directory: {src_dir}")
-    print(f"Output directory: {output_dir}")
-    print(f"YAML docs directory: {docs_yaml_dir}")
-    print(f"Markdown docs directory: {docs_md_dir}")
-    print(f"Schemas directory: {schemas_dir}")
-    print()
+    logger.info("=== Schema Documentation Generation ===")
+    logger.info(f"Source directory: {src_dir}")
+    logger.info(f"Output directory: {output_dir}")
+    logger.debug("YAML docs directory: %s", docs_yaml_dir)
+    logger.debug("Markdown docs directory: %s", docs_md_dir)
+    logger.debug("Schemas directory: %s", schemas_dir)
+    logger.info("")
 
     # Step 1: Convert YAML schemas to JSON in schemas directory
-    print("Step 1: Converting YAML schemas to JSON...")
+    logger.info("Step 1: Converting YAML schemas to JSON...")
     try:
         import subprocess
 
@@ -41,7 +51,7 @@ def run_documentation_generation(src_dir, output_dir):
         yaml_files = list(src_path.rglob("*.schema.yaml"))
 
         if not yaml_files:
-            print(f"No YAML schema files found in {src_dir}")
+            logger.warning(f"No YAML schema files found in {src_dir}")
             return False
 
         # Ensure schemas directory exists
@@ -60,70 +70,98 @@ def run_documentation_generation(src_dir, output_dir):
 
             # Run the YAML to JSON conversion
             cmd = [python_executable, str(yaml_to_json_script), str(yaml_file), str(json_file)]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            with instrumentation.span('convert'):
+                result = subprocess.run(cmd, capture_output=True, text=True)
 
             if result.returncode != 0:
-                print(f"Error converting {yaml_file}: {result.stderr}")
+                logger.error(f"Error converting {yaml_file}: {result.stderr}")
                 return False
 
-            print(f"Converted: {yaml_file} → {json_file}")
+            instrumentation.record_read(yaml_file.stat().st_size)
+            if json_file.exists():
+                instrumentation.record_write(json_file.stat().st_size)
+
+            logger.debug("Converted: %s → %s", yaml_file, json_file)
 
-        print(f"Converted {len(yaml_files)} schema files to JSON in: {schemas_dir}")
+        logger.info(f"Converted {len(yaml_files)} schema files to JSON in: {schemas_dir}")
 
     except Exception as e:
-        print(f"Error converting schema files: {e}")
+        logger.error(f"Error converting schema files: {e}")
         return False
 
-    print()
+    logger.info("")
 
     # Step 2: Generate YAML documentation
-    print("Step 2: Generating YAML documentation...")
+    logger.info("Step 2: Generating YAML documentation...")
     yaml_script = script_dir / "generate_docs_yaml.py"
     yaml_cmd = [python_executable, str(yaml_script), src_dir, str(docs_yaml_dir)]
 
     try:
-        result = subprocess.run(yaml_cmd, check=True, capture_output=True, text=True)
-        print(result.stdout)
+        with instrumentation.span('render_yaml'):
+            result = subprocess.run(yaml_cmd, check=True, capture_output=True, text=True, env=relay_env())
+        # The child's records go through this logger's level and log file
+        relay_output(logger, result.stdout)
         if result.stderr:
-            print("YAML generation warnings/errors:")
-            print(result.stderr)
+            logger.warning("YAML generation warnings/errors:")
+            logger.warning(result.stderr)
     except subprocess.CalledProcessError as e:
-        print(f"Error generating YAML documentation: {e}")
-        print(f"STDOUT: {e.stdout}")
-        print(f"STDERR: {e.stderr}")
+        logger.error(f"Error generating YAML documentation: {e}")
+        relay_output(logger, e.stdout or "")
+        logger.error(f"STDERR: {e.stderr}")
         return False
 
-    print()
+    logger.info("")
 
     # Step 3: Generate Markdown documentation
-    print("Step 3: Generating Markdown documentation...")
+    logger.info("Step 3: Generating Markdown documentation...")
     md_script = script_dir / "generate_docs_markdown.py"
     md_cmd = [python_executable, str(md_script), str(docs_yaml_dir), str(docs_md_dir)]
 
     try:
-        result = subprocess.run(md_cmd, check=True, capture_output=True, text=True)
-        print(result.stdout)
+        with instrumentation.span('render_markdown'):
+            result = subprocess.run(md_cmd, check=True, capture_output=True, text=True, env=relay_env())
+        relay_output(logger, result.stdout)
         if result.stderr:
-            print("Markdown generation warnings/errors:")
-            print(result.stderr)
+            logger.warning("Markdown generation warnings/errors:")
+            logger.warning(result.stderr)
     except subprocess.CalledProcessError as e:
-        print(f"Error generating Markdown documentation: {e}")
-        print(f"STDOUT: {e.stdout}")
-        print(f"STDERR: {e.stderr}")
+        logger.error(f"Error generating Markdown documentation: {e}")
+        relay_output(logger, e.stdout or "")
+        logger.error(f"STDERR: {e.stderr}")
         return False
 
-    print()
-    print("=== Documentation Generation Complete ===")
+    logger.info("")
+    logger.info("=== Documentation Generation Complete ===")
     return True
 
 
+def pop_option(args, name):
+    """Remove '<name> <value>' from args and return the value, or None if absent."""
+    if name not in args:
+        return None
+    index = args.index(name)
+    if index + 1 >= len(args):
+        return None
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2 or len(sys.argv) > 3:
-        print("Usage: python generate_docs_all.py <src_dir> [output_dir]")
+    args = sys.argv[1:]
+    profile_dir = pop_option(args, '--profile')
+    log_level = pop_option(args, '--log-level')
+    log_file = pop_option(args, '--log-file')
+
+    if len(args) < 1 or len(args) > 2:
+        print("Usage: python generate_docs_all.py <src_dir> [output_dir] [--profile DIR] [--log-level LEVEL] [--log-file PATH]")
         print()
         print("Arguments:")
         print("  src_dir      : Directory containing .schema.yaml files")
         print("  output_dir   : Base output directory (default: output)")
+        print("  --profile DIR: Write a cProfile dump and JSON timing summary to DIR")
+        print("  --log-level  : Console log level, DEBUG shows every file (default: INFO)")
+        print("  --log-file   : Append all log records, including DEBUG, to PATH as JSON lines")
         print()
         print("Output structure:")
         print("  output/")
@@ -137,12 +175,19 @@ if __name__ == "__main__":
         print("  python generate_docs_all.py src my_output")
         sys.exit(1)
 
-    src_dir = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else "output"
+    src_dir = args[0]
+    output_dir = args[1] if len(args) > 1 else "output"
 
     if not os.path.exists(src_dir):
         print(f"Source directory does not exist: {src_dir}")
         sys.exit(1)
 
-    success = run_documentation_generation(src_dir, output_dir)
+    configure_logging('cloudeventjekylldocs', level=log_level, log_file=log_file)
+    # yaml_to_json picks these up from the environment; the generator scripts
+    # are relayed through this logger instead
+    export_logging_env(log_level, log_file)
+
+    instrumentation = Instrumentation('cloudeventjekylldocs')
+    with instrumentation.profile(profile_dir):
+        success = run_documentation_generation(src_dir, output_dir, instrumentation)
     sys.exit(0 if success else 1)
@@ -10,6 +10,13 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+# Shared build tooling lives alongside this project in src/tooling
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tooling'))
+
+from build_logging import configure_logging, get_logger  # noqa: E402
+
+logger = get_logger('cloudeventjekylldocs')
+
 
 def generate_markdown_docs(docs_yaml_dir, docs_md_dir):
     """Generate Markdown documentation from YAML documentation files."""
@@ -23,10 +30,10 @@ def generate_markdown_docs(docs_yaml_dir, docs_md_dir):
     yaml_doc_files = list(yaml_path.rglob("*.doc.yaml"))
 
     if not yaml_doc_files:
-        print(f"No YAML documentation files found in {docs_yaml_dir}")
+        logger.warning(f"No YAML documentation files found in {docs_yaml_dir}")
         return
 
-    print(f"Found {len(yaml_doc_files)} YAML documentation file(s) to convert")
+    logger.info(f"Found {len(yaml_doc_files)} YAML documentation file(s) to convert")
 
     for yaml_doc_file in yaml_doc_files:
         generate_single_markdown_doc(yaml_doc_file, yaml_path, md_path)
@@ -69,10 +76,10 @@ def generate_single_markdown_doc(yaml_doc_file, yaml_path, md_path):
         with open(md_file, 'w') as f:
             f.write(content)
 
-        print(f"Generated Markdown documentation: {md_file}")
+        logger.debug("Generated Markdown documentation: %s", md_file)
 
     except Exception as e:
-        print(f"Error processing {yaml_doc_file}: {e}")
+        logger.error(f"Error processing {yaml_doc_file}: {e}")
 
 
 
@@ -373,10 +380,10 @@ def generate_markdown_index_from_yaml(yaml_index_file, yaml_path, md_path):
         with open(md_index_file, 'w') as f:
             f.write(content)
 
-        print(f"Generated Markdown index: {md_index_file}")
+        logger.debug("Generated Markdown index: %s", md_index_file)
 
     except Exception as e:
-        print(f"Error processing index {yaml_index_file}: {e}")
+        logger.error(f"Error processing index {yaml_index_file}: {e}")
 
 
 def generate_index_markdown_content(index_data, current_dir_from_jekyll_root=Path('.')):
@@ -497,6 +504,8 @@ directory: "{directory}"
 
 
 if __name__ == "__main__":
+    configure_logging('cloudeventjekylldocs')
+
     if len(sys.argv) != 3:
         print("Usage: python generate_docs_markdown.py <docs_yaml_dir> <docs_md_dir>")
         sys.exit(1)
@@ -509,4 +518,4 @@ if __name__ == "__main__":
         sys.exit(1)
 
     generate_markdown_docs(docs_yaml_dir, docs_md_dir)
-    print("Markdown documentation generation complete!")
+    logger.info("Markdown documentation generation complete!")
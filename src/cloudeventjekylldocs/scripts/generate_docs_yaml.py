@@ -11,6 +11,13 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+# Shared build tooling lives alongside this project in src/tooling
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tooling'))
+
+from build_logging import configure_logging, get_logger  # noqa: E402
+
+logger = get_logger('cloudeventjekylldocs')
+
 
 def generate_schema_docs_yaml(src_dir, docs_dir):
     """Generate YAML documentation for all YAML schema files in src_dir."""
@@ -24,10 +31,10 @@ def generate_schema_docs_yaml(src_dir, docs_dir):
     yaml_files = list(src_path.rglob("*.schema.yaml"))
 
     if not yaml_files:
-        print(f"No YAML schema files found in {src_dir}")
+        logger.warning(f"No YAML schema files found in {src_dir}")
         return
 
-    print(f"Found {len(yaml_files)} schema file(s) to document")
+    logger.info(f"Found {len(yaml_files)} schema file(s) to document")
 
     doc_yaml_files = []
     for yaml_file in yaml_files:
@@ -60,11 +67,11 @@ def generate_single_doc_yaml(yaml_file, src_path, docs_path):
         with open(doc_file, 'w') as f:
             yaml.dump(doc_data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
 
-        print(f"Generated YAML documentation: {doc_file}")
+        logger.debug("Generated YAML documentation: %s", doc_file)
         return doc_file
 
     except Exception as e:
-        print(f"Error processing {yaml_file}: {e}")
+        logger.error(f"Error processing {yaml_file}: {e}")
         return None
 
 
@@ -328,10 +335,12 @@ def generate_directory_index_yaml(directory, schemas_by_dir, doc_files_by_dir, s
     with open(index_file, 'w') as f:
         yaml.dump(index_data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
 
-    print(f"Generated index YAML: {index_file}")
+    logger.debug("Generated index YAML: %s", index_file)
 
 
 if __name__ == "__main__":
+    configure_logging('cloudeventjekylldocs')
+
     if len(sys.argv) != 3:
         print("Usage: python generate_docs_yaml.py <src_dir> <docs_dir>")
         sys.exit(1)
@@ -344,4 +353,4 @@ if __name__ == "__main__":
         sys.exit(1)
 
     generate_schema_docs_yaml(src_dir, docs_dir)
-    print("YAML documentation generation complete!")
+    logger.info("YAML documentation generation complete!")
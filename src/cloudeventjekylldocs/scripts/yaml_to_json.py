@@ -5,6 +5,14 @@ YAML to JSON converter for schema files using PyYAML.
 import yaml
 import json
 import sys
+from pathlib import Path
+
+# Shared build tooling lives alongside this project in src/tooling
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tooling'))
+
+from build_logging import configure_logging, get_logger  # noqa: E402
+
+logger = get_logger('cloudeventjekylldocs')
 
 def yaml_to_json(yaml_file, json_file):
     """Convert YAML file to JSON file."""
@@ -17,10 +25,12 @@ def yaml_to_json(yaml_file, json_file):
 
         return True
     except Exception as e:
-        print(f"Error converting {yaml_file}: {e}")
+        logger.error(f"Error converting {yaml_file}: {e}")
         return False
 
 if __name__ == "__main__":
+    configure_logging('cloudeventjekylldocs')
+
     if len(sys.argv) != 3:
         print("Usage: python yaml_to_json.py <input.yaml> <output.json>")
         sys.exit(1)
@@ -29,7 +39,7 @@ if __name__ == "__main__":
     json_file = sys.argv[2]
 
     if yaml_to_json(yaml_file, json_file):
-        print(f"Converted {yaml_file} to {json_file}")
+        logger.info(f"Converted {yaml_file} to {json_file}")
     else:
-        print(f"Failed to convert {yaml_file}")
+        logger.error(f"Failed to convert {yaml_file}")
         sys.exit(1)
@@ -0,0 +1,101 @@
+"""Unit tests for benchmark_docs.py script."""
+import pytest
+import yaml
+import json
+from pathlib import Path
+from unittest.mock import patch
+import sys
+import os
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from benchmark_docs import (
+    STAGES,
+    build_schema,
+    build_schema_tree,
+    run_benchmark,
+    main
+)
+
+
+class TestBuildSchema:
+    """Test suite for synthetic schema generation."""
+
+    def test_schema_has_requested_shape(self):
+        """Test that properties, examples and allOf are generated as requested."""
+        schema = build_schema(1, properties=12, nesting=2, examples=4, parent_ref='../parent.schema.yaml')
+
+        assert len(schema['properties']) == 12
+        assert len(schema['examples']) == 4
+        assert schema['allOf'] == [{'$ref': '../parent.schema.yaml'}]
+        # Every fifth property is a nested object
+        assert schema['properties']['prop0']['type'] == 'object'
+        assert schema['properties']['prop0']['properties']['child0']['type'] == 'object'
+        assert schema['properties']['prop1']['type'] == 'string'
+
+    def test_schema_without_parent_has_no_allof(self):
+        """Test that chain roots do not inherit."""
+        schema = build_schema(0, properties=2, nesting=0, examples=1, parent_ref=None)
+
+        assert 'allOf' not in schema
+
+
+class TestBuildSchemaTree:
+    """Test suite for synthetic schema tree generation."""
+
+    def test_tree_is_nested_and_chained(self, tmp_path):
+        """Test schemas are written at the requested depth with allOf chains."""
+        files = build_schema_tree(tmp_path, schemas=6, depth=3, properties=2, nesting=0, examples=1, chain=3)
+
+        assert len(files) == 6
+        for schema_file in files:
+            assert len(schema_file.relative_to(tmp_path).parts) == 4
+
+        with open(files[1]) as f:
+            schema = yaml.safe_load(f)
+        parent = (files[1].parent / schema['allOf'][0]['$ref']).resolve()
+        assert parent == files[0].resolve()
+
+        # Every third schema starts a new chain
+        with open(files[3]) as f:
+            assert 'allOf' not in yaml.safe_load(f)
+
+
+class TestRunBenchmark:
+    """Test suite for the benchmark run and report."""
+
+    def test_report_contains_all_stages(self, tmp_path):
+        """Test that every stage is timed and outputs are produced."""
+        report = run_benchmark(schemas=4, depth=2, properties=3, nesting=1, examples=2, chain=2,
+                               work_dir=tmp_path)
+
+        assert list(report['stages'].keys()) == STAGES
+        for stage in report['stages'].values():
+            assert stage['seconds'] >= 0
+            assert stage['cumulative_peak_rss_kb'] > 0
+        assert report['outputs']['json_schemas'] == 4
+        assert report['outputs']['yaml_docs'] == 4
+        assert report['outputs']['markdown_docs'] == 4
+        assert report['outputs']['indices'] > 0
+        assert 'pipeline' not in report
+
+    def test_report_is_json_serialisable(self, tmp_path):
+        """Test that the report can be written as JSON."""
+        report = run_benchmark(schemas=2, depth=1, properties=2, nesting=0, examples=1, chain=0,
+                               work_dir=tmp_path)
+
+        assert json.loads(json.dumps(report))['config']['schemas'] == 2
+
+    def test_main_writes_report_file(self, tmp_path):
+        """Test that main writes the report to --output."""
+        output_file = tmp_path / 'report.json'
+        argv = ['benchmark_docs.py', '--schemas', '2', '--depth', '1', '--properties', '2',
+                '--examples', '1', '--work-dir', str(tmp_path), '--output', str(output_file)]
+
+        with patch.object(sys, 'argv', argv):
+            main()
+
+        report = json.loads(output_file.read_text())
+        assert report['benchmark'] == 'cloudevent-jekyll-docs'
+        assert set(report['stages']) == set(STAGES)
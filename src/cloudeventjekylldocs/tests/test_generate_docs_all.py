@@ -282,6 +282,77 @@ class TestGenerateDocsAllCLI:
         # The script should exit successfully
         assert result.returncode in [0, 1]  # May fail due to mocking, but shouldn't crash
 
+    def test_cli_with_profile(self, tmp_path):
+        """Test CLI with --profile writes a cProfile dump and timing summary."""
+        src_dir = tmp_path / "src"
+        src_dir.mkdir()
+        with open(src_dir / "test.schema.yaml", 'w') as f:
+            yaml.dump({"title": "Test", "type": "object"}, f)
+
+        output_dir = tmp_path / "output"
+        profile_dir = tmp_path / "profile"
+        script_path = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'generate_docs_all.py')
+
+        result = subprocess.run([
+            sys.executable,
+            script_path,
+            str(src_dir),
+            str(output_dir),
+            '--profile',
+            str(profile_dir)
+        ], capture_output=True, text=True)
+
+        assert result.returncode == 0
+        assert (profile_dir / 'cloudeventjekylldocs.prof').exists()
+        timings = json.loads((profile_dir / 'cloudeventjekylldocs-timings.json').read_text())
+        assert set(timings['spans']) == {'convert', 'render_yaml', 'render_markdown'}
+        assert timings['counters']['files_read'] == 1
+        assert timings['counters']['files_written'] == 1
+
+    def test_cli_log_levels_and_log_file(self, tmp_path):
+        """Test per-file detail is hidden by default but captured in the JSON log file."""
+        src_dir = tmp_path / "src"
+        src_dir.mkdir()
+        with open(src_dir / "test.schema.yaml", 'w') as f:
+            yaml.dump({"title": "Test", "type": "object"}, f)
+
+        log_file = tmp_path / "docs.jsonl"
+        script_path = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'generate_docs_all.py')
+
+        result = subprocess.run([
+            sys.executable,
+            script_path,
+            str(src_dir),
+            str(tmp_path / "output"),
+            '--log-file',
+            str(log_file)
+        ], capture_output=True, text=True)
+
+        assert result.returncode == 0
+        assert "Converted 1 schema files" in result.stdout
+        assert "Converted:" not in result.stdout
+        assert "Generated YAML documentation" not in result.stdout
+
+        records = [json.loads(line) for line in log_file.read_text().splitlines()]
+        debug_messages = [r['message'] for r in records if r['level'] == 'DEBUG']
+        # Records come from this script and from the generator subprocesses
+        assert any(m.startswith("Converted:") for m in debug_messages)
+        # Relayed once, by this script, rather than also written by the subprocess
+        assert len([m for m in debug_messages if m.startswith("Generated YAML documentation:")]) == 1
+        assert any(m.startswith("Generated Markdown documentation") for m in debug_messages)
+
+        debug_result = subprocess.run([
+            sys.executable,
+            script_path,
+            str(src_dir),
+            str(tmp_path / "debug-output"),
+            '--log-level',
+            'DEBUG'
+        ], capture_output=True, text=True)
+
+        assert "Converted:" in debug_result.stdout
+        assert "Generated YAML documentation" in debug_result.stdout
+
     def test_cli_no_arguments(self):
         """Test CLI with no arguments."""
         script_path = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'generate_docs_all.py')
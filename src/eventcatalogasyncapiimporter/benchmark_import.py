@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the AsyncAPI to EventCatalog importer.
+
+Synthesises a catalog-sized set of asyncapi-*.yaml files plus a matching
+schema tree under a fake schema_base_path, then runs import_all and reports
+wall time per phase and the number of file operations performed.
+
+Phases are measured as exclusive time, so time spent copying schemas inside
+create_event_structure is attributed to "schema_copy" rather than "structure":
+
+- parse:          load_asyncapi_file
+- structure:      create_*_structure (domains, services, events, channels)
+- schema_copy:    copies of envelope, bundled and data schemas
+- tracking:       recording service/event and subdomain/service references
+- relationships:  update_*_relationships
+
+Copies and writes run on the importer's I/O threads (--io-workers), so with
+workers the schema_copy time is spent in the background and phase times can
+add up to more than the wall time. --io-latency-ms adds a delay to every
+copy and write to mimic a network-mounted workspace.
+
+Usage:
+    python benchmark_import.py --services 300 --events-per-service 8
+    python benchmark_import.py --repeat 5 --output benchmark-report.json
+    python benchmark_import.py --spec-format json
+    python benchmark_import.py --busy-service-operations 5000
+    python benchmark_import.py --io-latency-ms 5 --io-workers 0
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from import_asyncapi import AsyncAPIImporter  # noqa: E402
+from file_backend import LocalFileBackend  # noqa: E402
+
+SCHEMA_URL_PREFIX = "https://notify.nhs.uk/cloudevents"
+SCHEMA_VERSION_PATH = "schemas/digital-letters/2025-10-draft"
+TYPE_PREFIX = "uk.nhs.notify.digital.letters"
+
+PHASES = ("parse", "structure", "schema_copy", "tracking", "relationships")
+
+STRUCTURE_METHODS = (
+    "create_parent_domain_structure",
+    "create_subdomain_structure",
+    "create_service_structure",
+    "create_event_structure",
+    "create_channel_structure",
+)
+
+TRACKING_METHODS = (
+    "track_subdomain_service",
+    "track_service_event",
+)
+
+RELATIONSHIP_METHODS = (
+    "update_parent_domain_relationships",
+    "update_subdomain_relationships",
+    "update_service_relationships",
+)
+
+
+class PhaseTimer:
+    """Accumulates exclusive wall time per phase, handling nested phases."""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.calls: Dict[str, int] = {phase: 0 for phase in PHASES}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[List[Any]]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def wrap(self, phase: str, func: Callable) -> Callable:
+        """Return func wrapped so its exclusive time is charged to phase."""
+
+        def timed(*args, **kwargs):
+            stack = self._stack()
+            # Each frame is [phase, time spent in nested phases]
+            frame = [phase, 0.0]
+            stack.append(frame)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                with self._lock:
+                    self.totals[phase] += elapsed - frame[1]
+                    self.calls[phase] += 1
+                if stack:
+                    stack[-1][1] += elapsed
+
+        return timed
+
+
+class FileOpCounter(LocalFileBackend):
+    """Local file backend that counts file reads, writes, copies and directory creations."""
+
+    def __init__(self, latency: float = 0.0):
+        """latency is slept before every write and copy, in seconds."""
+        self.latency = latency
+        self.counts: Dict[str, int] = {
+            "files_read": 0,
+            "files_written": 0,
+            "bytes_written": 0,
+            "schema_files_copied": 0,
+            "schema_bytes_copied": 0,
+            "mkdir_calls": 0,
+        }
+        self._lock = threading.Lock()
+
+    def add(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += amount
+
+    def open_text(self, path: Path) -> TextIO:
+        self.add("files_read")
+        return super().open_text(path)
+
+    def write_text(self, path: Path, content: str) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        super().write_text(path, content)
+        self.add("files_written")
+        self.add("bytes_written", len(content))
+
+    def copy(self, source: Path, destination: Path) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        super().copy(source, destination)
+        self.add("schema_files_copied")
+        self.add("schema_bytes_copied", os.path.getsize(source))
+
+    def mkdir(self, path: Path, parents: bool = False, exist_ok: bool = False) -> None:
+        self.add("mkdir_calls")
+        super().mkdir(path, parents=parents, exist_ok=exist_ok)
+
+
+def event_type_for(index: int) -> str:
+    """Return a synthetic CloudEvents type for the given event index."""
+    return f"{TYPE_PREFIX}.bench.domain{index % 17}.event{index}.v1"
+
+
+def build_schema_tree(schema_base_path: Path, event_count: int) -> None:
+    """Write envelope, bundled and data schemas for every synthetic event."""
+    events_dir = schema_base_path / SCHEMA_VERSION_PATH / "events"
+    data_dir = schema_base_path / SCHEMA_VERSION_PATH / "data"
+    events_dir.mkdir(parents=True, exist_ok=True)
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    for index in range(event_count):
+        event_type = event_type_for(index)
+        data_url = f"{SCHEMA_URL_PREFIX}/{SCHEMA_VERSION_PATH}/data/{event_type}-data.schema.json"
+        data_schema = {
+            "$schema": "https://json-schema.org/draft/2020-12/schema",
+            "title": f"Event{index}Data",
+            "type": "object",
+            "properties": {
+                f"field{n}": {"type": "string", "description": f"Field {n}"}
+                for n in range(20)
+            },
+        }
+        envelope = {
+            "$schema": "https://json-schema.org/draft/2020-12/schema",
+            "title": f"Event{index}",
+            "type": "object",
+            "properties": {
+                "type": {"type": "string", "const": event_type},
+                "dataschema": {"type": "string", "const": data_url},
+                "data": {"$ref": data_url},
+            },
+        }
+        bundle = dict(envelope, properties=dict(envelope["properties"], data=data_schema))
+
+        (data_dir / f"{event_type}-data.schema.json").write_text(json.dumps(data_schema, indent=2))
+        (events_dir / f"{event_type}.schema.json").write_text(json.dumps(envelope, indent=2))
+        (events_dir / f"{event_type}.bundle.schema.json").write_text(json.dumps(bundle, indent=2))
+
+
+def build_service_spec(
+    service_index: int,
+    subdomain_count: int,
+    event_indices: List[int],
+    consumed_indices: List[int],
+    service_title: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build an AsyncAPI document shaped like the generator's per-service output."""
+    service_title = service_title or f"Bench Service {service_index}"
+    spec: Dict[str, Any] = {
+        "asyncapi": "3.0.0",
+        "info": {
+            "title": f"NHS Notify Digital Letters - {service_title}",
+            "version": "2025-10-draft",
+            "description": f"Synthetic service {service_index}",
+            "x-service-metadata": {
+                "c4type": "code",
+                "owner": "Benchmark Team",
+                "author": "Benchmark Team",
+                "parent": f"Bench Subdomain {service_index % subdomain_count}",
+            },
+        },
+        "channels": {},
+        "operations": {},
+        "components": {"messages": {}},
+    }
+
+    for action, indices in (("send", event_indices), ("receive", consumed_indices)):
+        for index in indices:
+            event_type = event_type_for(index)
+            channel_id = event_type.replace(".", "_")
+            nice_name = f"BenchEvent{index}"
+            spec["channels"][channel_id] = {
+                "address": event_type.replace(".", "/"),
+                "messages": {
+                    nice_name: {
+                        "name": nice_name,
+                        "title": nice_name,
+                        "summary": f"Event: {event_type}",
+                        "description": f"Synthetic event {index}",
+                        "contentType": "application/cloudevents+json",
+                        "payload": {
+                            "$ref": f"{SCHEMA_URL_PREFIX}/{SCHEMA_VERSION_PATH}/events/{event_type}.schema.json"
+                        },
+                    }
+                },
+                "description": f"{service_title} - {event_type}",
+            }
+            spec["operations"][f"{action}_{channel_id}"] = {
+                "action": action,
+                "channel": {"$ref": f"#/channels/{channel_id}"},
+                "summary": f"{action.capitalize()} {nice_name}",
+                "description": f"{service_title} {action}s this event",
+                "messages": [{"$ref": f"#/channels/{channel_id}/messages/{nice_name}"}],
+            }
+
+    return spec
+
+
+def write_spec(spec: Dict[str, Any], spec_base: Path, spec_format: str) -> None:
+    """Write a spec as YAML, JSON or both next to spec_base."""
+    if spec_format in ("yaml", "both"):
+        with open(spec_base.with_suffix(".yaml"), "w") as f:
+            yaml.dump(spec, f, default_flow_style=False, sort_keys=False)
+    if spec_format in ("json", "both"):
+        with open(spec_base.with_suffix(".json"), "w") as f:
+            json.dump(spec, f, indent=2)
+
+
+def build_corpus(
+    root: Path,
+    services: int,
+    events_per_service: int,
+    subdomains: int,
+    spec_format: str = "yaml",
+    busy_service_operations: int = 0,
+) -> Dict[str, Path]:
+    """
+    Create the AsyncAPI directory, schema tree and empty catalog under root.
+
+    spec_format is "yaml", "json" or "both", mirroring the generator's
+    --format option. busy_service_operations adds one more service that
+    sends that many events and receives as many again.
+    """
+    asyncapi_dir = root / "asyncapi"
+    eventcatalog_dir = root / "eventcatalog"
+    schema_base_path = root / "schema-base"
+    asyncapi_dir.mkdir(parents=True)
+    eventcatalog_dir.mkdir(parents=True)
+
+    # Half as many event types as (service, event) pairs so channels are shared
+    event_count = max(1, (services * events_per_service) // 2)
+    build_schema_tree(schema_base_path, event_count + 2 * busy_service_operations)
+
+    for service_index in range(services):
+        raised = [(service_index * events_per_service + n) % event_count for n in range(events_per_service)]
+        consumed = [(index + 1) % event_count for index in raised[: max(1, events_per_service // 2)]]
+        spec = build_service_spec(service_index, subdomains, raised, consumed)
+        write_spec(spec, asyncapi_dir / f"asyncapi-bench-service-{service_index}", spec_format)
+
+    if busy_service_operations:
+        first = event_count
+        raised = list(range(first, first + busy_service_operations))
+        consumed = list(range(first + busy_service_operations, first + 2 * busy_service_operations))
+        spec = build_service_spec(services, subdomains, raised, consumed, service_title="Bench Busy Service")
+        write_spec(spec, asyncapi_dir / "asyncapi-bench-busy-service", spec_format)
+
+    return {
+        "asyncapi_dir": asyncapi_dir,
+        "eventcatalog_dir": eventcatalog_dir,
+        "schema_base_path": schema_base_path,
+    }
+
+
+def instrument(importer: AsyncAPIImporter, timer: PhaseTimer) -> None:
+    """Wrap importer methods on the instance so each call is charged to a phase."""
+    importer.load_asyncapi_file = timer.wrap("parse", importer.load_asyncapi_file)
+    for name in STRUCTURE_METHODS:
+        setattr(importer, name, timer.wrap("structure", getattr(importer, name)))
+    for name in TRACKING_METHODS:
+        setattr(importer, name, timer.wrap("tracking", getattr(importer, name)))
+    for name in RELATIONSHIP_METHODS:
+        setattr(importer, name, timer.wrap("relationships", getattr(importer, name)))
+
+
+def run_once(paths: Dict[str, Path], io_workers: int = 8, io_latency: float = 0.0) -> Dict[str, Any]:
+    """Run a single instrumented import into a fresh catalog directory."""
+    if paths["eventcatalog_dir"].exists():
+        shutil.rmtree(paths["eventcatalog_dir"])
+    paths["eventcatalog_dir"].mkdir(parents=True)
+
+    timer = PhaseTimer()
+    counter = FileOpCounter(io_latency)
+    counter.copy = timer.wrap("schema_copy", counter.copy)
+    importer = AsyncAPIImporter(
+        asyncapi_dir=paths["asyncapi_dir"],
+        eventcatalog_dir=paths["eventcatalog_dir"],
+        schema_base_path=paths["schema_base_path"],
+        io_workers=io_workers,
+        fs=counter,
+    )
+    instrument(importer, timer)
+
+    start = time.perf_counter()
+    importer.import_all()
+    total = time.perf_counter() - start
+
+    phases = {phase: round(seconds, 6) for phase, seconds in timer.totals.items()}
+    phases["other"] = round(max(0.0, total - sum(timer.totals.values())), 6)
+
+    return {
+        "total_seconds": round(total, 6),
+        "phases": phases,
+        "phase_calls": dict(timer.calls),
+        "file_ops": dict(counter.counts),
+        "created": {
+            "services": len(importer.created_services),
+            "events": len(importer.created_events),
+            "channels": len(importer.created_channels),
+        },
+    }
+
+
+def summarise(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Return the median wall time per phase across runs."""
+    phase_names = list(runs[0]["phases"].keys())
+    return {
+        "total_seconds_median": round(statistics.median(r["total_seconds"] for r in runs), 6),
+        "phases_median": {
+            phase: round(statistics.median(r["phases"][phase] for r in runs), 6)
+            for phase in phase_names
+        },
+    }
+
+
+def run_benchmark(
+    services: int = 300,
+    events_per_service: int = 8,
+    subdomains: int = 12,
+    repeat: int = 3,
+    work_dir: Optional[Path] = None,
+    spec_format: str = "yaml",
+    busy_service_operations: int = 0,
+    io_workers: int = 8,
+    io_latency_ms: float = 0.0,
+) -> Dict[str, Any]:
+    """Build a synthetic corpus and run the importer against it repeat times."""
+    config = {
+        "services": services,
+        "events_per_service": events_per_service,
+        "subdomains": subdomains,
+        "repeat": repeat,
+        "spec_format": spec_format,
+        "busy_service_operations": busy_service_operations,
+        "io_workers": io_workers,
+        "io_latency_ms": io_latency_ms,
+    }
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as temp_dir:
+        build_start = time.perf_counter()
+        paths = build_corpus(
+            Path(temp_dir), services, events_per_service, subdomains, spec_format,
+            busy_service_operations,
+        )
+        build_seconds = time.perf_counter() - build_start
+
+        runs = [run_once(paths, io_workers, io_latency_ms / 1000) for _ in range(repeat)]
+
+    return {
+        "benchmark": "eventcatalog-asyncapi-importer",
+        "python": sys.version.split()[0],
+        "config": config,
+        "corpus_build_seconds": round(build_seconds, 6),
+        "runs": runs,
+        "summary": summarise(runs),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print a human-readable summary of a benchmark report."""
+    config = report["config"]
+    last_run = report["runs"][-1]
+    print("=" * 60)
+    print("EventCatalog importer benchmark")
+    print("=" * 60)
+    print(f"  Services: {config['services']}, events/service: {config['events_per_service']}, "
+          f"subdomains: {config['subdomains']}, runs: {config['repeat']}, "
+          f"specs: {config['spec_format']}")
+    print(f"  I/O workers: {config['io_workers']}, simulated latency: {config['io_latency_ms']}ms")
+    if config["busy_service_operations"]:
+        print(f"  Busy service: {config['busy_service_operations']} sends, "
+              f"{config['busy_service_operations']} receives")
+    print(f"  Corpus build: {report['corpus_build_seconds']:.3f}s")
+    print()
+    print("  Phase (median)        Seconds")
+    for phase, seconds in report["summary"]["phases_median"].items():
+        print(f"    {phase:<20}{seconds:>10.4f}")
+    print(f"    {'total':<20}{report['summary']['total_seconds_median']:>10.4f}")
+    print()
+    print("  File operations (last run)")
+    for name, count in last_run["file_ops"].items():
+        print(f"    {name:<20}{count:>10}")
+    print("=" * 60)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the AsyncAPI to EventCatalog importer at catalog scale"
+    )
+    parser.add_argument("--services", type=int, default=300,
+                        help="Number of synthetic asyncapi-*.yaml files (default: 300)")
+    parser.add_argument("--events-per-service", type=int, default=8,
+                        help="Events raised per service (default: 8)")
+    parser.add_argument("--subdomains", type=int, default=12,
+                        help="Number of subdomains services are spread across (default: 12)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of timed runs (default: 3)")
+    parser.add_argument("--spec-format", choices=["yaml", "json", "both"], default="yaml",
+                        help="Format of the synthetic specs; the importer prefers JSON (default: yaml)")
+    parser.add_argument("--busy-service-operations", type=int, default=0,
+                        help="Add one service with this many send and as many receive operations (default: 0)")
+    parser.add_argument("--io-workers", type=int, default=8,
+                        help="Importer threads for copies and writes; 0 runs them inline (default: 8)")
+    parser.add_argument("--io-latency-ms", type=float, default=0.0,
+                        help="Delay added to every copy and write, in milliseconds (default: 0)")
+    parser.add_argument("--work-dir", type=str, default=None,
+                        help="Directory for the temporary corpus (default: system temp)")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Write the JSON report to this path")
+
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        services=args.services,
+        events_per_service=args.events_per_service,
+        subdomains=args.subdomains,
+        repeat=args.repeat,
+        work_dir=Path(args.work_dir) if args.work_dir else None,
+        spec_format=args.spec_format,
+        busy_service_operations=args.busy_service_operations,
+        io_workers=args.io_workers,
+        io_latency_ms=args.io_latency_ms,
+    )
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,505 @@ It creates domains, services, channels, and events based on AsyncAPI definitions
 """
 
 import argparse
+import hashlib
 import json
-import os
 import re
-import shutil
 import sys
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from urllib.parse import unquote
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import yaml
 
+# Shared build tooling lives alongside this project in src/tooling
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tooling"))
+
+from file_backend import FileBackend, LocalFileBackend, MemoryFileBackend, summarize_plan  # noqa: E402
+from instrumentation import (  # noqa: E402
+    BYTES_COPIED,
+    BYTES_WRITTEN,
+    FILES_COPIED,
+    FILES_DEDUPLICATED,
+    FILES_UNCHANGED,
+    FILES_WRITTEN,
+    Instrumentation,
+)
+from io_executor import IOExecutor, IOExecutorError  # noqa: E402
+
+
+# The generator's combined spec, asyncapi-all.yaml / asyncapi-all.json
+COMBINED_SPEC = "asyncapi-all"
+
+# Counter for frontmatter rewrites made by the relationship updates
+RELATIONSHIP_PATCHES = "relationship_patches"
+# Counter for event version files replaced by links to identical files
+EVENT_FILES_LINKED = "event_files_linked"
+
+
+@dataclass(frozen=True)
+class ImportTarget:
+    """One EventCatalog tree to render, with its own parent domain and schema base."""
+
+    eventcatalog_dir: Path
+    parent_domain_name: str = "Digital Letters"
+    schema_base_path: Optional[Path] = None
+
+
+def load_targets(targets_file: Path) -> List[ImportTarget]:
+    """
+    Read extra import targets from a YAML list.
+
+    Each entry has eventcatalog_dir and optionally parent_domain and
+    schema_base_path. Relative paths are resolved against the file's directory.
+    """
+    targets_file = Path(targets_file)
+    with open(targets_file, "r") as f:
+        entries = yaml.safe_load(f) or []
+
+    targets = []
+    for entry in entries:
+        schema_base_path = entry.get("schema_base_path")
+        targets.append(ImportTarget(
+            eventcatalog_dir=targets_file.parent / entry["eventcatalog_dir"],
+            parent_domain_name=entry.get("parent_domain", "Digital Letters"),
+            schema_base_path=targets_file.parent / schema_base_path if schema_base_path else None,
+        ))
+    return targets
+
+
+class RefSet:
+    """
+    Insertion-ordered set of {"id": ..., "version": ...} references.
+
+    Membership is keyed on (id, version), so adding is constant time however
+    many references a service or subdomain has, and iteration yields the
+    references in the order they were first added.
+    """
+
+    __slots__ = ("_refs",)
+
+    def __init__(self, refs: Optional[List[Dict[str, str]]] = None):
+        self._refs: Dict[Tuple[str, str], Dict[str, str]] = {}
+        for ref in refs or ():
+            self.add(ref)
+
+    def add(self, ref: Dict[str, str]) -> bool:
+        """Add ref unless an equal (id, version) is present; return whether it was added."""
+        key = (ref["id"], ref["version"])
+        if key in self._refs:
+            return False
+        self._refs[key] = ref
+        return True
+
+    def __contains__(self, ref: Dict[str, str]) -> bool:
+        return (ref["id"], ref["version"]) in self._refs
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self._refs.values())
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def __bool__(self) -> bool:
+        return bool(self._refs)
+
+    def __repr__(self) -> str:
+        return f"RefSet({list(self._refs.values())!r})"
+
+
+class Frontmatter:
+    """
+    A page's YAML frontmatter, parsed once so its relationship lists can be updated.
+
+    Top-level keys other than RELATIONSHIP_KEYS keep their original text, so
+    hand edits survive a re-import. The relationship lists are parsed into
+    RefSets and rendered after them, in RELATIONSHIP_KEYS order, each after a
+    blank line, so rendering a parsed page gives back the same bytes.
+    """
+
+    RELATIONSHIP_KEYS = ("domains", "services", "receives", "sends")
+    _KEY_LINE = re.compile(r"[A-Za-z_][\w-]*\s*:")
+
+    def __init__(self, blocks: List[Tuple[Optional[str], List[str]]], refs: Dict[str, RefSet], body: str):
+        self.blocks = blocks
+        self.refs = refs
+        self.body = body
+
+    @classmethod
+    def parse(cls, content: str) -> Optional["Frontmatter"]:
+        """Parse a page, returning None if it has no frontmatter."""
+        if not content.startswith("---\n"):
+            return None
+        end = content.find("\n---", 3)
+        if end < 0:
+            return None
+
+        blocks: List[Tuple[Optional[str], List[str]]] = []
+        for line in content[4:end + 1].splitlines(keepends=True):
+            match = cls._KEY_LINE.match(line)
+            if match or not blocks:
+                blocks.append((match.group().rstrip(" :") if match else None, [line]))
+            else:
+                blocks[-1][1].append(line)
+
+        kept, refs = [], {}
+        for key, lines in blocks:
+            if key in cls.RELATIONSHIP_KEYS:
+                refs[key] = cls._parse_refs("".join(lines))
+            else:
+                kept.append((key, lines))
+        return cls(kept, refs, content[end + 4:])
+
+    @staticmethod
+    def _parse_refs(text: str) -> RefSet:
+        try:
+            entries = next(iter((yaml.safe_load(text) or {}).values()), None) or []
+        except (yaml.YAMLError, AttributeError):
+            return RefSet()
+        return RefSet([{"id": str(entry["id"]), "version": str(entry.get("version", "latest"))}
+                       for entry in entries if isinstance(entry, dict) and "id" in entry])
+
+    def get_refs(self, key: str) -> RefSet:
+        """The references listed under key, empty if it is absent."""
+        return self.refs.get(key, RefSet())
+
+    def set_refs(self, key: str, refs: RefSet) -> bool:
+        """Replace the references under key, dropping the key if refs is empty; return whether they changed."""
+        changed = list(self.get_refs(key)) != list(refs)
+        self.refs[key] = RefSet(list(refs))
+        return changed
+
+    def merge_refs(self, key: str, refs: RefSet) -> bool:
+        """Add refs to those under key, keeping existing ones first; return whether any were added."""
+        merged = self.refs.setdefault(key, RefSet())
+        added = False
+        for ref in refs:
+            added = merged.add(ref) or added
+        return added
+
+    def render(self) -> str:
+        """Serialise the page with the relationship lists written back."""
+        lines = [line for _, block_lines in self.blocks for line in block_lines]
+        relationships = []
+        for key in self.RELATIONSHIP_KEYS:
+            if self.refs.get(key):
+                relationships.append(f"\n{key}:\n")
+                for ref in self.refs[key]:
+                    relationships.append(f"  - id: {ref['id']}\n    version: {ref['version']}\n")
+        if relationships:
+            # The blank line before each list is rendered with it
+            while lines and not lines[-1].strip():
+                lines.pop()
+        return "---\n" + "".join(lines + relationships) + "---" + self.body
+
+
+class PointerResolver:
+    """
+    Resolves local "$ref" JSON pointers ("#/channels/a/messages/B") within one document.
+
+    Each pointer is walked once; later lookups of the same "$ref" come from a
+    cache. A node that is itself only a "$ref" is followed to its target.
+    """
+
+    def __init__(self, document: Dict[str, Any]):
+        self.document = document
+        self._cache: Dict[str, Optional[Any]] = {}
+
+    @staticmethod
+    def _tokens(ref: str) -> List[str]:
+        """Split a local pointer into unescaped reference tokens."""
+        pointer = unquote(ref[1:])
+        if not pointer:
+            return []
+        return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+    def resolve(self, ref: str) -> Optional[Any]:
+        """Return the node ref points to, or None if it is not local or does not exist."""
+        if ref not in self._cache:
+            self._cache[ref] = self._walk(ref, set())
+        return self._cache[ref]
+
+    def _walk(self, ref: str, seen: Set[str]) -> Optional[Any]:
+        if not ref.startswith("#") or ref in seen:
+            return None
+        seen.add(ref)
+
+        node: Any = self.document
+        for token in self._tokens(ref):
+            if isinstance(node, dict) and token in node:
+                node = node[token]
+            elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+                node = node[int(token)]
+            else:
+                return None
+
+        # Follow a node that only points elsewhere
+        if isinstance(node, dict) and set(node) == {"$ref"}:
+            return self._walk(node["$ref"], seen)
+        return node
+
+    @staticmethod
+    def name(ref: str) -> str:
+        """Return the last token of a pointer, e.g. the message name."""
+        return PointerResolver._tokens(ref)[-1] if ref.startswith("#/") else ref
+
+
+# Prefix stripped from schema URLs to give paths under --schema-base-path
+SCHEMA_URL_PREFIX = "https://notify.nhs.uk/cloudevents"
+
+
+def message_schema_path(message_data: Dict[str, Any]) -> str:
+    """
+    Return the path of a message's envelope schema, or "" if it has none.
+
+    Specs generated with bundled schemas point the payload at components and
+    keep the URL in x-schema-url.
+    """
+    payload = message_data.get("payload", {})
+    schema_path = message_data.get("x-schema-url") or payload.get("$ref", "")
+    if schema_path.startswith("#"):
+        return ""
+    return schema_path.replace(SCHEMA_URL_PREFIX, "")
+
+
+def event_version(message_data: Dict[str, Any]) -> str:
+    """
+    Derive an event's semantic version from its type and schema path.
+
+    The major version is the .vN suffix of the event type, taken from the
+    schema file name or the "Event: <type>" summary. The schema release, the
+    directory above events/ in the schema path such as 2025-10-draft, is the
+    pre-release: ...received.v2 under 2025-10-draft is 2.0.0-2025-10-draft.
+    """
+    schema_path = message_schema_path(message_data)
+    major = "1"
+    for event_type in (PurePosixPath(schema_path).name.removesuffix(".schema.json"),
+                       str(message_data.get("summary", ""))):
+        match = re.search(r"\.v(\d+)$", event_type)
+        if match:
+            major = str(int(match.group(1)))
+            break
+
+    release = re.search(r"/([^/]+)/events/[^/]+$", schema_path)
+    if release:
+        return f"{major}.0.0-{re.sub(r'[^0-9A-Za-z.-]+', '-', release.group(1))}"
+    return f"{major}.0.0"
+
+
+def version_key(version: str) -> Tuple:
+    """
+    Sort key ordering versions by semantic version precedence.
+
+    A release sorts after its pre-releases, and pre-releases compare
+    identifier by identifier, numbers numerically. Versions that are not
+    semantic versions sort first, by text.
+    """
+    match = re.match(r"^(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z.-]+))?$", version)
+    if not match:
+        return (0, (), False, (), version)
+    prerelease = match.group(4)
+    identifiers = tuple(
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in (prerelease or "").split(".") if prerelease
+    )
+    return (1, tuple(int(n) for n in match.group(1, 2, 3)), prerelease is None, identifiers, version)
+
+
+def is_prerelease(version: str) -> bool:
+    """Whether version is a semantic version with a pre-release, such as 1.0.0-2025-10-draft."""
+    key = version_key(version)
+    return key[0] == 1 and not key[2]
+
+
+# libyaml's parser when PyYAML was built with it, the pure Python one otherwise
+StreamLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class AsyncAPIStreamReader:
+    """
+    Reads an AsyncAPI document one channel or operation at a time.
+
+    Works on PyYAML parse events, so only the entry being read is held as
+    nodes; JSON specs are read the same way, as YAML flow syntax. Sections
+    the importer never reads, such as components/schemas, are skipped
+    without being built.
+    """
+
+    # Top-level sections yielded one entry at a time
+    KEYED_SECTIONS = ("channels", "operations")
+    # components sub-sections yielded one entry at a time; the rest are skipped
+    COMPONENT_SECTIONS = ("channels", "messages")
+    # Top-level sections yielded whole
+    WHOLE_SECTIONS = ("info", "x-services")
+
+    def __init__(self, stream: Any):
+        self.loader = StreamLoader(stream)
+        self.anchors: Dict[str, yaml.Node] = {}
+
+    def entries(self) -> Iterator[Tuple[str, Optional[str], Any]]:
+        """
+        Yield (section, name, value) for each entry the importer reads.
+
+        section is "channels", "operations", "components/<kind>" or one of
+        WHOLE_SECTIONS, whose name is None.
+        """
+        loader = self.loader
+        try:
+            loader.get_event()
+            if not loader.check_event(yaml.DocumentStartEvent):
+                return
+            loader.get_event()
+            if not loader.check_event(yaml.MappingStartEvent):
+                return
+            loader.get_event()
+            while not loader.check_event(yaml.MappingEndEvent):
+                section = self._value()
+                if section in self.KEYED_SECTIONS:
+                    for name, value in self._entries():
+                        yield section, name, value
+                elif section == "components" and loader.check_event(yaml.MappingStartEvent):
+                    loader.get_event()
+                    while not loader.check_event(yaml.MappingEndEvent):
+                        kind = self._value()
+                        if kind in self.COMPONENT_SECTIONS:
+                            for name, value in self._entries():
+                                yield f"components/{kind}", name, value
+                        else:
+                            self._skip()
+                    loader.get_event()
+                elif section in self.WHOLE_SECTIONS:
+                    yield section, None, self._value()
+                else:
+                    self._skip()
+        finally:
+            loader.dispose()
+
+    def _entries(self) -> Iterator[Tuple[Any, Any]]:
+        loader = self.loader
+        if not loader.check_event(yaml.MappingStartEvent):
+            self._skip()
+            return
+        loader.get_event()
+        while not loader.check_event(yaml.MappingEndEvent):
+            name = self._value()
+            yield name, self._value()
+        loader.get_event()
+
+    def _value(self) -> Any:
+        return self.loader.construct_document(self._node())
+
+    def _node(self) -> yaml.Node:
+        """Compose the next node from parse events, as yaml.compose would."""
+        loader = self.loader
+        event = loader.get_event()
+        if isinstance(event, yaml.AliasEvent):
+            if event.anchor not in self.anchors:
+                raise yaml.composer.ComposerError(
+                    None, None, f"found undefined or skipped alias {event.anchor!r}", event.start_mark)
+            return self.anchors[event.anchor]
+
+        tag = event.tag
+        if isinstance(event, yaml.ScalarEvent):
+            if tag is None or tag == "!":
+                tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+            node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+        elif isinstance(event, yaml.SequenceStartEvent):
+            if tag is None or tag == "!":
+                tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+            node = yaml.SequenceNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+        else:
+            if tag is None or tag == "!":
+                tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+            node = yaml.MappingNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+
+        if event.anchor is not None:
+            self.anchors[event.anchor] = node
+        if isinstance(node, yaml.SequenceNode):
+            while not loader.check_event(yaml.SequenceEndEvent):
+                node.value.append(self._node())
+            node.end_mark = loader.get_event().end_mark
+        elif isinstance(node, yaml.MappingNode):
+            while not loader.check_event(yaml.MappingEndEvent):
+                key = self._node()
+                node.value.append((key, self._node()))
+            node.end_mark = loader.get_event().end_mark
+        return node
+
+    def _skip(self) -> None:
+        """Consume the next node's events without building it."""
+        depth = 0
+        while True:
+            event = self.loader.get_event()
+            if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                depth += 1
+            elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                depth -= 1
+            if depth == 0:
+                return
+
+
+def outline_message(message: Any) -> Any:
+    """Keep the message fields the importer reads."""
+    if not isinstance(message, dict):
+        return message
+    outline = {key: message[key] for key in ("$ref", "summary", "description", "contentType", "x-schema-url")
+               if key in message}
+    payload = message.get("payload")
+    if isinstance(payload, dict) and "$ref" in payload:
+        outline["payload"] = {"$ref": payload["$ref"]}
+    return outline
+
+
+def outline_channel(channel: Any) -> Any:
+    """Keep the channel fields the importer reads."""
+    if not isinstance(channel, dict):
+        return channel
+    outline = {key: channel[key] for key in ("$ref", "address", "description") if key in channel}
+    if isinstance(channel.get("messages"), dict):
+        outline["messages"] = {name: outline_message(message) for name, message in channel["messages"].items()}
+    return outline
+
+
+def outline_operation(operation: Any) -> Any:
+    """Keep the operation fields the importer reads."""
+    if not isinstance(operation, dict):
+        return operation
+    outline = {key: operation[key] for key in ("$ref", "action") if key in operation}
+    if "channel" in operation:
+        channel = operation["channel"]
+        outline["channel"] = {"$ref": channel["$ref"]} if isinstance(channel, dict) and "$ref" in channel else {}
+    if "messages" in operation:
+        messages = operation["messages"] or []
+        outline["messages"] = [
+            {"$ref": message["$ref"]} if isinstance(message, dict) and "$ref" in message else {}
+            for message in messages
+        ]
+    return outline
+
+
+OUTLINERS = {"channels": outline_channel, "operations": outline_operation, "messages": outline_message}
+
+
+def read_asyncapi_outline(stream: Any) -> Dict[str, Any]:
+    """
+    Stream an AsyncAPI document into an outline holding only what the importer reads.
+
+    The outline has the same shape as the document, so it can be imported
+    and its "$ref"s resolved like the full document, but memory grows with
+    the number of channels and operations rather than the document's size.
+    """
+    outline: Dict[str, Any] = {}
+    for section, name, value in AsyncAPIStreamReader(stream).entries():
+        if name is None:
+            outline[section] = value
+            continue
+        parent = outline
+        for part in section.split("/"):
+            parent = parent.setdefault(part, {})
+        parent[name] = OUTLINERS[section.rsplit("/", 1)[-1]](value)
+    return outline
+
 
 class AsyncAPIImporter:
     """Imports AsyncAPI specifications into EventCatalog structure."""
@@ -28,6 +517,12 @@ class AsyncAPIImporter:
         parent_domain_name: str = "Digital Letters",
         verbose: bool = False,
         schema_base_path: Optional[Path] = None,
+        from_combined: bool = False,
+        io_workers: int = 0,
+        targets: Optional[List[ImportTarget]] = None,
+        stream: bool = False,
+        versioned_events: bool = False,
+        fs: Optional[FileBackend] = None,
     ):
         """
         Initialize the importer.
@@ -38,6 +533,17 @@ class AsyncAPIImporter:
             parent_domain_name: Name of the parent domain (subdomains will be created under this)
             verbose: Enable verbose logging
             schema_base_path: Base path for schema files on local filesystem
+            from_combined: Import every service from asyncapi-all in one parse
+                instead of from the per-service files
+            io_workers: Threads for schema copies and file writes; 0 runs them inline
+            targets: Further catalogs to render from the same parsed specs,
+                after the one described by the arguments above
+            stream: Stream each spec into an outline of the fields the importer
+                reads, instead of loading the whole document
+            versioned_events: Version events from their type and schema path,
+                keeping earlier versions under versioned/ in each event folder
+            fs: Backend for every file read and written (default: the local
+                disk); a MemoryFileBackend makes a dry run
         """
         self.asyncapi_dir = Path(asyncapi_dir)
         self.eventcatalog_dir = Path(eventcatalog_dir)
@@ -45,6 +551,11 @@ class AsyncAPIImporter:
         self.verbose = verbose
         self.schema_base_path = Path(
             schema_base_path) if schema_base_path else None
+        self.from_combined = from_combined
+        self.targets = list(targets or [])
+        self.stream = stream
+        self.versioned_events = versioned_events
+        self.fs = fs or LocalFileBackend()
 
         # Create base directories
         self.domains_dir = self.eventcatalog_dir / "domains"
@@ -57,24 +568,188 @@ class AsyncAPIImporter:
         self.created_parent_domain: bool = False
 
         # Track relationships for updating frontmatter
-        # subdomain -> list of services
-        self.subdomain_services: Dict[str, List[Dict[str, str]]] = {}
-        # service -> {sends: [], receives: []}
-        self.service_events: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
+        # subdomain -> services, in the order first seen
+        self.subdomain_services: Dict[str, RefSet] = {}
+        # service -> {sends: events, receives: events}, in the order first seen
+        self.service_events: Dict[str, Dict[str, RefSet]] = {}
         # Track all subdomains created
         self.created_subdomains: Dict[str, str] = {}  # slug -> version
 
+        # Span timings and file counters, written out by --profile
+        self.instrumentation = Instrumentation("eventcatalogasyncapiimporter")
+
+        # Copies and writes run here so rendering does not wait on the disk
+        self.io = IOExecutor(io_workers)
+        self.io_failures = 0
+
+        # Parsed specs and schemas, shared with the importers for extra targets
+        self._documents: Dict[Path, Dict[str, Any]] = {}
+        self._schemas: Dict[Path, Any] = {}
+        self.target_importers: List["AsyncAPIImporter"] = []
+
+        # Event folders written with versioned_events, arranged once rendering is done
+        self.event_roots: Set[Path] = set()
+
     def log(self, message: str, level: str = "INFO") -> None:
         """Log a message."""
         if self.verbose or level in ["ERROR", "WARNING"]:
             print(f"[{level}] {message}")
 
+    def _read_text(self, file_path: Path) -> str:
+        """Read a text file, recording the read."""
+        # A write to this file may still be queued
+        self.io.flush(file_path)
+        with self.instrumentation.span("load"):
+            content = self.fs.read_text(file_path)
+        self.instrumentation.record_read(len(content.encode("utf-8")))
+        return content
+
+    def _write_text(self, file_path: Path, content: str, counter: Optional[str] = None) -> None:
+        """
+        Queue a text file write, recording it when it runs.
+
+        counter, if given, is counted only when the file's content changes.
+        """
+        self.io.submit(file_path, self._write_text_now, file_path, content, counter)
+
+    def _write_text_now(self, file_path: Path, content: str, counter: Optional[str] = None) -> None:
+        data = content.encode("utf-8")
+        with self.instrumentation.span("write"):
+            # Leave files that already hold this content alone, so re-imports
+            # do not touch their modification times
+            try:
+                if self.fs.stat(file_path).st_size == len(data) and self.fs.read_bytes(file_path) == data:
+                    self.instrumentation.record_unchanged()
+                    return
+            except FileNotFoundError:
+                pass
+            self._unlink_if_linked(file_path)
+            self.fs.write_text(file_path, content)
+        self.instrumentation.record_write(len(data))
+        if counter is not None:
+            self.instrumentation.count(counter)
+
+    def _copy_file(self, source: Path, destination: Path) -> None:
+        """Queue a copy preserving metadata, recording it when it runs."""
+        self.io.submit(destination, self._copy_file_now, source, destination)
+
+    def _copy_file_now(self, source: Path, destination: Path) -> None:
+        source_stat = self.fs.stat(source)
+        with self.instrumentation.span("copy"):
+            # copy2 keeps the modification time, so a destination with the
+            # same size and mtime is the schema copied by an earlier run
+            try:
+                destination_stat = self.fs.stat(destination)
+                if (destination_stat.st_size == source_stat.st_size
+                        and destination_stat.st_mtime_ns == source_stat.st_mtime_ns):
+                    self.instrumentation.record_deduplicated()
+                    return
+            except FileNotFoundError:
+                pass
+            self._unlink_if_linked(destination)
+            self.fs.copy(source, destination)
+        self.instrumentation.record_copy(source_stat.st_size)
+
+    def _unlink_if_linked(self, file_path: Path) -> None:
+        """Remove a file shared with other event versions, so writing it leaves them alone."""
+        try:
+            if self.fs.stat(file_path).st_nlink > 1:
+                self.fs.unlink(file_path)
+        except FileNotFoundError:
+            pass
+
+    def wait_for_io(self) -> int:
+        """Wait for queued copies and writes, logging any that failed; return the failure count."""
+        try:
+            with self.instrumentation.span("io_wait"):
+                self.io.wait()
+        except IOExecutorError as e:
+            for path, error in e.failures:
+                self.log(f"Error writing {path}: {error}", "WARNING")
+            self.io_failures += len(e.failures)
+            return len(e.failures)
+        return 0
+
+    def run_report(self) -> Dict[str, Any]:
+        """
+        Return a JSON-serialisable report of the run, for --report.
+
+        Phase times are span totals in seconds. write and copy run on the
+        I/O threads, so they are summed across threads and can exceed the
+        wall time. File counts and times cover every target; the created
+        counts at the top level are for the first. With a MemoryFileBackend
+        the file counts are what the run would do, and planned_changes
+        counts the steps its plan holds.
+        """
+        summary = self.instrumentation.summary()
+        counters = summary["counters"]
+        report = {
+            "tool": summary["tool"],
+            "started_at": summary["started_at"],
+            "wall_seconds": summary["wall_seconds"],
+            "services_created": len(self.created_services),
+            "events_created": len(self.created_events),
+            "channels_created": len(self.created_channels),
+            "files_written": counters.get(FILES_WRITTEN, 0),
+            "files_unchanged": counters.get(FILES_UNCHANGED, 0),
+            "bytes_written": counters.get(BYTES_WRITTEN, 0),
+            "schema_files_copied": counters.get(FILES_COPIED, 0),
+            "schema_files_deduplicated": counters.get(FILES_DEDUPLICATED, 0),
+            "schema_bytes_copied": counters.get(BYTES_COPIED, 0),
+            "relationship_patches": counters.get(RELATIONSHIP_PATCHES, 0),
+            "event_files_linked": counters.get(EVENT_FILES_LINKED, 0),
+            "io_failures": self.io_failures + sum(t.io_failures for t in self.target_importers),
+            "phases": {name: span["total_seconds"] for name, span in summary["spans"].items()},
+            "targets": [
+                {
+                    "eventcatalog_dir": str(importer.eventcatalog_dir),
+                    "services_created": len(importer.created_services),
+                    "events_created": len(importer.created_events),
+                    "channels_created": len(importer.created_channels),
+                }
+                for importer in [self] + self.target_importers
+            ],
+        }
+        if isinstance(self.fs, MemoryFileBackend):
+            report["planned_changes"] = summarize_plan(self.fs.plan())
+        return report
+
+    def write_report(self, path: Path) -> Path:
+        """Write run_report() as JSON to path and return the path."""
+        report_path = Path(path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(self.run_report(), indent=2) + "\n")
+        return report_path
+
+    def _read_json(self, file_path: Path) -> Any:
+        """Read and parse a JSON schema, once however many events or targets use it."""
+        if file_path not in self._schemas:
+            self._schemas[file_path] = json.loads(self._read_text(file_path))
+        return self._schemas[file_path]
+
     def load_asyncapi_file(self, file_path: Path) -> Optional[Dict[str, Any]]:
-        """Load and parse an AsyncAPI YAML file."""
+        """Load and parse an AsyncAPI YAML or JSON file."""
+        if file_path in self._documents:
+            return self._documents[file_path]
         try:
-            with open(file_path, "r") as f:
-                data = yaml.safe_load(f)
+            if self.stream:
+                # Reading and parsing interleave, so both count as parse time
+                with self.instrumentation.span("parse"):
+                    with self.fs.open_text(file_path) as f:
+                        data = read_asyncapi_outline(f)
+                self.instrumentation.record_read(self.fs.stat(file_path).st_size)
+                self.log(f"Streamed AsyncAPI file: {file_path.name}")
+                self._documents[file_path] = data
+                return data
+
+            content = self._read_text(file_path)
+            with self.instrumentation.span("parse"):
+                if file_path.suffix == ".json":
+                    data = json.loads(content)
+                else:
+                    data = yaml.safe_load(content)
             self.log(f"Loaded AsyncAPI file: {file_path.name}")
+            self._documents[file_path] = data
             return data
         except Exception as e:
             self.log(f"Error loading {file_path}: {e}", "ERROR")
@@ -125,8 +800,8 @@ class AsyncAPIImporter:
         parent_domain_slug = self.sanitize_name(self.parent_domain_name)
         parent_domain_path = self.domains_dir / parent_domain_slug
 
-        if not parent_domain_path.exists():
-            parent_domain_path.mkdir(parents=True, exist_ok=True)
+        if not self.fs.exists(parent_domain_path):
+            self.fs.mkdir(parent_domain_path, parents=True, exist_ok=True)
 
             # Create index.mdx for parent domain
             index_content = f"""---
@@ -144,8 +819,7 @@ This domain contains subdomains related to {self.parent_domain_name}.
 <NodeGraph />
 """
             index_file = parent_domain_path / "index.mdx"
-            with open(index_file, "w") as f:
-                f.write(index_content)
+            self._write_text(index_file, index_content)
 
             self.log(f"Created parent domain: {self.parent_domain_name}")
             self.created_parent_domain = True
@@ -159,12 +833,12 @@ This domain contains subdomains related to {self.parent_domain_name}.
 
         subdomain_slug = self.sanitize_name(subdomain_name)
         subdomains_dir = parent_domain_path / "subdomains"
-        subdomains_dir.mkdir(parents=True, exist_ok=True)
+        self.fs.mkdir(subdomains_dir, parents=True, exist_ok=True)
 
         subdomain_path = subdomains_dir / subdomain_slug
 
-        if not subdomain_path.exists():
-            subdomain_path.mkdir(parents=True, exist_ok=True)
+        if not self.fs.exists(subdomain_path):
+            self.fs.mkdir(subdomain_path, parents=True, exist_ok=True)
 
             # Create index.mdx for subdomain
             index_content = f"""---
@@ -182,8 +856,7 @@ This subdomain contains services related to {subdomain_name}.
 <NodeGraph />
 """
             index_file = subdomain_path / "index.mdx"
-            with open(index_file, "w") as f:
-                f.write(index_content)
+            self._write_text(index_file, index_content)
 
             self.log(f"Created subdomain: {subdomain_name}")
 
@@ -204,11 +877,11 @@ This subdomain contains services related to {subdomain_name}.
         # Services should be under a 'services' folder within the subdomain
         # Structure: domains/{Parent Domain}/subdomains/{Subdomain}/services/{Service Name}/
         services_dir = subdomain_path / "services"
-        services_dir.mkdir(parents=True, exist_ok=True)
+        self.fs.mkdir(services_dir, parents=True, exist_ok=True)
         service_path = services_dir / service_slug
 
         # Always create/update service files (don't skip if already processed)
-        service_path.mkdir(parents=True, exist_ok=True)
+        self.fs.mkdir(service_path, parents=True, exist_ok=True)
 
         info = asyncapi_data.get("info", {})
         description = info.get("description", f"{service_name} service")
@@ -244,9 +917,20 @@ summary: |
 <NodeGraph />
 """
 
+        # The page is written once, with the sends and receives tracked so
+        # far, so events no longer in the specs drop out and a re-import that
+        # finds the same relationships leaves it unchanged
         index_file = service_path / "index.mdx"
-        with open(index_file, "w") as f:
-            f.write(index_content)
+        page = Frontmatter.parse(index_content)
+        existing = Frontmatter.parse(self._read_text(index_file)) if self.fs.exists(index_file) else None
+        tracked = self.service_events.get(service_slug, {})
+        changed = False
+        for key in ("receives", "sends"):
+            refs = tracked.get(key, RefSet())
+            page.set_refs(key, refs)
+            before = existing.get_refs(key) if existing is not None else RefSet()
+            changed = changed or list(before) != list(refs)
+        self._write_text(index_file, page.render(), RELATIONSHIP_PATCHES if changed else None)
 
         self.created_services.add(service_slug)
         self.log(f"Created service: {service_name}")
@@ -260,15 +944,25 @@ summary: |
         channel_address: str,
         message_data: Dict[str, Any],
         action: str,
+        version: str = "1.0.0",
     ) -> None:
-        """Create event structure within a service."""
+        """
+        Create event structure within a service.
+
+        With versioned_events the event is written to versioned/<version>
+        in its folder, and arrange_event_versions() later moves the latest
+        version up to the folder itself.
+        """
         event_slug = self.sanitize_name(event_name)
         events_dir = service_path / "events"
-        events_dir.mkdir(exist_ok=True)
+        self.fs.mkdir(events_dir, exist_ok=True)
 
         event_key = f"{service_path.name}/{event_slug}"
+        if self.versioned_events:
+            event_key += f"@{version}"
         if event_key in self.created_events:
             self.log(f"Event already exists: {event_name}", "DEBUG")
+            self.instrumentation.record_skip()
             return
 
         # Extract event details
@@ -280,18 +974,15 @@ summary: |
         # Determine if it's a published or subscribed event
         event_type = "published" if action == "send" else "received"
 
-        # Extract schema path if available
-        payload = message_data.get("payload", {})
-        schema_path = payload.get("$ref", "")
-
-        # Strip the https://notify.nhs.uk/cloudevents prefix to make it relative
-        if schema_path:
-            schema_path = schema_path.replace(
-                "https://notify.nhs.uk/cloudevents", "")
+        # Schema path relative to the https://notify.nhs.uk/cloudevents prefix
+        schema_path = message_schema_path(message_data)
 
         # Create event folder and index.mdx (EventCatalog expects events/eventname/index.mdx)
         event_dir = events_dir / event_slug
-        event_dir.mkdir(parents=True, exist_ok=True)
+        if self.versioned_events:
+            self.event_roots.add(event_dir)
+            event_dir = event_dir / "versioned" / version
+        self.fs.mkdir(event_dir, parents=True, exist_ok=True)
 
         # Copy schema file to event directory if schema_base_path is provided
         schema_filename = None
@@ -304,72 +995,53 @@ summary: |
             relative_schema_path = schema_path.lstrip("/")
             source_schema_file = self.schema_base_path / relative_schema_path
 
-            if source_schema_file.exists():
+            if self.fs.exists(source_schema_file):
+                # Copies are queued on the I/O executor; failures are
+                # reported together once rendering is done
                 schema_filename = source_schema_file.name
-                dest_schema_file = event_dir / schema_filename
-                try:
-                    shutil.copy2(source_schema_file, dest_schema_file)
-                    self.log(f"Copied schema file: {schema_filename}", "DEBUG")
-
-                    # Also copy the bundled version if it exists
-                    bundled_schema_file = source_schema_file.parent / \
-                        source_schema_file.name.replace(
-                            '.schema.', '.bundle.schema.')
-                    if bundled_schema_file.exists():
-                        bundled_schema_filename = bundled_schema_file.name
-                        dest_bundled_schema_file = event_dir / bundled_schema_filename
-                        try:
-                            shutil.copy2(bundled_schema_file,
-                                        dest_bundled_schema_file)
-                            self.log(
-                                f"Copied bundled schema file: {bundled_schema_filename}", "DEBUG")
-                        except Exception as e:
-                            self.log(
-                                f"Error copying bundled schema file {bundled_schema_file}: {e}", "WARNING")
-                            bundled_schema_filename = None
-
-                    # Parse the schema file to look for dataschema
-                    try:
-                        with open(source_schema_file, 'r') as f:
-                            schema_content = json.load(f)
-
-                        # Look for dataschema with const value
-                        if "properties" in schema_content and "dataschema" in schema_content["properties"]:
-                            dataschema_prop = schema_content["properties"]["dataschema"]
-                            if "const" in dataschema_prop:
-                                data_schema_url = dataschema_prop["const"]
-                                # Strip the prefix to get relative path
-                                data_schema_path = data_schema_url.replace(
-                                    "https://notify.nhs.uk/cloudevents", "")
-
-                                # Copy the data schema file
-                                relative_data_schema_path = data_schema_path.lstrip(
-                                    "/")
-                                source_data_schema_file = self.schema_base_path / relative_data_schema_path
-
-                                if source_data_schema_file.exists():
-                                    data_schema_filename = source_data_schema_file.name
-                                    dest_data_schema_file = event_dir / data_schema_filename
-                                    try:
-                                        shutil.copy2(
-                                            source_data_schema_file, dest_data_schema_file)
-                                        self.log(
-                                            f"Copied data schema file: {data_schema_filename}", "DEBUG")
-                                    except Exception as e:
-                                        self.log(
-                                            f"Error copying data schema file {source_data_schema_file}: {e}", "WARNING")
-                                        data_schema_filename = None
-                                else:
-                                    self.log(
-                                        f"Data schema file not found: {source_data_schema_file}", "WARNING")
-                    except Exception as e:
-                        self.log(
-                            f"Error parsing schema file {source_schema_file}: {e}", "WARNING")
+                self._copy_file(source_schema_file, event_dir / schema_filename)
+                self.log(f"Copied schema file: {schema_filename}", "DEBUG")
+
+                # Also copy the bundled version if it exists
+                bundled_schema_file = source_schema_file.parent / \
+                    source_schema_file.name.replace(
+                        '.schema.', '.bundle.schema.')
+                if self.fs.exists(bundled_schema_file):
+                    bundled_schema_filename = bundled_schema_file.name
+                    self._copy_file(bundled_schema_file, event_dir / bundled_schema_filename)
+                    self.log(
+                        f"Copied bundled schema file: {bundled_schema_filename}", "DEBUG")
 
+                # Parse the schema file to look for dataschema
+                try:
+                    schema_content = self._read_json(source_schema_file)
+
+                    # Look for dataschema with const value
+                    if "properties" in schema_content and "dataschema" in schema_content["properties"]:
+                        dataschema_prop = schema_content["properties"]["dataschema"]
+                        if "const" in dataschema_prop:
+                            data_schema_url = dataschema_prop["const"]
+                            # Strip the prefix to get relative path
+                            data_schema_path = data_schema_url.replace(
+                                SCHEMA_URL_PREFIX, "")
+
+                            # Copy the data schema file
+                            relative_data_schema_path = data_schema_path.lstrip(
+                                "/")
+                            source_data_schema_file = self.schema_base_path / relative_data_schema_path
+
+                            if self.fs.exists(source_data_schema_file):
+                                data_schema_filename = source_data_schema_file.name
+                                self._copy_file(
+                                    source_data_schema_file, event_dir / data_schema_filename)
+                                self.log(
+                                    f"Copied data schema file: {data_schema_filename}", "DEBUG")
+                            else:
+                                self.log(
+                                    f"Data schema file not found: {source_data_schema_file}", "WARNING")
                 except Exception as e:
                     self.log(
-                        f"Error copying schema file {source_schema_file}: {e}", "WARNING")
-                    schema_filename = None
+                        f"Error parsing schema file {source_schema_file}: {e}", "WARNING")
             else:
                 self.log(
                     f"Schema file not found: {source_schema_file}", "WARNING")
@@ -378,7 +1050,7 @@ summary: |
         frontmatter_parts = [
             f"id: {event_slug}",
             f"name: {event_name}",
-            f"version: 1.0.0",
+            f"version: {version}",
             f"summary: |\n  {summary}"
         ]
 
@@ -446,8 +1118,7 @@ Schema Reference: [{schema_path}]({schema_path})
 """
 
         event_file = event_dir / "index.mdx"
-        with open(event_file, "w") as f:
-            f.write(event_content)
+        self._write_text(event_file, event_content)
 
         self.created_events.add(event_key)
         self.log(f"Created event: {event_name} ({event_type})")
@@ -460,9 +1131,10 @@ Schema Reference: [{schema_path}]({schema_path})
 
         if channel_slug in self.created_channels:
             self.log(f"Channel already exists: {channel_name}", "DEBUG")
+            self.instrumentation.record_skip()
             return
 
-        self.channels_dir.mkdir(exist_ok=True)
+        self.fs.mkdir(self.channels_dir, exist_ok=True)
 
         address = channel_data.get("address", channel_name)
         description = channel_data.get(
@@ -470,7 +1142,7 @@ Schema Reference: [{schema_path}]({schema_path})
 
         # Create channel folder and index.mdx (EventCatalog expects channels/channelname/index.mdx)
         channel_dir = self.channels_dir / channel_slug
-        channel_dir.mkdir(parents=True, exist_ok=True)
+        self.fs.mkdir(channel_dir, parents=True, exist_ok=True)
 
         # Create channel markdown file
         channel_content = f"""---
@@ -501,12 +1173,21 @@ This channel carries the following messages:
             channel_content += f"- **{msg_name}**: {msg_summary}\n"
 
         channel_file = channel_dir / "index.mdx"
-        with open(channel_file, "w") as f:
-            f.write(channel_content)
+        self._write_text(channel_file, channel_content)
 
         self.created_channels.add(channel_slug)
         self.log(f"Created channel: {channel_name}")
 
+    def track_subdomain_service(self, subdomain_slug: str, service_ref: Dict[str, str]) -> None:
+        """Record that a subdomain contains a service, once per (id, version)."""
+        if subdomain_slug not in self.subdomain_services:
+            self.subdomain_services[subdomain_slug] = RefSet()
+        self.subdomain_services[subdomain_slug].add(service_ref)
+
+    def track_service_event(self, service_slug: str, action: str, event_ref: Dict[str, str]) -> None:
+        """Record that a service sends or receives an event, once per (id, version)."""
+        self.service_events[service_slug]["sends" if action == "send" else "receives"].add(event_ref)
+
     def process_asyncapi_file(self, file_path: Path) -> None:
         """Process a single AsyncAPI file."""
         self.log(f"\nProcessing: {file_path.name}")
@@ -515,6 +1196,18 @@ This channel carries the following messages:
         if not asyncapi_data:
             return
 
+        self.process_asyncapi_data(asyncapi_data)
+
+    def process_asyncapi_data(
+        self, asyncapi_data: Dict[str, Any], resolver: Optional[PointerResolver] = None
+    ) -> None:
+        """
+        Import one service's AsyncAPI document.
+
+        Args:
+            asyncapi_data: The service's spec, or a view of it built from the combined spec
+            resolver: Resolver for the operations' "$ref"s (default: one over asyncapi_data)
+        """
         # Extract service information
         service_name = self.extract_service_name(asyncapi_data)
         subdomain_name = self.extract_subdomain_from_service(
@@ -525,71 +1218,205 @@ This channel carries the following messages:
         # Create subdomain structure (which also creates parent domain)
         subdomain_path = self.create_subdomain_structure(subdomain_name)
 
+        # Initialize service events tracking
+        if service_slug not in self.service_events:
+            self.service_events[service_slug] = {"sends": RefSet(), "receives": RefSet()}
+
+        # Resolve the operations' messages, tracking the service's sends and
+        # receives before its page is written
+        messages = self.resolve_operation_messages(service_slug, asyncapi_data, resolver)
+
         # Create service structure
         service_path = self.create_service_structure(
             subdomain_path, service_name, asyncapi_data, subdomain_name
         )
 
         # Track subdomain-service relationship
-        if subdomain_slug not in self.subdomain_services:
-            self.subdomain_services[subdomain_slug] = []
-
-        # Add service to subdomain if not already there
         # Normalize version to semver (EventCatalog expects semver)
         raw_version = asyncapi_data.get("info", {}).get("version", "0.0.1")
         if not raw_version or not raw_version[0].isdigit() or raw_version.count('.') != 2:
             raw_version = "1.0.0"
 
-        service_ref = {"id": service_slug, "version": raw_version}
-        if service_ref not in self.subdomain_services[subdomain_slug]:
-            self.subdomain_services[subdomain_slug].append(service_ref)
-
-        # Initialize service events tracking
-        if service_slug not in self.service_events:
-            self.service_events[service_slug] = {"sends": [], "receives": []}
+        self.track_subdomain_service(subdomain_slug, {"id": service_slug, "version": raw_version})
 
         # Process channels
         channels = asyncapi_data.get("channels", {})
         for channel_name, channel_data in channels.items():
             self.create_channel_structure(channel_name, channel_data)
 
-        # Process operations to create events
+        for msg_name, channel_address, msg_data, action, version in messages:
+            self.create_event_structure(
+                service_path, msg_name, channel_address, msg_data, action, version
+            )
+
+    def resolve_operation_messages(
+        self, service_slug: str, asyncapi_data: Dict[str, Any], resolver: Optional[PointerResolver] = None
+    ) -> List[Tuple[str, str, Dict[str, Any], str, str]]:
+        """
+        Resolve and track the messages a service's operations send and receive.
+
+        Only the messages each operation references are resolved, or all of
+        its channel's if it lists none.
+
+        Returns:
+            (message name, channel address, message, action, version) per message
+        """
+        resolver = resolver or PointerResolver(asyncapi_data)
+        messages = []
         operations = asyncapi_data.get("operations", {})
         for op_name, op_data in operations.items():
             action = op_data.get("action", "")
             channel_ref = op_data.get("channel", {}).get("$ref", "")
+            channel_data = resolver.resolve(channel_ref) if channel_ref.startswith("#/channels/") else None
+            if not isinstance(channel_data, dict):
+                continue
+
+            message_refs = [message.get("$ref", "") for message in op_data.get("messages") or []]
+            if not message_refs:
+                message_refs = [
+                    f"{channel_ref}/messages/{name.replace('~', '~0').replace('/', '~1')}"
+                    for name in channel_data.get("messages", {})
+                ]
+
+            channel_address = channel_data.get("address", PointerResolver.name(channel_ref))
+            for msg_ref in message_refs:
+                msg_data = resolver.resolve(msg_ref)
+                if not isinstance(msg_data, dict):
+                    self.log(f"Operation {op_name}: unresolved message {msg_ref!r}", "WARNING")
+                    continue
+                msg_name = PointerResolver.name(msg_ref)
+
+                # Track service-event relationship
+                version = event_version(msg_data) if self.versioned_events else "1.0.0"
+                self.track_service_event(
+                    service_slug, action, {"id": self.sanitize_name(msg_name), "version": version})
+                messages.append((msg_name, channel_address, msg_data, action, version))
+        return messages
+
+    def service_views(self, combined: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Split a combined spec into one document per service.
+
+        Each view holds the service's info and the channels and operations it
+        owns, as listed under x-services, in the order of its own spec. Views
+        are returned in the order their per-service files would be imported.
+        """
+        info = combined.get("info", {})
+        channels = combined.get("channels", {})
+        operations = combined.get("operations", {})
+        views = []
+        for title, service in combined.get("x-services", {}).items():
+            owned = {op_id: operations[op_id] for op_id in service.get("operations", []) if op_id in operations}
+            view_channels = {}
+            for op_data in owned.values():
+                channel_name = PointerResolver.name(op_data.get("channel", {}).get("$ref", ""))
+                if channel_name in channels:
+                    view_channels.setdefault(channel_name, channels[channel_name])
+            views.append({
+                "info": {
+                    "title": title,
+                    "version": info.get("version", "0.0.1"),
+                    "description": service.get("description", f"{title} service"),
+                    "x-service-metadata": service.get("x-service-metadata", {}),
+                },
+                "channels": view_channels,
+                "operations": owned,
+            })
+        # Per-service files are named asyncapi-<title with spaces as dashes>
+        return sorted(views, key=lambda view: view["info"]["title"].lower().replace(" ", "-"))
+
+    def import_combined(self, spec_file: Path) -> bool:
+        """
+        Import every service from a combined spec parsed once.
 
-            # Extract channel name from reference
-            if channel_ref.startswith("#/channels/"):
-                channel_name = channel_ref.replace("#/channels/", "")
-                channel_data = channels.get(channel_name, {})
-
-                # Get messages
-                messages_data = channel_data.get("messages", {})
-                for msg_name, msg_data in messages_data.items():
-                    # Get full message data if it's a reference
-                    if "$ref" in msg_data:
-                        msg_ref = msg_data["$ref"]
-                        if msg_ref.startswith(f"#/channels/{channel_name}/messages/"):
-                            msg_data = messages_data.get(msg_name, msg_data)
-
-                    channel_address = channel_data.get("address", channel_name)
-                    event_slug = self.sanitize_name(msg_name)
-
-                    # Track service-event relationship
-                    event_ref = {"id": event_slug, "version": "1.0.0"}
-                    if action == "send":
-                        if event_ref not in self.service_events[service_slug]["sends"]:
-                            self.service_events[service_slug]["sends"].append(
-                                event_ref)
-                    else:
-                        if event_ref not in self.service_events[service_slug]["receives"]:
-                            self.service_events[service_slug]["receives"].append(
-                                event_ref)
-
-                    self.create_event_structure(
-                        service_path, msg_name, channel_address, msg_data, action
-                    )
+        Returns False, importing nothing, if the spec has no x-services
+        block describing which operations each service owns.
+        """
+        self.log(f"\nProcessing combined file: {spec_file.name}")
+        combined = self.load_asyncapi_file(spec_file)
+        if not combined:
+            return False
+        if "x-services" not in combined:
+            self.log(f"{spec_file.name} has no x-services; regenerate it to import from it", "WARNING")
+            return False
+
+        # One resolver for the whole document, so shared channels resolve once
+        resolver = PointerResolver(combined)
+        for view in self.service_views(combined):
+            with self.instrumentation.span("render"):
+                self.log(f"\nProcessing service: {view['info']['title']}")
+                self.process_asyncapi_data(view, resolver)
+        return True
+
+    def arrange_event_versions(self) -> None:
+        """
+        Put the latest version of each event written this run at the top of its folder.
+
+        An older version already at the top is moved to versioned/<version>,
+        unless that folder exists, and is otherwise replaced. A release at the
+        top when this run wrote pre-releases is a page from an import without
+        versioned events, which sorts after every pre-release of its major
+        version, so it is replaced rather than kept as the latest. Identical
+        files across an event's versions are then hard-linked, so unchanged
+        schemas take no extra space as versions accumulate.
+        """
+        self.log("\nArranging event versions...")
+
+        for event_root in sorted(self.event_roots):
+            versioned_dir = event_root / "versioned"
+            written = {path.name: path for path in self.fs.iterdir(versioned_dir) if self.fs.is_dir(path)}
+            top_file = event_root / "index.mdx"
+            top_version = None
+            if self.fs.exists(top_file):
+                match = re.search(r"^version: (.+)$", self._read_text(top_file), re.MULTILINE)
+                top_version = match.group(1).strip() if match else None
+
+            latest = max(written, key=version_key)
+            unversioned = top_version is not None and not is_prerelease(top_version) and is_prerelease(latest)
+            if top_version is None or unversioned or version_key(latest) >= version_key(top_version):
+                top_files = [path for path in self.fs.iterdir(event_root) if self.fs.is_file(path)]
+                if top_version is not None and not unversioned and top_version != latest \
+                        and top_version not in written:
+                    archive = versioned_dir / top_version
+                    self.fs.mkdir(archive)
+                    for path in top_files:
+                        self.fs.replace(path, archive / path.name)
+                else:
+                    for path in top_files:
+                        self.fs.unlink(path)
+                for path in self.fs.iterdir(written[latest]):
+                    self.fs.replace(path, event_root / path.name)
+                self.fs.rmdir(written[latest])
+                self.log(f"Event {event_root.name}: latest version {latest}", "DEBUG")
+
+            if not self.fs.iterdir(versioned_dir):
+                self.fs.rmdir(versioned_dir)
+            self.link_identical_files(event_root)
+
+    def link_identical_files(self, event_root: Path) -> None:
+        """Replace files in an event folder and its versions with links to identical ones."""
+        folders = [event_root]
+        if self.fs.is_dir(event_root / "versioned"):
+            folders += sorted(path for path in self.fs.iterdir(event_root / "versioned") if self.fs.is_dir(path))
+
+        first: Dict[Tuple[int, str], Path] = {}
+        for folder in folders:
+            for path in sorted(self.fs.iterdir(folder)):
+                if not self.fs.is_file(path):
+                    continue
+                key = (self.fs.stat(path).st_size, hashlib.sha256(self.fs.read_bytes(path)).hexdigest())
+                original = first.setdefault(key, path)
+                if original == path or self.fs.samefile(original, path):
+                    continue
+                link = path.with_name(f".{path.name}.link")
+                try:
+                    self.fs.link(original, link)
+                except OSError as e:
+                    # Hard links need the same filesystem; keep the copy otherwise
+                    self.log(f"Could not link {path} to {original}: {e}", "DEBUG")
+                    continue
+                self.fs.replace(link, path)
+                self.instrumentation.count(EVENT_FILES_LINKED)
 
     def update_subdomain_relationships(self) -> None:
         """Update subdomain index files with service relationships."""
@@ -600,42 +1427,21 @@ This channel carries the following messages:
         for subdomain_slug, services in self.subdomain_services.items():
             subdomain_path = self.domains_dir / parent_domain_slug / \
                 "subdomains" / subdomain_slug / "index.mdx"
-            if not subdomain_path.exists():
+            if not self.fs.exists(subdomain_path):
                 self.log(
                     f"Subdomain file not found: {subdomain_path}", "WARNING")
                 continue
 
-            # Read existing content
-            with open(subdomain_path, "r") as f:
-                content = f.read()
-
-            # Split frontmatter and markdown
-            if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 3:
-                    frontmatter = parts[1]
-                    markdown_content = parts[2]
-
-                    # Remove existing services section if present
-                    import re
-                    frontmatter = re.sub(
-                        r'\nservices:.*?(?=\n\w+:|$)', '', frontmatter, flags=re.DOTALL)
-
-                    # Add updated services list
-                    services_yaml = "\nservices:\n"
-                    for service in services:
-                        services_yaml += f"  - id: {service['id']}\n"
-                        services_yaml += f"    version: {service['version']}\n"
-
-                    frontmatter += services_yaml
+            page = Frontmatter.parse(self._read_text(subdomain_path))
+            if page is None:
+                continue
 
-                    # Write back
-                    new_content = f"---{frontmatter}---{markdown_content}"
-                    with open(subdomain_path, "w") as f:
-                        f.write(new_content)
+            # The services found in this import replace any listed before
+            page.set_refs("services", services)
+            self._write_page(subdomain_path, page)
 
-                    self.log(
-                        f"Updated subdomain: {subdomain_slug} with {len(services)} services")
+            self.log(
+                f"Updated subdomain: {subdomain_slug} with {len(services)} services")
 
     def update_domain_relationships(self) -> None:
         """DEPRECATED: Use update_subdomain_relationships instead. Kept for backward compatibility."""
@@ -648,42 +1454,22 @@ This channel carries the following messages:
         parent_domain_slug = self.sanitize_name(self.parent_domain_name)
         parent_domain_path = self.domains_dir / parent_domain_slug / "index.mdx"
 
-        if not parent_domain_path.exists():
+        if not self.fs.exists(parent_domain_path):
             self.log(f"Parent domain file not found: {parent_domain_path}", "WARNING")
             return
 
-        # Read existing content
-        with open(parent_domain_path, "r") as f:
-            content = f.read()
-
-        # Split frontmatter and markdown
-        if content.startswith("---"):
-            parts = content.split("---", 2)
-            if len(parts) >= 3:
-                frontmatter = parts[1]
-                markdown_content = parts[2]
-
-                # Remove existing domains section if present
-                import re
-                frontmatter = re.sub(
-                    r'\ndomains:.*?(?=\n\w+:|$)', '', frontmatter, flags=re.DOTALL)
-
-                # Add updated domains list (subdomains are referenced as "domains" in EventCatalog)
-                if self.created_subdomains:
-                    domains_yaml = "\ndomains:\n"
-                    for subdomain_slug in sorted(self.created_subdomains.keys()):
-                        version = self.created_subdomains[subdomain_slug]
-                        domains_yaml += f"  - id: {subdomain_slug}\n"
-                        domains_yaml += f"    version: {version}\n"
-
-                    frontmatter += domains_yaml
+        page = Frontmatter.parse(self._read_text(parent_domain_path))
+        if page is None:
+            return
 
-                # Write back
-                new_content = f"---{frontmatter}---{markdown_content}"
-                with open(parent_domain_path, "w") as f:
-                    f.write(new_content)
+        # Subdomains are referenced as "domains" in EventCatalog
+        page.set_refs("domains", RefSet([
+            {"id": subdomain_slug, "version": self.created_subdomains[subdomain_slug]}
+            for subdomain_slug in sorted(self.created_subdomains)
+        ]))
+        self._write_page(parent_domain_path, page)
 
-                self.log(f"Updated parent domain with {len(self.created_subdomains)} subdomains")
+        self.log(f"Updated parent domain with {len(self.created_subdomains)} subdomains")
 
     def update_service_relationships(self) -> None:
         """Update service index files with event relationships."""
@@ -698,15 +1484,15 @@ This channel carries the following messages:
 
             # Check if parent domain has subdomains directory
             subdomains_dir = parent_domain_path / "subdomains"
-            if subdomains_dir.exists():
-                for subdomain_dir in subdomains_dir.glob("*"):
-                    if not subdomain_dir.is_dir():
+            if self.fs.exists(subdomains_dir):
+                for subdomain_dir in self.fs.glob(subdomains_dir, "*"):
+                    if not self.fs.is_dir(subdomain_dir):
                         continue
                     services_dir = subdomain_dir / "services"
-                    if not services_dir.exists():
+                    if not self.fs.exists(services_dir):
                         continue
                     potential_file = services_dir / service_slug / "index.mdx"
-                    if potential_file.exists():
+                    if self.fs.exists(potential_file):
                         service_file = potential_file
                         break
 
@@ -715,77 +1501,123 @@ This channel carries the following messages:
                     f"Service file not found for: {service_slug}", "WARNING")
                 continue
 
-            # Read existing content
-            with open(service_file, "r") as f:
-                content = f.read()
-
-            # Split frontmatter and markdown
-            if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 3:
-                    frontmatter = parts[1]
-                    markdown_content = parts[2]
-
-                    needs_update = False
-
-                    # Add receives if not already there
-                    if events["receives"] and "receives:" not in frontmatter:
-                        receives_yaml = "\nreceives:\n"
-                        for event in events["receives"]:
-                            receives_yaml += f"  - id: {event['id']}\n"
-                            receives_yaml += f"    version: {event['version']}\n"
-                        frontmatter += receives_yaml
-                        needs_update = True
-
-                    # Add sends if not already there
-                    if events["sends"] and "sends:" not in frontmatter:
-                        sends_yaml = "\nsends:\n"
-                        for event in events["sends"]:
-                            sends_yaml += f"  - id: {event['id']}\n"
-                            sends_yaml += f"    version: {event['version']}\n"
-                        frontmatter += sends_yaml
-                        needs_update = True
-
-                    if needs_update:
-                        # Write back
-                        new_content = f"---{frontmatter}---{markdown_content}"
-                        with open(service_file, "w") as f:
-                            f.write(new_content)
-
-                        self.log(
-                            f"Updated service: {service_slug} with {len(events['sends'])} sends, {len(events['receives'])} receives")
+            page = Frontmatter.parse(self._read_text(service_file))
+            if page is None:
+                continue
+
+            # The events found in this import replace any listed before
+            changed = page.set_refs("receives", events["receives"])
+            changed = page.set_refs("sends", events["sends"]) or changed
+            if changed:
+                self._write_page(service_file, page)
+
+                self.log(
+                    f"Updated service: {service_slug} with {len(events['sends'])} sends, {len(events['receives'])} receives")
+            else:
+                self.instrumentation.record_skip()
+
+    def _write_page(self, file_path: Path, page: Frontmatter) -> None:
+        """Write a page back after its relationships were updated."""
+        self._write_text(file_path, page.render(), RELATIONSHIP_PATCHES)
+
+    def find_asyncapi_files(self) -> List[Path]:
+        """
+        Find the AsyncAPI files to import, one per spec.
+
+        The generator can write each spec as YAML, JSON or both. When both
+        exist the .json sibling is used, since it parses much faster.
+        """
+        specs: Dict[str, Path] = {}
+        for suffix in (".yaml", ".json"):
+            for spec_file in self.fs.glob(self.asyncapi_dir, f"asyncapi-*{suffix}"):
+                specs[spec_file.stem] = spec_file
+        return [specs[stem] for stem in sorted(specs)]
+
+    def target_importer(self, target: ImportTarget) -> "AsyncAPIImporter":
+        """
+        Return an importer that renders target from this importer's parsed specs.
+
+        It shares the parsed specs and schemas, the file backend, the I/O
+        executor and the instrumentation, so nothing is read or parsed twice.
+        """
+        importer = AsyncAPIImporter(
+            self.asyncapi_dir,
+            target.eventcatalog_dir,
+            parent_domain_name=target.parent_domain_name,
+            verbose=self.verbose,
+            schema_base_path=target.schema_base_path,
+            from_combined=self.from_combined,
+            stream=self.stream,
+            versioned_events=self.versioned_events,
+            fs=self.fs,
+        )
+        importer.io = self.io
+        importer.instrumentation = self.instrumentation
+        importer._documents = self._documents
+        importer._schemas = self._schemas
+        return importer
 
     def import_all(self) -> None:
-        """Import all AsyncAPI files from the directory."""
-        if not self.asyncapi_dir.exists():
+        """Import all AsyncAPI files into this catalog, then into each extra target."""
+        self.import_catalog()
+
+        self.target_importers = []
+        for target in self.targets:
+            self.log(f"\nRendering target: {target.eventcatalog_dir}")
+            importer = self.target_importer(target)
+            importer.import_catalog()
+            self.target_importers.append(importer)
+
+    def import_catalog(self) -> None:
+        """Import all AsyncAPI files from the directory into this importer's catalog."""
+        if not self.fs.exists(self.asyncapi_dir):
             self.log(
                 f"AsyncAPI directory not found: {self.asyncapi_dir}", "ERROR")
             sys.exit(1)
 
-        # Find all AsyncAPI YAML files
-        yaml_files = list(self.asyncapi_dir.glob("asyncapi-*.yaml"))
+        # Find all AsyncAPI files, preferring JSON over YAML
+        spec_files = self.find_asyncapi_files()
 
-        if not yaml_files:
+        if not spec_files:
             self.log(
                 f"No AsyncAPI files found in {self.asyncapi_dir}", "WARNING"
             )
             return
 
-        self.log(f"Found {len(yaml_files)} AsyncAPI files to process\n")
+        if self.from_combined:
+            combined_file = next((f for f in spec_files if f.stem == COMBINED_SPEC), None)
+            if combined_file and self.import_combined(combined_file):
+                spec_files = []
+            else:
+                self.log("No usable combined spec; importing per-service files", "WARNING")
+
+        if spec_files:
+            self.log(f"Found {len(spec_files)} AsyncAPI files to process\n")
 
         # Process each file
-        for yaml_file in sorted(yaml_files):
+        for spec_file in spec_files:
             # Skip the 'all' file as it's a combined view
-            if yaml_file.name == "asyncapi-all.yaml":
-                self.log(f"Skipping combined file: {yaml_file.name}")
+            if spec_file.stem == COMBINED_SPEC:
+                self.log(f"Skipping combined file: {spec_file.name}")
+                self.instrumentation.record_skip()
                 continue
 
-            self.process_asyncapi_file(yaml_file)
+            with self.instrumentation.span("render"):
+                self.process_asyncapi_file(spec_file)
+
+        # Relationship updates read back and check for the files written above
+        self.wait_for_io()
+
+        if self.versioned_events:
+            with self.instrumentation.span("versions"):
+                self.arrange_event_versions()
 
         # Update relationships in frontmatter
-        self.update_parent_domain_relationships()
-        self.update_domain_relationships()
-        self.update_service_relationships()
+        with self.instrumentation.span("relationships"):
+            self.update_parent_domain_relationships()
+            self.update_domain_relationships()
+            self.update_service_relationships()
+        self.wait_for_io()
 
         # Print summary
         self.log(f"\n{'='*60}")
@@ -793,6 +1625,8 @@ This channel carries the following messages:
         self.log(f"  Services created: {len(self.created_services)}")
         self.log(f"  Events created: {len(self.created_events)}")
         self.log(f"  Channels created: {len(self.created_channels)}")
+        if self.io_failures:
+            self.log(f"  Failed copies/writes: {self.io_failures}", "WARNING")
         self.log(f"{'='*60}")
 
 
@@ -816,6 +1650,18 @@ Examples:
 
     # Custom parent domain name
     python import_asyncapi.py --parent-domain "My Parent Domain"
+
+    # Import everything from asyncapi-all in one parse
+    python import_asyncapi.py --from-combined
+
+    # Also render the catalogs listed in targets.yaml from the same parse
+    python import_asyncapi.py --targets targets.yaml
+
+    # List what an import would change without writing anything
+    python import_asyncapi.py --dry-run --verbose
+
+    # Import into memory, then write the changes in one pass if it succeeds
+    python import_asyncapi.py --staged
         """,
     )
 
@@ -865,6 +1711,68 @@ Examples:
         help="Enable verbose logging",
     )
 
+    parser.add_argument(
+        "--from-combined",
+        action="store_true",
+        help="Import all services from asyncapi-all in one parse instead of the per-service files",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream each spec, keeping only the fields the importer reads, so memory does not grow with spec size",
+    )
+
+    parser.add_argument(
+        "--versioned-events",
+        action="store_true",
+        help="Version events from their type and schema path, keeping earlier versions under versioned/",
+    )
+
+    parser.add_argument(
+        "--io-workers",
+        type=int,
+        default=8,
+        help="Threads for schema copies and file writes; 0 runs them inline (default: 8)",
+    )
+
+    parser.add_argument(
+        "--targets",
+        type=str,
+        metavar="FILE",
+        default=None,
+        help="YAML list of further catalogs (eventcatalog_dir, parent_domain, schema_base_path) "
+        "to render from the same parsed specs",
+    )
+
+    memory_modes = parser.add_mutually_exclusive_group()
+    memory_modes.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Import into memory and print the planned changes instead of writing them",
+    )
+    memory_modes.add_argument(
+        "--staged",
+        action="store_true",
+        help="Import into memory, then write the planned changes in one pass, so a failed import writes nothing",
+    )
+
+    parser.add_argument(
+        "--report",
+        type=str,
+        metavar="PATH",
+        default=None,
+        help="Write a JSON run report with file operation counts and phase times to PATH",
+    )
+
+    parser.add_argument(
+        "--profile",
+        type=str,
+        metavar="DIR",
+        default=None,
+        help="Profile the run, writing a cProfile dump and JSON timing summary to DIR",
+    )
+
     args = parser.parse_args()
 
     # Handle deprecated --domain flag
@@ -874,6 +1782,11 @@ Examples:
             "Warning: --domain is deprecated, use --parent-domain instead", file=sys.stderr)
         parent_domain = args.domain
 
+    # Dry and staged runs read the specs and any existing catalog from disk
+    # but keep their writes in memory
+    in_memory = args.dry_run or args.staged
+    fs = MemoryFileBackend(LocalFileBackend()) if in_memory else None
+
     # Create importer and run
     importer = AsyncAPIImporter(
         asyncapi_dir=args.asyncapi_dir,
@@ -881,10 +1794,35 @@ Examples:
         parent_domain_name=parent_domain,
         verbose=args.verbose,
         schema_base_path=args.schema_base_path,
+        from_combined=args.from_combined,
+        io_workers=0 if in_memory else args.io_workers,
+        targets=load_targets(args.targets) if args.targets else None,
+        stream=args.stream,
+        versioned_events=args.versioned_events,
+        fs=fs,
     )
 
     try:
-        importer.import_all()
+        with importer.instrumentation.profile(args.profile):
+            importer.import_all()
+        if args.report:
+            importer.write_report(args.report)
+        if args.staged:
+            # The writes are queued only now, so they can use the I/O threads
+            with IOExecutor(args.io_workers) as executor:
+                counts = fs.flush(LocalFileBackend(), executor)
+            print("\nApplied changes:")
+            for action, count in counts.items():
+                print(f"  {action}: {count}")
+        elif args.dry_run:
+            plan = fs.plan()
+            print("\nDry run, nothing was written. Planned changes:")
+            for action, count in summarize_plan(plan).items():
+                print(f"  {action}: {count}")
+            if args.verbose:
+                for step in plan:
+                    print(f"  {step.action} {step.path}" + (f" <- {step.source}" if step.source else ""))
+            return
         print("\n✅ Import completed successfully!")
     except Exception as e:
         print(f"\n❌ Import failed: {e}", file=sys.stderr)
@@ -0,0 +1,54 @@
+"""Pytest configuration and shared fixtures for eventcatalogasyncapiimporter tests."""
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from import_asyncapi import AsyncAPIImporter
+
+
+@pytest.fixture
+def temp_path():
+    """Create a temporary directory for test files."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+
+@pytest.fixture
+def temp_dirs(temp_path):
+    """Create empty asyncapi and eventcatalog directories for testing."""
+    asyncapi_dir = temp_path / "asyncapi"
+    eventcatalog_dir = temp_path / "eventcatalog"
+
+    asyncapi_dir.mkdir()
+    eventcatalog_dir.mkdir()
+
+    return {
+        "temp_dir": temp_path,
+        "asyncapi_dir": asyncapi_dir,
+        "eventcatalog_dir": eventcatalog_dir,
+    }
+
+
+@pytest.fixture
+def catalog_tree():
+    """Return a helper mapping each file under a catalog to its content."""
+    def tree(root: Path, with_links: bool = False) -> dict:
+        """With with_links, each file maps to (content, link count), to compare hard-linked schemas."""
+        return {
+            str(path.relative_to(root)): (path.read_bytes(), path.stat().st_nlink) if with_links else path.read_bytes()
+            for path in sorted(root.rglob("*")) if path.is_file()
+        }
+    return tree
+
+
+@pytest.fixture
+def run_import():
+    """Return a helper importing asyncapi_dir into eventcatalog_dir with the given importer options."""
+    def run(asyncapi_dir: Path, eventcatalog_dir: Path, **kwargs) -> AsyncAPIImporter:
+        importer = AsyncAPIImporter(asyncapi_dir, eventcatalog_dir, **kwargs)
+        importer.import_all()
+        return importer
+    return run
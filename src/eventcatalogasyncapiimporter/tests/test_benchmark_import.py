@@ -0,0 +1,142 @@
+"""
+Tests for the importer benchmark harness.
+
+Runs the harness against a tiny synthetic corpus to make sure the phase
+timings and file operation counts are collected and reported.
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from benchmark_import import (
+    PHASES,
+    PhaseTimer,
+    build_corpus,
+    main,
+    run_benchmark,
+)
+
+
+class TestPhaseTimer:
+    """Test exclusive phase timing."""
+
+    def test_nested_phase_time_is_exclusive(self):
+        """Time spent in a nested phase is not charged to the outer phase."""
+        timer = PhaseTimer()
+        inner = timer.wrap("schema_copy", lambda: sum(range(200000)))
+        outer = timer.wrap("structure", lambda: inner())
+
+        outer()
+
+        assert timer.calls["structure"] == 1
+        assert timer.calls["schema_copy"] == 1
+        assert timer.totals["schema_copy"] > 0
+        assert timer.totals["structure"] < timer.totals["schema_copy"]
+
+
+class TestBuildCorpus:
+    """Test synthetic corpus generation."""
+
+    def test_build_corpus_creates_specs_and_schemas(self, tmp_path):
+        """Corpus contains one spec per service and a schema tree."""
+        paths = build_corpus(tmp_path, services=4, events_per_service=2, subdomains=2)
+
+        specs = list(paths["asyncapi_dir"].glob("asyncapi-*.yaml"))
+        assert len(specs) == 4
+
+        schemas = list(paths["schema_base_path"].rglob("*.schema.json"))
+        # 4 event types, each with envelope, bundle and data schema
+        assert len(schemas) == 12
+
+
+    def test_build_corpus_busy_service(self, tmp_path):
+        """A busy service sends and receives its own events."""
+        paths = build_corpus(tmp_path, services=2, events_per_service=1, subdomains=1,
+                             busy_service_operations=5)
+
+        busy = yaml.safe_load((paths["asyncapi_dir"] / "asyncapi-bench-busy-service.yaml").read_text())
+        actions = [op["action"] for op in busy["operations"].values()]
+        assert actions.count("send") == 5
+        assert actions.count("receive") == 5
+        # 1 shared event type plus 10 for the busy service
+        assert len(list(paths["schema_base_path"].rglob("*.bundle.schema.json"))) == 11
+
+    def test_build_corpus_json_specs(self, tmp_path):
+        """spec_format controls which spec files are written."""
+        paths = build_corpus(tmp_path, services=2, events_per_service=1, subdomains=1, spec_format="both")
+
+        assert len(list(paths["asyncapi_dir"].glob("asyncapi-*.yaml"))) == 2
+        assert len(list(paths["asyncapi_dir"].glob("asyncapi-*.json"))) == 2
+
+
+class TestRunBenchmark:
+    """Test the end-to-end benchmark run."""
+
+    def test_report_contains_phases_and_file_ops(self, tmp_path):
+        """Report has timings for every phase and non-zero file op counts."""
+        report = run_benchmark(
+            services=3, events_per_service=2, subdomains=2, repeat=2, work_dir=tmp_path
+        )
+
+        assert len(report["runs"]) == 2
+        run = report["runs"][0]
+        for phase in PHASES:
+            assert phase in run["phases"]
+            assert run["phase_calls"][phase] > 0
+        assert run["file_ops"]["schema_files_copied"] > 0
+        assert run["file_ops"]["files_written"] > 0
+        assert run["created"]["services"] == 3
+        assert set(report["summary"]["phases_median"]) == set(run["phases"])
+
+    def test_io_options(self, tmp_path):
+        """Inline and threaded I/O with simulated latency do the same work."""
+        reports = [
+            run_benchmark(services=2, events_per_service=1, subdomains=1, repeat=1, work_dir=tmp_path,
+                          io_workers=workers, io_latency_ms=1)
+            for workers in (0, 4)
+        ]
+
+        assert [r["config"]["io_workers"] for r in reports] == [0, 4]
+        assert reports[0]["runs"][0]["file_ops"] == reports[1]["runs"][0]["file_ops"]
+
+    def test_busy_service_relationships(self, tmp_path):
+        """Every operation of the busy service ends up in its frontmatter."""
+        report = run_benchmark(
+            services=1, events_per_service=1, subdomains=1, repeat=1, work_dir=tmp_path,
+            busy_service_operations=20,
+        )
+
+        run = report["runs"][0]
+        assert report["config"]["busy_service_operations"] == 20
+        assert run["created"]["services"] == 2
+        assert run["phase_calls"]["tracking"] >= 40
+
+    def test_main_writes_json_report(self, tmp_path, capsys):
+        """main() prints a summary and writes the JSON report."""
+        output_file = tmp_path / "report.json"
+        test_args = [
+            "benchmark_import.py",
+            "--services", "2",
+            "--events-per-service", "1",
+            "--repeat", "1",
+            "--work-dir", str(tmp_path),
+            "--output", str(output_file),
+        ]
+
+        with patch.object(sys, "argv", test_args):
+            main()
+
+        report = json.loads(output_file.read_text())
+        assert report["config"]["services"] == 2
+        assert "EventCatalog importer benchmark" in capsys.readouterr().out
+
+
+# Run tests if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,176 @@
+"""
+Tests for importing through an in-memory file backend, for dry runs and tests.
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from import_asyncapi import AsyncAPIImporter, main
+from file_backend import LocalFileBackend, MemoryFileBackend
+from io_executor import IOExecutor
+
+SERVICES = 3
+SCHEMA_URL = "https://notify.nhs.uk/cloudevents/schemas"
+
+
+def spec(n: int, release: str = "1.0.0") -> dict:
+    return {
+        "asyncapi": "3.0.0",
+        "info": {"title": f"NHS Notify Digital Letters - Service {n}", "version": release,
+                 "x-service-metadata": {"parent": "Group"}},
+        "channels": {f"channel{n}": {"address": f"c/{n}", "messages": {f"Event{n}": {
+            "payload": {"$ref": f"{SCHEMA_URL}/{release}/events/uk.nhs.event{n}.v1.schema.json"}
+        }}}},
+        "operations": {f"send_{n}": {"action": "send", "channel": {"$ref": f"#/channels/channel{n}"}}},
+    }
+
+
+def write_inputs(fs, root: Path, release: str = "1.0.0") -> dict:
+    """Write SERVICES specs for release, with envelope and bundled schemas, through fs."""
+    asyncapi_dir = root / "asyncapi" / release
+    events_dir = root / "schema-base" / "schemas" / release / "events"
+    fs.mkdir(asyncapi_dir, parents=True)
+    fs.mkdir(events_dir, parents=True)
+    for n in range(SERVICES):
+        fs.write_text(events_dir / f"uk.nhs.event{n}.v1.schema.json", '{"type": "object"}')
+        fs.write_text(events_dir / f"uk.nhs.event{n}.v1.bundle.schema.json", '{"type": "object", "bundled": true}')
+        fs.write_text(asyncapi_dir / f"asyncapi-service-{n}.yaml", yaml.dump(spec(n, release)))
+    return {
+        "asyncapi_dir": asyncapi_dir,
+        "eventcatalog_dir": root / "catalog",
+        "schema_base_path": root / "schema-base",
+    }
+
+
+class TestDryRun:
+    """Test importing into a MemoryFileBackend."""
+
+    def test_nothing_written(self, temp_path):
+        """Specs and schemas are read from disk; the catalog exists only in memory."""
+        inputs = write_inputs(LocalFileBackend(), temp_path)
+        fs = MemoryFileBackend(LocalFileBackend())
+
+        importer = AsyncAPIImporter(**inputs, fs=fs)
+        importer.import_all()
+
+        assert not inputs["eventcatalog_dir"].exists()
+        page = inputs["eventcatalog_dir"] / "domains/digital-letters/subdomains/group/index.mdx"
+        assert "  - id: service-0" in fs.read_text(page)
+        report = importer.run_report()
+        assert report["planned_changes"]["copy"] == 2 * SERVICES
+        # Pages written twice, before and after their relationships, are planned once:
+        # the parent domain, the subdomain, and a service, event and channel per spec
+        assert report["planned_changes"]["write"] == 2 + 3 * SERVICES < report["files_written"]
+
+    def test_without_disk(self):
+        """A backend with no base runs the whole import in memory."""
+        fs = MemoryFileBackend()
+        inputs = write_inputs(fs, Path("/virtual"))
+
+        AsyncAPIImporter(**inputs, fs=fs).import_all()
+
+        event_dir = inputs["eventcatalog_dir"] / \
+            "domains/digital-letters/subdomains/group/services/service-1/events/event1"
+        assert fs.read_text(event_dir / "uk.nhs.event1.v1.schema.json") == '{"type": "object"}'
+        assert "schemaPath: uk.nhs.event1.v1.bundle.schema.json" in fs.read_text(event_dir / "index.mdx")
+        assert not Path("/virtual").exists()
+
+    def test_existing_catalog_unchanged(self, temp_path):
+        """Planning an import the catalog already holds plans no changes."""
+        inputs = write_inputs(LocalFileBackend(), temp_path)
+        AsyncAPIImporter(**inputs).import_all()
+        fs = MemoryFileBackend(LocalFileBackend())
+
+        AsyncAPIImporter(**inputs, fs=fs).import_all()
+
+        assert fs.plan() == []
+
+
+class TestFlush:
+    """Test flushing an in-memory import to disk."""
+
+    @pytest.mark.parametrize("io_workers", [0, 4])
+    def test_flush_matches_direct_import(self, temp_path, io_workers, catalog_tree):
+        """Flushing gives the catalog a direct import writes."""
+        inputs = write_inputs(LocalFileBackend(), temp_path)
+        AsyncAPIImporter(**{**inputs, "eventcatalog_dir": temp_path / "direct"}).import_all()
+        fs = MemoryFileBackend(LocalFileBackend())
+        AsyncAPIImporter(**inputs, io_workers=io_workers, fs=fs).import_all()
+
+        with IOExecutor(io_workers) as executor:
+            counts = fs.flush(LocalFileBackend(), executor)
+
+        direct = catalog_tree(temp_path / "direct", with_links=True)
+        assert catalog_tree(inputs["eventcatalog_dir"], with_links=True) == direct
+        assert counts["copy"] == 2 * SERVICES
+
+    def test_flush_versioned_releases(self, temp_path, catalog_tree):
+        """Moves and links made arranging event versions are applied as a direct run makes them."""
+        for catalog, fs in (("direct", None), ("flushed", MemoryFileBackend(LocalFileBackend()))):
+            for release in ("2025-10-draft", "2026-01"):
+                inputs = write_inputs(LocalFileBackend(), temp_path / catalog, release)
+                AsyncAPIImporter(**inputs, versioned_events=True, fs=fs).import_all()
+                if fs is not None:
+                    fs.flush(LocalFileBackend())
+
+        direct = catalog_tree(temp_path / "direct" / "catalog", with_links=True)
+        assert catalog_tree(temp_path / "flushed" / "catalog", with_links=True) == direct
+        assert any(nlink > 1 for _, nlink in direct.values())
+
+    def test_cli_dry_run(self, temp_path, capsys):
+        """--dry-run prints the plan and reports it, writing no catalog."""
+        inputs = write_inputs(LocalFileBackend(), temp_path)
+        report_path = temp_path / "report.json"
+        argv = ["import_asyncapi.py", "--asyncapi-dir", str(inputs["asyncapi_dir"]),
+                "--eventcatalog-dir", str(inputs["eventcatalog_dir"]),
+                "--schema-base-path", str(inputs["schema_base_path"]),
+                "--dry-run", "--verbose", "--report", str(report_path)]
+
+        with patch.object(sys, "argv", argv):
+            main()
+
+        out = capsys.readouterr().out
+        assert "Dry run, nothing was written" in out
+        assert f"copy {inputs['eventcatalog_dir']}" in out
+        assert not inputs["eventcatalog_dir"].exists()
+        assert json.loads(report_path.read_text())["planned_changes"]["copy"] == 2 * SERVICES
+
+    def test_cli_staged(self, temp_path, catalog_tree, capsys):
+        """--staged writes the catalog a direct import writes, in one pass after the import."""
+        inputs = write_inputs(LocalFileBackend(), temp_path)
+        AsyncAPIImporter(**{**inputs, "eventcatalog_dir": temp_path / "direct"}).import_all()
+        argv = ["import_asyncapi.py", "--asyncapi-dir", str(inputs["asyncapi_dir"]),
+                "--eventcatalog-dir", str(inputs["eventcatalog_dir"]),
+                "--schema-base-path", str(inputs["schema_base_path"]), "--staged"]
+
+        with patch.object(sys, "argv", argv):
+            main()
+
+        assert f"copy: {2 * SERVICES}" in capsys.readouterr().out
+        direct = catalog_tree(temp_path / "direct", with_links=True)
+        assert catalog_tree(inputs["eventcatalog_dir"], with_links=True) == direct
+
+    def test_cli_staged_failure_writes_nothing(self, temp_path):
+        """An import that fails under --staged leaves the catalog untouched."""
+        inputs = write_inputs(LocalFileBackend(), temp_path)
+        argv = ["import_asyncapi.py", "--asyncapi-dir", str(inputs["asyncapi_dir"]),
+                "--eventcatalog-dir", str(inputs["eventcatalog_dir"]),
+                "--schema-base-path", str(inputs["schema_base_path"]), "--staged"]
+        update = AsyncAPIImporter.update_service_relationships
+
+        def fail_after_writing(importer):
+            update(importer)
+            raise RuntimeError("interrupted")
+
+        with patch.object(sys, "argv", argv):
+            with patch.object(AsyncAPIImporter, "update_service_relationships", fail_after_writing):
+                with pytest.raises(SystemExit):
+                    main()
+
+        assert not inputs["eventcatalog_dir"].exists()
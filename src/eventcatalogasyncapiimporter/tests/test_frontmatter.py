@@ -0,0 +1,182 @@
+"""
+Tests for the parsed frontmatter model used by the relationship updates.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from import_asyncapi import AsyncAPIImporter, Frontmatter, RefSet
+
+SERVICE_PAGE = """---
+id: mesh-poller
+name: MESH Poller
+version: 1.0.0
+summary: |
+    AsyncAPI specification for MESH Poller
+
+    Second paragraph
+owners:
+  - Tom D'Roza
+
+receives:
+  - id: timerexpired
+    version: 1.0.0
+
+sends:
+  - id: inboxmessagereceived
+    version: 1.0.0
+---
+
+# MESH Poller
+
+---
+
+Body text after a rule.
+"""
+
+
+def ref(event_id: str, version: str = "1.0.0") -> dict:
+    return {"id": event_id, "version": version}
+
+
+class TestFrontmatter:
+    """Test parsing, updating and rendering frontmatter."""
+
+    def test_round_trip(self):
+        """Rendering an unchanged page gives back the same text."""
+        assert Frontmatter.parse(SERVICE_PAGE).render() == SERVICE_PAGE
+
+    def test_parses_relationships(self):
+        """Relationship lists become RefSets; other keys are kept as text."""
+        page = Frontmatter.parse(SERVICE_PAGE)
+
+        assert list(page.get_refs("receives")) == [ref("timerexpired")]
+        assert list(page.get_refs("sends")) == [ref("inboxmessagereceived")]
+        assert not page.get_refs("services")
+        assert [key for key, _ in page.blocks] == ["id", "name", "version", "summary", "owners"]
+        assert page.body.startswith("\n\n# MESH Poller\n\n---\n")
+
+    def test_merge_keeps_existing_first(self):
+        """Merged references follow the existing ones, without duplicates."""
+        page = Frontmatter.parse(SERVICE_PAGE)
+
+        assert page.merge_refs("sends", RefSet([ref("inboxmessagereceived"), ref("inboxmessagereceived", "2.0.0")]))
+        assert not page.merge_refs("receives", RefSet([ref("timerexpired")]))
+
+        frontmatter = yaml.safe_load(page.render().split("---\n")[1])
+        assert frontmatter["sends"] == [ref("inboxmessagereceived"), ref("inboxmessagereceived", "2.0.0")]
+        assert frontmatter["receives"] == [ref("timerexpired")]
+
+    def test_set_replaces_and_empty_removes(self):
+        """Setting a list replaces it; an empty list removes the key and its blank line."""
+        page = Frontmatter.parse(SERVICE_PAGE)
+        page.set_refs("receives", RefSet())
+        page.set_refs("sends", RefSet([ref("other")]))
+
+        rendered = page.render()
+
+        assert "receives:" not in rendered
+        assert "owners:\n  - Tom D'Roza\n\nsends:\n  - id: other\n    version: 1.0.0\n---\n" in rendered
+
+    def test_relationships_in_the_middle(self):
+        """A hand-placed list is moved after the other keys, which keep their text."""
+        content = "---\nid: a\nservices:\n  - id: old\n    version: 1.0.0\nbadges:\n  - content: New\n---\nBody\n"
+        page = Frontmatter.parse(content)
+        page.set_refs("services", RefSet([ref("new")]))
+
+        assert page.render() == (
+            "---\nid: a\nbadges:\n  - content: New\n\nservices:\n  - id: new\n    version: 1.0.0\n---\nBody\n")
+
+    @pytest.mark.parametrize("content", ["No frontmatter\n", "---\nid: a\n", "--- \nid: a\n---\n"])
+    def test_no_frontmatter(self, content):
+        """Pages without an opening and closing --- line are left to the caller."""
+        assert Frontmatter.parse(content) is None
+
+
+class TestRelationshipUpdates:
+    """Test re-importing over pages that already have relationships."""
+
+    def write_specs(self, asyncapi_dir: Path, services, events=("Sent",)) -> None:
+        for spec_file in asyncapi_dir.glob("*.yaml"):
+            spec_file.unlink()
+        for name in services:
+            spec = {
+                "asyncapi": "3.0.0",
+                "info": {"title": f"NHS Notify Digital Letters - {name}", "version": "1.0.0",
+                         "x-service-metadata": {"parent": "Letters"}},
+                "channels": {"c": {"address": "c",
+                                   "messages": {f"{name}{event}": {"summary": event} for event in events}}},
+                "operations": {"send": {"action": "send", "channel": {"$ref": "#/channels/c"}}},
+            }
+            (asyncapi_dir / f"asyncapi-{name.lower()}.yaml").write_text(yaml.dump(spec))
+
+    @pytest.fixture
+    def import_services(self, temp_path, run_import):
+        """Return a helper writing one spec per service name and importing them."""
+        def run(services, events=("Sent",)) -> AsyncAPIImporter:
+            asyncapi_dir = temp_path / "asyncapi"
+            asyncapi_dir.mkdir(exist_ok=True)
+            self.write_specs(asyncapi_dir, services, events)
+            return run_import(asyncapi_dir, temp_path / "catalog")
+        return run
+
+    def pages(self, temp_path: Path) -> dict:
+        root = temp_path / "catalog" / "domains"
+        return {str(p.relative_to(root)): p.read_text() for p in sorted(root.rglob("index.mdx"))}
+
+    def test_reimport_is_stable(self, temp_path, import_services):
+        """Importing the same specs again leaves every page as it was."""
+        import_services(["Sender", "Printer"])
+        first = self.pages(temp_path)
+
+        import_services(["Sender", "Printer"])
+
+        assert self.pages(temp_path) == first
+
+    def test_reimport_writes_nothing(self, temp_path, import_services):
+        """A re-import of the same specs writes no page, service pages included."""
+        import_services(["Sender", "Printer"])
+
+        importer = import_services(["Sender", "Printer"])
+
+        assert importer.run_report()["files_written"] == 0
+        service = temp_path / "catalog/domains/digital-letters/subdomains/letters/services/sender/index.mdx"
+        frontmatter = yaml.safe_load(service.read_text().split("---\n")[1])
+        assert [s["id"] for s in frontmatter["sends"]] == ["sendersent"]
+
+    def test_removed_event_drops_out(self, temp_path, import_services):
+        """An event no longer in a service's spec is removed from its sends."""
+        import_services(["Sender"], events=("Sent", "Failed"))
+
+        importer = import_services(["Sender"], events=("Sent",))
+
+        service = temp_path / "catalog/domains/digital-letters/subdomains/letters/services/sender/index.mdx"
+        frontmatter = yaml.safe_load(service.read_text().split("---\n")[1])
+        assert frontmatter["sends"] == [ref("sendersent")]
+        assert importer.run_report()["relationship_patches"] == 1
+
+    def test_removed_service_drops_out(self, temp_path, import_services):
+        """A service no longer imported is removed from its subdomain's list."""
+        import_services(["Sender", "Printer"])
+
+        import_services(["Sender"])
+
+        subdomain = temp_path / "catalog/domains/digital-letters/subdomains/letters/index.mdx"
+        frontmatter = yaml.safe_load(subdomain.read_text().split("---\n")[1])
+        assert frontmatter["services"] == [ref("sender")]
+
+    def test_hand_edits_kept(self, temp_path, import_services):
+        """Keys added by hand to a subdomain page survive a re-import."""
+        import_services(["Sender"])
+        subdomain = temp_path / "catalog/domains/digital-letters/subdomains/letters/index.mdx"
+        subdomain.write_text(subdomain.read_text().replace("\nservices:", "badges:\n  - content: Core\n\nservices:"))
+
+        import_services(["Sender", "Printer"])
+
+        frontmatter = yaml.safe_load(subdomain.read_text().split("---\n")[1])
+        assert frontmatter["badges"] == [{"content": "Core"}]
+        assert sorted(s["id"] for s in frontmatter["services"]) == ["printer", "sender"]
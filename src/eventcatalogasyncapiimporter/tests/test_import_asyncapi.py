@@ -12,8 +12,8 @@ Tests cover all functionality including:
 - Error handling and edge cases
 """
 
+import json
 import sys
-import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
@@ -25,24 +25,6 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from import_asyncapi import AsyncAPIImporter
 
 
-@pytest.fixture
-def temp_dirs():
-    """Create temporary directories for testing."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        asyncapi_dir = temp_path / "asyncapi"
-        eventcatalog_dir = temp_path / "eventcatalog"
-
-        asyncapi_dir.mkdir()
-        eventcatalog_dir.mkdir()
-
-        yield {
-            "temp_dir": temp_path,
-            "asyncapi_dir": asyncapi_dir,
-            "eventcatalog_dir": eventcatalog_dir,
-        }
-
-
 @pytest.fixture
 def sample_asyncapi():
     """Sample AsyncAPI specification for testing."""
@@ -281,6 +263,69 @@ class TestFileLoading:
         assert data is None
 
 
+class TestJsonSpecs:
+    """Test loading JSON specs and preferring them over YAML."""
+
+    def test_load_json_asyncapi_file(self, temp_dirs, sample_asyncapi):
+        """Test loading a JSON AsyncAPI file."""
+        importer = AsyncAPIImporter(
+            temp_dirs["asyncapi_dir"],
+            temp_dirs["eventcatalog_dir"],
+        )
+        json_file = temp_dirs["asyncapi_dir"] / "asyncapi-test-service.json"
+        json_file.write_text(json.dumps(sample_asyncapi))
+
+        data = importer.load_asyncapi_file(json_file)
+
+        assert data == sample_asyncapi
+
+    def test_load_invalid_json_file(self, temp_dirs):
+        """Test loading an invalid JSON file returns None."""
+        importer = AsyncAPIImporter(
+            temp_dirs["asyncapi_dir"],
+            temp_dirs["eventcatalog_dir"],
+        )
+        invalid_file = temp_dirs["asyncapi_dir"] / "asyncapi-invalid.json"
+        invalid_file.write_text("{not json")
+
+        assert importer.load_asyncapi_file(invalid_file) is None
+
+    def test_find_asyncapi_files_prefers_json(self, temp_dirs):
+        """Test that the .json sibling is chosen when both formats exist."""
+        asyncapi_dir = temp_dirs["asyncapi_dir"]
+        for name in (
+            "asyncapi-both.yaml",
+            "asyncapi-both.json",
+            "asyncapi-yaml-only.yaml",
+            "asyncapi-json-only.json",
+            "other.json",
+        ):
+            (asyncapi_dir / name).write_text("{}")
+        importer = AsyncAPIImporter(asyncapi_dir, temp_dirs["eventcatalog_dir"])
+
+        files = importer.find_asyncapi_files()
+
+        assert [f.name for f in files] == [
+            "asyncapi-both.json",
+            "asyncapi-json-only.json",
+            "asyncapi-yaml-only.yaml",
+        ]
+
+    def test_import_uses_json_sibling(self, temp_dirs, sample_asyncapi_file, sample_asyncapi):
+        """Test that import_all parses the JSON sibling and not the YAML file."""
+        json_spec = dict(sample_asyncapi)
+        json_spec["info"] = dict(sample_asyncapi["info"], title="NHS Notify Digital Letters - JSON Service")
+        sample_asyncapi_file.with_suffix(".json").write_text(json.dumps(json_spec))
+        importer = AsyncAPIImporter(
+            temp_dirs["asyncapi_dir"],
+            temp_dirs["eventcatalog_dir"],
+        )
+
+        importer.import_all()
+
+        assert importer.created_services == {"json-service"}
+
+
 class TestNameSanitization:
     """Test name sanitization for file paths and IDs."""
 
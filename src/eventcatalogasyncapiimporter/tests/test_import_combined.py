@@ -0,0 +1,162 @@
+"""
+Tests for importing the whole catalog from asyncapi-all in one parse.
+
+Builds per-service specs and the matching combined spec the generator would
+write, then checks both import modes produce the same EventCatalog tree.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from import_asyncapi import AsyncAPIImporter, main
+
+SERVICES = {
+    "MESH Poller": {"parent": "MESH Services", "sends": ["a", "b"], "receives": ["c"]},
+    "PDM Poller": {"parent": "PDM Services", "sends": ["c"], "receives": ["a", "c"]},
+}
+
+
+def channel(event: str) -> dict:
+    return {
+        "address": f"uk/nhs/notify/{event}/v1",
+        "messages": {
+            f"Event{event.upper()}": {
+                "name": f"Event{event.upper()}",
+                "summary": f"Event: uk.nhs.notify.{event}.v1",
+                "description": f"Event {event}.",
+                "contentType": "application/cloudevents+json",
+                "payload": {"$ref": f"https://example.com/{event}.schema.json"},
+            }
+        },
+    }
+
+
+def operation(action: str, event: str) -> dict:
+    channel_id = f"uk_nhs_notify_{event}_v1"
+    return {
+        "action": action,
+        "channel": {"$ref": f"#/channels/{channel_id}"},
+        "messages": [{"$ref": f"#/channels/{channel_id}/messages/Event{event.upper()}"}],
+    }
+
+
+def metadata(title: str) -> dict:
+    return {"c4type": "code", "owner": "Team", "author": "Team", "parent": SERVICES[title]["parent"]}
+
+
+def write_specs(asyncapi_dir: Path) -> None:
+    """Write per-service specs and the combined spec for SERVICES."""
+    combined = {
+        "asyncapi": "3.0.0",
+        "info": {"title": "NHS Notify Digital Letters", "version": "2025-10-draft"},
+        "channels": {},
+        "operations": {},
+        "x-services": {},
+    }
+    for title, service in SERVICES.items():
+        spec = {
+            "asyncapi": "3.0.0",
+            "info": {
+                "title": f"NHS Notify Digital Letters - {title}",
+                "version": "2025-10-draft",
+                "description": f"AsyncAPI specification for {title}",
+                "x-service-metadata": metadata(title),
+            },
+            "channels": {},
+            "operations": {},
+        }
+        owned = []
+        slug = title.lower().replace(" ", "_")
+        for action, key in (("send", "sends"), ("receive", "receives")):
+            for event in service[key]:
+                channel_id = f"uk_nhs_notify_{event}_v1"
+                spec["channels"].setdefault(channel_id, channel(event))
+                spec["operations"][f"{action}_{channel_id}"] = operation(action, event)
+                combined["channels"][channel_id] = channel(event)
+                combined["operations"][f"{action}_{channel_id}_by_{slug}"] = operation(action, event)
+                owned.append(f"{action}_{channel_id}_by_{slug}")
+        combined["x-services"][title] = {
+            "description": f"AsyncAPI specification for {title}",
+            "x-service-metadata": metadata(title),
+            "operations": owned,
+        }
+        (asyncapi_dir / f"asyncapi-{title.lower().replace(' ', '-')}.yaml").write_text(
+            yaml.dump(spec, sort_keys=False))
+
+    # Stable operation IDs sort receives before sends
+    combined["operations"] = dict(sorted(combined["operations"].items()))
+    (asyncapi_dir / "asyncapi-all.yaml").write_text(yaml.dump(combined, sort_keys=False))
+
+
+@pytest.fixture
+def asyncapi_dir(temp_path):
+    asyncapi_dir = temp_path / "asyncapi"
+    asyncapi_dir.mkdir()
+    write_specs(asyncapi_dir)
+    return asyncapi_dir
+
+
+class TestImportCombined:
+    """Test the one-parse combined import mode."""
+
+    def test_same_tree_as_per_service_import(self, asyncapi_dir, run_import, catalog_tree):
+        """Both modes write identical catalogs."""
+        per_service = run_import(asyncapi_dir, asyncapi_dir.parent / "per-service")
+        combined = run_import(asyncapi_dir, asyncapi_dir.parent / "combined", from_combined=True)
+
+        assert catalog_tree(asyncapi_dir.parent / "combined") == catalog_tree(asyncapi_dir.parent / "per-service")
+        assert combined.created_events == per_service.created_events
+        assert combined.instrumentation.counters["files_read"] < per_service.instrumentation.counters["files_read"]
+
+    def test_parses_only_combined_file(self, asyncapi_dir):
+        """Only asyncapi-all is loaded."""
+        importer = AsyncAPIImporter(asyncapi_dir, asyncapi_dir.parent / "catalog", from_combined=True)
+
+        with patch.object(importer, "load_asyncapi_file", wraps=importer.load_asyncapi_file) as load:
+            importer.import_all()
+
+        assert [call.args[0].name for call in load.call_args_list] == ["asyncapi-all.yaml"]
+
+    def test_service_views(self, asyncapi_dir):
+        """Each view holds only the service's own channels and operations."""
+        importer = AsyncAPIImporter(asyncapi_dir, asyncapi_dir.parent / "catalog")
+        combined = yaml.safe_load((asyncapi_dir / "asyncapi-all.yaml").read_text())
+
+        views = importer.service_views(combined)
+
+        assert [view["info"]["title"] for view in views] == ["MESH Poller", "PDM Poller"]
+        pdm = views[1]
+        assert list(pdm["operations"]) == [
+            "send_uk_nhs_notify_c_v1_by_pdm_poller",
+            "receive_uk_nhs_notify_a_v1_by_pdm_poller",
+            "receive_uk_nhs_notify_c_v1_by_pdm_poller",
+        ]
+        assert list(pdm["channels"]) == ["uk_nhs_notify_c_v1", "uk_nhs_notify_a_v1"]
+        assert pdm["info"]["x-service-metadata"]["parent"] == "PDM Services"
+
+    def test_falls_back_without_x_services(self, asyncapi_dir, run_import):
+        """A combined spec without x-services is ignored in favour of the per-service files."""
+        combined_file = asyncapi_dir / "asyncapi-all.yaml"
+        combined = yaml.safe_load(combined_file.read_text())
+        del combined["x-services"]
+        combined_file.write_text(yaml.dump(combined))
+
+        importer = run_import(asyncapi_dir, asyncapi_dir.parent / "catalog", from_combined=True)
+
+        assert importer.created_services == {"mesh-poller", "pdm-poller"}
+
+    def test_cli_flag(self, asyncapi_dir):
+        """--from-combined is passed to the importer."""
+        argv = ["import_asyncapi.py", "--asyncapi-dir", str(asyncapi_dir),
+                "--eventcatalog-dir", str(asyncapi_dir.parent / "catalog"), "--from-combined"]
+
+        with patch.object(sys, "argv", argv):
+            with patch("import_asyncapi.AsyncAPIImporter") as importer:
+                main()
+
+        assert importer.call_args.kwargs["from_combined"] is True
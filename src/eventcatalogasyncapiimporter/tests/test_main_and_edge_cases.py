@@ -9,8 +9,8 @@ Tests cover:
 - Deprecated flags
 """
 
+import json
 import sys
-import tempfile
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
@@ -22,24 +22,6 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from import_asyncapi import main, AsyncAPIImporter
 
 
-@pytest.fixture
-def temp_dirs():
-    """Create temporary directories for testing."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        asyncapi_dir = temp_path / "asyncapi"
-        eventcatalog_dir = temp_path / "eventcatalog"
-
-        asyncapi_dir.mkdir()
-        eventcatalog_dir.mkdir()
-
-        yield {
-            "temp_dir": temp_path,
-            "asyncapi_dir": asyncapi_dir,
-            "eventcatalog_dir": eventcatalog_dir,
-        }
-
-
 class TestMainFunction:
     """Test main() function and CLI interface."""
 
@@ -135,6 +117,162 @@ class TestMainFunction:
             assert exc_info.value.code == 1
 
 
+    def test_main_with_profile(self, temp_dirs):
+        """Test main() with --profile writes a cProfile dump and timing summary."""
+        asyncapi_data = {
+            "asyncapi": "3.0.0",
+            "info": {"title": "NHS Notify Digital Letters - Test Service", "version": "1.0.0"},
+        }
+        with open(temp_dirs["asyncapi_dir"] / "asyncapi-test.yaml", "w") as f:
+            yaml.dump(asyncapi_data, f)
+        profile_dir = temp_dirs["temp_dir"] / "profile"
+
+        test_args = [
+            "import_asyncapi.py",
+            "--asyncapi-dir", str(temp_dirs["asyncapi_dir"]),
+            "--eventcatalog-dir", str(temp_dirs["eventcatalog_dir"]),
+            "--profile", str(profile_dir),
+        ]
+
+        with patch.object(sys, 'argv', test_args):
+            main()
+
+        assert (profile_dir / "eventcatalogasyncapiimporter.prof").exists()
+        timings = json.loads(
+            (profile_dir / "eventcatalogasyncapiimporter-timings.json").read_text())
+        assert timings["spans"]["parse"]["count"] == 1
+        assert timings["counters"]["files_written"] > 0
+
+
+class TestInstrumentation:
+    """Test span and counter recording during import."""
+
+    def test_import_records_file_operations(self, temp_dirs):
+        """Test that reads, writes, copies and skips are counted."""
+        schema_base = temp_dirs["temp_dir"] / "schema-base"
+        schema_dir = schema_base / "schemas"
+        schema_dir.mkdir(parents=True)
+        (schema_dir / "event.schema.json").write_text('{"type": "object"}')
+
+        asyncapi_data = {
+            "asyncapi": "3.0.0",
+            "info": {"title": "NHS Notify Digital Letters - Test Service", "version": "1.0.0"},
+            "channels": {
+                "test_channel": {
+                    "address": "test/channel",
+                    "messages": {
+                        "TestEvent": {
+                            "payload": {
+                                "$ref": "https://notify.nhs.uk/cloudevents/schemas/event.schema.json"
+                            }
+                        }
+                    },
+                }
+            },
+            "operations": {
+                "send_test": {"action": "send", "channel": {"$ref": "#/channels/test_channel"}},
+            },
+        }
+        with open(temp_dirs["asyncapi_dir"] / "asyncapi-test.yaml", "w") as f:
+            yaml.dump(asyncapi_data, f)
+        with open(temp_dirs["asyncapi_dir"] / "asyncapi-all.yaml", "w") as f:
+            yaml.dump(asyncapi_data, f)
+
+        importer = AsyncAPIImporter(
+            temp_dirs["asyncapi_dir"],
+            temp_dirs["eventcatalog_dir"],
+            schema_base_path=schema_base,
+        )
+        importer.import_all()
+
+        summary = importer.instrumentation.summary()
+        for span in ("load", "parse", "render", "write", "copy", "relationships"):
+            assert summary["spans"][span]["count"] > 0
+        assert summary["counters"]["files_copied"] == 1
+        assert summary["counters"]["bytes_copied"] == len('{"type": "object"}')
+        # asyncapi-all.yaml is skipped
+        assert summary["counters"]["files_skipped"] >= 1
+
+
+class TestBackgroundIO:
+    """Test copies and writes queued on the I/O executor."""
+
+    def write_catalog_inputs(self, temp_dirs, services=3):
+        schema_base = temp_dirs["temp_dir"] / "schema-base"
+        schema_dir = schema_base / "schemas"
+        schema_dir.mkdir(parents=True)
+        for n in range(services):
+            (schema_dir / f"event{n}.schema.json").write_text('{"type": "object"}')
+            (schema_dir / f"event{n}.bundle.schema.json").write_text('{"type": "object", "bundled": true}')
+            spec = {
+                "asyncapi": "3.0.0",
+                "info": {"title": f"NHS Notify Digital Letters - Service {n}", "version": "1.0.0",
+                         "x-service-metadata": {"parent": "Group"}},
+                "channels": {f"channel{n}": {"address": f"c/{n}", "messages": {f"Event{n}": {
+                    "payload": {"$ref": f"https://notify.nhs.uk/cloudevents/schemas/event{n}.schema.json"}
+                }}}},
+                "operations": {f"send_{n}": {"action": "send", "channel": {"$ref": f"#/channels/channel{n}"}}},
+            }
+            with open(temp_dirs["asyncapi_dir"] / f"asyncapi-service-{n}.yaml", "w") as f:
+                yaml.dump(spec, f)
+        return schema_base
+
+    def catalog(self, root: Path) -> dict:
+        return {str(p.relative_to(root)): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+    def test_threaded_matches_inline(self, temp_dirs):
+        """Test that queued copies and writes give the same catalog as inline ones."""
+        schema_base = self.write_catalog_inputs(temp_dirs)
+        inline_dir = temp_dirs["temp_dir"] / "inline"
+        threaded_dir = temp_dirs["temp_dir"] / "threaded"
+
+        AsyncAPIImporter(temp_dirs["asyncapi_dir"], inline_dir, schema_base_path=schema_base).import_all()
+        threaded = AsyncAPIImporter(temp_dirs["asyncapi_dir"], threaded_dir,
+                                    schema_base_path=schema_base, io_workers=4)
+        threaded.import_all()
+
+        assert self.catalog(threaded_dir) == self.catalog(inline_dir)
+        assert threaded.instrumentation.counters["files_copied"] == 6
+
+    def test_failures_reported_after_rendering(self, temp_dirs, capsys):
+        """Test that failed copies are logged together and do not stop the import."""
+        schema_base = self.write_catalog_inputs(temp_dirs)
+        importer = AsyncAPIImporter(temp_dirs["asyncapi_dir"], temp_dirs["eventcatalog_dir"],
+                                    schema_base_path=schema_base, io_workers=2)
+
+        def failing_copy(source, destination):
+            raise OSError("disk unavailable")
+
+        with patch.object(importer, "_copy_file_now", failing_copy):
+            importer.import_all()
+
+        out = capsys.readouterr().out
+        assert out.count("disk unavailable") == 6
+        assert "Failed copies/writes: 6" in out
+        assert len(importer.created_services) == 3
+
+    def test_read_waits_for_queued_write(self, temp_dirs):
+        """Test that reading a file back sees a write still in the queue."""
+        importer = AsyncAPIImporter(temp_dirs["asyncapi_dir"], temp_dirs["eventcatalog_dir"], io_workers=2)
+        target = temp_dirs["eventcatalog_dir"] / "index.mdx"
+
+        importer._write_text(target, "first")
+        importer._write_text(target, "second")
+
+        assert importer._read_text(target) == "second"
+
+    def test_cli_io_workers(self, temp_dirs):
+        """Test that --io-workers is passed to the importer."""
+        argv = ["import_asyncapi.py", "--asyncapi-dir", str(temp_dirs["asyncapi_dir"]),
+                "--eventcatalog-dir", str(temp_dirs["eventcatalog_dir"]), "--io-workers", "0"]
+
+        with patch.object(sys, "argv", argv):
+            with patch("import_asyncapi.AsyncAPIImporter") as importer:
+                main()
+
+        assert importer.call_args.kwargs["io_workers"] == 0
+
+
 class TestEventWithSchemaFiles:
     """Test event creation with schema file copying."""
 
@@ -232,6 +370,39 @@ class TestEventWithSchemaFiles:
         copied_schema = event_dir / "schema.json"
         assert copied_schema.exists()
 
+    def test_event_with_bundled_schema_uses_schema_url(self, temp_dirs):
+        """Test that x-schema-url is copied when the payload points at components."""
+        schema_base = temp_dirs["temp_dir"] / "schemas"
+        schema_dir = schema_base / "test"
+        schema_dir.mkdir(parents=True)
+        (schema_dir / "schema.json").write_text('{"type": "object"}')
+
+        importer = AsyncAPIImporter(
+            temp_dirs["asyncapi_dir"],
+            temp_dirs["eventcatalog_dir"],
+            schema_base_path=schema_base,
+        )
+        subdomain_path = importer.create_subdomain_structure("Test SubDomain")
+        service_path = importer.create_service_structure(
+            subdomain_path, "Test Service", {"info": {"title": "Test Service", "version": "1.0.0"}}
+        )
+
+        message_data = {
+            "name": "TestEvent",
+            "payload": {"$ref": "#/components/schemas/test.schema"},
+            "x-schema-url": "https://notify.nhs.uk/cloudevents/test/schema.json",
+        }
+
+        importer.create_event_structure(
+            service_path,
+            "TestEvent",
+            "test/channel",
+            message_data,
+            "send"
+        )
+
+        assert (service_path / "events" / "testevent" / "schema.json").exists()
+
 
 class TestEdgeCases:
     """Test edge cases and error conditions."""
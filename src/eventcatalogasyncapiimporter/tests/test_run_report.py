@@ -0,0 +1,120 @@
+"""
+Tests for the importer run report written by --report.
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from import_asyncapi import AsyncAPIImporter, main
+
+SERVICES = 3
+
+
+@pytest.fixture
+def inputs(temp_path):
+    """Write SERVICES one-event specs, each with an envelope and a bundled schema."""
+    asyncapi_dir = temp_path / "asyncapi"
+    schema_dir = temp_path / "schema-base" / "schemas"
+    asyncapi_dir.mkdir()
+    schema_dir.mkdir(parents=True)
+    for n in range(SERVICES):
+        (schema_dir / f"event{n}.schema.json").write_text('{"type": "object"}')
+        (schema_dir / f"event{n}.bundle.schema.json").write_text('{"type": "object", "bundled": true}')
+        spec = {
+            "asyncapi": "3.0.0",
+            "info": {"title": f"NHS Notify Digital Letters - Service {n}", "version": "1.0.0",
+                     "x-service-metadata": {"parent": "Group"}},
+            "channels": {f"channel{n}": {"address": f"c/{n}", "messages": {f"Event{n}": {
+                "payload": {"$ref": f"https://notify.nhs.uk/cloudevents/schemas/event{n}.schema.json"}
+            }}}},
+            "operations": {f"send_{n}": {"action": "send", "channel": {"$ref": f"#/channels/channel{n}"}}},
+        }
+        (asyncapi_dir / f"asyncapi-service-{n}.yaml").write_text(yaml.dump(spec))
+    return {
+        "temp_dir": temp_path,
+        "asyncapi_dir": asyncapi_dir,
+        "eventcatalog_dir": temp_path / "eventcatalog",
+        "schema_base": temp_path / "schema-base",
+    }
+
+
+@pytest.fixture
+def import_inputs(inputs, run_import):
+    """Return a helper importing the inputs into their catalog with io_workers I/O threads."""
+    def run(io_workers: int = 0) -> AsyncAPIImporter:
+        return run_import(inputs["asyncapi_dir"], inputs["eventcatalog_dir"],
+                          schema_base_path=inputs["schema_base"], io_workers=io_workers)
+    return run
+
+
+class TestRunReport:
+    """Test the file operation statistics in the run report."""
+
+    def test_fresh_catalog(self, import_inputs):
+        """Every page is written and every schema copied."""
+        report = import_inputs().run_report()
+
+        assert report["services_created"] == SERVICES
+        assert report["events_created"] == SERVICES
+        assert report["files_written"] > 0
+        assert report["files_unchanged"] == 0
+        assert report["schema_files_copied"] == 2 * SERVICES
+        assert report["schema_files_deduplicated"] == 0
+        assert report["schema_bytes_copied"] == SERVICES * (
+            len('{"type": "object"}') + len('{"type": "object", "bundled": true}'))
+        # Parent domain, one subdomain and each service
+        assert report["relationship_patches"] == 1 + 1 + SERVICES
+        assert report["io_failures"] == 0
+        for phase in ("load", "parse", "render", "write", "copy", "relationships", "io_wait"):
+            assert report["phases"][phase] >= 0
+
+    @pytest.mark.parametrize("io_workers", [0, 4])
+    def test_reimport_skips_unchanged_files(self, inputs, import_inputs, io_workers):
+        """A second import over the same catalog copies no schemas and leaves identical pages alone."""
+        import_inputs()
+        channel_page = inputs["eventcatalog_dir"] / "channels" / "channel0" / "index.mdx"
+        mtime = channel_page.stat().st_mtime_ns
+
+        report = import_inputs(io_workers).run_report()
+
+        assert report["schema_files_copied"] == 0
+        assert report["schema_bytes_copied"] == 0
+        assert report["schema_files_deduplicated"] == 2 * SERVICES
+        assert report["files_unchanged"] > 0
+        assert report["files_written"] == 0
+        # Relationships already on the pages are not counted as patches
+        assert report["relationship_patches"] == 0
+        assert channel_page.stat().st_mtime_ns == mtime
+
+    def test_changed_schema_is_copied(self, inputs, import_inputs):
+        """A schema edited since the last import is copied again."""
+        import_inputs()
+        (inputs["schema_base"] / "schemas" / "event0.schema.json").write_text('{"type": "string"}')
+
+        report = import_inputs().run_report()
+
+        assert report["schema_files_copied"] == 1
+        assert report["schema_files_deduplicated"] == 2 * SERVICES - 1
+        copied = next(inputs["eventcatalog_dir"].rglob("event0.schema.json"))
+        assert copied.read_text() == '{"type": "string"}'
+
+    def test_cli_report(self, inputs):
+        """--report writes the report as JSON."""
+        report_path = inputs["temp_dir"] / "reports" / "import.json"
+        argv = ["import_asyncapi.py", "--asyncapi-dir", str(inputs["asyncapi_dir"]),
+                "--eventcatalog-dir", str(inputs["eventcatalog_dir"]),
+                "--schema-base-path", str(inputs["schema_base"]), "--report", str(report_path)]
+
+        with patch.object(sys, "argv", argv):
+            main()
+
+        report = json.loads(report_path.read_text())
+        assert report["tool"] == "eventcatalogasyncapiimporter"
+        assert report["schema_files_copied"] == 2 * SERVICES
+        assert report["wall_seconds"] > 0
@@ -9,7 +9,6 @@ Tests cover:
 """
 
 import sys
-import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
@@ -18,25 +17,7 @@ import yaml
 
 # Import the importer class
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from import_asyncapi import AsyncAPIImporter
-
-
-@pytest.fixture
-def temp_dirs():
-    """Create temporary directories for testing."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        asyncapi_dir = temp_path / "asyncapi"
-        eventcatalog_dir = temp_path / "eventcatalog"
-
-        asyncapi_dir.mkdir()
-        eventcatalog_dir.mkdir()
-
-        yield {
-            "temp_dir": temp_path,
-            "asyncapi_dir": asyncapi_dir,
-            "eventcatalog_dir": eventcatalog_dir,
-        }
+from import_asyncapi import AsyncAPIImporter, PointerResolver, RefSet
 
 
 @pytest.fixture
@@ -413,6 +394,41 @@ class TestRelationshipTracking:
         # Check that service events are tracked
         assert len(importer.service_events) > 0
 
+    def test_refs_tracked_once_in_first_seen_order(self, temp_dirs):
+        """Test that repeated references are dropped and order is kept."""
+        importer = AsyncAPIImporter(temp_dirs["asyncapi_dir"], temp_dirs["eventcatalog_dir"])
+        importer.service_events["svc"] = {"sends": RefSet(), "receives": RefSet()}
+
+        for slug in ["b", "a", "b", "c", "a"]:
+            importer.track_service_event("svc", "send", {"id": slug, "version": "1.0.0"})
+        importer.track_service_event("svc", "receive", {"id": "a", "version": "1.0.0"})
+        importer.track_subdomain_service("sub", {"id": "svc", "version": "1.0.0"})
+        importer.track_subdomain_service("sub", {"id": "svc", "version": "2.0.0"})
+        importer.track_subdomain_service("sub", {"id": "svc", "version": "1.0.0"})
+
+        assert [ref["id"] for ref in importer.service_events["svc"]["sends"]] == ["b", "a", "c"]
+        assert list(importer.service_events["svc"]["receives"]) == [{"id": "a", "version": "1.0.0"}]
+        assert [ref["version"] for ref in importer.subdomain_services["sub"]] == ["1.0.0", "2.0.0"]
+
+
+class TestRefSet:
+    """Test the insertion-ordered reference set."""
+
+    def test_add_contains_and_len(self):
+        """Test membership is keyed on id and version."""
+        refs = RefSet([{"id": "a", "version": "1.0.0"}])
+
+        assert refs.add({"id": "a", "version": "1.0.0"}) is False
+        assert refs.add({"id": "a", "version": "2.0.0"}) is True
+        assert {"id": "a", "version": "2.0.0"} in refs
+        assert {"id": "b", "version": "1.0.0"} not in refs
+        assert len(refs) == 2
+
+    def test_empty_is_falsy(self):
+        """Test an empty set is falsy, as an empty list was."""
+        assert not RefSet()
+        assert RefSet([{"id": "a", "version": "1.0.0"}])
+
 
 class TestUpdateRelationships:
     """Test relationship update methods."""
@@ -468,6 +484,102 @@ class TestUpdateRelationships:
         importer.update_service_relationships()
 
 
+class TestPointerResolver:
+    """Test local JSON pointer resolution."""
+
+    def test_resolves_and_caches(self, sample_asyncapi):
+        """Test that a pointer resolves to its node and is walked once."""
+        resolver = PointerResolver(sample_asyncapi)
+        ref = "#/channels/test_event_channel_v1/messages/TestEvent"
+
+        node = resolver.resolve(ref)
+
+        assert node["name"] == "TestEvent"
+        sample_asyncapi["channels"].clear()
+        assert resolver.resolve(ref) is node
+
+    def test_escapes_and_indexes(self):
+        """Test ~0, ~1, percent-encoding and list indexes."""
+        resolver = PointerResolver({"a/b": {"c~d": [{"x": 1}, {"y": 2}]}, "e f": 3})
+
+        assert resolver.resolve("#/a~1b/c~0d/1") == {"y": 2}
+        assert resolver.resolve("#/e%20f") == 3
+        assert resolver.resolve("#") == resolver.document
+
+    def test_follows_refs_and_stops_on_cycles(self):
+        """Test that nodes that are only a $ref are followed."""
+        resolver = PointerResolver({
+            "channels": {"c": {"messages": {"M": {"$ref": "#/components/messages/M"}}}},
+            "components": {"messages": {"M": {"name": "M"}, "A": {"$ref": "#/components/messages/B"},
+                                        "B": {"$ref": "#/components/messages/A"}}},
+        })
+
+        assert resolver.resolve("#/channels/c/messages/M") == {"name": "M"}
+        assert resolver.resolve("#/components/messages/A") is None
+        assert resolver.resolve("#/missing") is None
+        assert resolver.resolve("https://example.com/schema.json") is None
+
+    def test_name(self):
+        """Test the message name is the last unescaped token."""
+        assert PointerResolver.name("#/channels/c/messages/Test~1Event") == "Test/Event"
+
+
+class TestOperationMessages:
+    """Test that operations only import the messages they reference."""
+
+    def two_message_spec(self, sample_asyncapi):
+        channel = sample_asyncapi["channels"]["test_event_channel_v1"]
+        channel["messages"]["OtherEvent"] = dict(channel["messages"]["TestEvent"], name="OtherEvent")
+        return sample_asyncapi
+
+    def process(self, temp_dirs, spec):
+        importer = AsyncAPIImporter(temp_dirs["asyncapi_dir"], temp_dirs["eventcatalog_dir"])
+        asyncapi_file = temp_dirs["asyncapi_dir"] / "asyncapi-test.yaml"
+        asyncapi_file.write_text(yaml.dump(spec))
+        importer.process_asyncapi_file(asyncapi_file)
+        return importer
+
+    def test_only_referenced_message(self, temp_dirs, sample_asyncapi):
+        """Test that other messages on the channel are not imported for the operation."""
+        importer = self.process(temp_dirs, self.two_message_spec(sample_asyncapi))
+
+        sends = importer.service_events["test-service"]["sends"]
+        assert [ref["id"] for ref in sends] == ["testevent"]
+
+    def test_all_channel_messages_when_none_listed(self, temp_dirs, sample_asyncapi):
+        """Test that an operation without messages covers its whole channel."""
+        spec = self.two_message_spec(sample_asyncapi)
+        del spec["operations"]["send_test_event"]["messages"]
+
+        importer = self.process(temp_dirs, spec)
+
+        sends = importer.service_events["test-service"]["sends"]
+        assert {ref["id"] for ref in sends} == {"testevent", "otherevent"}
+
+    def test_components_message(self, temp_dirs, sample_asyncapi):
+        """Test that a message defined under components is resolved."""
+        message = sample_asyncapi["channels"]["test_event_channel_v1"]["messages"]["TestEvent"]
+        sample_asyncapi["components"]["messages"]["TestEvent"] = message
+        sample_asyncapi["channels"]["test_event_channel_v1"]["messages"]["TestEvent"] = {
+            "$ref": "#/components/messages/TestEvent"
+        }
+
+        importer = self.process(temp_dirs, sample_asyncapi)
+
+        assert [ref["id"] for ref in importer.service_events["test-service"]["sends"]] == ["testevent"]
+        assert any("testevent" in key for key in importer.created_events)
+
+    def test_unresolved_message_skipped(self, temp_dirs, sample_asyncapi):
+        """Test that a dangling message reference is skipped."""
+        sample_asyncapi["operations"]["send_test_event"]["messages"] = [
+            {"$ref": "#/channels/test_event_channel_v1/messages/Missing"}
+        ]
+
+        importer = self.process(temp_dirs, sample_asyncapi)
+
+        assert len(importer.service_events["test-service"]["sends"]) == 0
+
+
 # Run tests if executed directly
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,193 @@
+"""
+Tests for streaming AsyncAPI specs into outlines.
+"""
+
+import io
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from import_asyncapi import AsyncAPIImporter, AsyncAPIStreamReader, main, read_asyncapi_outline
+
+
+def big_schema(n: int) -> dict:
+    return {"type": "object", "properties": {f"field{m}": {"type": "string", "description": "x" * 80}
+                                             for m in range(20)}}
+
+
+def service_spec(n: int, schemas: int = 5) -> dict:
+    """A spec with unread fields and a large components section around two channels."""
+    return {
+        "asyncapi": "3.0.0",
+        "info": {"title": f"NHS Notify Digital Letters - Service {n}", "version": "1.0.0",
+                 "description": f"Service {n}", "x-service-metadata": {"parent": "Group", "owner": "Team"}},
+        "channels": {
+            f"channel{n}": {
+                "address": f"c/{n}",
+                "description": f"Channel {n}",
+                "bindings": {"kafka": {"topic": f"c{n}"}},
+                "messages": {
+                    f"Event{n}": {
+                        "summary": f"Event {n}",
+                        "description": "Raised when it happens.",
+                        "contentType": "application/cloudevents+json",
+                        "payload": {"$ref": "#/components/schemas/Envelope0"},
+                        "x-schema-url": f"https://notify.nhs.uk/cloudevents/schemas/event{n}.schema.json",
+                        "examples": [{"payload": {"id": "1"}}],
+                    },
+                    "Shared": {"$ref": "#/components/messages/Shared"},
+                },
+            },
+            "other": {"address": "c/other", "messages": {"Other": {"summary": "Other"}}},
+        },
+        "operations": {
+            f"send_{n}": {
+                "action": "send",
+                "channel": {"$ref": f"#/channels/channel{n}"},
+                "messages": [{"$ref": f"#/channels/channel{n}/messages/Event{n}"}],
+                "description": "Sends it.",
+            },
+            "receive_other": {"action": "receive", "channel": {"$ref": "#/channels/other"}},
+            "receive_shared": {
+                "action": "receive",
+                "channel": {"$ref": f"#/channels/channel{n}"},
+                "messages": [{"$ref": f"#/channels/channel{n}/messages/Shared"}],
+            },
+        },
+        "components": {
+            "schemas": {f"Envelope{m}": big_schema(m) for m in range(schemas)},
+            "messages": {"Shared": {"summary": "Shared event", "payload": {"type": "object"}}},
+        },
+    }
+
+
+class TestAsyncAPIStreamReader:
+    """Test the event-driven reader."""
+
+    def test_yields_entries_in_document_order(self):
+        """Channels and operations come one at a time; unread sections are skipped."""
+        entries = list(AsyncAPIStreamReader(io.StringIO(yaml.dump(service_spec(1), sort_keys=False))).entries())
+
+        assert [(section, name) for section, name, _ in entries] == [
+            ("info", None),
+            ("channels", "channel1"),
+            ("channels", "other"),
+            ("operations", "send_1"),
+            ("operations", "receive_other"),
+            ("operations", "receive_shared"),
+            ("components/messages", "Shared"),
+        ]
+        assert entries[1][2] == service_spec(1)["channels"]["channel1"]
+
+    def test_reads_json(self):
+        """JSON specs stream as YAML flow syntax."""
+        text = json.dumps(service_spec(1), indent=2)
+
+        assert read_asyncapi_outline(io.StringIO(text)) == read_asyncapi_outline(
+            io.StringIO(yaml.dump(service_spec(1))))
+
+    def test_outline_keeps_only_read_fields(self):
+        """The outline drops bindings, examples, inline payloads and components/schemas."""
+        outline = read_asyncapi_outline(io.StringIO(yaml.dump(service_spec(1))))
+
+        assert "schemas" not in outline["components"]
+        assert outline["channels"]["channel1"]["messages"]["Event1"] == {
+            "summary": "Event 1",
+            "description": "Raised when it happens.",
+            "contentType": "application/cloudevents+json",
+            "payload": {"$ref": "#/components/schemas/Envelope0"},
+            "x-schema-url": "https://notify.nhs.uk/cloudevents/schemas/event1.schema.json",
+        }
+        assert outline["channels"]["channel1"]["messages"]["Shared"] == {"$ref": "#/components/messages/Shared"}
+        assert outline["components"]["messages"]["Shared"] == {"summary": "Shared event"}
+        assert outline["operations"]["send_1"] == {
+            "action": "send",
+            "channel": {"$ref": "#/channels/channel1"},
+            "messages": [{"$ref": "#/channels/channel1/messages/Event1"}],
+        }
+
+    def test_aliases(self):
+        """Aliases to entries that were read resolve; aliases into skipped sections fail."""
+        text = (
+            "channels:\n"
+            "  a: &chan {address: a/b, messages: {M: {summary: S}}}\n"
+            "  b: *chan\n"
+            "components:\n"
+            "  schemas: {S: &schema {type: object}}\n"
+        )
+        outline = read_asyncapi_outline(io.StringIO(text))
+        assert outline["channels"]["b"] == outline["channels"]["a"]
+
+        with pytest.raises(yaml.YAMLError):
+            read_asyncapi_outline(io.StringIO(text + "operations:\n  op: {action: send, channel: *schema}\n"))
+
+    def test_empty_document(self):
+        """An empty document gives an empty outline."""
+        assert read_asyncapi_outline(io.StringIO("")) == {}
+
+    def test_memory_does_not_grow_with_components(self, temp_path):
+        """Peak memory depends on the channels read, not on the size of skipped sections."""
+        def peak(schemas):
+            spec_file = temp_path / f"asyncapi-{schemas}.yaml"
+            spec_file.write_text(yaml.dump(service_spec(1, schemas)))
+            with open(spec_file, "r") as f:
+                tracemalloc.start()
+                read_asyncapi_outline(f)
+                _, peak_bytes = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            return spec_file.stat().st_size, peak_bytes
+
+        small_size, small_peak = peak(5)
+        large_size, large_peak = peak(200)
+
+        assert large_size > 20 * small_size
+        assert large_peak < 2 * small_peak
+
+
+class TestStreamingImport:
+    """Test importing with stream=True."""
+
+    @pytest.mark.parametrize("suffix", [".yaml", ".json"])
+    @pytest.mark.parametrize("from_combined", [False, True])
+    def test_same_tree_as_full_load(self, temp_path, suffix, from_combined, catalog_tree):
+        """Streaming writes the same catalog as loading each document."""
+        asyncapi_dir = temp_path / "asyncapi"
+        asyncapi_dir.mkdir()
+        for n in range(3):
+            spec = service_spec(n)
+            text = json.dumps(spec, indent=2) if suffix == ".json" else yaml.dump(spec, sort_keys=False)
+            (asyncapi_dir / f"asyncapi-service-{n}{suffix}").write_text(text)
+
+        AsyncAPIImporter(asyncapi_dir, temp_path / "full", from_combined=from_combined).import_all()
+        streamed = AsyncAPIImporter(asyncapi_dir, temp_path / "streamed", from_combined=from_combined, stream=True)
+        streamed.import_all()
+
+        assert catalog_tree(temp_path / "streamed") == catalog_tree(temp_path / "full")
+        assert len(streamed.created_events) == 9
+        assert streamed.instrumentation.counters["files_read"] >= 3
+
+    def test_bad_spec_logged(self, temp_path, capsys):
+        """A spec the reader cannot parse is reported like a load failure."""
+        spec_file = temp_path / "asyncapi-broken.yaml"
+        spec_file.write_text("channels:\n  a: [unclosed\n")
+        importer = AsyncAPIImporter(temp_path, temp_path / "catalog", stream=True)
+
+        assert importer.load_asyncapi_file(spec_file) is None
+        assert "Error loading" in capsys.readouterr().out
+
+    def test_cli_flag(self, temp_path):
+        """--stream is passed to the importer."""
+        argv = ["import_asyncapi.py", "--asyncapi-dir", str(temp_path),
+                "--eventcatalog-dir", str(temp_path / "catalog"), "--stream"]
+
+        with patch.object(sys, "argv", argv):
+            with patch("import_asyncapi.AsyncAPIImporter") as importer:
+                main()
+
+        assert importer.call_args.kwargs["stream"] is True
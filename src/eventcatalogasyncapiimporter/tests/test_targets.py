@@ -0,0 +1,135 @@
+"""
+Tests for rendering several EventCatalog trees from one parse.
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import import_asyncapi
+from import_asyncapi import AsyncAPIImporter, ImportTarget, load_targets, main
+
+SERVICES = 3
+
+
+@pytest.fixture
+def inputs(temp_path):
+    """
+    Write SERVICES specs sharing one event, whose envelope schema names a data schema.
+
+    Each service sends its own event and receives event0.
+    """
+    asyncapi_dir = temp_path / "asyncapi"
+    schema_dir = temp_path / "schema-base" / "schemas"
+    asyncapi_dir.mkdir()
+    schema_dir.mkdir(parents=True)
+    for n in range(SERVICES):
+        (schema_dir / f"event{n}.schema.json").write_text(
+            '{"properties": {"dataschema": {"const": "https://notify.nhs.uk/cloudevents/schemas/'
+            f'data{n}.schema.json"}}}}}}')
+        (schema_dir / f"data{n}.schema.json").write_text('{"type": "object"}')
+    for n in range(SERVICES):
+        spec = {
+            "asyncapi": "3.0.0",
+            "info": {"title": f"NHS Notify Digital Letters - Service {n}", "version": "1.0.0",
+                     "x-service-metadata": {"parent": f"Group {n % 2}"}},
+            "channels": {
+                f"channel{m}": {"address": f"c/{m}", "messages": {f"Event{m}": {
+                    "payload": {"$ref": f"https://notify.nhs.uk/cloudevents/schemas/event{m}.schema.json"}
+                }}} for m in {0, n}
+            },
+            "operations": {
+                f"send_{n}": {"action": "send", "channel": {"$ref": f"#/channels/channel{n}"}},
+                "receive_0": {"action": "receive", "channel": {"$ref": "#/channels/channel0"}},
+            },
+        }
+        (asyncapi_dir / f"asyncapi-service-{n}.yaml").write_text(yaml.dump(spec))
+    return {
+        "temp_dir": temp_path,
+        "asyncapi_dir": asyncapi_dir,
+        "schema_base": temp_path / "schema-base",
+    }
+
+
+def extra_targets(inputs) -> list:
+    return [
+        ImportTarget(inputs["temp_dir"] / "external", "NHS Notify", inputs["schema_base"]),
+        ImportTarget(inputs["temp_dir"] / "bare"),
+    ]
+
+
+class TestImportTargets:
+    """Test fanning one parse out to several catalogs."""
+
+    @pytest.mark.parametrize("io_workers", [0, 4])
+    def test_targets_match_separate_runs(self, inputs, io_workers, catalog_tree):
+        """Each target's tree is the one a separate run writes."""
+        separate = inputs["temp_dir"] / "separate"
+        AsyncAPIImporter(inputs["asyncapi_dir"], separate / "internal",
+                         schema_base_path=inputs["schema_base"]).import_all()
+        for target in extra_targets(inputs):
+            AsyncAPIImporter(inputs["asyncapi_dir"], separate / target.eventcatalog_dir.name,
+                             parent_domain_name=target.parent_domain_name,
+                             schema_base_path=target.schema_base_path).import_all()
+
+        importer = AsyncAPIImporter(inputs["asyncapi_dir"], inputs["temp_dir"] / "internal",
+                                    schema_base_path=inputs["schema_base"], io_workers=io_workers,
+                                    targets=extra_targets(inputs))
+        importer.import_all()
+
+        for name in ("internal", "external", "bare"):
+            assert catalog_tree(inputs["temp_dir"] / name) == catalog_tree(separate / name)
+        assert (inputs["temp_dir"] / "external" / "domains" / "nhs-notify").is_dir()
+        assert [t["eventcatalog_dir"] for t in importer.run_report()["targets"]] == [
+            str(inputs["temp_dir"] / name) for name in ("internal", "external", "bare")]
+
+    def test_specs_and_schemas_read_once(self, inputs):
+        """Specs and envelope schemas are read once across all targets."""
+        reads = Counter()
+        read_text = AsyncAPIImporter._read_text
+
+        def counting_read(importer, file_path):
+            reads[file_path] += 1
+            return read_text(importer, file_path)
+
+        importer = AsyncAPIImporter(inputs["asyncapi_dir"], inputs["temp_dir"] / "internal",
+                                    schema_base_path=inputs["schema_base"], targets=extra_targets(inputs))
+        with patch.object(AsyncAPIImporter, "_read_text", counting_read):
+            importer.import_all()
+
+        sources = {path: count for path, count in reads.items() if path.parent.name in ("asyncapi", "schemas")}
+        assert len(sources) == 2 * SERVICES
+        assert set(sources.values()) == {1}
+
+    def test_load_targets(self, inputs):
+        """Relative paths in the targets file are resolved against its directory."""
+        targets_file = inputs["temp_dir"] / "config" / "targets.yaml"
+        targets_file.parent.mkdir()
+        targets_file.write_text(yaml.dump([
+            {"eventcatalog_dir": "../external", "parent_domain": "NHS Notify", "schema_base_path": "../schema-base"},
+            {"eventcatalog_dir": "/tmp/bare"},
+        ]))
+
+        targets = load_targets(targets_file)
+
+        assert targets[0] == ImportTarget(
+            targets_file.parent / "../external", "NHS Notify", targets_file.parent / "../schema-base")
+        assert targets[1] == ImportTarget(Path("/tmp/bare"), "Digital Letters", None)
+
+    def test_cli_targets(self, inputs):
+        """--targets loads the file and passes its targets to the importer."""
+        targets_file = inputs["temp_dir"] / "targets.yaml"
+        targets_file.write_text(yaml.dump([{"eventcatalog_dir": "external"}]))
+        argv = ["import_asyncapi.py", "--asyncapi-dir", str(inputs["asyncapi_dir"]),
+                "--eventcatalog-dir", str(inputs["temp_dir"] / "internal"), "--targets", str(targets_file)]
+
+        with patch.object(sys, "argv", argv):
+            with patch.object(import_asyncapi, "AsyncAPIImporter") as importer:
+                main()
+
+        assert importer.call_args.kwargs["targets"] == [ImportTarget(inputs["temp_dir"] / "external")]
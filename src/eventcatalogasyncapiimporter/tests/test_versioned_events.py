@@ -0,0 +1,182 @@
+"""
+Tests for versioned event folders.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from import_asyncapi import AsyncAPIImporter, event_version, main, version_key
+
+SCHEMA_URL = "https://notify.nhs.uk/cloudevents/schemas/digital-letters"
+
+
+def message(event_type: str, release: str) -> dict:
+    return {
+        "summary": f"Event: {event_type}",
+        "payload": {"$ref": f"{SCHEMA_URL}/{release}/events/{event_type}.schema.json"},
+    }
+
+
+def write_release(temp_path: Path, release: str, types=("uk.nhs.notify.letter.sent.v1",), schema="{}") -> Path:
+    """Write a one-service spec for release, and its schemas, returning the spec directory."""
+    asyncapi_dir = temp_path / "asyncapi" / release
+    asyncapi_dir.mkdir(parents=True)
+    events_dir = temp_path / "schema-base" / "schemas" / "digital-letters" / release / "events"
+    events_dir.mkdir(parents=True, exist_ok=True)
+
+    channels, operations = {}, {}
+    for event_type in types:
+        (events_dir / f"{event_type}.schema.json").write_text(schema)
+        channel_id = event_type.replace(".", "_")
+        channels[channel_id] = {"address": channel_id, "messages": {"LetterSent": message(event_type, release)}}
+        operations[f"send_{channel_id}"] = {"action": "send", "channel": {"$ref": f"#/channels/{channel_id}"}}
+    spec = {
+        "asyncapi": "3.0.0",
+        "info": {"title": "NHS Notify Digital Letters - Sender", "version": release,
+                 "x-service-metadata": {"parent": "Letters"}},
+        "channels": channels,
+        "operations": operations,
+    }
+    (asyncapi_dir / "asyncapi-sender.yaml").write_text(yaml.dump(spec))
+    return asyncapi_dir
+
+
+@pytest.fixture
+def import_release(temp_path, run_import):
+    """Return a helper importing one release's specs into the catalog with versioned events."""
+    def run(asyncapi_dir: Path, **kwargs) -> AsyncAPIImporter:
+        return run_import(asyncapi_dir, temp_path / "catalog", schema_base_path=temp_path / "schema-base",
+                          versioned_events=True, **kwargs)
+    return run
+
+
+def event_dir(temp_path: Path) -> Path:
+    return temp_path / "catalog/domains/digital-letters/subdomains/letters/services/sender/events/lettersent"
+
+
+class TestEventVersion:
+    """Test deriving versions from event types and schema paths."""
+
+    @pytest.mark.parametrize("message_data, expected", [
+        (message("uk.nhs.notify.letter.sent.v1", "2025-10-draft"), "1.0.0-2025-10-draft"),
+        (message("uk.nhs.notify.letter.sent.v12", "2026-01"), "12.0.0-2026-01"),
+        ({"summary": "Event: uk.nhs.notify.letter.sent.v2"}, "2.0.0"),
+        ({"x-schema-url": f"{SCHEMA_URL}/2025-10-draft/events/uk.x.v3.schema.json",
+          "payload": {"$ref": "#/components/schemas/X"}}, "3.0.0-2025-10-draft"),
+        ({"payload": {"$ref": "https://example.com/release_1/events/x.schema.json"}}, "1.0.0-release-1"),
+        ({"summary": "Something"}, "1.0.0"),
+    ])
+    def test_event_version(self, message_data, expected):
+        assert event_version(message_data) == expected
+
+    def test_version_order(self):
+        """Pre-releases sort before their release, identifiers compare numerically."""
+        versions = ["2.0.0-2025-10-draft", "1.0.0", "1.0.0-alpha.10", "1.0.0-2026-01",
+                    "1.0.0-alpha.2", "1.0.0-2025-10-draft", "latest"]
+
+        assert sorted(versions, key=version_key) == [
+            "latest", "1.0.0-2025-10-draft", "1.0.0-2026-01", "1.0.0-alpha.2",
+            "1.0.0-alpha.10", "1.0.0", "2.0.0-2025-10-draft",
+        ]
+
+
+class TestVersionedEvents:
+    """Test the versioned/ layout across imports."""
+
+    def test_releases_accumulate(self, temp_path, import_release):
+        """A newer release moves the previous one under versioned/, sharing identical schemas."""
+        import_release(write_release(temp_path, "2025-10-draft"))
+        importer = import_release(write_release(temp_path, "2026-01"))
+
+        root = event_dir(temp_path)
+        archived = root / "versioned" / "1.0.0-2025-10-draft"
+        assert "version: 1.0.0-2026-01" in (root / "index.mdx").read_text()
+        assert "version: 1.0.0-2025-10-draft" in (archived / "index.mdx").read_text()
+
+        schema = "uk.nhs.notify.letter.sent.v1.schema.json"
+        assert (root / schema).samefile(archived / schema)
+        assert importer.run_report()["event_files_linked"] == 1
+
+        service_page = (root.parent.parent / "index.mdx").read_text()
+        assert "version: 1.0.0-2026-01" in service_page
+
+    def test_changed_schema_not_linked(self, temp_path, import_release):
+        """Schemas that differ between releases are kept apart."""
+        import_release(write_release(temp_path, "2025-10-draft", schema='{"v": 1}'))
+        import_release(write_release(temp_path, "2026-01", schema='{"v": 2}'))
+
+        schema = "uk.nhs.notify.letter.sent.v1.schema.json"
+        root = event_dir(temp_path)
+        assert (root / schema).read_text() == '{"v": 2}'
+        assert (root / "versioned" / "1.0.0-2025-10-draft" / schema).read_text() == '{"v": 1}'
+
+    @pytest.mark.parametrize("io_workers", [0, 4])
+    def test_reimporting_older_release(self, temp_path, import_release, io_workers):
+        """Re-importing an older release updates its folder without touching the latest or its links."""
+        older = write_release(temp_path, "2025-10-draft")
+        import_release(older)
+        import_release(write_release(temp_path, "2026-01"))
+        schema_file = temp_path / "schema-base/schemas/digital-letters/2025-10-draft/events" / \
+            "uk.nhs.notify.letter.sent.v1.schema.json"
+        schema_file.write_text('{"fixed": true}')
+
+        import_release(older, io_workers=io_workers)
+
+        schema = "uk.nhs.notify.letter.sent.v1.schema.json"
+        root = event_dir(temp_path)
+        assert "version: 1.0.0-2026-01" in (root / "index.mdx").read_text()
+        assert (root / schema).read_text() == "{}"
+        assert (root / "versioned" / "1.0.0-2025-10-draft" / schema).read_text() == '{"fixed": true}'
+
+    def test_major_versions_in_one_spec(self, temp_path, import_release):
+        """v1 and v2 of an event type in one spec share a folder, with v2 on top."""
+        asyncapi_dir = write_release(temp_path, "2025-10-draft",
+                                     types=("uk.nhs.notify.letter.sent.v1", "uk.nhs.notify.letter.sent.v2"))
+
+        importer = import_release(asyncapi_dir)
+
+        root = event_dir(temp_path)
+        assert "version: 2.0.0-2025-10-draft" in (root / "index.mdx").read_text()
+        assert (root / "versioned" / "1.0.0-2025-10-draft" / "index.mdx").exists()
+        assert len(importer.created_events) == 2
+
+    def test_reimport_same_release(self, temp_path, import_release):
+        """Importing the same release again leaves one copy at the top."""
+        asyncapi_dir = write_release(temp_path, "2025-10-draft")
+        import_release(asyncapi_dir)
+        first = {path.name: path.read_bytes() for path in event_dir(temp_path).iterdir()}
+
+        import_release(asyncapi_dir)
+
+        assert {path.name: path.read_bytes() for path in event_dir(temp_path).iterdir()} == first
+        assert not (event_dir(temp_path) / "versioned").exists()
+
+    def test_replaces_unversioned_catalog(self, temp_path, import_release, run_import):
+        """A catalog imported without versioned events has its 1.0.0 pages replaced, not kept on top."""
+        asyncapi_dir = write_release(temp_path, "2025-10-draft")
+        run_import(asyncapi_dir, temp_path / "catalog", schema_base_path=temp_path / "schema-base")
+        root = event_dir(temp_path)
+        assert "version: 1.0.0\n" in (root / "index.mdx").read_text()
+
+        import_release(asyncapi_dir)
+
+        assert "version: 1.0.0-2025-10-draft" in (root / "index.mdx").read_text()
+        assert not (root / "versioned").exists()
+        service = yaml.safe_load((root.parent.parent / "index.mdx").read_text().split("---\n")[1])
+        assert service["sends"] == [{"id": "lettersent", "version": "1.0.0-2025-10-draft"}]
+
+    def test_cli_flag(self, temp_path):
+        """--versioned-events is passed to the importer."""
+        argv = ["import_asyncapi.py", "--asyncapi-dir", str(temp_path),
+                "--eventcatalog-dir", str(temp_path / "catalog"), "--versioned-events"]
+
+        with patch.object(sys, "argv", argv):
+            with patch("import_asyncapi.AsyncAPIImporter") as importer:
+                main()
+
+        assert importer.call_args.kwargs["versioned_events"] is True
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Structured logging shared by the Python CLIs under src/.
+
+Console output defaults to INFO, which carries run summaries only; per-item
+detail (each file loaded, generated or converted) is logged at DEBUG. A JSON
+lines log file can be attached to capture every record, including DEBUG,
+for later analysis regardless of the console level.
+
+The level and log file can also be set through the BUILD_LOG_LEVEL and
+BUILD_LOG_FILE environment variables, so scripts that run other scripts as
+subprocesses pass their settings down without extra arguments. Scripts that
+capture a subprocess's output instead run it with relay_env() and pass the
+output to relay_output(), so its records go through their own logger.
+"""
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Union
+
+LOG_LEVEL_ENV = "BUILD_LOG_LEVEL"
+LOG_FILE_ENV = "BUILD_LOG_FILE"
+# "json" makes the console write every record as JSON, for relay_output()
+LOG_FORMAT_ENV = "BUILD_LOG_FORMAT"
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+DEFAULT_LOG_LEVEL = "INFO"
+
+# Attributes present on every LogRecord; anything else was passed via extra=
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+}
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Stream handler that always writes to the current sys.stdout."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        # sys.stdout is looked up on every emit, so ignore assignments
+        pass
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def get_logger(tool: str) -> logging.Logger:
+    """
+    Return the logger for a tool.
+
+    The first call attaches a console handler writing plain messages to
+    stdout at the default level, so modules can log before (or without)
+    configure_logging being called.
+    """
+    logger = logging.getLogger(tool)
+    if not any(isinstance(h, _StdoutHandler) for h in logger.handlers):
+        console = _StdoutHandler()
+        if _relayed():
+            console.setFormatter(JsonFormatter())
+        else:
+            console.setFormatter(logging.Formatter("%(message)s"))
+        console.setLevel(_console_level(os.environ.get(LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL)))
+        logger.addHandler(console)
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+    return logger
+
+
+def configure_logging(
+    tool: str,
+    level: Optional[str] = None,
+    log_file: Optional[Union[str, Path]] = None,
+) -> logging.Logger:
+    """
+    Configure a tool's console level and optional JSON log file.
+
+    Args:
+        tool: Logger name
+        level: Console level name (default: BUILD_LOG_LEVEL or INFO)
+        log_file: Append every record as JSON lines to this file
+            (default: BUILD_LOG_FILE, if set)
+
+    Returns:
+        The configured logger
+    """
+    logger = get_logger(tool)
+    level = (level or os.environ.get(LOG_LEVEL_ENV) or DEFAULT_LOG_LEVEL).upper()
+    log_file = log_file or os.environ.get(LOG_FILE_ENV)
+
+    for handler in list(logger.handlers):
+        if isinstance(handler, _StdoutHandler):
+            handler.setLevel(_console_level(level))
+        elif isinstance(handler, logging.FileHandler):
+            logger.removeHandler(handler)
+            handler.close()
+
+    if log_file:
+        log_path = Path(log_file)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(log_path, mode="a", encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        file_handler.setLevel(logging.DEBUG)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+def _relayed() -> bool:
+    """Whether this process's output is being relayed by the script that ran it."""
+    return os.environ.get(LOG_FORMAT_ENV) == "json"
+
+
+def _console_level(level: str) -> str:
+    # A relayed console writes every record; the relaying script filters them
+    return "DEBUG" if _relayed() else level.upper()
+
+
+def relay_env() -> dict:
+    """
+    Return the environment for a subprocess whose output is passed to relay_output().
+
+    The subprocess writes every record to stdout as JSON and no log file,
+    since the relaying script applies its own level and log file.
+    """
+    env = dict(os.environ)
+    env[LOG_FORMAT_ENV] = "json"
+    env.pop(LOG_FILE_ENV, None)
+    return env
+
+
+def relay_output(logger: logging.Logger, output: str) -> None:
+    """
+    Log a subprocess's output through logger.
+
+    JSON records written under relay_env() keep their level, logger name,
+    time and extra fields; any other line is logged at INFO.
+    """
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            entry = None
+        if not isinstance(entry, dict) or "message" not in entry:
+            logger.info("%s", line)
+            continue
+        fields = {key: value for key, value in entry.items()
+                  if key not in ("time", "level", "logger", "message")}
+        level = getattr(logging, str(entry.get("level", "INFO")), logging.INFO)
+        record = logging.makeLogRecord({
+            **fields,
+            "name": entry.get("logger", logger.name),
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "msg": entry["message"],
+        })
+        if "time" in entry:
+            record.created = datetime.fromisoformat(entry["time"]).timestamp()
+        logger.handle(record)
+
+
+def export_logging_env(level: Optional[str], log_file: Optional[Union[str, Path]]) -> None:
+    """Export the level and log file so subprocesses inherit them."""
+    if level:
+        os.environ[LOG_LEVEL_ENV] = level.upper()
+    if log_file:
+        os.environ[LOG_FILE_ENV] = str(Path(log_file).resolve())
+
+
+def add_logging_arguments(parser) -> None:
+    """Add --log-level and --log-file to an argparse parser."""
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        choices=LOG_LEVELS,
+        default=None,
+        help="Console log level; per-item detail is logged at DEBUG (default: INFO)",
+    )
+    parser.add_argument(
+        "--log-file",
+        type=str,
+        metavar="PATH",
+        default=None,
+        help="Append all log records, including DEBUG, to PATH as JSON lines",
+    )
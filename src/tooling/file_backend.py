@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+File system backends shared by the Python CLIs under src/.
+
+A tool that reads and writes through a FileBackend can run against the disk
+(LocalFileBackend) or in memory (MemoryFileBackend). The memory backend
+reads through to an optional base backend and keeps every change to
+itself. plan() lists the net changes, one step per directory or file, and
+flush() applies them to another backend in one pass: directories first,
+then file writes, copies and links, which can run on an IOExecutor, then
+removals. Steps whose file already holds the planned content are skipped.
+"""
+import errno
+import fnmatch
+import io
+import locale
+import os
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, TextIO
+
+# Plan step actions, in the order flush() applies them
+MKDIR = "mkdir"
+WRITE = "write"
+COPY = "copy"
+LINK = "link"
+REMOVE = "remove"
+RMDIR = "rmdir"
+ACTIONS = (MKDIR, WRITE, COPY, LINK, REMOVE, RMDIR)
+
+
+class FileStat(NamedTuple):
+    """The parts of os.stat_result the tools read."""
+
+    st_size: int
+    st_mtime_ns: int
+    st_nlink: int
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    """
+    One change recorded by MemoryFileBackend.
+
+    source is the file copied for COPY and the file linked to for LINK;
+    data is the content for WRITE. mtime_ns is kept for written files that
+    began as copies, so they keep their source's modification time.
+    """
+
+    action: str
+    path: Path
+    source: Optional[Path] = None
+    data: Optional[bytes] = None
+    mtime_ns: Optional[int] = None
+
+
+class FileBackend(ABC):
+    """
+    The file operations the tools use, on pathlib paths.
+
+    Semantics follow pathlib, os and shutil: missing paths raise
+    FileNotFoundError, and writes need their parent directory to exist.
+    Subclasses implement every abstract method, so an incomplete backend
+    fails when it is created.
+    """
+
+    @abstractmethod
+    def read_bytes(self, path: Path) -> bytes:
+        """Read a file's content."""
+
+    @abstractmethod
+    def open_text(self, path: Path) -> TextIO:
+        """Open a file for reading text, like open(path, "r")."""
+
+    def read_text(self, path: Path) -> str:
+        with self.open_text(path) as f:
+            return f.read()
+
+    @abstractmethod
+    def write_text(self, path: Path, content: str) -> None:
+        """Write text to path, like Path.write_text."""
+
+    @abstractmethod
+    def write_bytes(self, path: Path, data: bytes, mtime_ns: Optional[int] = None) -> None:
+        """Write data to path, setting its modification time if mtime_ns is given."""
+
+    @abstractmethod
+    def copy(self, source: Path, destination: Path) -> None:
+        """Copy a file with its modification time, like shutil.copy2."""
+
+    @abstractmethod
+    def stat(self, path: Path) -> FileStat:
+        """Return the size, modification time and link count of a file."""
+
+    @abstractmethod
+    def exists(self, path: Path) -> bool:
+        """Whether path is a file or directory."""
+
+    @abstractmethod
+    def is_file(self, path: Path) -> bool:
+        """Whether path is a file."""
+
+    @abstractmethod
+    def is_dir(self, path: Path) -> bool:
+        """Whether path is a directory."""
+
+    @abstractmethod
+    def mkdir(self, path: Path, parents: bool = False, exist_ok: bool = False) -> None:
+        """Create a directory, like Path.mkdir."""
+
+    @abstractmethod
+    def iterdir(self, path: Path) -> List[Path]:
+        """The entries of a directory."""
+
+    def glob(self, path: Path, pattern: str) -> List[Path]:
+        """Entries of directory path whose names match pattern; empty if path is not a directory."""
+        if not self.is_dir(path):
+            return []
+        return [child for child in self.iterdir(path) if fnmatch.fnmatchcase(child.name, pattern)]
+
+    @abstractmethod
+    def replace(self, source: Path, destination: Path) -> None:
+        """Move a file, replacing destination, like os.replace."""
+
+    @abstractmethod
+    def unlink(self, path: Path) -> None:
+        """Remove a file."""
+
+    @abstractmethod
+    def rmdir(self, path: Path) -> None:
+        """Remove an empty directory."""
+
+    @abstractmethod
+    def link(self, source: Path, destination: Path) -> None:
+        """Make destination a hard link to source, like os.link."""
+
+    @abstractmethod
+    def samefile(self, first: Path, second: Path) -> bool:
+        """Whether two paths are the same file, like os.path.samefile."""
+
+
+class LocalFileBackend(FileBackend):
+    """The local disk."""
+
+    def read_bytes(self, path: Path) -> bytes:
+        return Path(path).read_bytes()
+
+    def open_text(self, path: Path) -> TextIO:
+        return open(path, "r")
+
+    def write_text(self, path: Path, content: str) -> None:
+        with open(path, "w") as f:
+            f.write(content)
+
+    def write_bytes(self, path: Path, data: bytes, mtime_ns: Optional[int] = None) -> None:
+        with open(path, "wb") as f:
+            f.write(data)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def copy(self, source: Path, destination: Path) -> None:
+        shutil.copy2(source, destination)
+
+    def stat(self, path: Path) -> FileStat:
+        return os.stat(path)
+
+    def exists(self, path: Path) -> bool:
+        return Path(path).exists()
+
+    def is_file(self, path: Path) -> bool:
+        return Path(path).is_file()
+
+    def is_dir(self, path: Path) -> bool:
+        return Path(path).is_dir()
+
+    def mkdir(self, path: Path, parents: bool = False, exist_ok: bool = False) -> None:
+        Path(path).mkdir(parents=parents, exist_ok=exist_ok)
+
+    def iterdir(self, path: Path) -> List[Path]:
+        return list(Path(path).iterdir())
+
+    def glob(self, path: Path, pattern: str) -> List[Path]:
+        return list(Path(path).glob(pattern))
+
+    def replace(self, source: Path, destination: Path) -> None:
+        os.replace(source, destination)
+
+    def unlink(self, path: Path) -> None:
+        Path(path).unlink()
+
+    def rmdir(self, path: Path) -> None:
+        Path(path).rmdir()
+
+    def link(self, source: Path, destination: Path) -> None:
+        os.link(source, destination)
+
+    def samefile(self, first: Path, second: Path) -> bool:
+        return os.path.samefile(first, second)
+
+
+class _Entry:
+    """A file's content in memory, shared by the paths hard-linked to it."""
+
+    __slots__ = ("data", "source", "size", "mtime_ns", "copied", "links")
+
+    def __init__(self, data: Optional[bytes], source: Optional[Path], size: int, mtime_ns: int, copied: bool):
+        # Content, or None while it is still the base's file at source
+        self.data = data
+        self.source = source
+        self.size = size
+        self.mtime_ns = mtime_ns
+        # Copies and moves keep their source's modification time
+        self.copied = copied
+        self.links = 0
+
+
+def _missing(path: Path) -> FileNotFoundError:
+    return FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), str(path))
+
+
+class MemoryFileBackend(FileBackend):
+    """
+    Files and directories held in memory on top of a read-only base.
+
+    Paths the memory backend has not written or removed are read from base,
+    so a run can read its inputs and an existing catalog from disk while
+    writing nothing there. Copies of base files are not read until they are
+    flushed, unless the base file is overwritten first. The backend is
+    thread-safe, so it can be written from an IOExecutor's workers.
+    """
+
+    def __init__(self, base: Optional[FileBackend] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            base: Backend to read paths this one has not changed from
+                (default: none, so only files written here exist)
+        """
+        self.base = base
+        self._lock = threading.RLock()
+        self._files: Dict[Path, _Entry] = {}
+        self._dirs: Set[Path] = set()
+        # Paths removed here that base may still have
+        self._removed: Set[Path] = set()
+        # Names created here in each directory, merged with base's in iterdir()
+        self._children: Dict[Path, Set[str]] = {}
+        # Entries still reading their content from each base path
+        self._pending_copies: Dict[Path, List[_Entry]] = {}
+
+    def _in_base(self, path: Path) -> bool:
+        return self.base is not None and path not in self._removed and path not in self._files \
+            and path not in self._dirs
+
+    def _base_file(self, path: Path) -> bool:
+        return self._in_base(path) and self.base.is_file(path)
+
+    def _add_child(self, path: Path) -> None:
+        self._children.setdefault(path.parent, set()).add(path.name)
+
+    def _check_parent(self, path: Path) -> None:
+        if not self.is_dir(path.parent):
+            raise _missing(path.parent)
+        if self.is_dir(path):
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), str(path))
+
+    def _materialize(self, path: Path) -> None:
+        """Read the base file at path into the copies made of it, before path changes."""
+        for entry in self._pending_copies.pop(path, []):
+            if entry.data is None:
+                entry.data = self.base.read_bytes(path)
+
+    def _drop(self, path: Path) -> None:
+        entry = self._files.pop(path, None)
+        if entry is not None:
+            entry.links -= 1
+        self._children.get(path.parent, set()).discard(path.name)
+
+    def _set(self, path: Path, entry: _Entry, materialize: bool = True) -> None:
+        """Point path at entry, replacing whatever was there."""
+        if materialize:
+            self._materialize(path)
+        self._drop(path)
+        self._files[path] = entry
+        entry.links += 1
+        self._removed.discard(path)
+        self._add_child(path)
+
+    def _entry_for(self, path: Path) -> _Entry:
+        """The entry for a file, taking an unchanged base file into memory by reference."""
+        entry = self._files.get(path)
+        if entry is not None:
+            return entry
+        if not self._base_file(path):
+            raise _missing(path)
+        base_stat = self.base.stat(path)
+        entry = _Entry(None, path, base_stat.st_size, base_stat.st_mtime_ns, copied=True)
+        self._pending_copies.setdefault(path, []).append(entry)
+        return entry
+
+    def read_bytes(self, path: Path) -> bytes:
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is None:
+                if not self._base_file(path):
+                    raise _missing(path)
+                return self.base.read_bytes(path)
+            if entry.data is not None:
+                return entry.data
+            return self.base.read_bytes(entry.source)
+
+    def open_text(self, path: Path) -> TextIO:
+        with self._lock:
+            if path not in self._files and self._base_file(path):
+                return self.base.open_text(path)
+            return io.TextIOWrapper(io.BytesIO(self.read_bytes(path)))
+
+    def write_text(self, path: Path, content: str) -> None:
+        self.write_bytes(path, content.encode(locale.getpreferredencoding(False)))
+
+    def write_bytes(self, path: Path, data: bytes, mtime_ns: Optional[int] = None) -> None:
+        with self._lock:
+            self._check_parent(path)
+            entry = _Entry(data, None, len(data), time.time_ns() if mtime_ns is None else mtime_ns,
+                           copied=mtime_ns is not None)
+            self._set(path, entry)
+
+    def copy(self, source: Path, destination: Path) -> None:
+        with self._lock:
+            original = self._entry_for(source)
+            self._check_parent(destination)
+            entry = _Entry(original.data, original.source, original.size, original.mtime_ns, copied=True)
+            if entry.data is None:
+                self._pending_copies.setdefault(entry.source, []).append(entry)
+            self._set(destination, entry)
+
+    def stat(self, path: Path) -> FileStat:
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None:
+                return FileStat(entry.size, entry.mtime_ns, entry.links)
+            if path in self._dirs:
+                return FileStat(0, 0, 1)
+            if not self._in_base(path):
+                raise _missing(path)
+            return self.base.stat(path)
+
+    def exists(self, path: Path) -> bool:
+        with self._lock:
+            return path in self._files or self.is_dir(path) or (self._in_base(path) and self.base.exists(path))
+
+    def is_file(self, path: Path) -> bool:
+        with self._lock:
+            return path in self._files or self._base_file(path)
+
+    def is_dir(self, path: Path) -> bool:
+        with self._lock:
+            # The root and the working directory always exist
+            return path in self._dirs or path == path.parent or (self._in_base(path) and self.base.is_dir(path))
+
+    def mkdir(self, path: Path, parents: bool = False, exist_ok: bool = False) -> None:
+        with self._lock:
+            if self.exists(path):
+                if exist_ok and self.is_dir(path):
+                    return
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), str(path))
+            if path.parent != path and not self.is_dir(path.parent):
+                if not parents:
+                    raise _missing(path.parent)
+                self.mkdir(path.parent, parents=True, exist_ok=True)
+            self._dirs.add(path)
+            self._removed.discard(path)
+            self._add_child(path)
+
+    def iterdir(self, path: Path) -> List[Path]:
+        with self._lock:
+            if not self.is_dir(path):
+                raise _missing(path)
+            names = set(self._children.get(path, ()))
+            if self.base is not None and path not in self._removed and self.base.is_dir(path):
+                names.update(child.name for child in self.base.iterdir(path) if child not in self._removed)
+            return [path / name for name in sorted(names)]
+
+    def replace(self, source: Path, destination: Path) -> None:
+        with self._lock:
+            entry = self._entry_for(source)
+            self._check_parent(destination)
+            # Keep the entry alive while source is dropped
+            entry.links += 1
+            self.unlink(source)
+            self._set(destination, entry)
+            entry.links -= 1
+
+    def unlink(self, path: Path) -> None:
+        with self._lock:
+            if path in self._files:
+                self._drop(path)
+            elif not self._base_file(path):
+                raise _missing(path)
+            if self.base is not None and self.base.exists(path):
+                self._removed.add(path)
+
+    def rmdir(self, path: Path) -> None:
+        with self._lock:
+            if self.iterdir(path):
+                raise OSError(errno.ENOTEMPTY, os.strerror(errno.ENOTEMPTY), str(path))
+            self._dirs.discard(path)
+            self._children.pop(path, None)
+            self._children.get(path.parent, set()).discard(path.name)
+            if self.base is not None and self.base.is_dir(path):
+                self._removed.add(path)
+
+    def link(self, source: Path, destination: Path) -> None:
+        with self._lock:
+            entry = self._entry_for(source)
+            if self.exists(destination):
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), str(destination))
+            self._check_parent(destination)
+            if source not in self._files:
+                # The base file keeps its content, so copies of it can stay unread
+                self._set(source, entry, materialize=False)
+            self._set(destination, entry)
+
+    def samefile(self, first: Path, second: Path) -> bool:
+        with self._lock:
+            if first in self._files or second in self._files:
+                return self._files.get(first) is self._files.get(second)
+            if self.base is None:
+                raise _missing(first)
+            return self.base.samefile(first, second)
+
+    def _base_holds(self, path: Path, data: bytes) -> bool:
+        try:
+            return self.base is not None and self.base.stat(path).st_size == len(data) \
+                and self.base.read_bytes(path) == data
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            return False
+
+    def plan(self) -> List[PlanStep]:
+        """
+        List the changes made here, relative to base.
+
+        Directories come first, parents before children, then each file
+        that was written, copied or linked, then removed files and
+        directories, children before parents. Hard-linked paths give one
+        WRITE or COPY for the first path and a LINK for each of the others.
+        A base file that was only linked to keeps its content and is not
+        copied, and files rewritten with the content base already has are
+        left out.
+        """
+        with self._lock:
+            steps = [PlanStep(MKDIR, path) for path in sorted(self._dirs)
+                     if self.base is None or not self.base.is_dir(path)]
+
+            groups: Dict[int, List[Path]] = {}
+            for path in sorted(self._files):
+                groups.setdefault(id(self._files[path]), []).append(path)
+            for paths in groups.values():
+                entry = self._files[paths[0]]
+                # A linked base file stays where it is, and the others link to it
+                paths.sort(key=lambda path: path != entry.source)
+                first = paths[0]
+                if entry.data is not None:
+                    if len(paths) == 1 and self._base_holds(first, entry.data):
+                        continue
+                    steps.append(PlanStep(WRITE, first, data=entry.data,
+                                          mtime_ns=entry.mtime_ns if entry.copied else None))
+                elif entry.source != first:
+                    steps.append(PlanStep(COPY, first, source=entry.source))
+                steps.extend(PlanStep(LINK, path, source=first) for path in paths[1:])
+
+            removed = sorted(self._removed, reverse=True)
+            steps.extend(PlanStep(REMOVE, path) for path in removed if not self.base.is_dir(path))
+            steps.extend(PlanStep(RMDIR, path) for path in removed if self.base.is_dir(path))
+            return steps
+
+    def flush(self, target: FileBackend, executor: Optional[Any] = None) -> Dict[str, int]:
+        """
+        Apply plan() to target and forget the changes made here.
+
+        Args:
+            target: Backend to write to, normally the base
+            executor: Optional IOExecutor to run file steps on. Links are keyed on
+                the file they link to, so they run after it is written.
+
+        Returns:
+            Steps applied per action, and "unchanged" for file steps skipped
+            because target already held their content
+        """
+        with self._lock:
+            steps = self.plan()
+            counts = dict.fromkeys(ACTIONS + ("unchanged",), 0)
+            counts_lock = threading.Lock()
+
+            def run(step: PlanStep) -> None:
+                applied = _apply_file_step(target, step)
+                with counts_lock:
+                    counts[step.action if applied else "unchanged"] += 1
+
+            for step in steps:
+                if step.action == MKDIR:
+                    target.mkdir(step.path, parents=True, exist_ok=True)
+                    counts[MKDIR] += 1
+                elif step.action in (WRITE, COPY, LINK):
+                    if executor is None:
+                        run(step)
+                    else:
+                        executor.submit(step.source if step.action == LINK else step.path, run, step)
+            if executor is not None:
+                executor.wait()
+
+            for step in steps:
+                if step.action not in (REMOVE, RMDIR):
+                    continue
+                try:
+                    if step.action == REMOVE:
+                        target.unlink(step.path)
+                    else:
+                        target.rmdir(step.path)
+                except FileNotFoundError:
+                    continue
+                counts[step.action] += 1
+
+            self._files.clear()
+            self._dirs.clear()
+            self._removed.clear()
+            self._children.clear()
+            self._pending_copies.clear()
+            return counts
+
+
+def _apply_file_step(target: FileBackend, step: PlanStep) -> bool:
+    """Apply a WRITE, COPY or LINK step; return False if target already held the content."""
+    try:
+        current = target.stat(step.path)
+    except FileNotFoundError:
+        current = None
+
+    if step.action == LINK:
+        if current is not None:
+            if target.samefile(step.source, step.path):
+                return False
+            target.unlink(step.path)
+        target.link(step.source, step.path)
+        return True
+
+    if current is not None:
+        if step.action == COPY:
+            source = target.stat(step.source)
+            if current.st_size == source.st_size and current.st_mtime_ns == source.st_mtime_ns:
+                return False
+        elif current.st_size == len(step.data) and target.read_bytes(step.path) == step.data:
+            return False
+        # Writing in place would change the files linked to this one too
+        if current.st_nlink > 1:
+            target.unlink(step.path)
+
+    if step.action == COPY:
+        target.copy(step.source, step.path)
+    else:
+        target.write_bytes(step.path, step.data, step.mtime_ns)
+    return True
+
+
+def summarize_plan(steps: Iterable[PlanStep]) -> Dict[str, int]:
+    """Count plan steps per action."""
+    counts = dict.fromkeys(ACTIONS, 0)
+    for step in steps:
+        counts[step.action] += 1
+    return counts
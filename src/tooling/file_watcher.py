@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+File watching shared by the Python CLIs under src/.
+
+Uses watchdog (inotify on Linux) when it is installed and falls back to
+polling file modification times otherwise. Either way callers get batches
+of changed paths, so a burst of editor writes triggers one rebuild.
+"""
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - exercised when watchdog is absent
+    FileSystemEventHandler = object
+    Observer = None
+
+# (mtime_ns, size) per file
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+def take_snapshot(directories: Iterable[Path], pattern: str = "*.md") -> Snapshot:
+    """Record the modification time and size of every matching file."""
+    snapshot: Snapshot = {}
+    for directory in directories:
+        directory = Path(directory)
+        if not directory.exists():
+            continue
+        for path in directory.rglob(pattern):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def diff_snapshots(before: Snapshot, after: Snapshot) -> Set[Path]:
+    """Return paths that were added, removed or modified between snapshots."""
+    changed = set(before.keys() ^ after.keys())
+    changed.update(path for path in before.keys() & after.keys() if before[path] != after[path])
+    return changed
+
+
+class _ChangeCollector(FileSystemEventHandler):
+    """Collect paths from watchdog events until drained."""
+
+    def __init__(self, pattern: str):
+        super().__init__()
+        self.suffix = pattern.lstrip("*")
+        self.pending: Set[Path] = set()
+        self.lock = threading.Lock()
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        paths = [event.src_path, getattr(event, "dest_path", None)]
+        with self.lock:
+            for path in paths:
+                if path and str(path).endswith(self.suffix):
+                    self.pending.add(Path(path))
+
+    def drain(self) -> Set[Path]:
+        with self.lock:
+            pending, self.pending = self.pending, set()
+        return pending
+
+
+class FileWatcher:
+    """Watch directories for changes to files matching a pattern."""
+
+    def __init__(
+        self,
+        directories: Iterable[Path],
+        pattern: str = "*.md",
+        interval: float = 0.5,
+        use_native: Optional[bool] = None,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            directories: Directories to watch recursively
+            pattern: Glob pattern for files of interest
+            interval: Seconds between checks for changes
+            use_native: Use watchdog if True, polling if False, and watchdog
+                when available if None
+        """
+        self.directories = [Path(d) for d in directories]
+        self.pattern = pattern
+        self.interval = interval
+        if use_native is None:
+            use_native = Observer is not None
+        if use_native and Observer is None:
+            raise RuntimeError("watchdog is not installed; install it or use polling")
+        self.native = use_native
+        self._observer = None
+        self._collector: Optional[_ChangeCollector] = None
+        self._snapshot: Snapshot = {}
+
+    @property
+    def mode(self) -> str:
+        """'native' or 'polling'."""
+        return "native" if self.native else "polling"
+
+    def start(self) -> None:
+        """Start watching from the current state of the directories."""
+        if self.native:
+            self._collector = _ChangeCollector(self.pattern)
+            self._observer = Observer()
+            for directory in self.directories:
+                if directory.exists():
+                    self._observer.schedule(self._collector, str(directory), recursive=True)
+            self._observer.start()
+        else:
+            self._snapshot = take_snapshot(self.directories, self.pattern)
+
+    def stop(self) -> None:
+        """Stop watching."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def poll(self) -> Set[Path]:
+        """Return the paths changed since start() or the previous poll()."""
+        if self.native:
+            return self._collector.drain()
+        snapshot = take_snapshot(self.directories, self.pattern)
+        changed = diff_snapshots(self._snapshot, snapshot)
+        self._snapshot = snapshot
+        return changed
+
+    def run(
+        self,
+        callback: Callable[[Set[Path]], None],
+        stop_event: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Call callback with each batch of changed paths until stopped.
+
+        Runs until stop_event is set or KeyboardInterrupt is raised.
+        """
+        stop_event = stop_event or threading.Event()
+        self.start()
+        try:
+            while not stop_event.wait(self.interval):
+                changed = self.poll()
+                if changed:
+                    callback(changed)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Build instrumentation shared by the Python CLIs under src/.
+
+Records named timing spans (load, parse, render, write, copy, ...) and
+counters (files read/written/skipped, bytes) for a single tool run, and can
+wrap the run in cProfile so CI can see where build time goes without any
+code changes.
+"""
+import cProfile
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+# Counter names used consistently across the tools
+FILES_READ = "files_read"
+FILES_WRITTEN = "files_written"
+FILES_SKIPPED = "files_skipped"
+FILES_COPIED = "files_copied"
+FILES_UNCHANGED = "files_unchanged"
+FILES_DEDUPLICATED = "files_deduplicated"
+BYTES_READ = "bytes_read"
+BYTES_WRITTEN = "bytes_written"
+BYTES_COPIED = "bytes_copied"
+
+
+class Instrumentation:
+    """Collects span timings and counters for one run of a tool."""
+
+    def __init__(self, tool: str):
+        """
+        Initialize instrumentation for a tool.
+
+        Args:
+            tool: Tool name, used in the summary and profile file names
+        """
+        self.tool = tool
+        self.spans: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[List[Any]]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        Time a named span.
+
+        Spans may nest. total_seconds is inclusive of nested spans while
+        self_seconds excludes them, so self times add up to the instrumented
+        wall time without double counting.
+        """
+        stack = self._stack()
+        # Each frame is [name, seconds spent in nested spans]
+        frame: List[Any] = [name, 0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            with self._lock:
+                entry = self.spans.setdefault(
+                    name, {"count": 0, "total_seconds": 0.0, "self_seconds": 0.0}
+                )
+                entry["count"] += 1
+                entry["total_seconds"] += elapsed
+                entry["self_seconds"] += elapsed - frame[1]
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Increment a named counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_read(self, nbytes: int) -> None:
+        """Record a file read of nbytes."""
+        self.count(FILES_READ)
+        self.count(BYTES_READ, nbytes)
+
+    def record_write(self, nbytes: int) -> None:
+        """Record a file write of nbytes."""
+        self.count(FILES_WRITTEN)
+        self.count(BYTES_WRITTEN, nbytes)
+
+    def record_copy(self, nbytes: int) -> None:
+        """Record a file copy of nbytes."""
+        self.count(FILES_COPIED)
+        self.count(BYTES_COPIED, nbytes)
+
+    def record_skip(self) -> None:
+        """Record a file that was skipped."""
+        self.count(FILES_SKIPPED)
+
+    def record_unchanged(self) -> None:
+        """Record a write skipped because the file already had that content."""
+        self.count(FILES_UNCHANGED)
+
+    def record_deduplicated(self) -> None:
+        """Record a copy skipped because the destination already matched the source."""
+        self.count(FILES_DEDUPLICATED)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable summary of spans and counters."""
+        with self._lock:
+            spans = {
+                name: {
+                    "count": int(entry["count"]),
+                    "total_seconds": round(entry["total_seconds"], 6),
+                    "self_seconds": round(entry["self_seconds"], 6),
+                }
+                for name, entry in sorted(self.spans.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+
+        return {
+            "tool": self.tool,
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": round(time.perf_counter() - self._start, 6),
+            "spans": spans,
+            "counters": counters,
+        }
+
+    def write_summary(self, path: Union[str, Path]) -> Path:
+        """Write the summary as JSON to path and return the path."""
+        summary_path = Path(path)
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(summary_path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        return summary_path
+
+    @contextmanager
+    def profile(self, profile_dir: Optional[Union[str, Path]]) -> Iterator[None]:
+        """
+        Run the enclosed block under cProfile when profile_dir is set.
+
+        Writes <tool>.prof (load with pstats or snakeviz) and
+        <tool>-timings.json into profile_dir. Does nothing when profile_dir
+        is None, so callers can wrap their run unconditionally.
+        """
+        if not profile_dir:
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            output_dir = Path(profile_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(output_dir / f"{self.tool}.prof"))
+            self.write_summary(output_dir / f"{self.tool}-timings.json")
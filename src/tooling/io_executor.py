@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Bounded background file I/O shared by the Python CLIs under src/.
+
+IOExecutor runs file copies and writes on a small thread pool so a tool can
+keep rendering while a slow (for example network-mounted) disk catches up.
+Tasks are keyed by their destination path: tasks with the same key run in
+the order they were submitted, so a file rewritten several times ends up
+with its last content. Failures are collected rather than raised, and
+reported together by wait().
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class IOExecutorError(Exception):
+    """Raised by IOExecutor.wait() with every task that failed since the last wait."""
+
+    def __init__(self, failures: List[Tuple[Hashable, Exception]]):
+        self.failures = failures
+        shown = "; ".join(f"{key}: {error}" for key, error in failures[:5])
+        more = f" (and {len(failures) - 5} more)" if len(failures) > 5 else ""
+        super().__init__(f"{len(failures)} I/O task(s) failed: {shown}{more}")
+
+
+class IOExecutor:
+    """Runs keyed I/O tasks on a bounded thread pool."""
+
+    def __init__(self, max_workers: int = 8, max_pending: Optional[int] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Worker threads; 0 runs every task inline in submit()
+            max_pending: Tasks that may be queued or running at once before
+                submit() blocks (default: four per worker)
+        """
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="io") if max_workers > 0 else None
+        self._slots = threading.BoundedSemaphore(max_pending or max(1, max_workers) * 4)
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, Future] = {}
+        self._failures: List[Tuple[Hashable, Exception]] = []
+
+    def _run(self, key: Hashable, previous: Optional[Future], fn: Callable, args: Tuple[Any, ...]) -> None:
+        try:
+            # The pool takes tasks in submission order, so an earlier task
+            # with the same key is already running or done
+            if previous is not None:
+                previous.result()
+            fn(*args)
+        except Exception as error:
+            with self._lock:
+                self._failures.append((key, error))
+
+    def _release(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        self._slots.release()
+
+    def submit(self, key: Hashable, fn: Callable, *args: Any) -> None:
+        """Run fn(*args) in the background after any earlier task with the same key."""
+        if self._pool is None:
+            self._run(key, None, fn, args)
+            return
+
+        self._slots.acquire()
+        with self._lock:
+            previous = self._pending.get(key)
+            future = self._pool.submit(self._run, key, previous, fn, args)
+            self._pending[key] = future
+        future.add_done_callback(lambda done: self._release(key, done))
+
+    def flush(self, key: Hashable) -> None:
+        """Wait for the tasks queued for key, for example before reading the file back."""
+        with self._lock:
+            future = self._pending.get(key)
+        if future is not None:
+            future.result()
+
+    def wait(self) -> None:
+        """
+        Wait for every queued task.
+
+        Raises:
+            IOExecutorError: if any task failed since the last wait
+        """
+        waited = set()
+        while True:
+            with self._lock:
+                futures = [future for future in self._pending.values() if future not in waited]
+            if not futures:
+                break
+            for future in futures:
+                future.result()
+                waited.add(future)
+
+        with self._lock:
+            failures, self._failures = self._failures, []
+        if failures:
+            raise IOExecutorError(failures)
+
+    def shutdown(self) -> None:
+        """Wait for queued tasks and stop the worker threads."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "IOExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.wait()
+        finally:
+            self.shutdown()
@@ -0,0 +1,179 @@
+"""
+Tests for the shared structured logging.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from build_logging import (
+    LOG_FILE_ENV,
+    LOG_FORMAT_ENV,
+    LOG_LEVEL_ENV,
+    add_logging_arguments,
+    configure_logging,
+    export_logging_env,
+    get_logger,
+    relay_env,
+    relay_output,
+)
+
+
+@pytest.fixture
+def tool(request, monkeypatch):
+    """A unique logger name per test, with the logging env vars cleared."""
+    monkeypatch.delenv(LOG_LEVEL_ENV, raising=False)
+    monkeypatch.delenv(LOG_FILE_ENV, raising=False)
+    monkeypatch.delenv(LOG_FORMAT_ENV, raising=False)
+    name = f"test-tool-{request.node.name}"
+    yield name
+    for handler in list(logging.getLogger(name).handlers):
+        handler.close()
+        logging.getLogger(name).removeHandler(handler)
+
+
+class TestConsole:
+    """Tests for console output."""
+
+    def test_default_level_hides_debug(self, tool, capsys):
+        """Test that INFO is shown and DEBUG is hidden by default."""
+        logger = get_logger(tool)
+
+        logger.info('summary line')
+        logger.debug('per-item line')
+
+        output = capsys.readouterr().out
+        assert 'summary line' in output
+        assert 'per-item line' not in output
+
+    def test_configure_debug_level(self, tool, capsys):
+        """Test that configuring DEBUG shows per-item detail."""
+        logger = configure_logging(tool, level='debug')
+
+        logger.debug('per-item line')
+
+        assert 'per-item line' in capsys.readouterr().out
+
+    def test_level_from_environment(self, tool, monkeypatch, capsys):
+        """Test that BUILD_LOG_LEVEL sets the level when none is passed."""
+        monkeypatch.setenv(LOG_LEVEL_ENV, 'WARNING')
+        logger = configure_logging(tool)
+
+        logger.info('summary line')
+
+        assert capsys.readouterr().out == ''
+
+    def test_get_logger_is_idempotent(self, tool):
+        """Test that repeated calls do not add duplicate console handlers."""
+        get_logger(tool)
+        logger = get_logger(tool)
+
+        assert len(logger.handlers) == 1
+
+
+class TestJsonLogFile:
+    """Tests for the JSON lines log file."""
+
+    def test_log_file_captures_all_levels(self, tool, tmp_path, capsys):
+        """Test that DEBUG records reach the file even at the default console level."""
+        log_file = tmp_path / 'logs' / 'build.jsonl'
+        logger = configure_logging(tool, log_file=log_file)
+
+        logger.debug('per-item line', extra={'path': 'a/b.yaml'})
+        logger.info('summary line')
+
+        assert 'per-item line' not in capsys.readouterr().out
+        records = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert [r['level'] for r in records] == ['DEBUG', 'INFO']
+        assert records[0]['logger'] == tool
+        assert records[0]['message'] == 'per-item line'
+        assert records[0]['path'] == 'a/b.yaml'
+
+    def test_reconfigure_replaces_log_file(self, tool, tmp_path):
+        """Test that configuring again does not leave the old file handler attached."""
+        configure_logging(tool, log_file=tmp_path / 'first.jsonl')
+        logger = configure_logging(tool, log_file=tmp_path / 'second.jsonl')
+
+        logger.info('message')
+
+        assert (tmp_path / 'first.jsonl').read_text() == ''
+        assert 'message' in (tmp_path / 'second.jsonl').read_text()
+
+    def test_export_logging_env(self, tool, tmp_path, monkeypatch):
+        """Test exporting settings for subprocesses."""
+        # Register the variables with monkeypatch so they are restored afterwards
+        monkeypatch.setenv(LOG_LEVEL_ENV, '')
+        monkeypatch.setenv(LOG_FILE_ENV, '')
+
+        export_logging_env('debug', tmp_path / 'build.jsonl')
+
+        assert os.environ[LOG_LEVEL_ENV] == 'DEBUG'
+        assert os.environ[LOG_FILE_ENV] == str((tmp_path / 'build.jsonl').resolve())
+
+
+class TestRelay:
+    """Tests for relaying a subprocess's records through the logger that ran it."""
+
+    def test_relayed_console_writes_every_record_as_json(self, tool, monkeypatch, capsys):
+        """Test that a relayed process writes DEBUG records as JSON whatever its level."""
+        monkeypatch.setenv(LOG_FORMAT_ENV, 'json')
+        logger = configure_logging(tool, level='WARNING')
+
+        logger.debug('per-item line', extra={'path': 'a/b.yaml'})
+
+        record = json.loads(capsys.readouterr().out)
+        assert (record['level'], record['message'], record['path']) == ('DEBUG', 'per-item line', 'a/b.yaml')
+
+    def test_relay_env(self, tool, monkeypatch, tmp_path):
+        """Test that the relayed environment asks for JSON and no log file."""
+        monkeypatch.setenv(LOG_FILE_ENV, str(tmp_path / 'build.jsonl'))
+
+        env = relay_env()
+
+        assert env[LOG_FORMAT_ENV] == 'json'
+        assert LOG_FILE_ENV not in env
+
+    def test_relay_output_keeps_levels(self, tool, tmp_path, capsys):
+        """Test that relayed records keep their level, logger and fields, and plain lines are INFO."""
+        log_file = tmp_path / 'build.jsonl'
+        logger = configure_logging(tool, log_file=log_file)
+        output = '\n'.join([
+            json.dumps({'time': '2025-11-10T09:00:00+00:00', 'level': 'DEBUG', 'logger': 'child',
+                        'message': 'per-item line', 'path': 'a/b.yaml'}),
+            json.dumps({'time': '2025-11-10T09:00:01+00:00', 'level': 'WARNING', 'logger': 'child',
+                        'message': 'bad schema'}),
+            'plain line',
+            '',
+        ])
+
+        relay_output(logger, output)
+
+        assert capsys.readouterr().out == 'bad schema\nplain line\n'
+        records = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert [(r['level'], r['logger'], r['message']) for r in records] == [
+            ('DEBUG', 'child', 'per-item line'),
+            ('WARNING', 'child', 'bad schema'),
+            ('INFO', tool, 'plain line'),
+        ]
+        assert records[0]['path'] == 'a/b.yaml'
+        assert records[0]['time'] == '2025-11-10T09:00:00+00:00'
+
+
+class TestArguments:
+    """Tests for the argparse helpers."""
+
+    def test_add_logging_arguments(self):
+        """Test --log-level is case-insensitive and --log-file is optional."""
+        parser = argparse.ArgumentParser()
+        add_logging_arguments(parser)
+
+        args = parser.parse_args(['--log-level', 'debug'])
+
+        assert args.log_level == 'DEBUG'
+        assert args.log_file is None
@@ -0,0 +1,222 @@
+"""
+Tests for the shared file system backends.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from file_backend import (
+    COPY, LINK, MKDIR, REMOVE, RMDIR, WRITE,
+    FileBackend, LocalFileBackend, MemoryFileBackend, summarize_plan,
+)
+from io_executor import IOExecutor
+
+
+def tree(root: Path) -> dict:
+    """Each file's content and link count, and each directory."""
+    files = {}
+    for path in sorted(root.rglob("*")):
+        if path.is_file():
+            stat = path.stat()
+            files[str(path.relative_to(root))] = (path.read_bytes(), stat.st_nlink)
+        else:
+            files[str(path.relative_to(root))] = "dir"
+    return files
+
+
+def seed(root: Path) -> None:
+    """An existing output tree, with a source file kept outside it."""
+    (root / "src").mkdir()
+    (root / "src" / "schema.json").write_text('{"type": "object"}')
+    (root / "out" / "old").mkdir(parents=True)
+    (root / "out" / "old" / "index.mdx").write_text("old")
+    (root / "out" / "keep.txt").write_text("keep")
+    (root / "out" / "empty").mkdir()
+
+
+def scenario(fs, root: Path) -> None:
+    """Writes, copies, moves, links and removals, as an import with versioned events makes."""
+    out = root / "out"
+    fs.mkdir(out / "event" / "versioned" / "2.0.0", parents=True)
+    fs.write_text(out / "event" / "versioned" / "2.0.0" / "index.mdx", "v2")
+    fs.copy(root / "src" / "schema.json", out / "event" / "versioned" / "2.0.0" / "schema.json")
+    fs.mkdir(out / "event" / "versioned" / "1.0.0")
+    fs.replace(out / "old" / "index.mdx", out / "event" / "versioned" / "1.0.0" / "index.mdx")
+    fs.copy(root / "src" / "schema.json", out / "event" / "versioned" / "1.0.0" / "schema.json")
+    for path in fs.iterdir(out / "event" / "versioned" / "2.0.0"):
+        fs.replace(path, out / "event" / path.name)
+    fs.rmdir(out / "event" / "versioned" / "2.0.0")
+    fs.rmdir(out / "old")
+    fs.rmdir(out / "empty")
+    fs.link(out / "event" / "schema.json", out / "event" / "versioned" / "1.0.0" / ".schema.json.link")
+    fs.replace(out / "event" / "versioned" / "1.0.0" / ".schema.json.link",
+               out / "event" / "versioned" / "1.0.0" / "schema.json")
+    fs.write_text(out / "keep.txt", "changed")
+
+
+class TestFileBackend:
+    """Tests for the backend interface."""
+
+    def test_incomplete_backend_cannot_be_created(self):
+        """Test that a backend missing an operation fails when created, not when first used."""
+        class ReadOnlyBackend(FileBackend):
+            def read_bytes(self, path):
+                return b""
+
+        with pytest.raises(TypeError, match="write_text"):
+            ReadOnlyBackend()
+
+
+class TestMemoryFileBackend:
+    """Tests for the in-memory overlay."""
+
+    def test_reads_through_and_leaves_base_alone(self, tmp_path):
+        """Test that unchanged paths come from the base and changes stay in memory."""
+        seed(tmp_path)
+        fs = MemoryFileBackend(LocalFileBackend())
+
+        assert fs.read_text(tmp_path / "out" / "keep.txt") == "keep"
+        fs.write_text(tmp_path / "out" / "keep.txt", "changed")
+        fs.unlink(tmp_path / "out" / "old" / "index.mdx")
+        fs.mkdir(tmp_path / "out" / "new")
+
+        assert fs.read_text(tmp_path / "out" / "keep.txt") == "changed"
+        assert not fs.exists(tmp_path / "out" / "old" / "index.mdx")
+        assert fs.iterdir(tmp_path / "out") == [tmp_path / "out" / name for name in ("empty", "keep.txt", "new", "old")]
+        assert fs.iterdir(tmp_path / "out" / "old") == []
+        assert (tmp_path / "out" / "keep.txt").read_text() == "keep"
+        assert (tmp_path / "out" / "old" / "index.mdx").exists()
+        assert not (tmp_path / "out" / "new").exists()
+
+    def test_without_base(self):
+        """Test that a backend with no base holds only what was written to it."""
+        fs = MemoryFileBackend()
+        root = Path("/virtual")
+
+        with pytest.raises(FileNotFoundError):
+            fs.write_text(root / "a.txt", "a")
+        fs.mkdir(root / "dir", parents=True)
+        fs.write_text(root / "dir" / "a.txt", "a")
+
+        assert fs.is_dir(root) and fs.is_file(root / "dir" / "a.txt")
+        assert fs.glob(root / "dir", "*.txt") == [root / "dir" / "a.txt"]
+        assert fs.glob(root / "missing", "*") == []
+        with fs.open_text(root / "dir" / "a.txt") as f:
+            assert f.read() == "a"
+        assert [step.action for step in fs.plan()] == [MKDIR, MKDIR, WRITE]
+
+    def test_path_errors(self):
+        """Test that errors match the os and pathlib calls the backend stands in for."""
+        fs = MemoryFileBackend()
+        fs.mkdir(Path("/d"))
+        fs.write_text(Path("/d/a"), "a")
+
+        with pytest.raises(FileExistsError):
+            fs.mkdir(Path("/d"))
+        fs.mkdir(Path("/d"), exist_ok=True)
+        with pytest.raises(FileNotFoundError):
+            fs.mkdir(Path("/x/y"))
+        with pytest.raises(OSError):
+            fs.rmdir(Path("/d"))
+        with pytest.raises(FileExistsError):
+            fs.link(Path("/d/a"), Path("/d/a"))
+        with pytest.raises(FileNotFoundError):
+            fs.stat(Path("/d/b"))
+
+    def test_links_share_content(self):
+        """Test that linked paths report their link count and a write to one leaves the other."""
+        fs = MemoryFileBackend()
+        fs.mkdir(Path("/d"))
+        fs.write_text(Path("/d/a"), "a")
+        fs.link(Path("/d/a"), Path("/d/b"))
+
+        assert fs.samefile(Path("/d/a"), Path("/d/b"))
+        assert fs.stat(Path("/d/a")).st_nlink == 2
+
+        fs.write_text(Path("/d/b"), "b")
+
+        assert fs.read_text(Path("/d/a")) == "a"
+        assert fs.stat(Path("/d/a")).st_nlink == 1
+
+    def test_copies_are_lazy(self, tmp_path):
+        """Test that a copy of a base file keeps its mtime, and reads it only if the source changes."""
+        seed(tmp_path)
+        source = tmp_path / "src" / "schema.json"
+        fs = MemoryFileBackend(LocalFileBackend())
+        fs.copy(source, tmp_path / "copy.json")
+
+        assert fs.stat(tmp_path / "copy.json").st_mtime_ns == source.stat().st_mtime_ns
+        assert [(step.action, step.source) for step in fs.plan()] == [(COPY, source)]
+
+        fs.write_text(source, "new")
+
+        assert fs.read_text(tmp_path / "copy.json") == '{"type": "object"}'
+        assert [step.action for step in fs.plan()] == [WRITE, WRITE]
+
+    def test_plan(self, tmp_path):
+        """Test that the plan lists directories, then files, then removals."""
+        seed(tmp_path)
+        fs = MemoryFileBackend(LocalFileBackend())
+        scenario(fs, tmp_path)
+
+        plan = fs.plan()
+
+        assert [(step.action, str(step.path.relative_to(tmp_path))) for step in plan] == [
+            (MKDIR, "out/event"),
+            (MKDIR, "out/event/versioned"),
+            (MKDIR, "out/event/versioned/1.0.0"),
+            (WRITE, "out/event/index.mdx"),
+            (COPY, "out/event/schema.json"),
+            (LINK, "out/event/versioned/1.0.0/schema.json"),
+            (COPY, "out/event/versioned/1.0.0/index.mdx"),
+            (WRITE, "out/keep.txt"),
+            (REMOVE, "out/old/index.mdx"),
+            (RMDIR, "out/old"),
+            (RMDIR, "out/empty"),
+        ]
+        assert summarize_plan(plan)[MKDIR] == 3
+
+
+class TestFlush:
+    """Tests for applying a plan."""
+
+    @pytest.mark.parametrize("workers", [None, 4])
+    def test_flush_matches_direct_run(self, tmp_path, workers):
+        """Test that flushing gives the tree the same calls make on disk, links included."""
+        direct, planned = tmp_path / "direct", tmp_path / "planned"
+        for root in (direct, planned):
+            root.mkdir()
+            seed(root)
+        scenario(LocalFileBackend(), direct)
+        fs = MemoryFileBackend(LocalFileBackend())
+        scenario(fs, planned)
+
+        if workers:
+            with IOExecutor(workers) as executor:
+                counts = fs.flush(LocalFileBackend(), executor)
+        else:
+            counts = fs.flush(LocalFileBackend())
+
+        assert tree(planned) == tree(direct)
+        assert counts[LINK] == 1 and counts[RMDIR] == 2
+        assert fs.plan() == []
+
+    def test_flush_skips_unchanged(self, tmp_path):
+        """Test that files already holding the planned content are not rewritten."""
+        seed(tmp_path)
+        target = tmp_path / "out" / "keep.txt"
+        os.utime(target, ns=(1, 1))
+        fs = MemoryFileBackend()
+        fs.mkdir(tmp_path / "out", parents=True)
+        fs.write_text(target, "keep")
+        fs.copy(target, tmp_path / "out" / "copy.txt")
+
+        counts = fs.flush(LocalFileBackend())
+
+        assert counts["unchanged"] == 1 and counts[WRITE] == 1
+        assert target.stat().st_mtime_ns == 1
+        assert (tmp_path / "out" / "copy.txt").read_text() == "keep"
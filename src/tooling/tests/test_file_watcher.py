@@ -0,0 +1,118 @@
+"""
+Tests for the shared file watcher.
+"""
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import file_watcher
+from file_watcher import FileWatcher, diff_snapshots, take_snapshot
+
+
+def touch(path: Path, content: str) -> None:
+    """Write content and bump the mtime so the change is visible on coarse clocks."""
+    path.write_text(content)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestSnapshots:
+    """Tests for snapshot diffing."""
+
+    def test_diff_reports_added_removed_and_modified(self, tmp_path):
+        """Test each kind of change is reported."""
+        kept = tmp_path / 'kept.md'
+        removed = tmp_path / 'removed.md'
+        kept.write_text('a')
+        removed.write_text('b')
+        before = take_snapshot([tmp_path])
+
+        touch(kept, 'changed')
+        removed.unlink()
+        added = tmp_path / 'nested' / 'added.md'
+        added.parent.mkdir()
+        added.write_text('c')
+        (tmp_path / 'ignored.txt').write_text('d')
+
+        assert diff_snapshots(before, take_snapshot([tmp_path])) == {kept, removed, added}
+
+    def test_missing_directory_is_skipped(self, tmp_path):
+        """Test that a directory that does not exist yields an empty snapshot."""
+        assert take_snapshot([tmp_path / 'missing']) == {}
+
+
+class TestPollingWatcher:
+    """Tests for polling mode."""
+
+    def test_poll_returns_changes_once(self, tmp_path):
+        """Test that poll reports a change and then nothing until the next change."""
+        source = tmp_path / 'event.md'
+        source.write_text('a')
+        watcher = FileWatcher([tmp_path], use_native=False)
+        watcher.start()
+
+        assert watcher.poll() == set()
+        touch(source, 'b')
+        assert watcher.poll() == {source}
+        assert watcher.poll() == set()
+        assert watcher.mode == 'polling'
+
+    def test_run_batches_changes_until_stopped(self, tmp_path):
+        """Test that run calls back with changed paths and stops on the event."""
+        source = tmp_path / 'event.md'
+        source.write_text('a')
+        batches = []
+        stop_event = threading.Event()
+
+        def callback(changed):
+            batches.append(changed)
+            stop_event.set()
+
+        watcher = FileWatcher([tmp_path], interval=0.01, use_native=False)
+        thread = threading.Thread(target=watcher.run, args=(callback, stop_event))
+        thread.start()
+        time.sleep(0.05)
+        touch(source, 'b')
+        thread.join(timeout=5)
+
+        assert batches == [{source}]
+
+
+class TestNativeWatcher:
+    """Tests for watchdog mode."""
+
+    def test_native_requires_watchdog(self, tmp_path, monkeypatch):
+        """Test that asking for native mode without watchdog fails clearly."""
+        monkeypatch.setattr(file_watcher, 'Observer', None)
+
+        with pytest.raises(RuntimeError, match='watchdog is not installed'):
+            FileWatcher([tmp_path], use_native=True)
+
+        assert FileWatcher([tmp_path]).mode == 'polling'
+
+    def test_native_reports_changes(self, tmp_path):
+        """Test that watchdog events are collected for matching files."""
+        pytest.importorskip('watchdog')
+        watcher = FileWatcher([tmp_path], use_native=True)
+        watcher.start()
+        try:
+            source = tmp_path / 'event.md'
+            source.write_text('a')
+            (tmp_path / 'ignored.txt').write_text('b')
+
+            changed = set()
+            deadline = time.monotonic() + 5
+            while source not in changed and time.monotonic() < deadline:
+                time.sleep(0.02)
+                changed |= watcher.poll()
+        finally:
+            watcher.stop()
+
+        assert watcher.mode == 'native'
+        assert changed == {source}
@@ -0,0 +1,178 @@
+"""
+Tests for the shared build instrumentation.
+"""
+import json
+import pstats
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from instrumentation import (
+    BYTES_READ,
+    BYTES_WRITTEN,
+    FILES_DEDUPLICATED,
+    FILES_READ,
+    FILES_SKIPPED,
+    FILES_UNCHANGED,
+    FILES_WRITTEN,
+    Instrumentation,
+)
+
+
+class TestSpans:
+    """Tests for span timing."""
+
+    def test_span_records_count_and_time(self):
+        """Test that a span records its call count and duration."""
+        instrumentation = Instrumentation('test-tool')
+
+        for _ in range(3):
+            with instrumentation.span('load'):
+                time.sleep(0.001)
+
+        entry = instrumentation.spans['load']
+        assert entry['count'] == 3
+        assert entry['total_seconds'] >= 0.003
+        assert entry['self_seconds'] == entry['total_seconds']
+
+    def test_nested_span_excluded_from_self_time(self):
+        """Test that nested span time counts towards total but not self time."""
+        instrumentation = Instrumentation('test-tool')
+
+        with instrumentation.span('render'):
+            with instrumentation.span('write'):
+                time.sleep(0.01)
+
+        render = instrumentation.spans['render']
+        write = instrumentation.spans['write']
+        assert render['total_seconds'] >= write['total_seconds']
+        assert render['self_seconds'] < write['total_seconds']
+
+    def test_span_records_time_when_block_raises(self):
+        """Test that a span is still recorded if its block raises."""
+        instrumentation = Instrumentation('test-tool')
+
+        with pytest.raises(ValueError):
+            with instrumentation.span('parse'):
+                raise ValueError('bad input')
+
+        assert instrumentation.spans['parse']['count'] == 1
+
+    def test_spans_are_thread_safe(self):
+        """Test that spans from several threads are all recorded."""
+        instrumentation = Instrumentation('test-tool')
+
+        def worker():
+            for _ in range(100):
+                with instrumentation.span('copy'):
+                    instrumentation.count('files_copied')
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert instrumentation.spans['copy']['count'] == 400
+        assert instrumentation.counters['files_copied'] == 400
+
+
+class TestCounters:
+    """Tests for counters."""
+
+    def test_record_helpers_update_counters(self):
+        """Test the read, write and skip helpers."""
+        instrumentation = Instrumentation('test-tool')
+
+        instrumentation.record_read(100)
+        instrumentation.record_read(50)
+        instrumentation.record_write(10)
+        instrumentation.record_skip()
+
+        assert instrumentation.counters[FILES_READ] == 2
+        assert instrumentation.counters[BYTES_READ] == 150
+        assert instrumentation.counters[FILES_WRITTEN] == 1
+        assert instrumentation.counters[BYTES_WRITTEN] == 10
+        assert instrumentation.counters[FILES_SKIPPED] == 1
+
+    def test_record_unchanged_and_deduplicated(self):
+        """Test the helpers for writes and copies that were not needed."""
+        instrumentation = Instrumentation('test-tool')
+
+        instrumentation.record_unchanged()
+        instrumentation.record_unchanged()
+        instrumentation.record_deduplicated()
+
+        assert instrumentation.counters[FILES_UNCHANGED] == 2
+        assert instrumentation.counters[FILES_DEDUPLICATED] == 1
+        assert FILES_WRITTEN not in instrumentation.counters
+
+
+class TestSummary:
+    """Tests for the JSON timing summary."""
+
+    def test_summary_structure(self):
+        """Test the summary contains the tool, spans and counters."""
+        instrumentation = Instrumentation('test-tool')
+        with instrumentation.span('load'):
+            instrumentation.record_read(1)
+
+        summary = instrumentation.summary()
+
+        assert summary['tool'] == 'test-tool'
+        assert summary['wall_seconds'] >= 0
+        assert summary['spans']['load']['count'] == 1
+        assert summary['counters'][FILES_READ] == 1
+        # Must be serialisable
+        json.dumps(summary)
+
+    def test_write_summary_creates_parent_dirs(self, tmp_path):
+        """Test writing the summary to a nested path."""
+        instrumentation = Instrumentation('test-tool')
+
+        path = instrumentation.write_summary(tmp_path / 'nested' / 'timings.json')
+
+        assert json.loads(path.read_text())['tool'] == 'test-tool'
+
+
+class TestProfile:
+    """Tests for the cProfile wrapper."""
+
+    def test_profile_disabled_writes_nothing(self, tmp_path):
+        """Test that no files are written without a profile directory."""
+        instrumentation = Instrumentation('test-tool')
+
+        with instrumentation.profile(None):
+            sum(range(100))
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_profile_writes_dump_and_summary(self, tmp_path):
+        """Test that a cProfile dump and timing summary are written."""
+        instrumentation = Instrumentation('test-tool')
+        profile_dir = tmp_path / 'profile'
+
+        with instrumentation.profile(profile_dir):
+            with instrumentation.span('render'):
+                sum(range(1000))
+
+        dump = profile_dir / 'test-tool.prof'
+        timings = profile_dir / 'test-tool-timings.json'
+        assert dump.exists()
+        assert pstats.Stats(str(dump)).total_calls > 0
+        assert 'render' in json.loads(timings.read_text())['spans']
+
+    def test_profile_writes_output_when_run_fails(self, tmp_path):
+        """Test that profiling output is still written if the run raises."""
+        instrumentation = Instrumentation('test-tool')
+
+        with pytest.raises(RuntimeError):
+            with instrumentation.profile(tmp_path):
+                raise RuntimeError('build failed')
+
+        assert (tmp_path / 'test-tool-timings.json').exists()
@@ -0,0 +1,102 @@
+"""
+Tests for the shared background I/O executor.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from io_executor import IOExecutor, IOExecutorError
+
+
+def slow_write(path: Path, content: str, delay: float = 0.0) -> None:
+    time.sleep(delay)
+    path.write_text(content)
+
+
+class TestIOExecutor:
+    """Tests for ordering, bounding and error aggregation."""
+
+    def test_tasks_run_in_background(self, tmp_path):
+        """Test that submit returns before a slow task finishes and wait is a barrier."""
+        with IOExecutor(max_workers=4) as executor:
+            start = time.perf_counter()
+            for n in range(4):
+                executor.submit(tmp_path / f"{n}.txt", slow_write, tmp_path / f"{n}.txt", str(n), 0.1)
+            submitted = time.perf_counter() - start
+            executor.wait()
+            waited = time.perf_counter() - start
+
+        assert submitted < 0.1
+        assert waited < 0.35
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["0.txt", "1.txt", "2.txt", "3.txt"]
+
+    def test_same_key_runs_in_order(self, tmp_path):
+        """Test that the last write to a path wins even if earlier ones are slower."""
+        target = tmp_path / "index.mdx"
+
+        with IOExecutor(max_workers=4) as executor:
+            executor.submit(target, slow_write, target, "first", 0.1)
+            executor.submit(target, slow_write, target, "second", 0.0)
+
+        assert target.read_text() == "second"
+
+    def test_flush_waits_for_key(self, tmp_path):
+        """Test that flush makes a queued write visible."""
+        target = tmp_path / "index.mdx"
+        with IOExecutor(max_workers=2) as executor:
+            executor.submit(target, slow_write, target, "content", 0.05)
+            executor.flush(target)
+
+            assert target.read_text() == "content"
+
+    def test_bounded_concurrency(self):
+        """Test that no more than max_workers tasks run at once."""
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def task():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+
+        with IOExecutor(max_workers=3, max_pending=5) as executor:
+            for n in range(20):
+                executor.submit(n, task)
+
+        assert max(peak) <= 3
+        assert len(peak) == 20
+
+    def test_failures_aggregated(self, tmp_path):
+        """Test that every failure is reported once by wait and others still run."""
+        executor = IOExecutor(max_workers=2)
+        executor.submit("a", slow_write, tmp_path / "missing" / "a.txt", "a")
+        executor.submit("b", slow_write, tmp_path / "b.txt", "b")
+        executor.submit("c", slow_write, tmp_path / "missing" / "c.txt", "c")
+
+        with pytest.raises(IOExecutorError) as exc_info:
+            executor.wait()
+        executor.wait()
+        executor.shutdown()
+
+        assert sorted(key for key, _ in exc_info.value.failures) == ["a", "c"]
+        assert "2 I/O task(s) failed" in str(exc_info.value)
+        assert (tmp_path / "b.txt").read_text() == "b"
+
+    def test_inline_when_no_workers(self, tmp_path):
+        """Test that max_workers=0 runs each task in submit."""
+        executor = IOExecutor(max_workers=0)
+        executor.submit("a", slow_write, tmp_path / "a.txt", "a")
+
+        assert (tmp_path / "a.txt").read_text() == "a"
+        executor.submit("b", slow_write, tmp_path / "missing" / "b.txt", "b")
+        with pytest.raises(IOExecutorError):
+            executor.wait()